@@ -2,12 +2,17 @@
 """Merge multiple energy-measurement CSVs into one.
 
 Preserving input order and dropping duplicate commits. Supports files with or without headers.
+Kept for existing scripts, with the same options and output; it runs the same streaming merge as
+``energytrackr merge``.
 """
 
 import argparse
+import csv
+import os
 import sys
+import tempfile
 
-import pandas as pd
+from energytrackr.utils.merge import MergeSummary, merge_result_files
 
 
 def parse_args() -> argparse.Namespace:
@@ -54,51 +59,43 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def merge_csv_files(input_files: list[str], hash_column: str, data_column: str, no_header: bool) -> pd.DataFrame:
-    """Merge a list of CSVs into one DataFrame, dropping duplicate commit hashes.
+def write_two_columns(merged: str, output: str, hash_column: str, data_column: str) -> None:
+    """Write the output of headerless inputs: a `hash,data` header, then the first two columns of every row.
 
     Args:
-        input_files: List of paths to CSV files, in merge order.
-        hash_column: Name for the commit-hash column.
-        data_column: Name for the energy-value column.
-        no_header: If True, treat every file as having no header and exactly
-                   two columns (hash then value).
+        merged: The merged headerless file.
+        output: Path of the output.
+        hash_column: Name of the commit-hash column.
+        data_column: Name of the energy-value column.
+    """
+    with (
+        open(merged, newline="", encoding="utf-8") as fh,
+        open(output, "w", newline="", encoding="utf-8") as out,
+    ):
+        writer = csv.writer(out)
+        writer.writerow([hash_column, data_column])
+        writer.writerows(row[:2] for row in csv.reader(fh) if row)
+
+
+def merge(args: argparse.Namespace) -> MergeSummary:
+    """Merge the input files into the output.
+
+    Args:
+        args: The parsed command-line arguments.
 
     Returns:
-        A pandas.DataFrame with all unique commits in input order.
+        The counts of the merge.
     """
-    merged = pd.DataFrame()
-    seen_hashes = set()
-
-    for idx, path in enumerate(input_files, start=1):
-        try:
-            if no_header:
-                df = pd.read_csv(path, header=None)
-                if df.shape[1] < 2:
-                    sys.exit(f"Error: '{path}' has fewer than 2 columns.")
-                # Keep only first two columns
-                df = df.iloc[:, :2]
-                df.columns = [hash_column, data_column]
-            else:
-                df = pd.read_csv(path)
-        except Exception as e:
-            sys.exit(f"Error reading '{path}': {e}")
-
-        if hash_column not in df.columns:
-            sys.exit(f"Error: Column '{hash_column}' not found in '{path}'. Available columns: {list(df.columns)}")
-
-        if idx == 1:
-            # First file: take everything
-            merged = df.copy()
-            seen_hashes.update(merged[hash_column].astype(str).tolist())
-        else:
-            # Later files: only new hashes
-            mask_new = ~df[hash_column].astype(str).isin(seen_hashes)
-            new_rows = df.loc[mask_new]
-            merged = pd.concat([merged, new_rows], ignore_index=True)
-            seen_hashes.update(new_rows[hash_column].astype(str).tolist())
-
-    return merged
+    if not args.no_header:
+        return merge_result_files(args.inputs, args.output, header=True, hash_column=args.hash_column)
+    fd, merged = tempfile.mkstemp(suffix=".csv", dir=os.path.dirname(os.path.abspath(args.output)))
+    os.close(fd)
+    try:
+        summary = merge_result_files(args.inputs, merged)
+        write_two_columns(merged, args.output, args.hash_column, args.data_column)
+    finally:
+        os.remove(merged)
+    return summary
 
 
 def main() -> None:
@@ -108,19 +105,12 @@ def main() -> None:
     if len(args.inputs) < 2:
         sys.exit("Please provide at least two input CSV files to merge.")
 
-    merged_df = merge_csv_files(
-        args.inputs,
-        hash_column=args.hash_column,
-        data_column=args.data_column,
-        no_header=args.no_header,
-    )
-
     try:
-        merged_df.to_csv(args.output, index=False)
-    except Exception as e:
-        sys.exit(f"Error writing output '{args.output}': {e}")
+        summary = merge(args)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Error merging into '{args.output}': {e}")
 
-    print(f"Merged {len(args.inputs)} files into '{args.output}' ({len(merged_df)} total unique commits).")
+    print(f"Merged {summary.files} files into '{args.output}' ({summary.commits} total unique commits).")
 
 
 if __name__ == "__main__":
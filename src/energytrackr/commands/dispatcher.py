@@ -2,10 +2,16 @@
 
 import argparse
 
+from energytrackr.pipeline.bisect import bisect
+from energytrackr.pipeline.distributed import coordinate, work
 from energytrackr.pipeline.pipeline import measure
+from energytrackr.pipeline.watch import watch
 from energytrackr.plot.pipeline import plot
 from energytrackr.utils.exceptions import UnknownCommandError
+from energytrackr.utils.logger import logger
+from energytrackr.utils.merge import merge_result_files
 from energytrackr.utils.sort import reorder_commits
+from energytrackr.utils.tracing import format_summary, read_chrome_trace, summarize
 
 
 def handle_command(args: argparse.Namespace) -> None:
@@ -20,12 +26,43 @@ def handle_command(args: argparse.Namespace) -> None:
     match args.command:
         case "measure":
             # Measure energy consumption
-            measure(args.config)
+            measure(args.config, resume=args.resume, retry_failed=args.retry_failed)
+        case "bisect":
+            # Binary-search the first commit whose energy differs from the good one
+            bisect(args.config, args.good, args.bad, args.plot_config)
+        case "watch":
+            # Measure new commits continuously
+            watch(args.config, args.plot_config, once=args.once)
         case "sort":
             # Sort a result file
-            reorder_commits(args.file, args.repo_path, args.output_file)
+            reorder_commits(args.file, args.repo_path, args.output_file, args.branch)
+        case "merge":
+            # Merge result files
+            summary = merge_result_files(
+                args.inputs,
+                args.output,
+                args.policy,
+                args.hash_column if args.header else None,
+            )
+            logger.info(
+                "Merged %d files into %s: %d rows of %d commits, %d rows dropped.",
+                summary.files,
+                args.output,
+                summary.rows,
+                summary.commits,
+                summary.dropped,
+            )
         case "plot":
             # Plot a result file
             plot(args.file, args.repo_path)
+        case "coordinate":
+            # Distribute the measurement tasks to workers
+            coordinate(args.config, args.queue)
+        case "work":
+            # Measure tasks published by a coordinator
+            work(args.config, args.queue, args.host)
+        case "trace":
+            # Summarize the time spent per stage
+            logger.info("Time per stage in %s:\n%s", args.file, format_summary(summarize(read_chrome_trace(args.file))))
         case _:
             raise UnknownCommandError(args.command)
@@ -1,10 +1,12 @@
 """This module defines the configuration model for the pipeline."""
 
 from enum import StrEnum
-from typing import Self
+from typing import Any, Self
 
 from pydantic import BaseModel, Field, model_validator
 
+from energytrackr.utils.exceptions import DuplicateStageNameError, StageCycleError, UnknownStageDependencyError
+
 
 class ModeEnum(StrEnum):
     """Mode of execution for the pipeline.
@@ -30,6 +32,71 @@ class GranularityEnum(StrEnum):
     TAGS = "tags"
 
 
+class MeasurementBackendEnum(StrEnum):
+    """Backend used to measure the energy of a test run.
+
+    - 'perf': Run the test command under `perf stat`.
+    - 'rapl': Read the powercap RAPL counters directly before and after the test command.
+    """
+
+    PERF = "perf"
+    RAPL = "rapl"
+
+
+class ScheduleStrategyEnum(StrEnum):
+    """Order in which the runs of a campaign are measured.
+
+    - 'sequential': Every run of a batch of commits, then the next batch, in history order.
+    - 'round_robin': The campaign is measured in rounds, each one giving every commit its share of runs.
+    - 'abba': Rounds alternate between history order and reverse order (forward, backward, backward, forward).
+    - 'latin_square': Rounds order batches and commits by the rows of a Williams Latin square.
+    - 'random': Rounds order batches and commits randomly.
+    """
+
+    SEQUENTIAL = "sequential"
+    ROUND_ROBIN = "round_robin"
+    ABBA = "abba"
+    LATIN_SQUARE = "latin_square"
+    RANDOM = "random"
+
+
+class WorkspaceStrategyEnum(StrEnum):
+    """Strategy used to create the per-commit workspaces.
+
+    - 'copy': Full copy of the clone, including `.git`.
+    - 'worktree': `git worktree add --detach`, sharing the object store of the clone.
+    - 'shared_clone': `git clone --shared`, borrowing the objects of the clone.
+    - 'reflink': Copy-on-write copy of the clone (`cp --reflink=auto`), falling back to a full copy.
+    """
+
+    COPY = "copy"
+    WORKTREE = "worktree"
+    SHARED_CLONE = "shared_clone"
+    REFLINK = "reflink"
+
+
+class ResultFormatEnum(StrEnum):
+    """Storage format of the measurement results.
+
+    - 'csv': Headerless `commit,value...` rows, one per run.
+    - 'sqlite': A SQLite table with one row per run, holding the values and the run metadata.
+    """
+
+    CSV = "csv"
+    SQLITE = "sqlite"
+
+
+class CooldownModeEnum(StrEnum):
+    """Temperature the CPU is brought to before each measurement.
+
+    - 'ceiling': Wait until the temperature is below `temperature_safe_limit`.
+    - 'warm_steady': Keep the temperature within `band` below `temperature_safe_limit`, warming the CPU up if needed.
+    """
+
+    CEILING = "ceiling"
+    WARM_STEADY = "warm_steady"
+
+
 class RepositoryDefinition(BaseModel):
     """Definition of the repository to be tested."""
 
@@ -46,6 +113,126 @@ class RepositoryDefinition(BaseModel):
     )
 
 
+class AdaptiveSamplingDefinition(BaseModel):
+    """Configuration of the adaptive sampling of commits.
+
+    Instead of measuring every commit `num_runs` times, commits are measured in rounds and a
+    commit stops being measured once the confidence interval of its median is narrow enough,
+    unless one of its neighbours looks statistically different. `num_runs` becomes the upper bound.
+    """
+
+    enabled: bool = Field(default=False, description="Flag indicating whether adaptive sampling is used.", examples=[True])
+    initial_runs: int = Field(default=5, ge=2, description="Runs of every commit in the first round.", examples=[5])
+    runs_per_round: int = Field(default=5, ge=1, description="Runs added to an unsettled commit per round.", examples=[5])
+    relative_ci_width: float = Field(
+        default=0.02,
+        gt=0,
+        description="Relative width of the confidence interval of the median below which a commit is settled.",
+        examples=[0.02],
+    )
+    confidence: float = Field(
+        default=0.95,
+        gt=0,
+        lt=1,
+        description="Confidence level of the interval of the median.",
+        examples=[0.95],
+    )
+    neighbour_p_value: float = Field(
+        default=0.05,
+        gt=0,
+        lt=1,
+        description="Welch's t-test p-value below which a commit and its neighbour are considered different.",
+        examples=[0.05],
+    )
+
+
+class ScheduleDefinition(BaseModel):
+    """Configuration of the order of the runs over the campaign.
+
+    Except for 'sequential', the runs of every commit are spread over the whole campaign so that a
+    slow drift of the machine (temperature, ambient conditions) is not mistaken for a trend over
+    the history. Batches still hold at most `batch_size` commits, but a commit is built again in
+    every round unless the workspace cache keeps it.
+    """
+
+    strategy: ScheduleStrategyEnum = Field(
+        default=ScheduleStrategyEnum.SEQUENTIAL,
+        description="Scheduling strategy: 'sequential', 'round_robin', 'abba', 'latin_square' or 'random'.",
+        examples=["abba"],
+    )
+    rounds: int | None = Field(
+        default=None,
+        ge=1,
+        description="Number of rounds over the commits; `num_runs` (one run per commit and round) by default.",
+        examples=[5],
+    )
+    seed: int | None = Field(
+        default=None,
+        description="Seed of the random orders; drawn at random and recorded with the results if not set.",
+        examples=[42],
+    )
+
+
+class SteadyStateDefinition(BaseModel):
+    """Configuration of the detection of the warm-up runs of each commit.
+
+    The leading runs of a commit that the MSER rule finds outside the steady state are left out
+    of the estimate of the adaptive sampling, and of the plots with the `SteadyState` transform.
+    """
+
+    enabled: bool = Field(default=False, description="Flag indicating whether warm-up runs are detected.", examples=[True])
+    batch_size: int = Field(default=5, ge=1, description="Consecutive runs averaged by the MSER rule (MSER-5).", examples=[5])
+    max_truncated_fraction: float = Field(
+        default=0.5,
+        gt=0,
+        lt=1,
+        description="Largest fraction of the runs of a commit that may be dropped as warm-up.",
+        examples=[0.5],
+    )
+
+
+class StabilityCheckDefinition(BaseModel):
+    """Configuration of the check of the power draw before each batch is measured.
+
+    The RAPL package counter is sampled in-process; the batch is measured once the mean power of
+    every window of the test period is in line (by modified z-score) with that of the warm-up period.
+    """
+
+    enabled: bool = Field(default=False, description="Flag indicating whether the power draw is checked.", examples=[True])
+    rate_hz: float = Field(default=100.0, gt=0, description="Sampling rate of the energy counter.", examples=[100.0])
+    warmup_s: float = Field(
+        default=1.0,
+        gt=0,
+        description="Seconds sampled first, giving the reference power.",
+        examples=[1.0],
+    )
+    duration_s: float = Field(default=4.0, gt=0, description="Seconds of the test period.", examples=[4.0])
+    window_s: float = Field(
+        default=0.1,
+        gt=0,
+        description="Seconds over which the power is averaged before it is compared.",
+        examples=[0.1],
+    )
+    threshold: float = Field(
+        default=3.5,
+        gt=0,
+        description="Largest absolute modified z-score of the power of a window of a stable system.",
+        examples=[3.5],
+    )
+    max_attempts: int = Field(
+        default=3,
+        ge=1,
+        description="Tests run before a batch is measured anyway, with a warning.",
+        examples=[5],
+    )
+    retry_wait_s: float = Field(
+        default=10.0,
+        ge=0,
+        description="Seconds waited between two tests.",
+        examples=[30.0],
+    )
+
+
 class ExecutionPlanDefinition(BaseModel):
     """Execution plan for the pipeline."""
 
@@ -76,6 +263,17 @@ class ExecutionPlanDefinition(BaseModel):
     )
     test_command: str = Field(..., description="Command to execute tests.", examples=["mvn surefire:test"])
     test_command_path: str = Field(default="", description="Path where the test command should be executed.", examples=["."])
+    measurement_backend: MeasurementBackendEnum = Field(
+        default=MeasurementBackendEnum.PERF,
+        description="Backend used to measure energy: 'perf' or 'rapl' (direct powercap counters).",
+        examples=["rapl"],
+    )
+    perf_events: list[str] = Field(
+        default_factory=lambda: ["power/energy-pkg/"],
+        min_length=1,
+        description="perf events collected in a single `perf stat` run; one column per event, in this order.",
+        examples=[["power/energy-pkg/", "power/energy-cores/", "power/energy-gpu/"]],
+    )
     ignore_failures: bool = Field(
         default=True,
         description="Flag indicating whether to ignore failures.",
@@ -95,6 +293,36 @@ class ExecutionPlanDefinition(BaseModel):
         description="Flag indicating whether the test tasks should be executed in random order.",
         examples=[True],
     )
+    background_builds: bool = Field(
+        default=False,
+        description="Build the next batch while the current one is measured, suspending the builds during measurements.",
+        examples=[True],
+    )
+    adaptive_sampling: AdaptiveSamplingDefinition = Field(
+        default_factory=AdaptiveSamplingDefinition,
+        description="Adaptive sampling settings; when enabled, `num_runs` is the maximum number of runs per commit.",
+    )
+    schedule: ScheduleDefinition = Field(
+        default_factory=ScheduleDefinition,
+        description=(
+            "Order of the runs over the campaign; adaptive sampling schedules rounds itself and only uses the seed "
+            "to shuffle them."
+        ),
+    )
+    warmup_runs: int = Field(
+        default=0,
+        ge=0,
+        description="Runs executed before the first measured run of each commit in a batch, recorded as warm-up.",
+        examples=[2],
+    )
+    steady_state: SteadyStateDefinition = Field(
+        default_factory=SteadyStateDefinition,
+        description="Detection of the leading runs of each commit that are not in steady state.",
+    )
+    stability_check: StabilityCheckDefinition = Field(
+        default_factory=StabilityCheckDefinition,
+        description="Check of the power draw before each batch is measured.",
+    )
     oldest_commit: str | None = Field(
         default=None,
         description="The hash of the oldest commit to consider.",
@@ -105,6 +333,16 @@ class ExecutionPlanDefinition(BaseModel):
         description="The hash of the newest commit to consider.",
         examples=["f47ac10b-58cc-4372-a567-0e02b2c3d479"],
     )
+    first_parent: bool = Field(
+        default=False,
+        description="Only follow the first parent of merge commits when gathering commits.",
+        examples=[True],
+    )
+    paths: list[str] = Field(
+        default_factory=list,
+        description="Only gather commits modifying these paths (git pathspecs); all commits if empty.",
+        examples=[["src/", "pom.xml"]],
+    )
     execute_common_tests: bool = Field(
         default=False,
         description="Flag indicating whether to execute common tests in addition to specific ones.",
@@ -126,6 +364,46 @@ class ExecutionPlanDefinition(BaseModel):
         return self
 
 
+class CooldownDefinition(BaseModel):
+    """Configuration of the wait for the CPU to cool down before a measurement.
+
+    The cooling curve of the machine is learned from the temperature readings; once it is known,
+    the wait is predicted instead of polling the temperature every `poll_interval` seconds.
+    """
+
+    mode: CooldownModeEnum = Field(
+        default=CooldownModeEnum.CEILING,
+        description="Target a hard ceiling ('ceiling') or a band below it ('warm_steady').",
+        examples=["warm_steady"],
+    )
+    band: int = Field(
+        default=3000,
+        gt=0,
+        description="Width of the 'warm_steady' band below `temperature_safe_limit` (in milli-degrees).",
+        examples=[3000],
+    )
+    poll_interval: float = Field(
+        default=2.0,
+        gt=0,
+        description="Seconds between two readings while the cooling curve is unknown.",
+        examples=[2.0],
+    )
+    min_wait: float = Field(default=0.5, gt=0, description="Shortest predicted wait, in seconds.", examples=[0.5])
+    max_wait: float = Field(default=60.0, gt=0, description="Longest predicted wait, in seconds.", examples=[60.0])
+    warmup_step: float = Field(
+        default=1.0,
+        gt=0,
+        description="Seconds of CPU load between two readings when warming up in 'warm_steady' mode.",
+        examples=[1.0],
+    )
+    max_warmup: float = Field(
+        default=60.0,
+        ge=0,
+        description="Longest warm-up before measuring anyway in 'warm_steady' mode, in seconds.",
+        examples=[60.0],
+    )
+
+
 class LimitsDefinition(BaseModel):
     """Limits for the pipeline execution."""
 
@@ -134,6 +412,10 @@ class LimitsDefinition(BaseModel):
         description="The maximum safe operating temperature (in milli-degrees).",
         examples=[65000],
     )
+    cooldown: CooldownDefinition = Field(
+        default_factory=CooldownDefinition,
+        description="Configuration of the wait for the CPU to cool down.",
+    )
 
 
 class RegressionDetectionDefinition(BaseModel):
@@ -154,6 +436,254 @@ class RegressionDetectionDefinition(BaseModel):
     )
 
 
+class BuildCacheDefinition(BaseModel):
+    """Configuration of the content-addressed build artifact cache.
+
+    Build outputs are stored under the project's `.cache/` directory, keyed by the hash of the
+    commit's source tree, and restored instead of re-running the compile commands.
+    """
+
+    enabled: bool = Field(default=False, description="Flag indicating whether build outputs are cached.", examples=[True])
+    artifact_paths: list[str] = Field(
+        default_factory=list,
+        description="Build outputs to cache, relative to the repository root.",
+        examples=[["target"]],
+    )
+    tracked_files_only: bool = Field(
+        default=False,
+        description="Only hash the files matching `tracked_file_extensions` when computing the cache key.",
+        examples=[True],
+    )
+
+
+class WorkspaceCacheDefinition(BaseModel):
+    """Configuration of the cache of built workspaces.
+
+    Built `<repo>_<sha>` workspaces are kept across batches and invocations instead of being deleted
+    after each batch, and evicted in least recently used order beyond the disk budget.
+    """
+
+    enabled: bool = Field(default=False, description="Flag indicating whether built workspaces are kept.", examples=[True])
+    max_size_gb: float = Field(
+        default=20.0,
+        gt=0,
+        description="Disk budget of the cached workspaces, in GiB.",
+        examples=[50.0],
+    )
+    failure_ttl_h: float | None = Field(
+        default=24.0,
+        gt=0,
+        description="Hours during which a commit whose build failed is not built again; for ever if unset.",
+        examples=[168.0],
+    )
+
+
+class DistributedDefinition(BaseModel):
+    """Configuration of distributed measurements (``coordinate`` and ``work`` commands)."""
+
+    lease_s: float = Field(
+        default=600.0,
+        gt=0,
+        description="Seconds after which a task whose worker stopped renewing its lease is handed to another worker.",
+        examples=[900.0],
+    )
+    poll_interval: float = Field(
+        default=2.0,
+        gt=0,
+        description="Seconds between two polls of the task queue.",
+        examples=[5.0],
+    )
+
+
+class WatchDefinition(BaseModel):
+    """Configuration of the ``watch`` command, measuring the commits pushed to the branch."""
+
+    interval_s: float = Field(
+        default=300.0,
+        gt=0,
+        description="Seconds between two fetches of the branch.",
+        examples=[900.0],
+    )
+    remote: str = Field(
+        default="origin",
+        description="Remote name, URL or path (e.g. of a local mirror) the branch is fetched from.",
+        examples=["/srv/mirrors/project.git"],
+    )
+
+
+class WorkerPoolDefinition(BaseModel):
+    """Configuration of the process pool running the parallel pre-test stages.
+
+    The pool is started once per campaign. A build is only started while the available memory
+    covers ``memory_per_build_gb`` for it and for every build already running.
+    """
+
+    workers: int | None = Field(
+        default=None,
+        ge=1,
+        description="Number of worker processes; by default, the largest limit of the parallel pre-test stages.",
+        examples=[4],
+    )
+    memory_per_build_gb: float = Field(
+        default=0.0,
+        ge=0,
+        description="Memory reserved for each running build, in GiB; 0 disables the memory check.",
+        examples=[2.0],
+    )
+    poll_interval: float = Field(
+        default=1.0,
+        gt=0,
+        description="Seconds between two checks of the available memory while builds wait for it.",
+        examples=[5.0],
+    )
+
+
+class ResultsDefinition(BaseModel):
+    """Configuration of the result store."""
+
+    format: ResultFormatEnum = Field(
+        default=ResultFormatEnum.CSV,
+        description="Storage format of the results: 'csv' or 'sqlite' (values plus run metadata).",
+        examples=["sqlite"],
+    )
+    flush_every: int = Field(
+        default=1,
+        ge=1,
+        description="Number of runs buffered before they are written; buffers are also flushed after each batch.",
+        examples=[50],
+    )
+    dataset: str | None = Field(
+        default=None,
+        description=(
+            "Name of the result file in `energy_measurements`, without suffix, to which every invocation appends; "
+            "by default each invocation writes a new `energy_results_<timestamp>` file."
+        ),
+        examples=["energy_results"],
+    )
+
+
+class StageDefinition(BaseModel):
+    """A pipeline stage declared in the configuration, with its dependencies and scheduling constraints."""
+
+    module: str = Field(
+        ...,
+        description="Class name of a built-in stage, or `package.module:Class` of a custom stage.",
+        examples=["BuildStage", "my_stages.warmup:WarmupStage"],
+    )
+    name: str | None = Field(
+        default=None,
+        description="Name of the stage in `depends_on`, logs and traces; defaults to the class name.",
+        examples=["build"],
+    )
+    params: dict[str, Any] = Field(
+        default_factory=dict,
+        description="Keyword arguments passed to the stage constructor.",
+        examples=[{"seconds": 5}],
+    )
+    depends_on: list[str] = Field(
+        default_factory=list,
+        description="Stages of the same group that must run before this one.",
+        examples=[["CheckoutStage"]],
+    )
+    parallel: bool = Field(
+        default=False,
+        description="Whether the stage may run for several commits at once (pre-test stages only).",
+        examples=[True],
+    )
+    concurrency: int | None = Field(
+        default=None,
+        ge=1,
+        description="Maximum number of commits in a parallel stage at once; unlimited if unset.",
+        examples=[8],
+    )
+    exclusive: bool = Field(
+        default=False,
+        description="Suspend background builds while the stage runs (always the case for MeasureEnergyStage).",
+        examples=[True],
+    )
+    slot_timeout_s: float | None = Field(
+        default=3600.0,
+        gt=0,
+        description=(
+            "Seconds a commit waits for a free slot of the stage (see `parallel` and `concurrency`) before it is "
+            "left out of its batch, e.g. because a crashed worker never released its slot; unlimited if unset."
+        ),
+        examples=[600.0],
+    )
+
+    @property
+    def key(self) -> str:
+        """Name of the stage: `name`, or the class name of `module`."""
+        return self.name or self.module.rsplit(":", 1)[-1]
+
+
+class StagesDefinition(BaseModel):
+    """Stage groups of the pipeline; a group left unset keeps the built-in stages.
+
+    Within a group, stages run in an order compatible with their `depends_on` (declaration order
+    otherwise); the groups are sorted accordingly when the configuration is loaded.
+    """
+
+    pre_stages: list[StageDefinition] | None = Field(
+        default=None,
+        description="Stages run once on the full commit list.",
+    )
+    pre_test_stages: list[StageDefinition] | None = Field(
+        default=None,
+        description="Stages preparing and building the workspace of each commit.",
+    )
+    batch_stages: list[StageDefinition] | None = Field(
+        default=None,
+        description="Stages run for every measurement of a commit.",
+    )
+
+    @model_validator(mode="after")
+    def order_groups(self: Self) -> Self:
+        """Sort every group so that stages come after their dependencies.
+
+        Returns:
+            Self: The model with ordered groups.
+        """
+        for group in ("pre_stages", "pre_test_stages", "batch_stages"):
+            if (stages := getattr(self, group)) is not None:
+                setattr(self, group, _order_stages(stages))
+        return self
+
+
+def _order_stages(stages: list[StageDefinition]) -> list[StageDefinition]:
+    """Topologically sort stages, keeping the declaration order between independent stages.
+
+    Args:
+        stages (list[StageDefinition]): The stages of a group.
+
+    Returns:
+        list[StageDefinition]: The stages, each after all of its dependencies.
+
+    Raises:
+        DuplicateStageNameError: If two stages have the same name.
+        UnknownStageDependencyError: If a dependency is not a stage of the group.
+        StageCycleError: If the dependencies form a cycle.
+    """
+    by_key: dict[str, StageDefinition] = {}
+    for stage in stages:
+        if stage.key in by_key:
+            raise DuplicateStageNameError(stage.key)
+        by_key[stage.key] = stage
+    for stage in stages:
+        for dependency in stage.depends_on:
+            if dependency not in by_key:
+                raise UnknownStageDependencyError(stage.key, dependency)
+
+    ordered: list[StageDefinition] = []
+    done: set[str] = set()
+    while len(ordered) < len(stages):
+        if (ready := next((s for s in stages if s.key not in done and set(s.depends_on) <= done), None)) is None:
+            raise StageCycleError([s.key for s in stages if s.key not in done])
+        ordered.append(ready)
+        done.add(ready.key)
+    return ordered
+
+
 class PipelineConfig(BaseModel):
     """Configuration model for the entire pipeline."""
 
@@ -180,6 +710,11 @@ class PipelineConfig(BaseModel):
         description="Path to the CPU thermal file for monitoring temperature.",
         examples=["/sys/class/hwmon/hwmon5/temp1_input"],
     )
+    powercap_dir: str = Field(
+        default="/sys/class/powercap",
+        description="Path to the powercap sysfs directory used by the 'rapl' measurement backend.",
+        examples=["/sys/class/powercap"],
+    )
     setup_commands: list[str] | None = Field(
         default=None,
         description="List of shell commands to setup the environment.",
@@ -195,3 +730,42 @@ class PipelineConfig(BaseModel):
         description="Timeout for executions.",
         examples=[120],
     )
+    max_command_output: int = Field(
+        default=1024 * 1024,
+        ge=1024,
+        description="Bytes kept from the end of the stdout and stderr of each command; older output is dropped.",
+        examples=[4 * 1024 * 1024],
+    )
+    workspace_strategy: WorkspaceStrategyEnum = Field(
+        default=WorkspaceStrategyEnum.COPY,
+        description="How per-commit workspaces are created (copy, worktree, shared_clone or reflink).",
+        examples=["worktree"],
+    )
+    build_cache: BuildCacheDefinition = Field(
+        default_factory=BuildCacheDefinition,
+        description="Configuration of the build artifact cache.",
+    )
+    workspace_cache: WorkspaceCacheDefinition = Field(
+        default_factory=WorkspaceCacheDefinition,
+        description="Configuration of the cache of built workspaces.",
+    )
+    distributed: DistributedDefinition = Field(
+        default_factory=DistributedDefinition,
+        description="Configuration of distributed measurements.",
+    )
+    watch: WatchDefinition = Field(
+        default_factory=WatchDefinition,
+        description="Configuration of the watch command.",
+    )
+    worker_pool: WorkerPoolDefinition = Field(
+        default_factory=WorkerPoolDefinition,
+        description="Configuration of the process pool running the parallel pre-test stages.",
+    )
+    results: ResultsDefinition = Field(
+        default_factory=ResultsDefinition,
+        description="Configuration of the result store.",
+    )
+    stages: StagesDefinition | None = Field(
+        default=None,
+        description="Stage groups of the pipeline, with dependencies and concurrency limits; built-in stages if unset.",
+    )
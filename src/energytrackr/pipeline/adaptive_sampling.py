@@ -0,0 +1,221 @@
+"""Sequential adaptive sampling: measure commits in rounds until their estimate is tight.
+
+Every commit first gets ``initial_runs`` runs. After each round, a commit is scheduled again
+only if the distribution-free confidence interval of its median is wider than
+``relative_ci_width`` times the median, or if it looks statistically different (Welch's t-test)
+from one of its neighbours in the commit history, where extra runs add detection power.
+``num_runs`` bounds the number of runs of any commit. With steady-state detection, the leading
+runs of a commit that the MSER rule finds in the warm-up transient are left out of its sample.
+"""
+
+import math
+import random
+from statistics import NormalDist, median
+
+import git
+import numpy as np
+from scipy.stats import ttest_ind
+
+from energytrackr.config.config_model import ExecutionPlanDefinition
+from energytrackr.pipeline.task_journal import MeasurementTask, TaskKey
+from energytrackr.utils.logger import logger
+from energytrackr.utils.steady_state import mser_truncation
+
+
+def median_confidence_interval(values: list[float], confidence: float) -> tuple[float, float] | None:
+    """Compute a distribution-free confidence interval of the median from order statistics.
+
+    Args:
+        values (list[float]): The sample.
+        confidence (float): The confidence level, e.g. 0.95.
+
+    Returns:
+        tuple[float, float] | None: The lower and upper bounds, or None if the sample is too small
+            for the interval to be narrower than the sample range.
+    """
+    n = len(values)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    lower = math.floor((n - z * math.sqrt(n)) / 2)
+    upper = math.ceil(1 + (n + z * math.sqrt(n)) / 2)
+    if lower < 1 or upper > n:
+        return None
+    ordered = sorted(values)
+    return ordered[lower - 1], ordered[upper - 1]
+
+
+class AdaptiveSampler:
+    """Decides, round after round, which commits need more measurements."""
+
+    def __init__(
+        self,
+        commits: list[git.Commit],
+        plan: ExecutionPlanDefinition,
+        completed: set[TaskKey] | None = None,
+    ) -> None:
+        """Initialize the sampler.
+
+        Args:
+            commits (list[git.Commit]): The commits to measure, in history order (neighbours are adjacent).
+            plan (ExecutionPlanDefinition): The execution plan holding the adaptive sampling settings.
+            completed (set[TaskKey] | None): Tasks already measured in a previous session. Their run
+                indices are not reused, but their values are not known and they are not counted as samples.
+        """
+        self.commits = commits
+        self.settings = plan.adaptive_sampling
+        self.steady_state = plan.steady_state
+        self.max_runs = plan.num_runs
+        self.num_repeats = plan.num_repeats
+        # Seeded like `plan_batches`, so that the recorded schedule seed reproduces the order of the runs.
+        self._rng = random.Random(plan.schedule.seed) if plan.randomize_tasks else None
+        self.samples: dict[str, list[float]] = {commit.hexsha: [] for commit in commits}
+        self._position = {commit.hexsha: i for i, commit in enumerate(commits)}
+        self._runs_scheduled = dict.fromkeys(self.samples, 0)
+        for hexsha, run_index, _ in completed or set():
+            if hexsha in self._runs_scheduled:
+                self._runs_scheduled[hexsha] = max(self._runs_scheduled[hexsha], run_index + 1)
+
+    def initial_round(self, commits: list[git.Commit]) -> list[MeasurementTask]:
+        """Schedule the first runs of a group of commits.
+
+        Args:
+            commits (list[git.Commit]): The commits of the current batch.
+
+        Returns:
+            list[MeasurementTask]: `initial_runs` runs (minus those already done) of every commit.
+        """
+        return self._schedule(commits, self.settings.initial_runs, up_to=True)
+
+    def next_round(self, commits: list[git.Commit]) -> list[MeasurementTask]:
+        """Schedule the next round of runs for the commits whose estimate is not settled yet.
+
+        Args:
+            commits (list[git.Commit]): The commits of the current batch that can still be measured.
+
+        Returns:
+            list[MeasurementTask]: The tasks of the next round; empty once every commit is settled.
+        """
+        pending = [commit for commit in commits if self.needs_more_runs(commit.hexsha)]
+        return self._schedule(pending, self.settings.runs_per_round)
+
+    def record(self, hexsha: str, value: float) -> None:
+        """Record one measured value of a commit.
+
+        Args:
+            hexsha (str): The commit that was measured.
+            value (float): The measured energy.
+        """
+        self.samples.setdefault(hexsha, []).append(value)
+
+    def needs_more_runs(self, hexsha: str) -> bool:
+        """Check whether a commit should be measured again.
+
+        Args:
+            hexsha (str): The commit to check.
+
+        Returns:
+            bool: True if the commit has runs left and its estimate is loose or differs from a neighbour.
+        """
+        if self._runs_scheduled.get(hexsha, 0) >= self.max_runs:
+            return False
+        values = self.samples.get(hexsha, [])
+        if len(values) < self.settings.initial_runs:
+            return True
+        values = self.steady_values(values)
+        if not self.is_settled(values):
+            return True
+        return any(self._differs(values, neighbour) for neighbour in self._neighbours(hexsha))
+
+    def is_settled(self, values: list[float]) -> bool:
+        """Check whether the confidence interval of the median of a sample is narrow enough.
+
+        Args:
+            values (list[float]): The measured values of a commit.
+
+        Returns:
+            bool: True if the relative width of the interval is below the configured threshold.
+        """
+        if (interval := median_confidence_interval(values, self.settings.confidence)) is None:
+            return False
+        if not (centre := median(values)):
+            return False
+        return (interval[1] - interval[0]) / abs(centre) <= self.settings.relative_ci_width
+
+    def steady_values(self, values: list[float]) -> list[float]:
+        """Drop the leading values of a commit that are not in steady state, if detection is enabled.
+
+        Args:
+            values (list[float]): The measured values of a commit, in measurement order.
+
+        Returns:
+            list[float]: The values from the end of the warm-up transient on.
+        """
+        if not self.steady_state.enabled:
+            return values
+        dropped = mser_truncation(values, self.steady_state.batch_size, self.steady_state.max_truncated_fraction)
+        return values[dropped:]
+
+    def total_runs(self) -> int:
+        """Number of runs scheduled so far, over all commits.
+
+        Returns:
+            int: The total number of runs.
+        """
+        return sum(self._runs_scheduled.values())
+
+    def _neighbours(self, hexsha: str) -> list[list[float]]:
+        """Samples of the commits adjacent to a commit that have completed their first round.
+
+        Args:
+            hexsha (str): The commit whose neighbours are looked up.
+
+        Returns:
+            list[list[float]]: The samples of the previous and next commits, if measured.
+        """
+        if (position := self._position.get(hexsha)) is None:
+            return []
+        neighbours = []
+        for index in (position - 1, position + 1):
+            if 0 <= index < len(self.commits):
+                values = self.samples[self.commits[index].hexsha]
+                if len(values) >= self.settings.initial_runs:
+                    neighbours.append(self.steady_values(values))
+        return neighbours
+
+    def _differs(self, values: list[float], other: list[float]) -> bool:
+        """Welch's t-test between two samples.
+
+        Args:
+            values (list[float]): The first sample.
+            other (list[float]): The second sample.
+
+        Returns:
+            bool: True if the p-value is below the configured threshold.
+        """
+        _, p_value = ttest_ind(np.asarray(values), np.asarray(other), equal_var=False)
+        return bool(p_value < self.settings.neighbour_p_value)
+
+    def _schedule(self, commits: list[git.Commit], runs: int, *, up_to: bool = False) -> list[MeasurementTask]:
+        """Create the tasks of new runs for each commit, within the `num_runs` bound.
+
+        Args:
+            commits (list[git.Commit]): The commits to schedule.
+            runs (int): The number of runs to add to each commit.
+            up_to (bool): If True, `runs` is the total number of runs to reach instead of a number to add.
+
+        Returns:
+            list[MeasurementTask]: The new tasks.
+        """
+        tasks: list[MeasurementTask] = []
+        for commit in commits:
+            start = self._runs_scheduled.get(commit.hexsha, 0)
+            end = min(runs if up_to else start + runs, self.max_runs)
+            tasks.extend(
+                MeasurementTask(commit, run_index, repeat_index)
+                for run_index in range(start, end)
+                for repeat_index in range(self.num_repeats)
+            )
+            self._runs_scheduled[commit.hexsha] = max(start, end)
+        if self._rng is not None:
+            self._rng.shuffle(tasks)
+        logger.info("Adaptive sampling: scheduled %d tasks for %d commits.", len(tasks), len(commits))
+        return tasks
@@ -0,0 +1,302 @@
+"""Background execution of the pre-test stages of the next batch.
+
+While a batch is measured, the workspaces of the next batch are checked out and built by a
+background thread, one process per commit. The processes are started by a fork server rather than
+forked from the thread, which could inherit locks held by other threads; they receive the runner
+and its state by pickling. Each process leads its own process group, and only runs once the
+group is known to the builder, so the build can be suspended with SIGSTOP for exactly the span
+of an energy measurement and resumed with SIGCONT afterwards, e.g. while waiting for the CPU to
+cool down. Commands run by the stages start their own process group, so every descendant of a
+build process is signalled as well. The energy readings are therefore never contaminated by a
+concurrent build.
+"""
+
+import functools
+import multiprocessing
+import os
+import signal
+import threading
+from collections import defaultdict
+from collections.abc import Callable, Generator, Iterable
+from contextlib import contextmanager, suppress
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any
+
+from energytrackr.utils.logger import logger
+
+PreTestRunner = Callable[[str, str], dict[str, Any]]
+
+
+def _initialize_and_run(
+    runner: PreTestRunner,
+    hexsha: str,
+    repo_path: str,
+    initializer: Callable[..., None] | None = None,
+    initargs: tuple[Any, ...] = (),
+) -> dict[str, Any]:
+    """Call the initializer of a build process, then run the pre-test stages of a commit.
+
+    Args:
+        runner (PreTestRunner): Runs the pre-test stages of a commit and returns its context.
+        hexsha (str): The commit to build.
+        repo_path (str): Path to the main clone.
+        initializer (Callable[..., None] | None): Called before the stages, e.g. to set the configuration.
+        initargs (tuple[Any, ...]): Arguments of the initializer.
+
+    Returns:
+        dict[str, Any]: The context returned by the runner.
+    """
+    if initializer is not None:
+        initializer(*initargs)
+    return runner(hexsha, repo_path)
+
+
+def _run_in_own_group(job: Callable[[], dict[str, Any]], hexsha: str, conn: Connection) -> None:
+    """Entry point of a build process: become a process group leader, run the stages, send back the context.
+
+    The stages only run once the builder has registered the group and allows them to.
+
+    Args:
+        job (Callable[[], dict[str, Any]]): Runs the pre-test stages of the commit and returns its context.
+        hexsha (str): The commit to build.
+        conn (Connection): Where the group is announced, the go-ahead received, and the resulting
+            context (or None on error) sent.
+    """
+    os.setpgid(0, 0)
+    conn.send(os.getpgid(0))
+    if not conn.recv():
+        conn.close()
+        return
+    try:
+        conn.send(job())
+    except Exception:
+        logger.exception("Background pre-test stages of %s failed.", hexsha)
+        conn.send(None)
+    finally:
+        conn.close()
+
+
+def _descendants(pids: Iterable[int]) -> set[int]:
+    """List the descendants of processes, whatever their process group.
+
+    Args:
+        pids (Iterable[int]): The ancestors.
+
+    Returns:
+        set[int]: The pids of all their descendants.
+    """
+    children: defaultdict[int, list[int]] = defaultdict(list)
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = Path(entry.path, "stat").read_text(encoding="utf-8")
+        except OSError:
+            continue
+        # "pid (comm) state ppid ...", where comm may contain spaces and parentheses.
+        children[int(stat.rpartition(")")[2].split()[1])].append(int(entry.name))
+    found: set[int] = set()
+    stack = list(pids)
+    while stack:
+        for child in children.get(stack.pop(), []):
+            if child not in found:
+                found.add(child)
+                stack.append(child)
+    return found
+
+
+def _signal_pids(pids: Iterable[int], signum: int) -> None:
+    """Send a signal to processes that may have exited.
+
+    Args:
+        pids (Iterable[int]): The processes.
+        signum (int): The signal.
+    """
+    for pid in pids:
+        with suppress(ProcessLookupError, PermissionError):
+            os.kill(pid, signum)
+
+
+class BackgroundBuilder:
+    """Runs pre-test stages in the background, in processes that can be suspended as a whole."""
+
+    def __init__(
+        self,
+        runner: PreTestRunner,
+        repo_path: str,
+        initializer: Callable[..., None] | None = None,
+        initargs: tuple[Any, ...] = (),
+    ) -> None:
+        """Initialize the builder.
+
+        Args:
+            runner (PreTestRunner): Runs the pre-test stages of a commit and returns its context; picklable.
+            repo_path (str): Path to the main clone.
+            initializer (Callable[..., None] | None): Called in every build process before the runner.
+            initargs (tuple[Any, ...]): Arguments of the initializer, picklable.
+        """
+        self.runner = runner
+        self.repo_path = repo_path
+        self.initializer = initializer
+        self.initargs = initargs
+        self._mp = multiprocessing.get_context("forkserver")
+        # Imported once by the fork server, rather than by every build process, if it is not running yet.
+        self._mp.set_forkserver_preload([getattr(runner, "func", runner).__module__])
+        self._lock = threading.Lock()
+        self._resumed = threading.Condition(self._lock)
+        self._suspended = False
+        self._stopping = False
+        self._groups: set[int] = set()
+        self._submitted: list[str] = []
+        self._results: dict[str, dict[str, Any] | None] = {}
+        self._thread: threading.Thread | None = None
+
+    def workspaces(self) -> set[str]:
+        """Paths of the workspaces of the submitted commits, which must not be cleaned up.
+
+        Returns:
+            set[str]: The absolute workspace paths.
+        """
+        return {os.path.abspath(f"{self.repo_path}_{hexsha}") for hexsha in self._submitted}
+
+    def submit(self, hexshas: Iterable[str]) -> None:
+        """Start building commits in the background, one after the other.
+
+        Args:
+            hexshas (Iterable[str]): The commits to build.
+        """
+        self.results()
+        self._submitted = list(hexshas)
+        if not self._submitted:
+            return
+        logger.info("Building %d commits of the next batch in the background.", len(self._submitted))
+        self._thread = threading.Thread(target=self._build_all, args=(self._submitted,), daemon=True)
+        self._thread.start()
+
+    def results(self) -> dict[str, dict[str, Any] | None]:
+        """Wait for the submitted commits to be built.
+
+        Returns:
+            dict[str, dict[str, Any] | None]: The context of each submitted commit, or None if its
+                stages could not be run.
+        """
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        results, self._results, self._submitted = self._results, {}, []
+        return results
+
+    @contextmanager
+    def suspended(self) -> Generator[None]:
+        """Suspend every background process for the duration of the block.
+
+        Yields:
+            None: While the background processes are stopped.
+        """
+        with self._lock:
+            self._suspended = True
+            self._signal_groups(signal.SIGSTOP)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._suspended = False
+                self._signal_groups(signal.SIGCONT)
+                self._resumed.notify_all()
+
+    def shutdown(self) -> None:
+        """Stop building: resume and terminate the running processes and wait for the thread."""
+        with self._lock:
+            self._stopping = True
+            self._suspended = False
+            self._signal_groups(signal.SIGCONT)
+            self._signal_groups(signal.SIGTERM)
+            self._resumed.notify_all()
+        self.results()
+        self._stopping = False
+
+    def _signal_groups(self, signum: int) -> None:
+        """Send a signal to every running process group and to all its descendants; the lock must be held.
+
+        Args:
+            signum (int): The signal.
+        """
+        if not self._groups:
+            return
+        # Listed first: descendants are reparented (and lost) once their parent is terminated.
+        descendants = _descendants(self._groups)
+        for pgid in self._groups:
+            with suppress(ProcessLookupError):
+                os.killpg(pgid, signum)
+        _signal_pids(descendants, signum)
+        if signum == signal.SIGSTOP:
+            # Stop the processes spawned while the tree was being walked, until none is left running.
+            while new := _descendants(self._groups) - descendants:
+                _signal_pids(new, signum)
+                descendants |= new
+
+    def _build_all(self, hexshas: list[str]) -> None:
+        """Build commits one after the other (background thread).
+
+        Args:
+            hexshas (list[str]): The commits to build.
+        """
+        for hexsha in hexshas:
+            if self._stopping or not self._build(hexsha):
+                return
+
+    def _build(self, hexsha: str) -> bool:
+        """Build a commit in a process leading its own group, and record its context.
+
+        Args:
+            hexsha (str): The commit to build.
+
+        Returns:
+            bool: False if the builder stopped before the build could start.
+        """
+        conn, child_conn = self._mp.Pipe()
+        job = functools.partial(_initialize_and_run, self.runner, hexsha, self.repo_path, self.initializer, self.initargs)
+        process = self._mp.Process(target=_run_in_own_group, args=(job, hexsha, child_conn), daemon=True)
+        process.start()
+        child_conn.close()
+        # The process leads its own group before it runs anything.
+        if (pgid := self._receive(conn, hexsha)) is None:
+            self._results[hexsha] = None
+            conn.close()
+            process.join()
+            return True
+        with self._lock:
+            # Never start a build during a measurement.
+            while self._suspended and not self._stopping:
+                self._resumed.wait()
+            if go := not self._stopping:
+                self._groups.add(pgid)
+            conn.send(go)
+        try:
+            context = self._receive(conn, hexsha) if go else None
+        finally:
+            conn.close()
+            process.join()
+            with self._lock:
+                self._groups.discard(pgid)
+        if go:
+            self._results[hexsha] = context
+        return go
+
+    @staticmethod
+    def _receive(conn: Connection, hexsha: str) -> Any:  # noqa: ANN401
+        """Receive a message from a build process.
+
+        Args:
+            conn (Connection): The end of the pipe of the builder.
+            hexsha (str): The commit built by the process.
+
+        Returns:
+            Any: The message, or None if the process exited without sending it.
+        """
+        try:
+            return conn.recv()
+        except EOFError:
+            logger.error("Background build of %s exited without a result.", hexsha)
+            return None
@@ -0,0 +1,280 @@
+"""Energy bisection: locate the first commit whose energy differs from a known-good baseline.
+
+Instead of measuring every commit between a known-good and a known-bad commit, the range is
+binary-searched: each probed commit is checked out, built and measured ``num_runs`` times with
+the regular pipeline stages, and compared with the good commit using Welch's t-test and Cohen's d,
+with the thresholds used by the `DetectChanges` transform. A range of n commits needs about
+log2(n) builds. As with ``git bisect skip``, a probed commit that cannot be measured (e.g. its
+build fails) is replaced by its closest measurable neighbour in the remaining range.
+
+Every measured commit is kept in ``energy_measurements/bisect_cache.json`` (and in the usual
+results file), so that later bisections and reports reuse the measurements.
+"""
+
+import functools
+import json
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+import git
+import numpy as np
+
+from energytrackr.config.config_store import Config
+from energytrackr.pipeline.core_stages.verify_perf_stage import VerifyPerfStage
+from energytrackr.pipeline.pipeline import (
+    Pipeline,
+    compile_stages,
+    create_batches,
+    export_trace,
+    open_project,
+    restore_head,
+)
+from energytrackr.pipeline.stage_interface import PipelineStage
+from energytrackr.plot.config import Thresholds, get_settings
+from energytrackr.utils.exceptions import InvalidBisectRangeError, UnmeasurableBisectCommitsError
+from energytrackr.utils.git_utils import rev_list
+from energytrackr.utils.logger import logger
+from energytrackr.utils.significance import cohens_d, welch_p_value
+
+BISECT_CACHE_FILE = "bisect_cache.json"
+
+
+class MeasurementCache:
+    """Measured values of commits, persisted as a JSON object mapping commit hashes to values."""
+
+    def __init__(self, path: str | Path) -> None:
+        """Load the cache, if it exists.
+
+        Args:
+            path (str | Path): Location of the JSON cache file.
+        """
+        self.path = Path(path)
+        self._values: dict[str, list[float]] = {}
+        if self.path.is_file():
+            try:
+                self._values = json.loads(self.path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                logger.warning("Ignoring corrupted bisect cache %s", self.path)
+
+    def get(self, hexsha: str) -> list[float]:
+        """Return the cached values of a commit.
+
+        Args:
+            hexsha (str): The commit hash.
+
+        Returns:
+            list[float]: The measured values, empty if the commit was never measured.
+        """
+        return list(self._values.get(hexsha, []))
+
+    def put(self, hexsha: str, values: list[float]) -> None:
+        """Store the values of a commit and write the cache to disk.
+
+        Args:
+            hexsha (str): The commit hash.
+            values (list[float]): All measured values of the commit.
+        """
+        self._values[hexsha] = values
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._values), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+class EnergyBisector:
+    """Binary search of the first commit whose energy differs from the first commit of a range."""
+
+    def __init__(
+        self,
+        commits: list[git.Commit],
+        measure_commit: Callable[[git.Commit], list[float]],
+        thresholds: Thresholds,
+    ) -> None:
+        """Initialize the bisector.
+
+        Args:
+            commits (list[git.Commit]): The range, oldest first: the known-good commit, then every commit up to the bad one.
+            measure_commit (Callable[[git.Commit], list[float]]): Returns the measured values of a commit.
+            thresholds (Thresholds): Statistical thresholds, as used by `DetectChanges`.
+        """
+        self.commits = commits
+        self.measure_commit = measure_commit
+        self.thresholds = thresholds
+        self.measured: dict[str, list[float]] = {}
+
+    def differs(self, baseline: list[float], test: list[float]) -> bool:
+        """Check whether two samples differ significantly and by a non-negligible effect.
+
+        Args:
+            baseline (list[float]): Values of the good commit.
+            test (list[float]): Values of the probed commit.
+
+        Returns:
+            bool: True if Welch's p-value is below `welch_p` and |Cohen's d| reaches the "negligible" threshold,
+                as in `DetectChanges`.
+        """
+        min_values = self.thresholds.min_values_for_normality_test
+        if len(baseline) < min_values or len(test) < min_values:
+            logger.warning("Not enough measurements to compare (%d vs %d).", len(baseline), len(test))
+            return False
+        baseline_arr, test_arr = np.asarray(baseline), np.asarray(test)
+        p_value = welch_p_value(baseline_arr, test_arr)
+        cohen_d = cohens_d(baseline_arr, test_arr)
+        logger.info("p-value %.4g, Cohen's d %.3f", p_value, cohen_d)
+        return p_value < self.thresholds.welch_p and abs(cohen_d) >= self.thresholds.cohen_d["negligible"]
+
+    def run(self) -> git.Commit | None:
+        """Search the first commit that differs from the good commit.
+
+        Returns:
+            git.Commit | None: The first differing commit, or None if the bad commit does not differ from the good one.
+
+        Raises:
+            UnmeasurableBisectCommitsError: If the good or the bad commit cannot be measured, or if the
+                commits left between the last good and first differing probes cannot be measured.
+        """
+        low, high = 0, len(self.commits) - 1
+        for index in (low, high):
+            if not self._measurable(index):
+                raise UnmeasurableBisectCommitsError([self.commits[index].hexsha])
+        good = self._values(low)
+        if not self.differs(good, self._values(high)):
+            logger.warning("The bad commit does not differ significantly from the good commit.")
+            return None
+        while high - low > 1:
+            if (probe := self._probe(low, high)) is None:
+                raise UnmeasurableBisectCommitsError([commit.hexsha for commit in self.commits[low + 1 : high]])
+            if self.differs(good, self._values(probe)):
+                high = probe
+            else:
+                low = probe
+        logger.info("First differing commit: %s (%d commits measured)", self.commits[high].hexsha, len(self.measured))
+        return self.commits[high]
+
+    def _probe(self, low: int, high: int) -> int | None:
+        """Pick the commit to probe between two indices: the middle one, or its closest measurable neighbour.
+
+        Args:
+            low (int): Index of the last commit known not to differ.
+            high (int): Index of the first commit known to differ.
+
+        Returns:
+            int | None: The index of a measurable commit strictly between the two, or None if there is none.
+        """
+        mid = (low + high) // 2
+        logger.info("Bisecting: %d commits left, probing %s", high - low - 1, self.commits[mid].hexsha)
+        for index in sorted(range(low + 1, high), key=lambda i: (abs(i - mid), i)):
+            if self._measurable(index):
+                return index
+            logger.warning("Skipping %s: not enough measurements.", self.commits[index].hexsha)
+        return None
+
+    def _measurable(self, index: int) -> bool:
+        """Check whether the commit at an index of the range yields enough values to be compared.
+
+        Args:
+            index (int): Index of the commit in the range.
+
+        Returns:
+            bool: True if the commit has at least `min_values_for_normality_test` values.
+        """
+        return len(self._values(index)) >= self.thresholds.min_values_for_normality_test
+
+    def _values(self, index: int) -> list[float]:
+        """Measure the commit at an index of the range, once.
+
+        Args:
+            index (int): Index of the commit in the range.
+
+        Returns:
+            list[float]: The measured values of the commit.
+        """
+        commit = self.commits[index]
+        if commit.hexsha not in self.measured:
+            self.measured[commit.hexsha] = self.measure_commit(commit)
+        return self.measured[commit.hexsha]
+
+
+def commit_range(repo: git.Repo, good: str, bad: str) -> list[git.Commit]:
+    """List the first-parent history from a good commit to a bad commit.
+
+    Args:
+        repo (git.Repo): The repository.
+        good (str): The known-good commit.
+        bad (str): The known-bad commit.
+
+    Returns:
+        list[git.Commit]: The good commit followed by the commits up to the bad one, oldest first.
+
+    Raises:
+        InvalidBisectRangeError: If there is no commit between the good and the bad commit.
+    """
+    if not (commits := list(reversed(rev_list(repo, "--first-parent", f"{good}..{bad}")))):
+        raise InvalidBisectRangeError(good, bad)
+    return [repo.commit(good), *commits]
+
+
+def _measure_commit(
+    commit: git.Commit,
+    cache: MeasurementCache,
+    stages: dict[str, list[PipelineStage]],
+    repo_path: str,
+) -> list[float]:
+    """Measure a commit with the pipeline stages, unless the cache already holds enough runs of it.
+
+    Args:
+        commit (git.Commit): The commit.
+        cache (MeasurementCache): The measurements of previous bisections, updated in place.
+        stages (dict[str, list[PipelineStage]]): The pipeline stages.
+        repo_path (str): Path to the repository.
+
+    Returns:
+        list[float]: The measured values of the commit.
+    """
+    plan = Config.get_config().execution_plan
+    values = cache.get(commit.hexsha)
+    if len(values) >= plan.num_runs * plan.num_repeats:
+        logger.info("Using %d cached measurements of %s", len(values), commit.hexsha)
+        return values
+    tasks = create_batches([commit], 1, plan.num_runs, plan.num_repeats, plan.randomize_tasks)
+    pipeline = Pipeline(stages, repo_path)
+    pipeline.run(tasks)
+    values += pipeline.samples.get(commit.hexsha, [])
+    cache.put(commit.hexsha, values)
+    return values
+
+
+def bisect(config_path: str, good: str, bad: str, plot_config: str | None = None) -> str | None:
+    """Find the first commit between a good and a bad commit whose energy consumption differs from the good one.
+
+    Args:
+        config_path (str): The file path to the configuration file.
+        good (str): The known-good commit.
+        bad (str): The known-bad commit.
+        plot_config (str | None): Path of the plot configuration holding the statistical thresholds
+            (defaults to `plot.yml` in the current directory, or built-in defaults).
+
+    Returns:
+        str | None: The hash of the first differing commit, or None if none was found.
+    """
+    config_folder = os.path.dirname(config_path)
+    config, repo_path, repo = open_project(config_path)
+    branch = config.repo.branch or repo.active_branch.name
+    commits = commit_range(repo, good, bad)
+    logger.info("Bisecting %d commits between %s and %s", len(commits), good, bad)
+
+    pre_context = {"abort_pipeline": False}
+    VerifyPerfStage().run(pre_context)
+    if pre_context["abort_pipeline"]:
+        return None
+
+    cache = MeasurementCache(os.path.join(config_folder, "energy_measurements", BISECT_CACHE_FILE))
+    measure_commit = functools.partial(_measure_commit, cache=cache, stages=compile_stages(config), repo_path=repo_path)
+    thresholds = get_settings(plot_config).energytrackr.analysis.thresholds
+    try:
+        found = EnergyBisector(commits, measure_commit, thresholds).run()
+    finally:
+        export_trace(config_folder)
+        restore_head(repo, branch)
+    return found.hexsha if found is not None else None
@@ -0,0 +1,192 @@
+"""Content-addressed cache of build outputs, keyed by the hash of the commit's source tree.
+
+Two commits whose sources are identical (or differ only in files that are not tracked, when
+``tracked_files_only`` is set) share the same key, so the second one restores the build outputs
+of the first instead of running the compile commands again. Entries live under
+``<project>/.cache/.build_cache/<key>`` and survive between batches and campaigns.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import git
+
+from energytrackr.config.config_model import PipelineConfig
+from energytrackr.utils.logger import logger
+
+BUILD_CACHE_DIR_NAME = ".build_cache"
+MANIFEST_FILE = "manifest.json"
+
+
+class BuildCache:
+    """Stores and restores build outputs keyed by source tree hash."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        artifact_paths: list[str],
+        compile_commands: list[str],
+        tracked_extensions: set[str] | None = None,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            root (str | Path): Directory holding the cache entries.
+            artifact_paths (list[str]): Build outputs to cache, relative to the repository root.
+            compile_commands (list[str]): Compile commands, mixed into the key so that changing them invalidates the cache.
+            tracked_extensions (set[str] | None): If set, only files with these extensions contribute to the key.
+        """
+        self.root = Path(root)
+        self.artifact_paths = artifact_paths
+        self.compile_commands = compile_commands
+        self.tracked_extensions = tracked_extensions
+
+    @classmethod
+    def from_config(cls, config: PipelineConfig, repo_path: str) -> "BuildCache | None":
+        """Create the cache described by the configuration, if it is enabled.
+
+        Args:
+            config (PipelineConfig): The pipeline configuration.
+            repo_path (str): Path of the main clone, whose parent is the project's cache directory.
+
+        Returns:
+            BuildCache | None: The cache, or None if caching is disabled or has nothing to store.
+        """
+        cache_cfg = config.build_cache
+        if not cache_cfg.enabled or not cache_cfg.artifact_paths:
+            return None
+        return cls(
+            root=Path(repo_path).parent / BUILD_CACHE_DIR_NAME,
+            artifact_paths=cache_cfg.artifact_paths,
+            compile_commands=config.execution_plan.compile_commands or [],
+            tracked_extensions=set(config.tracked_file_extensions) if cache_cfg.tracked_files_only else None,
+        )
+
+    def key_for(self, repo: git.Repo, commit: str) -> str:
+        """Compute the cache key of a commit.
+
+        Args:
+            repo (git.Repo): Repository containing the commit.
+            commit (str): The commit hash.
+
+        Returns:
+            str: Hex digest identifying the commit's (tracked) source tree and the build commands.
+        """
+        digest = hashlib.sha256()
+        if self.tracked_extensions is None:
+            digest.update(repo.commit(commit).tree.hexsha.encode())
+        else:
+            suffixes = tuple(self.tracked_extensions)
+            # Each line is "<mode> <type> <blob sha>\t<path>", so hashing the selected lines covers content and layout.
+            for line in repo.git.ls_tree("-r", "--full-tree", commit).splitlines():
+                if line.endswith(suffixes):
+                    digest.update(line.encode())
+                    digest.update(b"\n")
+        for cmd in self.compile_commands:
+            digest.update(b"\0" + cmd.encode())
+        return digest.hexdigest()
+
+    def contains(self, key: str) -> bool:
+        """Check whether an entry exists for a key.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            bool: True if build outputs are stored for this key.
+        """
+        return (self.root / key / MANIFEST_FILE).is_file()
+
+    def restore(self, key: str, workspace: str | Path) -> bool:
+        """Copy cached build outputs into a workspace.
+
+        Args:
+            key (str): The cache key.
+            workspace (str | Path): The checked-out working tree to populate.
+
+        Returns:
+            bool: True on a cache hit, False if there is no entry or restoring failed.
+        """
+        if not self.contains(key):
+            return False
+        entry = self.root / key
+        try:
+            _copy_paths(entry, Path(workspace), self.artifact_paths)
+        except OSError as e:
+            logger.warning("Failed to restore build cache entry %s: %s", key, e)
+            return False
+        return True
+
+    def store(self, key: str, workspace: str | Path, commit: str) -> None:
+        """Save the build outputs of a workspace under a key.
+
+        The entry is assembled in a temporary directory and renamed into place, so concurrent
+        workers building the same tree never observe a partial entry.
+
+        Args:
+            key (str): The cache key.
+            workspace (str | Path): The working tree that has just been built.
+            commit (str): The commit that was built, recorded in the entry manifest.
+        """
+        if self.contains(key):
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_entry = self.root / f"{key}.tmp-{os.getpid()}"
+        stored = [rel_path for rel_path in self.artifact_paths if (Path(workspace) / rel_path).exists()]
+        if missing := set(self.artifact_paths) - set(stored):
+            logger.warning("Build outputs %s not found in %s; not cached.", sorted(missing), workspace)
+        manifest = {"commit": commit, "paths": stored, "created": datetime.now().isoformat()}
+        try:
+            self._write_entry(key, tmp_entry, Path(workspace), manifest)
+        except OSError as e:
+            # Another worker may have stored the same key first (rename onto a non-empty directory).
+            logger.warning("Failed to store build cache entry %s: %s", key, e)
+        finally:
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+
+    def _write_entry(self, key: str, tmp_entry: Path, workspace: Path, manifest: dict[str, Any]) -> None:
+        """Assemble an entry in a temporary directory, then rename it into place.
+
+        Args:
+            key (str): The cache key.
+            tmp_entry (Path): The temporary directory.
+            workspace (Path): The working tree that has just been built.
+            manifest (dict[str, Any]): The manifest of the entry, listing the stored paths.
+        """
+        tmp_entry.mkdir(parents=True, exist_ok=True)
+        _copy_paths(workspace, tmp_entry, manifest["paths"])
+        (tmp_entry / MANIFEST_FILE).write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp_entry, self.root / key)
+
+
+def _copy_paths(src_root: Path, dst_root: Path, rel_paths: Iterable[str]) -> None:
+    """Copy the paths that exist under one directory to the same paths under another.
+
+    Args:
+        src_root (Path): The source directory.
+        dst_root (Path): The destination directory.
+        rel_paths (Iterable[str]): The paths, relative to both directories.
+    """
+    for rel_path in rel_paths:
+        if (src := src_root / rel_path).exists():
+            _copy_path(src, dst_root / rel_path)
+
+
+def _copy_path(src: Path, dst: Path) -> None:
+    """Copy a file or a directory tree, creating parent directories and merging into existing ones.
+
+    Args:
+        src (Path): The file or directory to copy.
+        dst (Path): The destination path.
+    """
+    if src.is_dir():
+        shutil.copytree(src, dst, symlinks=True, dirs_exist_ok=True)
+    else:
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(src, dst)
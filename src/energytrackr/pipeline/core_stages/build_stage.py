@@ -1,12 +1,21 @@
 """Module to build the project if in 'benchmarks' mode or skip if in 'tests' mode."""
 
+import os
+import signal
+import subprocess
 from typing import Any
 
+import git
+
 from energytrackr.config.config_store import Config
+from energytrackr.pipeline.build_cache import BuildCache
 from energytrackr.pipeline.stage_interface import PipelineStage
 from energytrackr.utils.logger import logger
 from energytrackr.utils.utils import run_command
 
+# A shell reports a command killed by signal N with the exit status 128 + N.
+SHELL_SIGNAL_BASE = 128
+
 
 class BuildStage(PipelineStage):
     """Builds the project if in 'benchmarks' mode, or skip if 'tests' mode has no build commands."""
@@ -24,6 +33,8 @@ class BuildStage(PipelineStage):
             context (dict[str, Any]): A dictionary to store the state of the pipeline execution.
             Keys used:
                 - "build_failed" (bool): Indicates if any build command failed.
+                - "transient_failure" (bool): Set if the failure may not happen again, because a
+                  build command timed out or was killed (e.g. by the OOM killer).
                 - "abort_pipeline" (bool): Indicates if the pipeline should be aborted.
 
         Notes:
@@ -32,17 +43,53 @@ class BuildStage(PipelineStage):
             - `config.execution_plan.batch_size`: Specifies the number of repository copies to create in batch mode.
             - `config.execution_plan.compile_commands`: The list of build commands to execute.
             - `config.execution_plan.ignore_failures`: If True, the pipeline will not abort on build failures.
+            - `config.build_cache`: If enabled, outputs of a previous build of the same source tree are restored
+              instead of running the compile commands, and successful builds are stored in the cache.
             - The repository path is derived from `config.repo_path`.
         """
         config = Config.get_config()
 
         compile_cmds = config.execution_plan.compile_commands or []
+        workspace = os.getcwd()
+        cache = BuildCache.from_config(config, context.get("repo_path", "")) if compile_cmds else None
+        cache_key: str | None = None
+        if cache is not None:
+            cache_key = cache.key_for(git.Repo(workspace), context["commit"])
+            if cache.restore(cache_key, workspace):
+                logger.info("Restored build outputs from cache (key %s).", cache_key[:12], context=context)
+                context["build_cache_hit"] = True
+                return
+
         for cmd in compile_cmds:
             logger.info("Running build command: %s", cmd, context=context)
-            result = run_command(cmd, context=context)
-            if result.returncode:
-                logger.error("Build command failed: %s (code %s)", cmd, result.returncode, context=context)
-                context["build_failed"] = True
-                if not config.execution_plan.ignore_failures:
-                    context["abort_pipeline"] = True
-                break
+            try:
+                returncode = run_command(cmd, context=context).returncode
+            except subprocess.TimeoutExpired:
+                # Already logged by run_command.
+                context["transient_failure"] = True
+            else:
+                if not returncode:
+                    continue
+                logger.error("Build command failed: %s (code %s)", cmd, returncode, context=context)
+                context["transient_failure"] = _killed_by_signal(returncode)
+            context["build_failed"] = True
+            if not config.execution_plan.ignore_failures:
+                context["abort_pipeline"] = True
+            break
+        else:
+            if cache is not None and cache_key is not None:
+                cache.store(cache_key, workspace, context["commit"])
+                logger.info("Stored build outputs in cache (key %s).", cache_key[:12], context=context)
+
+
+def _killed_by_signal(returncode: int) -> bool:
+    """Check whether a shell command was killed by a signal rather than exiting with an error.
+
+    Args:
+        returncode (int): The exit status of the command.
+
+    Returns:
+        bool: True if the status is that of a command killed by a signal.
+    """
+    signum = -returncode if returncode < 0 else returncode - SHELL_SIGNAL_BASE
+    return signum in {int(s) for s in signal.valid_signals()}
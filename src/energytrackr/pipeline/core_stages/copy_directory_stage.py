@@ -1,25 +1,29 @@
-"""Pipeline stage to copy a directory to a target location."""
+"""Pipeline stage to create the workspace of a commit from the main clone."""
 
-import shutil
 from pathlib import Path
 from typing import Any
 
+from energytrackr.config.config_store import Config
 from energytrackr.pipeline.stage_interface import PipelineStage
+from energytrackr.pipeline.workspace import create_workspace
 from energytrackr.utils.exceptions import MissingContextKeyError, SourceDirectoryNotFoundError
 from energytrackr.utils.logger import logger
 
 
 class CopyDirectoryStage(PipelineStage):
-    """Pipeline stage to copy a directory to a target location."""
+    """Pipeline stage to create the workspace of a commit, using the configured workspace strategy."""
 
     def run(self, context: dict[str, Any]) -> None:  # noqa: PLR6301
-        """Executes the logic to copy a directory from source to target.
+        """Creates the workspace `<repo_path>_<commit>` from the main clone.
+
+        The workspace is a full copy, a git worktree, a shared clone or a copy-on-write copy of the
+        clone, depending on `config.workspace_strategy`. An existing workspace is reused as is.
 
         Args:
             context (dict[str, Any]): A dictionary containing contextual information.
             Expected keys:
-                - 'source_dir': str | Path — path to the source directory
-                - 'target_dir': str | Path — path to the destination directory
+                - 'repo_path': str | Path — path to the main clone
+                - 'commit': str — the commit of the workspace
 
         Raises:
             MissingContextKeyError: If the required keys are missing in the context.
@@ -34,11 +38,16 @@ class CopyDirectoryStage(PipelineStage):
         if not source.is_dir():
             raise SourceDirectoryNotFoundError(source)
 
-        logger.info("Copying directory from %s to %s", source, target, context=context)
+        if target.is_dir():
+            logger.info("Workspace %s already exists; reusing it.", target, context=context)
+            return
+
+        strategy = Config.get_config().workspace_strategy
+        logger.info("Creating workspace %s from %s (%s)", target, source, strategy, context=context)
         try:
-            shutil.copytree(src=source, dst=target, dirs_exist_ok=True)
+            create_workspace(source, target, str(context["commit"]), strategy)
         except Exception as e:
-            logger.error("Error copying directory: %s", e, context=context)
+            logger.error("Error creating workspace: %s", e, context=context)
             context["abort_pipeline"] = True
             return
-        logger.info("Copy completed.", context=context)
+        logger.info("Workspace created.", context=context)
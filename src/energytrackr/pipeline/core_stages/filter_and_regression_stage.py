@@ -14,6 +14,7 @@ from git.objects.commit import Commit
 from energytrackr.config.config_model import PipelineConfig
 from energytrackr.config.config_store import Config
 from energytrackr.pipeline.stage_interface import PipelineStage
+from energytrackr.utils.commit_index import CommitFileIndex
 from energytrackr.utils.logger import logger
 
 
@@ -92,11 +93,13 @@ class FilterAndRegressionStage(PipelineStage):
 
     @staticmethod
     def _filter_commits(commits: list[Commit], config: PipelineConfig) -> list[Commit]:
+        # The modified files of every commit come from a single `git log` stream instead of one diff per commit.
+        file_index = CommitFileIndex.for_commits(commits[0].repo, (commit.hexsha for commit in commits))
         filtered: list[Commit] = []
         for commit in commits:
             remove_commit: bool = False
             has_tracked_file: bool = False
-            for file in commit.stats.files:
+            for file in file_index.files(commit.hexsha):
                 if any(str(file).startswith(directory) for directory in config.ignored_directories):
                     remove_commit = True
                     break
@@ -1,17 +1,30 @@
-"""Module for measuring energy consumption using perf."""
+"""Module for measuring energy consumption using perf or the RAPL powercap counters."""
 
+import socket
+import time
+from collections.abc import Iterable
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+from energytrackr.config.config_model import MeasurementBackendEnum, PipelineConfig
 from energytrackr.config.config_store import Config
+from energytrackr.pipeline.result_store import MeasurementRecord, ResultWriter, create_result_writer
 from energytrackr.pipeline.stage_interface import PipelineStage
+from energytrackr.pipeline.task_journal import MeasurementTask, TaskJournal
+from energytrackr.utils.covariates import read_cpu_frequency_mhz, read_cpu_temperature, read_loadavg
 from energytrackr.utils.logger import logger
+from energytrackr.utils.rapl import RaplReader
 from energytrackr.utils.utils import run_command
 
+# Index of the event name in a `perf stat -x,` counter line.
+PERF_EVENT_FIELD = 2
+
 
 class MeasureEnergyStage(PipelineStage):
-    """Uses `perf` to measure energy consumption. Appends the data to a results file."""
+    """Measures energy consumption with `perf` or RAPL. Appends the data to a results file."""
+
+    measures_energy = True
 
     def __init__(self) -> None:
         """Initialize the MeasureEnergyStage with a timestamp.
@@ -20,12 +33,20 @@ class MeasureEnergyStage(PipelineStage):
         generated during the energy measurement process.
         """
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._rapl_reader: RaplReader | None = None
+        self._writer: ResultWriter | None = None
+        # Tasks whose record is buffered; they are marked done in the journal once written.
+        self._unflushed: list[tuple[TaskJournal, MeasurementTask]] = []
+        # Commits whose warm-up runs were executed since their workspace was built.
+        self._warmed_up: set[str] = set()
 
     def run(self, context: dict[str, Any]) -> None:
         """Runs the energy measurement and appends the data to a results file.
 
-        If the build failed, or if there is no test command, or if the perf command fails,
-        it will abort the pipeline unless ignore_failures is set.
+        If the build failed, or if there is no test command, or if the measurement fails,
+        it will abort the pipeline unless ignore_failures is set. The first run of a commit in a
+        batch (or, for a distributed worker, after each build) is preceded by `warmup_runs` runs,
+        recorded as warm-up.
 
         Args:
             context (dict): The context dictionary containing the current commit and other configuration.
@@ -40,54 +61,260 @@ class MeasureEnergyStage(PipelineStage):
             logger.info("Skipping energy measurement because no test command is provided.", context=context)
             return
 
-        perf_command = f"perf stat -e power/energy-pkg/ {test_cmd}"
+        task: MeasurementTask | None = context.get("task")
+        if (hexsha := context["commit"].hexsha) not in self._warmed_up:
+            self._warmed_up.add(hexsha)
+            for index in range(config.execution_plan.warmup_runs):
+                logger.info("Warm-up run %d/%d", index + 1, config.execution_plan.warmup_runs, context=context)
+                if (warmup := self._measure(test_cmd, config, context, task, warmup=True)) is None:
+                    return
+                if self._get_writer(config, context).write(warmup):
+                    self._mark_flushed()
+
+        if (record := self._measure(test_cmd, config, context, task)) is None:
+            return
+
+        writer = self._get_writer(config, context)
+        if (journal := context.get("journal")) is not None and task is not None:
+            self._unflushed.append((journal, task))
+        if writer.write(record):
+            self._mark_flushed()
+        logger.info("Recorded energy data in %s", writer.path, context=context)
+        context["measurement"] = [str(value) for value in record.values.values()]
+        context["record"] = record
+
+    def _measure(
+        self,
+        test_cmd: str,
+        config: PipelineConfig,
+        context: dict[str, Any],
+        task: MeasurementTask | None,
+        warmup: bool = False,
+    ) -> MeasurementRecord | None:
+        """Measure one run of the test command with the configured backend, along with its covariates.
+
+        Args:
+            test_cmd (str): The test command to measure.
+            config (PipelineConfig): The pipeline configuration.
+            context (dict[str, Any]): The pipeline context.
+            task (MeasurementTask | None): The task of the run, if any.
+            warmup (bool): Whether the run is a warm-up run.
+
+        Returns:
+            MeasurementRecord | None: The record of the run, or None if it must not be written.
+        """
+        record = MeasurementRecord(
+            commit=context["commit"].hexsha,
+            run_index=task.run_index if task else 0,
+            repeat_index=task.repeat_index if task else 0,
+            started_at=datetime.now().isoformat(),
+            cpu_temperature=self._read_temperature(config),
+            loadavg=read_loadavg(),
+            backend=str(config.execution_plan.measurement_backend),
+            host=socket.gethostname(),
+            warmup=warmup,
+            schedule=str(config.execution_plan.schedule.strategy),
+            schedule_seed=config.execution_plan.schedule.seed,
+        )
+        start_frequency = read_cpu_frequency_mhz()
+        if config.execution_plan.measurement_backend == MeasurementBackendEnum.RAPL:
+            measured = self._measure_with_rapl(test_cmd, config, context, record)
+        else:
+            measured = self._measure_with_perf(test_cmd, config, context, record)
+        record.end_temperature = self._read_temperature(config)
+        # Two point readings, before and after the workload; not a time average over the run.
+        frequencies = [f for f in (start_frequency, read_cpu_frequency_mhz()) if f is not None]
+        record.cpu_frequency_mhz = sum(frequencies) / len(frequencies) if frequencies else None
+        return record if measured else None
+
+    def flush(self) -> None:
+        """Write the buffered records and mark their tasks done in the journal."""
+        if self._writer is not None:
+            self._writer.flush()
+        self._mark_flushed()
+
+    def forget_commits(self, hexshas: Iterable[str]) -> None:
+        """Run the warm-up runs again before the next run of the given commits.
+
+        Args:
+            hexshas (Iterable[str]): The commits, whose workspace is built again.
+        """
+        self._warmed_up.difference_update(hexshas)
+
+    def _mark_flushed(self) -> None:
+        """Record the tasks of the written records as done in their journal."""
+        for journal, task in self._unflushed:
+            journal.mark_done(task)
+        self._unflushed.clear()
+
+    def _get_writer(self, config: PipelineConfig, context: dict[str, Any]) -> ResultWriter:
+        """Return the result writer, creating it on first use.
+
+        Without a configured `results.dataset`, a new ``energy_results_<timestamp>`` file is
+        created, unless the journal of a resumed campaign names the file of the campaign. The
+        name is recorded in the journal.
+
+        Args:
+            config (PipelineConfig): The pipeline configuration.
+            context (dict[str, Any]): The pipeline context, holding the repository path and the journal.
+
+        Returns:
+            ResultWriter: The writer of this measurement session.
+        """
+        if self._writer is None:
+            repo_path = context["repo_path"]
+            assert repo_path is not None, "Repository path is not set in the configuration."
+            journal: TaskJournal | None = context.get("journal")
+            resumed = journal.dataset if journal is not None else None
+            name = config.results.dataset or resumed or f"energy_results_{self.timestamp}"
+            if journal is not None:
+                journal.set_dataset(name)
+            stem = Path(repo_path).parent.parent / "energy_measurements" / name
+            self._writer = create_result_writer(config, stem)
+        return self._writer
+
+    @staticmethod
+    def _read_temperature(config: PipelineConfig) -> float | None:
+        """Read the CPU temperature recorded with a run.
+
+        Args:
+            config (PipelineConfig): The pipeline configuration.
+
+        Returns:
+            float | None: The temperature in milli-degrees, or None if it cannot be read.
+        """
+        try:
+            return read_cpu_temperature(config.cpu_thermal_file)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def _check_returncode(returncode: int, config: PipelineConfig, context: dict[str, Any]) -> bool:
+        """Handle a failed measured command.
+
+        Args:
+            returncode (int): Exit code of the measured command.
+            config (PipelineConfig): The pipeline configuration.
+            context (dict[str, Any]): The pipeline context.
+
+        Returns:
+            bool: False if the measurement must be dropped (and the pipeline aborted), True otherwise.
+        """
+        if not returncode:
+            return True
+        logger.error("Measured command failed: (code %s).", returncode, context=context)
+        if not config.execution_plan.ignore_failures:
+            context["abort_pipeline"] = True
+            return False
+        logger.warning("Ignoring failures; continuing anyway.", context=context)
+        return True
+
+    def _measure_with_perf(
+        self,
+        test_cmd: str,
+        config: PipelineConfig,
+        context: dict[str, Any],
+        record: MeasurementRecord,
+    ) -> bool:
+        """Run the test command under a single `perf stat` collecting every configured event.
+
+        Args:
+            test_cmd (str): The test command to measure.
+            config (PipelineConfig): The pipeline configuration.
+            context (dict[str, Any]): The pipeline context.
+            record (MeasurementRecord): The record of the run, filled with the values and metadata.
+
+        Returns:
+            bool: True if the record must be written.
+        """
+        events = config.execution_plan.perf_events
+        perf_command = f"perf stat -x, -e {','.join(events)} {test_cmd}"
 
         logger.info("Measuring energy with: %s", perf_command, context=context)
+        start = time.perf_counter()
         result = run_command(perf_command, context=context)
+        record.duration_s = time.perf_counter() - start
+        record.exit_code = result.returncode
 
         # If `perf` fails:
-        if result.returncode:
-            logger.error("Perf command failed: (code %s).", result.returncode, context=context)
+        if not self._check_returncode(result.returncode, config, context):
+            return False
+
+        # perf writes its counters to stderr; the test command may print anything on stdout.
+        readings = self.parse_perf_output(result.stderr + "\n" + result.stdout, events)
+
+        if missing := [event for event, value in readings.items() if value is None]:
+            logger.warning("No energy data found in perf output for %s.", ", ".join(missing), context=context)
             if not config.execution_plan.ignore_failures:
                 context["abort_pipeline"] = True
-                return
-            logger.warning("Ignoring failures; continuing anyway.", context=context)
+                return False
+        record.values = {event: readings[event] for event in events}
+        return True
 
-        # Extract the reading from perf output
-        combined_output = result.stdout + "\n" + result.stderr
+    def _measure_with_rapl(
+        self,
+        test_cmd: str,
+        config: PipelineConfig,
+        context: dict[str, Any],
+        record: MeasurementRecord,
+    ) -> bool:
+        """Run the test command between two snapshots of every RAPL domain.
 
-        if (energy_pkg := self.extract_energy_value(combined_output, "power/energy-pkg/")) is None:
-            logger.warning("No energy data found in perf output.", context=context)
+        The values are written in joules, in the order of the discovered domains.
+
+        Args:
+            test_cmd (str): The test command to measure.
+            config (PipelineConfig): The pipeline configuration.
+            context (dict[str, Any]): The pipeline context.
+            record (MeasurementRecord): The record of the run, filled with the values and metadata.
+
+        Returns:
+            bool: True if the record must be written.
+        """
+        if self._rapl_reader is None:
+            self._rapl_reader = RaplReader(config.powercap_dir)
+            logger.info("RAPL domains (column order): %s", ", ".join(self._rapl_reader.domain_names), context=context)
+        reader = self._rapl_reader
+        if not reader.domains:
+            logger.error("No readable RAPL domain found under %s.", config.powercap_dir, context=context)
             if not config.execution_plan.ignore_failures:
                 context["abort_pipeline"] = True
-                return
+            return False
 
-        # Log to CSV
-        commit_hash = context["commit"].hexsha
-        repo_path = context["repo_path"]
-        assert repo_path is not None, "Repository path is not set in the configuration."
-        output_file = Path(repo_path).parent.parent / "energy_measurements" / f"energy_results_{self.timestamp}.csv"
-        output_file.parent.mkdir(parents=True, exist_ok=True)
+        logger.info("Measuring energy of %s with RAPL counters", test_cmd, context=context)
+        start = time.perf_counter()
+        before = reader.snapshot()
+        result = run_command(test_cmd, context=context)
+        after = reader.snapshot()
+        record.duration_s = time.perf_counter() - start
+        record.exit_code = result.returncode
 
-        with output_file.open("a") as fh:
-            fh.write(f"{commit_hash},{energy_pkg}\n")
+        if not self._check_returncode(result.returncode, config, context):
+            return False
 
-        logger.info("Appended energy data to %s", output_file, context=context)
+        energies = reader.energy_joules(before, after)
+        record.values = {name: f"{energies[name]:.6f}" for name in reader.domain_names}
+        return True
 
     @staticmethod
-    def extract_energy_value(perf_output: str, event_name: str) -> str | None:
-        """Extracts the value of the specified event from perf output.
+    def parse_perf_output(perf_output: str, events: list[str]) -> dict[str, str | None]:
+        """Parses the CSV output of `perf stat -x,`.
+
+        Each counter line has the form `value,unit,event,run-time,percentage,...`. Counters that
+        perf could not read are reported as `<not counted>` or `<not supported>`.
 
         Args:
             perf_output (str): The output from the perf command.
-            event_name (str): The name of the event to extract, e.g. "power/energy-pkg/".
+            events (list[str]): The events to extract, e.g. ["power/energy-pkg/"].
 
         Returns:
-            str | None: The value of the event as a string, or None if not found.
+            dict[str, str | None]: The value of each event, or None if it was not found or not counted.
         """
-        for line in perf_output.split("\n"):
-            if event_name in line:
-                parts = line.split()
-                if parts and "<not" not in parts[0]:
-                    return parts[0].replace(",", "")
-        return None
+        readings: dict[str, str | None] = dict.fromkeys(events)
+        for line in perf_output.splitlines():
+            fields = line.split(",")
+            if len(fields) <= PERF_EVENT_FIELD or (event := fields[PERF_EVENT_FIELD]) not in readings:
+                continue
+            if readings[event] is None and (value := fields[0].strip()) and not value.startswith("<"):
+                readings[event] = value
+        return readings
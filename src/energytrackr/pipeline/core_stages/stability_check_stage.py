@@ -1,16 +1,34 @@
 """Module to check the stability of the system before running the pipeline."""
 
-import statistics
 import time
 from typing import Any
 
+from energytrackr.config.config_model import StabilityCheckDefinition
+from energytrackr.config.config_store import Config
 from energytrackr.pipeline.stage_interface import PipelineStage
 from energytrackr.utils.logger import logger
-from energytrackr.utils.utils import run_command
+from energytrackr.utils.rapl import RaplSampler, discover_domains
 
 
 class StabilityCheckStage(PipelineStage):
-    """Runs a stability test on power usage before running the pipeline."""
+    """Runs a stability test on power usage before running the pipeline.
+
+    The package energy counter is sampled in-process at ``stability_check.rate_hz``; the counter
+    stays open, and its buffer allocated, from one test to the next.
+    """
+
+    def __init__(self, settings: StabilityCheckDefinition | None = None, powercap_dir: str | None = None) -> None:
+        """Initialize the stage; the counter is opened by the first test.
+
+        Args:
+            settings (StabilityCheckDefinition | None): The test settings; those of the execution
+                plan if None.
+            powercap_dir (str | None): The powercap sysfs directory; the configured `powercap_dir`
+                (the one the RAPL measurements read) if None.
+        """
+        self.settings = settings
+        self.powercap_dir = powercap_dir
+        self.sampler: RaplSampler | None = None
 
     def run(self, context: dict[str, Any]) -> None:
         """Runs a stability test on power usage before running the pipeline.
@@ -20,68 +38,63 @@ class StabilityCheckStage(PipelineStage):
         proceed.
 
         Args:
-            context (dict[str, Any]): The pipeline context containing the
+            context (dict[str, Any]): The pipeline context.
         """
         logger.info("Running stability test before measuring energy.")
 
-        if not self._is_system_stable():
+        if not self.wait_until_stable():
             logger.error("System is not stable. Aborting pipeline.")
             context["abort_pipeline"] = True
         else:
             logger.info("System is stable. Proceeding.")
 
-    @staticmethod
-    def _is_system_stable(k: float = 3.5, warmup: int = 5, duration: int = 30) -> bool:
-        """Runs a stability test on power usage.
+    def wait_until_stable(self) -> bool:
+        """Run the stability test until it passes, up to ``max_attempts`` times.
 
-        The test first warms up by taking 'warmup' number of samples, then
-        takes 'duration' number of samples. If the absolute value of the
-        modified z-score of any sample is greater than 'k', the system is
-        deemed unstable and the function returns False. Otherwise, the
-        function returns True.
-
-        The modified z-score is calculated as 0.6745 * (x - median) / median
-        absolute deviation, where x is the sample, median is the median of
-        the samples, and median absolute deviation is the median of the
-        absolute values of the differences between the samples and the
-        median.
-
-        If an exception occurs while taking a sample, the sample is
-        considered to be 0.
+        Returns:
+            bool: True if a test passed, or if the energy counter cannot be read (nothing is
+                checked then); False if every test failed.
+        """
+        settings = self.settings or Config.get_config().execution_plan.stability_check
+        if (sampler := self._get_sampler(settings)) is None:
+            return True
+        for attempt in range(1, settings.max_attempts + 1):
+            result = sampler.stability_test(settings.warmup_s, settings.duration_s, settings.window_s, settings.threshold)
+            if result.stable:
+                logger.info("Power draw stable at %.1f W (largest z-score %.2f).", result.median_w, result.max_z)
+                return True
+            logger.warning(
+                "Power draw unstable around %.1f W (z-score %.2f > %.2f), attempt %d/%d.",
+                result.median_w,
+                result.max_z,
+                settings.threshold,
+                attempt,
+                settings.max_attempts,
+            )
+            if attempt < settings.max_attempts:
+                time.sleep(settings.retry_wait_s)
+        return False
+
+    def close(self) -> None:
+        """Close the energy counter."""
+        if self.sampler is not None:
+            self.sampler.close()
+            self.sampler = None
+
+    def _get_sampler(self, settings: StabilityCheckDefinition) -> RaplSampler | None:
+        """Open the package energy counter on first use.
 
         Args:
-            k: the threshold above which the system is deemed unstable
-            warmup: the number of samples to take for warming up
-            duration: the total number of samples to take
+            settings (StabilityCheckDefinition): The test settings.
 
         Returns:
-            True if the system is stable, False otherwise
+            RaplSampler | None: The sampler, or None if no RAPL counter is readable.
         """
-        samples: list[int] = []
-        prev = StabilityCheckStage._read_uj()
-        for _ in range(warmup):
-            time.sleep(1)
-            now = StabilityCheckStage._read_uj()
-            samples.append(now - prev)
-            prev = now
-
-        median = statistics.median(samples)
-        mad = statistics.median([abs(x - median) for x in samples]) or 1
-
-        for _ in range(duration - warmup):
-            time.sleep(1)
-            now = StabilityCheckStage._read_uj()
-            diff = now - prev
-            prev = now
-            mz = 0.6745 * (diff - median) / mad
-            if abs(mz) > k:
-                return False
-        return True
-
-    @staticmethod
-    def _read_uj() -> int:
-        try:
-            result = run_command("cat /sys/class/powercap/intel-rapl:0/energy_uj")
-        except Exception:
-            return 0
-        return int(result.stdout.strip())
+        if self.sampler is None:
+            powercap_dir = self.powercap_dir or Config.get_config().powercap_dir
+            if not (domains := discover_domains(powercap_dir)):
+                logger.warning("No readable RAPL counter under %s; the stability test is skipped.", powercap_dir)
+                return None
+            samples_per_test = (settings.warmup_s + settings.duration_s + settings.window_s) * settings.rate_hz
+            self.sampler = RaplSampler(domains[0], settings.rate_hz, capacity=int(samples_per_test) + 2)
+        return self.sampler
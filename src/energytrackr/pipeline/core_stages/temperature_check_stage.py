@@ -3,15 +3,28 @@
 import time
 from typing import Any
 
+from energytrackr.config.config_model import CooldownDefinition, CooldownModeEnum
 from energytrackr.config.config_store import Config
 from energytrackr.pipeline.stage_interface import PipelineStage
+from energytrackr.utils.cooling_model import CoolingModel
+from energytrackr.utils.covariates import read_cpu_temperature
 from energytrackr.utils.logger import logger
 
 
 class TemperatureCheckStage(PipelineStage):
-    """Ensures that the CPU is not too hot before starting the next stage."""
+    """Ensures that the CPU is not too hot before starting the next stage.
 
-    def run(self, context: dict[str, Any]) -> None:  # noqa: ARG002
+    The cooling curve of the machine is learned from the readings taken while waiting, so that
+    after the first cooldowns the stage sleeps for the predicted time instead of polling.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the stage with an empty cooling model."""
+        self.model = CoolingModel()
+        self.total_cooldown_s = 0.0
+        self.cooldowns = 0
+
+    def run(self, context: dict[str, Any]) -> None:
         """Monitors the CPU temperature and waits until it is below a safe limit before proceeding.
 
         Args:
@@ -20,40 +33,127 @@ class TemperatureCheckStage(PipelineStage):
 
         The function repeatedly checks the CPU temperature by reading from
         the thermal file specified in the configuration. If the temperature is
-        above the safe limit, it logs a warning and waits for 2 seconds before
-        checking again. If the temperature is below the safe limit, or if there
-        is an issue reading the temperature, it logs the information and exits
-        the loop, allowing the pipeline to proceed.
+        above the safe limit, it logs a warning and waits for the time predicted by
+        the cooling model (or `poll_interval` seconds while the model is unknown)
+        before checking again. In 'warm_steady' mode, a CPU below the band is
+        warmed up first. If the temperature is in range, or if there is an issue
+        reading the temperature, it logs the information and exits the loop,
+        allowing the pipeline to proceed. The time spent is stored in
+        ``context["cooldown_s"]``.
         """
         config = Config.get_config()
         temp_file = config.cpu_thermal_file
         safe_limit = config.limits.temperature_safe_limit
+        cooldown = config.limits.cooldown
+        warm_steady = cooldown.mode == CooldownModeEnum.WARM_STEADY
+        lower_limit = safe_limit - cooldown.band
+        target = self._target(safe_limit, cooldown)
 
+        start = time.monotonic()
+        warmed_up = 0.0
+        predicted: float | None = None
+        # Readings taken after a measurement or a warm-up do not belong to the same cooling curve.
+        self.model.end_episode()
         while True:
             # Only this single statement is inside the try
             try:
-                temp = self._read_cpu_temp(temp_file)
+                temp = read_cpu_temperature(temp_file)
             except (OSError, ValueError) as e:
                 logger.warning("Could not read or parse temperature (%s). Proceeding anyway.", e)
                 break
 
+            self.model.observe(time.monotonic(), temp)
             logger.info("CPU temperature: %d (limit: %d)", temp, safe_limit)
             if temp < safe_limit:
-                # Safe to proceed
-                break
+                if not warm_steady or temp >= lower_limit:
+                    # Safe to proceed
+                    break
+                if warmed_up >= cooldown.max_warmup:
+                    logger.warning("CPU still below the warm band (%d) after %.1fs, proceeding anyway.", temp, warmed_up)
+                    break
+                logger.info("CPU below the warm band (%d < %d), warming up...", temp, lower_limit)
+                warmed_up += self._warm_up(cooldown.warmup_step)
+                self.model.end_episode()
+                continue
             logger.warning("CPU too hot (%d), waiting...", temp)
-            time.sleep(2)
+            wait = self._wait_time(temp, target, cooldown)
+            predicted = wait if predicted is None else predicted
+            time.sleep(wait)
+
+        self._record_cooldown(context, time.monotonic() - start, predicted)
+
+    def _record_cooldown(self, context: dict[str, Any], elapsed: float, predicted: float | None) -> None:
+        """Store the time spent in the context and keep the totals of the cooldowns.
+
+        Args:
+            context (dict[str, Any]): The shared context dictionary for the pipeline.
+            elapsed (float): Time spent in the stage, in seconds.
+            predicted (float | None): The first predicted wait, or None if the CPU did not need to cool down.
+        """
+        context["cooldown_s"] = elapsed
+        if predicted is not None:
+            self.total_cooldown_s += elapsed
+            self.cooldowns += 1
+            logger.info(
+                "Cooldown took %.1fs (first prediction %.1fs); %.1fs over %d cooldowns so far.",
+                elapsed,
+                predicted,
+                self.total_cooldown_s,
+                self.cooldowns,
+            )
+
+    def expected_cooldown(self, temperature: float) -> float | None:
+        """Predict the cooldown before a measurement, e.g. to estimate the remaining time of a campaign.
+
+        Args:
+            temperature (float): The CPU temperature after the previous measurement.
+
+        Returns:
+            float | None: The predicted wait in seconds, or None if the cooling curve is not known yet.
+        """
+        limits = Config.get_config().limits
+        return self.model.predict_wait(temperature, self._target(limits.temperature_safe_limit, limits.cooldown))
+
+    @staticmethod
+    def _target(safe_limit: int, cooldown: CooldownDefinition) -> float:
+        """Temperature to cool down to.
+
+        Args:
+            safe_limit (int): The temperature ceiling.
+            cooldown (CooldownDefinition): The cooldown settings.
+
+        Returns:
+            float: The middle of the band in 'warm_steady' mode, just below the ceiling otherwise.
+        """
+        return safe_limit - cooldown.band / 2 if cooldown.mode == CooldownModeEnum.WARM_STEADY else safe_limit - 1
+
+    def _wait_time(self, temperature: float, target: float, cooldown: CooldownDefinition) -> float:
+        """Compute how long to sleep before the next reading.
+
+        Args:
+            temperature (float): The current temperature.
+            target (float): The temperature to cool down to.
+            cooldown (CooldownDefinition): The cooldown settings.
+
+        Returns:
+            float: The predicted wait, bounded by `min_wait` and `max_wait`, or `poll_interval`
+                if the cooling curve is not known yet.
+        """
+        if (wait := self.model.predict_wait(temperature, target)) is None:
+            return cooldown.poll_interval
+        return min(max(wait, cooldown.min_wait), cooldown.max_wait)
 
     @staticmethod
-    def _read_cpu_temp(path: str) -> int:
-        """Reads and parses the CPU temperature from a thermal file.
+    def _warm_up(seconds: float) -> float:
+        """Keep a CPU core busy.
 
         Args:
-            path (str): Path to the thermal file.
+            seconds (float): Duration of the load.
 
         Returns:
-            int: The CPU temperature in milli-degrees Celsius.
+            float: The time actually spent, in seconds.
         """
-        with open(path, encoding="utf-8") as f:
-            # strip() + int() kept together so failure raises ValueError
-            return int(f.read().strip())
+        start = time.monotonic()
+        while time.monotonic() - start < seconds:
+            sum(i * i for i in range(10_000))
+        return time.monotonic() - start
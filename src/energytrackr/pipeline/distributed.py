@@ -0,0 +1,294 @@
+"""Distributed measurements: a coordinator publishing tasks and workers measuring them.
+
+The coordinator (``energytrackr coordinate``) gathers the commits, runs the pre-stages and publishes
+one task per (commit, run, repeat) in a `FileTaskQueue`. Workers (``energytrackr work``), one per
+measurement machine, each with their own clone of the repository, claim tasks, build the commits
+in their workspaces, measure them and append the results to the queue. The coordinator merges the
+results into a SQLite result store in which every run is tagged with the host that measured it,
+so that the analysis can be stratified by machine, and hands the tasks of lost workers (expired
+leases) to other workers.
+
+The machines are assumed to be identical and to share the same configuration; only the queue
+directory has to be shared between them (e.g. over NFS).
+"""
+
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Collection, Generator
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any
+
+import git
+
+from energytrackr.config.config_model import DistributedDefinition
+from energytrackr.pipeline.pipeline import (
+    Pipeline,
+    clean_cache_dir,
+    compile_stages,
+    export_trace,
+    log_context_buffer,
+    open_project,
+    plan_batches,
+    run_pre_stages,
+    run_pre_test_stages_for_commit,
+    run_setup_commands,
+)
+from energytrackr.pipeline.result_store import MeasurementRecord, ResultWriter, SqliteResultWriter
+from energytrackr.pipeline.scheduling import resolve_seed
+from energytrackr.pipeline.stage_interface import PipelineStage
+from energytrackr.pipeline.task_journal import MeasurementTask
+from energytrackr.pipeline.task_queue import FileTaskQueue, QueuedTask
+from energytrackr.utils.git_utils import commit_ref, gather_commits
+from energytrackr.utils.logger import logger
+from energytrackr.utils.tracing import tracer
+
+TaskExecutor = Callable[[QueuedTask], dict[str, Any]]
+
+
+def coordinate(config_path: str, queue_dir: str) -> None:
+    """Publish the tasks of a campaign and collect their results until every task is done.
+
+    Results already in the queue (e.g. from an interrupted coordinator) are kept, so running the
+    command again with the same queue resumes the campaign.
+
+    Args:
+        config_path (str): The file path to the configuration file.
+        queue_dir (str): The queue directory shared with the workers.
+    """
+    config_folder = os.path.dirname(config_path)
+    config, repo_path, repo = open_project(config_path)
+    commits = gather_commits(repo)
+    if not run_pre_stages(commits, repo_path, compile_stages(config)["pre_stages"]):
+        return
+
+    resolve_seed(config.execution_plan.schedule)
+    batches = plan_batches(commits, config.execution_plan)
+    tasks = [QueuedTask(task.hexsha, task.run_index, task.repeat_index) for batch in batches for task in batch]
+    queue = FileTaskQueue(queue_dir)
+    queue.reopen()
+    logger.info("Published %d of %d tasks in %s", queue.publish(tasks), len(tasks), queue_dir)
+
+    stem = os.path.join(config_folder, "energy_measurements", f"distributed_results_{datetime.now():%Y%m%d_%H%M%S}")
+    writer = SqliteResultWriter(f"{stem}{SqliteResultWriter.suffix}", flush_every=config.results.flush_every)
+    hosts = collect_results(
+        queue,
+        {task.id for task in tasks},
+        writer,
+        config.distributed.lease_s,
+        config.distributed.poll_interval,
+    )
+    queue.close()
+    logger.info(
+        "All tasks done; results written to %s. Runs per host: %s",
+        writer.path,
+        ", ".join(f"{host}: {count}" for host, count in sorted(hosts.items())),
+    )
+
+
+def collect_results(
+    queue: FileTaskQueue,
+    expected: set[str],
+    writer: ResultWriter,
+    lease_s: float,
+    poll_interval: float,
+) -> dict[str, int]:
+    """Merge the results of the workers and re-queue expired leases until every task has a result.
+
+    Args:
+        queue (FileTaskQueue): The task queue.
+        expected (set[str]): Identifiers of the tasks of the campaign.
+        writer (ResultWriter): Where the measured runs are written.
+        lease_s (float): Duration of a lease, in seconds.
+        poll_interval (float): Seconds between two polls of the queue.
+
+    Returns:
+        dict[str, int]: Number of measured runs per host.
+    """
+    done: set[str] = set()
+    hosts: dict[str, int] = {}
+    while True:
+        for result in queue.read_results():
+            task_id = result["task"]
+            if task_id not in expected or task_id in done:
+                # Unknown task, or a task measured twice after its lease expired: the first result wins.
+                continue
+            done.add(task_id)
+            queue.discard(task_id)
+            if result.get("status") != "ok":
+                logger.warning("Task %s failed on %s: %s", task_id, result.get("worker"), result.get("status"))
+                continue
+            writer.write(MeasurementRecord(**{**result["record"], "host": result["host"]}))
+            hosts[result["host"]] = hosts.get(result["host"], 0) + 1
+        writer.flush()
+        if done >= expected:
+            return hosts
+        for task_id in queue.requeue_expired(lease_s):
+            logger.warning("Lease of task %s expired; handing it to another worker.", task_id)
+        logger.info("%d/%d tasks done, %d pending", len(done), len(expected), queue.pending_count())
+        time.sleep(poll_interval)
+
+
+def work(config_path: str, queue_dir: str, host: str | None = None) -> None:
+    """Measure the tasks of a queue until the coordinator closes it.
+
+    Args:
+        config_path (str): The file path to the configuration file.
+        queue_dir (str): The queue directory shared with the coordinator.
+        host (str | None): Name of this machine in the results; the hostname by default.
+    """
+    config_folder = os.path.dirname(config_path)
+    config, repo_path, repo = open_project(config_path)
+    if config.setup_commands:
+        run_setup_commands(config.setup_commands)
+
+    executor = WorkerExecutor(repo, repo_path, compile_stages(config), keep=config.execution_plan.batch_size)
+    serve(FileTaskQueue(queue_dir), executor, host or socket.gethostname(), config.distributed, prefer=executor.prepared)
+    export_trace(config_folder)
+
+
+def serve(
+    queue: FileTaskQueue,
+    execute: TaskExecutor,
+    host: str,
+    settings: DistributedDefinition,
+    prefer: Collection[str] = (),
+) -> int:
+    """Claim and execute tasks until the queue is closed.
+
+    The worker is identified by the host and its process id.
+
+    Args:
+        queue (FileTaskQueue): The task queue.
+        execute (TaskExecutor): Runs a task and returns its result.
+        host (str): Name of the machine, recorded with every result.
+        settings (DistributedDefinition): The lease duration (leases are renewed three times per
+            lease) and the interval between two polls when no task is pending.
+        prefer (Collection[str]): Commits whose tasks are claimed first (e.g. already built ones).
+
+    Returns:
+        int: The number of tasks executed.
+    """
+    worker = f"{host}-{os.getpid()}"
+    logger.info("Worker %s waiting for tasks in %s", worker, queue.root)
+    count = 0
+    while True:
+        if (task := queue.claim(prefer)) is None:
+            if queue.closed:
+                logger.info("Queue closed; worker %s measured %d tasks.", worker, count)
+                return count
+            time.sleep(settings.poll_interval)
+            continue
+        logger.info("Task %s claimed by %s", task.id, worker)
+        with _renewing(queue, task, settings.lease_s / 3):
+            result = execute(task)
+        queue.complete(task, worker, {**result, "host": host})
+        count += 1
+
+
+@contextmanager
+def _renewing(queue: FileTaskQueue, task: QueuedTask, interval: float) -> Generator[None]:
+    """Renew the lease of a task in a background thread for the duration of the block.
+
+    Args:
+        queue (FileTaskQueue): The task queue.
+        task (QueuedTask): The leased task.
+        interval (float): Seconds between two renewals.
+
+    Yields:
+        None: While the task runs.
+    """
+    stop = threading.Event()
+
+    def renew() -> None:
+        while not stop.wait(interval):
+            if not queue.renew(task):
+                logger.warning("Lost the lease of task %s; another worker may measure it too.", task.id)
+                return
+
+    thread = threading.Thread(target=renew, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+class WorkerExecutor:
+    """Builds and measures the commits of the tasks claimed by a worker."""
+
+    def __init__(self, repo: git.Repo, repo_path: str, stages: dict[str, list[PipelineStage]], keep: int) -> None:
+        """Initialize the executor.
+
+        Args:
+            repo (git.Repo): The clone of this worker.
+            repo_path (str): Path to the clone.
+            stages (dict[str, list[PipelineStage]]): The compiled stages.
+            keep (int): Number of prepared workspaces kept, most recently used first.
+        """
+        self.repo = repo
+        self.repo_path = repo_path
+        self.stages = stages
+        self.keep = keep
+        # Prepared commits, least recently used first, and whether their build succeeded.
+        self.prepared: OrderedDict[str, bool] = OrderedDict()
+
+    def __call__(self, task: QueuedTask) -> dict[str, Any]:
+        """Build the commit of a task if needed and measure it.
+
+        Args:
+            task (QueuedTask): The task.
+
+        Returns:
+            dict[str, Any]: The status of the task ("ok", "build_failed" or "failed") and, if it
+                succeeded, the measured record.
+        """
+        if task.commit in self.prepared:
+            self.prepared.move_to_end(task.commit)
+        else:
+            self._prepare(task.commit)
+        if not self.prepared[task.commit]:
+            return {"status": "build_failed"}
+
+        commit = commit_ref(self.repo, task.commit)
+        context: dict[str, Any] = {
+            "commit": commit,
+            "task": MeasurementTask(commit, task.run_index, task.repeat_index),
+            "journal": None,
+            "build_failed": False,
+            "abort_pipeline": False,
+            "repo_path": self.repo_path,
+        }
+        succeeded = Pipeline._run_stage_group(self.stages.get("batch_stages", []), context)
+        for stage in self.stages.get("batch_stages", []):
+            stage.flush()
+        if not succeeded or (record := context.get("record")) is None:
+            return {"status": "failed"}
+        assert isinstance(record, MeasurementRecord)
+        return {"status": "ok", "record": asdict(record)}
+
+    def _prepare(self, hexsha: str) -> None:
+        """Run the pre-test stages of a commit, dropping the least recently used workspaces.
+
+        Args:
+            hexsha (str): The commit.
+        """
+        ctx = run_pre_test_stages_for_commit(hexsha, self.repo_path, self.stages.get("pre_test_stages", []))
+        # The measurements of the new build start with warm-up runs again.
+        for stage in self.stages.get("batch_stages", []):
+            stage.forget_commits([hexsha])
+        log_context_buffer(ctx)
+        tracer.merge(ctx.get("trace_spans", []))
+        self.prepared[hexsha] = not ctx.get("build_failed") and not ctx.get("abort_pipeline") and not ctx.get("slot_timeout")
+        if len(self.prepared) > self.keep:
+            while len(self.prepared) > self.keep:
+                self.prepared.popitem(last=False)
+            clean_cache_dir(
+                self.repo_path,
+                keep={os.path.abspath(f"{self.repo_path}_{sha}") for sha, built in self.prepared.items() if built},
+            )
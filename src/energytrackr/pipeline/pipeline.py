@@ -1,10 +1,14 @@
 """Pipeline orchestrator for running stages on commits in a repository."""
 
-import concurrent.futures
+import functools
 import os
 import random
 import shutil
 import sys
+from collections.abc import Collection
+from contextlib import closing, nullcontext, suppress
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Any
 
 import git
@@ -17,9 +21,12 @@ from rich.progress import (
     TimeRemainingColumn,
 )
 
-from energytrackr.config.config_model import PipelineConfig
+from energytrackr.config.config_model import ExecutionPlanDefinition, PipelineConfig
 from energytrackr.config.config_store import Config
 from energytrackr.config.loader import load_pipeline_config
+from energytrackr.pipeline.adaptive_sampling import AdaptiveSampler
+from energytrackr.pipeline.background_builds import BackgroundBuilder
+from energytrackr.pipeline.build_cache import BUILD_CACHE_DIR_NAME
 from energytrackr.pipeline.core_stages.build_stage import BuildStage
 from energytrackr.pipeline.core_stages.checkout_stage import CheckoutStage
 from energytrackr.pipeline.core_stages.copy_directory_stage import CopyDirectoryStage
@@ -27,12 +34,20 @@ from energytrackr.pipeline.core_stages.filter_and_regression_stage import Filter
 from energytrackr.pipeline.core_stages.measure_stage import MeasureEnergyStage
 from energytrackr.pipeline.core_stages.post_test_stage import PostTestStage
 from energytrackr.pipeline.core_stages.set_directory_stage import SetDirectoryStage
+from energytrackr.pipeline.core_stages.stability_check_stage import StabilityCheckStage
 from energytrackr.pipeline.core_stages.temperature_check_stage import TemperatureCheckStage
 from energytrackr.pipeline.core_stages.verify_perf_stage import VerifyPerfStage
-from energytrackr.pipeline.custom_stages.java_setup_stage import JavaSetupStage
+from energytrackr.pipeline.scheduling import resolve_seed, round_order, schedule_rounds
 from energytrackr.pipeline.stage_interface import PipelineStage
+from energytrackr.pipeline.stage_registry import ConfiguredStage, build_stages
+from energytrackr.pipeline.task_journal import MeasurementTask, TaskJournal, TaskKey
+from energytrackr.pipeline.worker_pool import WorkerPool
+from energytrackr.pipeline.workspace import prune_worktrees
+from energytrackr.pipeline.workspace_cache import BUILT, BYTES_PER_GB, WORKSPACE_INDEX_FILE, WorkspaceCache
+from energytrackr.utils.exceptions import ConfigurationSingletonNotSetError
 from energytrackr.utils.git_utils import clone_or_open_repo, gather_commits
 from energytrackr.utils.logger import logger
+from energytrackr.utils.tracing import format_summary, summarize, tracer, write_chrome_trace
 
 pre_stages: list[PipelineStage] = [
     VerifyPerfStage(),
@@ -56,23 +71,44 @@ batch_stages: list[PipelineStage] = [
 ]
 
 
-def compile_stages() -> dict[str, list[PipelineStage]]:
+@dataclass
+class _WorkerState:
+    """Pre-test stages of a pool worker and the repository it opens once, set by `_init_pre_test_worker`."""
+
+    stages: list[PipelineStage] | None = None
+    repo: git.Repo | None = None
+
+
+_WORKER = _WorkerState()
+
+
+def compile_stages(config: PipelineConfig | None = None) -> dict[str, list[PipelineStage]]:
     """Compile the pipeline stages based on the execution plan.
 
+    Args:
+        config (PipelineConfig | None): Configuration whose `stages` section replaces the built-in
+            stage groups it declares.
+
     Returns:
-        list[PipelineStage]: The compiled list of pipeline stages.
+        dict[str, list[PipelineStage]]: The stages of each group, in execution order.
     """
-    return {"pre_stages": pre_stages, "pre_test_stages": pre_test_stages, "batch_stages": batch_stages}
+    stages = {"pre_stages": pre_stages, "pre_test_stages": pre_test_stages, "batch_stages": batch_stages}
+    if config is not None and config.stages is not None:
+        for group in stages:
+            if (definitions := getattr(config.stages, group)) is not None:
+                stages[group] = build_stages(definitions)
+    return stages
 
 
 def setup_project_dirs(config: PipelineConfig, config_dir: str) -> str:
-    """Set up project, cache directories and return their paths.
+    """Set up the cache directory of a project and return the path of its repository.
 
     Args:
-        config (Config): The configuration object containing repository information.
+        config (PipelineConfig): The configuration object containing repository information.
+        config_dir (str): Directory containing the configuration file, in which the cache directory is created.
 
     Returns:
-        tuple[str, str, str]: Paths for project directory, cache directory, and repository path.
+        str: Path of the repository, in the cache directory.
     """
     project_name = os.path.basename(config.repo.url).replace(".git", "").lower()
     cache_dir = os.path.join(config_dir, ".cache")
@@ -83,6 +119,21 @@ def setup_project_dirs(config: PipelineConfig, config_dir: str) -> str:
     return repo_path
 
 
+def open_project(config_path: str) -> tuple[PipelineConfig, str, git.Repo]:
+    """Load the configuration of a project, then clone or open its repository.
+
+    Args:
+        config_path (str): The file path to the configuration file.
+
+    Returns:
+        tuple[PipelineConfig, str, git.Repo]: The configuration, the path of the repository and the repository.
+    """
+    load_pipeline_config(config_path)
+    config = Config.get_config()
+    repo_path = setup_project_dirs(config, os.path.dirname(config_path))
+    return config, repo_path, clone_or_open_repo(repo_path, config.repo.url, config.repo.clone_options)
+
+
 def run_setup_commands(commands: list[str]) -> None:
     """Run system-level setup commands if provided.
 
@@ -94,12 +145,13 @@ def run_setup_commands(commands: list[str]) -> None:
         os.system(cmd)
 
 
-def run_pre_stages(commits: list[git.Commit], repo_path: str) -> bool:
+def run_pre_stages(commits: list[git.Commit], repo_path: str, stages: list[PipelineStage] | None = None) -> bool:
     """Run pre-stages on the full commit list. Returns True if pipeline should continue.
 
     Args:
         commits (list[git.Commit]): List of git.Commit objects to process.
         repo_path (str): Path to the repository.
+        stages (list[PipelineStage] | None): The pre-stages; the built-in ones if None.
 
     Returns:
         bool: True if the pipeline should continue, False if it should abort.
@@ -110,8 +162,9 @@ def run_pre_stages(commits: list[git.Commit], repo_path: str) -> bool:
         "repo_path": repo_path,
         "commits": commits,
     }
-    for stage in pre_stages:
-        stage.run(pre_context)
+    for stage in pre_stages if stages is None else stages:
+        with tracer.span(stage.name, "pre_stages", pre_context):
+            stage.run(pre_context)
         if pre_context.get("abort_pipeline"):
             logger.warning("Pre-stages aborted the pipeline.")
             return False
@@ -124,8 +177,8 @@ def create_batches(
     num_runs: int,
     num_repeats: int,
     randomize_tasks: bool,
-) -> list[list[Any]]:
-    """Divide commits into batches and expand according to runs/repeats.
+) -> list[list[MeasurementTask]]:
+    """Divide commits into batches and expand according to runs/repeats, in sequential order.
 
     Args:
         commits (list[Commit]): List of git.Commit objects to process.
@@ -135,18 +188,54 @@ def create_batches(
         randomize_tasks (bool): Whether to randomize the order of tasks in each batch.
 
     Returns:
-        list[list[Any]]: List of batches, where each batch is a list of commits.
+        list[list[MeasurementTask]]: List of batches, where each batch is a list of measurement tasks.
+    """
+    # Only the scheduling settings of the plan are read.
+    plan = ExecutionPlanDefinition.model_construct(
+        batch_size=batch_size,
+        num_runs=num_runs,
+        num_repeats=num_repeats,
+        randomize_tasks=randomize_tasks,
+    )
+    return plan_batches(commits, plan)
+
+
+def plan_batches(
+    commits: list[git.Commit],
+    plan: ExecutionPlanDefinition,
+    completed: set[TaskKey] | None = None,
+) -> list[list[MeasurementTask]]:
+    """Divide commits into batches of tasks with the settings of an execution plan.
+
+    Except for the sequential strategy, the schedule of the plan spreads the runs over rounds, each
+    round visiting every batch of commits once.
+
+    Args:
+        commits (list[Commit]): List of git.Commit objects to process.
+        plan (ExecutionPlanDefinition): The execution plan, whose schedule seed is already resolved.
+        completed (set[TaskKey] | None): Keys of tasks already measured (e.g. loaded from a journal).
+            These tasks are not scheduled again, and batches left empty are dropped.
+
+    Returns:
+        list[list[MeasurementTask]]: List of batches, where each batch is a list of measurement tasks.
     """
-    commit_batches = [commits[i : i + batch_size] for i in range(0, len(commits), batch_size)]
-    batches: list[list[git.Commit]] = []
-    for commit_batch in commit_batches:
-        batch_tasks: list[git.Commit] = []
-        runs_per_commit = num_runs * num_repeats
-        for commit in commit_batch:
-            batch_tasks.extend([commit] * runs_per_commit)
-        if randomize_tasks:
-            random.shuffle(batch_tasks)
-        batches.append(batch_tasks)
+    completed = completed or set()
+    rng = random.Random(plan.schedule.seed)
+    rounds = schedule_rounds(commits, plan.batch_size, plan.num_runs, plan.schedule, rng)
+    batches: list[list[MeasurementTask]] = []
+    for round_index, (round_batches, run_indices) in enumerate(rounds):
+        for commit_batch in round_batches:
+            tasks = (
+                MeasurementTask(commit, run_index, repeat_index)
+                for commit in round_order(commit_batch, plan.schedule.strategy, round_index, rng)
+                for run_index in run_indices
+                for repeat_index in range(plan.num_repeats)
+            )
+            if not (batch_tasks := [task for task in tasks if task.key not in completed]):
+                continue
+            if plan.randomize_tasks:
+                rng.shuffle(batch_tasks)
+            batches.append(batch_tasks)
     return batches
 
 
@@ -161,7 +250,21 @@ def restore_head(repo: git.Repo, branch: str) -> None:
     logger.info("Restored HEAD to latest commit on branch %s.", branch)
 
 
-def measure(config_path: str) -> None:
+def journal_path(config_dir: str) -> str:
+    """Return the location of the task journal for a project.
+
+    The journal lives next to the results (and not in the cache directory, which is wiped after each batch).
+
+    Args:
+        config_dir (str): Directory containing the configuration file.
+
+    Returns:
+        str: Path of the JSON-lines task journal.
+    """
+    return os.path.join(config_dir, "energy_measurements", "task_journal.jsonl")
+
+
+def measure(config_path: str, resume: bool = False, retry_failed: bool = False) -> None:
     """Executes the measurement process for a given repository based on the provided configuration.
 
     This function performs the following steps:
@@ -174,20 +277,21 @@ def measure(config_path: str) -> None:
     7. Executes the remaining pipeline stages on these batches.
     8. Restores the repository's HEAD to the latest commit on the specified branch.
 
+    Every completed task is recorded in a journal, so that an interrupted campaign can be
+    continued with ``resume=True`` without re-measuring what was already done.
+
     Args:
         config_path (str): The file path to the configuration file.
+        resume (bool): Skip the tasks recorded as done in the journal of a previous run.
+        retry_failed (bool): Forget the build failures recorded in the workspace cache.
 
     Raises:
         Exceptions raised during the execution of repository operations or pipeline processing.
     """
-    load_pipeline_config(config_path)
     # Retrieve the configuration folder
     config_folder = os.path.dirname(config_path)
-    config = Config.get_config()
-
     # Set up directories and repository
-    repo_path = setup_project_dirs(config, config_folder)
-    repo = clone_or_open_repo(repo_path, config.repo.url, config.repo.clone_options)
+    config, repo_path, repo = open_project(config_path)
 
     # (Optional) run system-level setup commands.
     if config.setup_commands:
@@ -197,37 +301,119 @@ def measure(config_path: str) -> None:
     commits = gather_commits(repo)
     logger.info("Collected %d commits to process.", len(commits))
 
+    stages = compile_stages(config)
+
     # Run pre-stages once on the full list of commits
-    if not run_pre_stages(commits, repo_path):
+    if not run_pre_stages(commits, repo_path, stages["pre_stages"]):
         return
 
     logger.info("Filtered commits: %d", len(commits))
 
-    # Divide the filtered commits into batches
-    batches = create_batches(
-        commits,
-        config.execution_plan.batch_size,
-        config.execution_plan.num_runs,
-        config.execution_plan.num_repeats,
-        config.execution_plan.randomize_tasks,
-    )
-
-    pipeline = Pipeline(compile_stages(), repo_path)
+    journal = TaskJournal(journal_path(config_folder), resume=resume)
+    resolve_seed(config.execution_plan.schedule)
+
+    sampler: AdaptiveSampler | None = None
+    if config.execution_plan.adaptive_sampling.enabled:
+        # Only the first round is scheduled up front; further rounds are decided from the measurements.
+        sampler = AdaptiveSampler(commits, config.execution_plan, completed=journal.completed)
+        batch_size = config.execution_plan.batch_size
+        batches = [
+            batch for i in range(0, len(commits), batch_size) if (batch := sampler.initial_round(commits[i : i + batch_size]))
+        ]
+    else:
+        # Divide the filtered commits into batches
+        batches = plan_batches(commits, config.execution_plan, completed=journal.completed)
+    logger.info("Scheduled %d tasks in %d batches.", sum(len(batch) for batch in batches), len(batches))
+
+    pipeline = Pipeline(stages, repo_path, journal=journal, sampler=sampler)
+    if retry_failed and pipeline.workspace_cache is not None:
+        logger.info("Building %d failed commits again.", pipeline.workspace_cache.forget_failures())
     pipeline.run(batches)
+    if sampler is not None:
+        logger.info(
+            "Adaptive sampling used %d runs instead of %d.",
+            sampler.total_runs(),
+            len(commits) * config.execution_plan.num_runs,
+        )
+
+    export_trace(config_folder)
 
     # Restore HEAD
     restore_head(repo, config.repo.branch)
 
 
-def run_pre_test_stages_for_commit(commit_hexsha: str, repo_path: str) -> dict[str, Any]:
+def export_trace(config_dir: str) -> None:
+    """Write the stage spans of the campaign as a Chrome trace and log the time spent per stage.
+
+    Args:
+        config_dir (str): The directory of the configuration file.
+    """
+    if not tracer.spans:
+        return
+    path = os.path.join(config_dir, "energy_measurements", f"trace_{datetime.now():%Y%m%d_%H%M%S}.json")
+    write_chrome_trace(tracer.spans, path)
+    logger.info("Time per stage (Chrome trace written to %s):\n%s", path, format_summary(summarize(tracer.spans)))
+
+
+def _init_background_build(config: PipelineConfig) -> None:
+    """Set the configuration in a background build process, which does not inherit it.
+
+    Args:
+        config (PipelineConfig): The pipeline configuration.
+    """
+    try:
+        Config.get_config()
+    except ConfigurationSingletonNotSetError:
+        Config.set_config(config)
+
+
+def _init_pre_test_worker(stages: list[PipelineStage], repo_path: str | None = None) -> None:
+    """Initialize a pool worker with the pre-test stages, and the semaphores of their limits.
+
+    The repository is opened once per worker and reused by every commit the worker processes.
+
+    Args:
+        stages (list[PipelineStage]): The pre-test stages.
+        repo_path (str | None): Path to the repository; each commit opens it if None.
+    """
+    _WORKER.stages = stages
+    _WORKER.repo = None
+    if repo_path is not None:
+        # Reported by `run_pre_test_stages_for_commit`, which opens it again.
+        with suppress(git.InvalidGitRepositoryError, git.NoSuchPathError):
+            _WORKER.repo = git.Repo(repo_path)
+
+
+def _open_repo(repo_path: str) -> git.Repo:
+    """Return the repository opened by the pool worker, or open it.
+
+    Args:
+        repo_path (str): Path to the repository.
+
+    Returns:
+        git.Repo: The repository.
+    """
+    if _WORKER.repo is not None and _WORKER.repo.working_dir == os.path.abspath(repo_path):
+        return _WORKER.repo
+    return git.Repo(repo_path)
+
+
+def run_pre_test_stages_for_commit(
+    commit_hexsha: str,
+    repo_path: str,
+    stages: list[PipelineStage] | None = None,
+) -> dict[str, Any]:
     """Process the pre-test stages for a single commit in a separate process.
 
     Instead of receiving a git.Commit object (which might not be picklable), we pass the commit's hexsha.
-    Each process reopens the repository using repo_path and retrieves the commit object.
+    Each process reopens the repository using repo_path, unless its pool initializer already opened it,
+    and retrieves the commit object.
 
     Args:
         commit_hexsha (str): The hexsha of the commit to process.
         repo_path (str): Path to the repository.
+        stages (list[PipelineStage] | None): The pre-test stages; those of the pool worker, or the
+            built-in ones, if None.
 
     Returns:
         dict: The context after processing the stages.
@@ -242,7 +428,7 @@ def run_pre_test_stages_for_commit(commit_hexsha: str, repo_path: str) -> dict[s
 
     # 1. Re-open the repository
     try:
-        repo = git.Repo(repo_path)
+        repo = _open_repo(repo_path)
     except (git.InvalidGitRepositoryError, git.NoSuchPathError) as e:
         logger.exception("Invalid repo at %s: %s", repo_path, e, context=commit_context)
         commit_context["abort_pipeline"] = True
@@ -267,22 +453,26 @@ def run_pre_test_stages_for_commit(commit_hexsha: str, repo_path: str) -> dict[s
     # Success: record the resolved hexsha
     commit_context["commit"] = commit.hexsha
 
-    # 3. Execute each pre-test stage in isolation
-    for stage in pre_test_stages:
-        try:
-            stage.run(commit_context)
-        except Exception as e:
-            logger.exception(
-                "Error running stage %s on commit %s: %s",
-                stage.__class__.__name__,
-                commit.hexsha,
-                e,
-                context=commit_context,
-            )
-            # If a stage fails fatally, signal to abort further stages
-            commit_context["abort_pipeline"] = True
+    if stages is None:
+        stages = pre_test_stages if _WORKER.stages is None else _WORKER.stages
 
-        if commit_context.get("abort_pipeline"):
+    # 3. Execute each pre-test stage in isolation
+    for stage in stages:
+        with tracer.span(stage.name, "pre_test_stages", commit_context):
+            try:
+                stage.run(commit_context)
+            except Exception as e:
+                logger.exception(
+                    "Error running stage %s on commit %s: %s",
+                    stage.name,
+                    commit.hexsha,
+                    e,
+                    context=commit_context,
+                )
+                # If a stage fails fatally, signal to abort further stages
+                commit_context["abort_pipeline"] = True
+
+        if commit_context.get("abort_pipeline") or commit_context.get("build_failed") or commit_context.get("slot_timeout"):
             break
 
     return commit_context
@@ -311,15 +501,17 @@ def log_context_buffer(context: dict[str, Any]) -> None:
     logger.info("----- End of logs for %s -----\n", commit_id[:8])
 
 
-def clean_cache_dir(repo_path: str) -> None:
+def clean_cache_dir(repo_path: str, keep: Collection[str] = ()) -> None:
     """Remove all entries in the cache directory (siblings of the cloned repo) to free disk space.
 
     Given that repo_path points to:
         <project_dir>/.cache/.cache_<project_name>
-    this will delete everything under `<project_dir>/.cache/` except the live repo folder.
+    this will delete everything under `<project_dir>/.cache/` except the live repo folder, the build cache
+    and the index of the workspace cache.
 
     Args:
         repo_path (str): Absolute path to the cloned repository.
+        keep (Collection[str]): Absolute paths of other entries to keep, e.g. workspaces being built in the background.
     """
     cache_dir = os.path.dirname(repo_path)
     if not os.path.isdir(cache_dir):
@@ -328,8 +520,11 @@ def clean_cache_dir(repo_path: str) -> None:
 
     for entry in os.listdir(cache_dir):
         entry_path = os.path.join(cache_dir, entry)
-        # skip the active repo clone itself
-        if os.path.abspath(entry_path) == os.path.abspath(repo_path):
+        # skip the active repo clone itself and the workspaces to keep
+        if os.path.abspath(entry_path) in {os.path.abspath(repo_path), *keep}:
+            continue
+        # and the caches that outlive the batches
+        if entry in {BUILD_CACHE_DIR_NAME, WORKSPACE_INDEX_FILE}:
             continue
         try:
             if os.path.isdir(entry_path):
@@ -340,49 +535,94 @@ def clean_cache_dir(repo_path: str) -> None:
         except Exception as e:
             logger.warning("Failed to remove cache entry %s: %s", entry_path, e)
 
+    # Workspaces created with `git worktree add` leave administrative entries in the clone.
+    prune_worktrees(repo_path)
+
 
 class Pipeline:
     """Orchestrates the provided stages for each commit in sequence."""
 
-    def __init__(self, stages: dict[str, list[PipelineStage]], repo_path: str) -> None:
+    def __init__(
+        self,
+        stages: dict[str, list[PipelineStage]],
+        repo_path: str,
+        journal: TaskJournal | None = None,
+        sampler: AdaptiveSampler | None = None,
+    ) -> None:
         """Initializes the Pipeline with the given stages and configuration.
 
         Args:
             stages (dict[str, list[PipelineStage]]): A dictionary where the keys are stage names (as strings)
                 and the values are lists of PipelineStage objects representing the stages of the pipeline.
             repo_path (str): The path to the Git repository to be processed.
+            journal (TaskJournal | None): Journal in which completed tasks are recorded, if any.
+            sampler (AdaptiveSampler | None): If set, the commits of each batch are measured again in
+                rounds until the sampler considers their estimates settled.
 
         """
         self.stages = stages
         self.config = Config.get_config()
         self.repo_path = repo_path
+        self.journal = journal
+        self.sampler = sampler
+        self.samples: dict[str, list[float]] = {}
+        self.background: BackgroundBuilder | None = None
+        self.workspace_cache = WorkspaceCache.from_config(self.config, repo_path)
+        self.pool: WorkerPool[str] | None = None
+        # Commits left out of the current batch because a stage slot was not freed in time.
+        self.deferred: set[str] = set()
+        stability_check = self.config.execution_plan.stability_check
+        self.stability_check = StabilityCheckStage(stability_check) if stability_check.enabled else None
 
     @staticmethod
-    def _run_stage_group(stages: list[PipelineStage], context: dict[str, Any]) -> bool:
+    def _run_stage_group(
+        stages: list[PipelineStage],
+        context: dict[str, Any],
+        background: BackgroundBuilder | None = None,
+    ) -> bool:
         """Run a group of stages with the given context.
 
         Args:
             stages (list[PipelineStage]): A list of PipelineStage objects to run.
             context (dict[str, Any]): A dictionary containing the context for the pipeline execution.
                 This context is passed to each stage during execution.
+            background (BackgroundBuilder | None): Background builds, suspended while a stage measures energy.
 
         Returns:
             bool: True if all stages completed successfully, False if any stage aborted the pipeline.
         """
         for stage in stages:
-            stage.run(context)
+            with (
+                background.suspended() if background is not None and stage.measures_energy else nullcontext(),
+                tracer.span(stage.name, "batch_stages", context),
+            ):
+                stage.run(context)
             if context.get("abort_pipeline"):
-                logger.warning("Aborting remaining stages for stage %s", stage.__class__.__name__)
+                logger.warning("Aborting remaining stages for stage %s", stage.name)
                 return False
         return True
 
-    def run(self, batches: list[list[git.Commit]]) -> None:
-        """Executes the pipeline over a list of batches, where each batch contains a list of commits.
+    def run(self, batches: list[list[MeasurementTask]]) -> None:
+        """Executes the pipeline over a list of batches, where each batch contains a list of measurement tasks.
+
+        With `background_builds`, the pre-test stages of the next batch run in the background while
+        the current batch is measured; they are suspended for the span of every energy measurement.
+        With `workspace_cache`, commits whose workspace is already built skip the pre-test stages, and
+        built workspaces are only deleted when they no longer fit in the disk budget. The process pool
+        of the parallel pre-test stages is started on the first batch and kept until the last one.
+        With `stability_check`, each batch is only measured once the power draw is stable.
 
         Args:
-            batches (list[list[git.Commit]]): A list of batches, where each batch is a list of git.Commit objects.
+            batches (list[list[MeasurementTask]]): A list of batches, where each batch is a list of tasks.
         """
         failed_commits: set[str] = set()
+        if self.config.execution_plan.background_builds:
+            self.background = BackgroundBuilder(
+                functools.partial(run_pre_test_stages_for_commit, stages=self.stages.get("pre_test_stages", [])),
+                self.repo_path,
+                initializer=_init_background_build,
+                initargs=(self.config,),
+            )
 
         with Progress(
             SpinnerColumn(style="green"),
@@ -395,17 +635,162 @@ class Pipeline:
             transient=True,
         ) as progress:
             pipeline_task = progress.add_task("🔋Energy Pipeline", total=len(batches))
+            with closing(self):
+                for index, batch in enumerate(batches):
+                    next_batch = batches[index + 1] if index + 1 < len(batches) else None
+                    self._run_batch(batch, next_batch, failed_commits, progress)
+                    progress.advance(pipeline_task)
+
+    def _run_batch(
+        self,
+        batch: list[MeasurementTask],
+        next_batch: list[MeasurementTask] | None,
+        failed_commits: set[str],
+        progress: Progress,
+    ) -> None:
+        """Prepare the commits of a batch and measure its tasks.
+
+        Args:
+            batch (list[MeasurementTask]): The tasks of the batch.
+            next_batch (list[MeasurementTask] | None): The tasks of the next batch, built in the background
+                and protected from eviction; None for the last batch.
+            failed_commits (set[str]): Commits that failed to build or measure; updated in place.
+            progress (Progress): Rich Progress instance for updating a sub-task bar.
+        """
+        logger.info("Processing batch of %d tasks", len(batch))
+        unique_commit_hexshas = list({task.hexsha for task in batch})
+
+        built = self._collect_background_builds(failed_commits)
+        built |= self._reuse_cached_workspaces(unique_commit_hexshas, failed_commits)
+        self._run_pre_test_stages(
+            [sha for sha in unique_commit_hexshas if sha not in built],
+            failed_commits,
+            progress,
+        )
+        if self.background is not None and next_batch is not None:
+            # Commits of the current batch are excluded: their workspaces are in use.
+            self.background.submit(
+                sha
+                for sha in dict.fromkeys(task.hexsha for task in next_batch)
+                if sha not in unique_commit_hexshas and sha not in failed_commits and not self._is_cached(sha)
+            )
+        batch_to_process = [task for task in batch if task.hexsha not in failed_commits]
+        self._wait_for_stability()
+        failed_commits |= self._run_batch_stages(batch_to_process, progress)
+        if self.sampler is not None:
+            self._run_adaptive_rounds(batch_to_process, failed_commits, progress)
+        for stage in self.stages.get("batch_stages", []):
+            stage.flush()
+            stage.forget_commits(unique_commit_hexshas)
+
+        keep = self.background.workspaces() if self.background else set()
+        if self.workspace_cache is not None:
+            # The workspaces of the next batch are about to be measured.
+            self.workspace_cache.evict(protected={task.hexsha for task in next_batch or []})
+            keep |= self.workspace_cache.workspaces()
+        clean_cache_dir(self.repo_path, keep=keep)
+        failed_commits -= self.deferred
+        self.deferred.clear()
+
+    def close(self) -> None:
+        """Release what the campaign kept across batches: counter, worker processes and workspace index."""
+        if self.stability_check is not None:
+            self.stability_check.close()
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        if self.background is not None:
+            self.background.shutdown()
+        if self.workspace_cache is not None:
+            self.workspace_cache.save()
+
+    def _wait_for_stability(self) -> None:
+        """Wait for the power draw to be stable, with the background builds suspended."""
+        if self.stability_check is None:
+            return
+        with self.background.suspended() if self.background is not None else nullcontext():
+            if not self.stability_check.wait_until_stable():
+                logger.warning("Power draw still unstable; measuring the batch anyway.")
+
+    def _collect_background_builds(self, failed_commits: set[str]) -> set[str]:
+        """Wait for the commits built in the background and record their outcome.
+
+        Args:
+            failed_commits (set[str]): A set to which failed SHAs will be added.
+
+        Returns:
+            set[str]: The commits whose pre-test stages were run in the background.
+        """
+        if self.background is None:
+            return set()
+        results = self.background.results()
+        for sha, ctx in results.items():
+            if ctx is None:
+                logger.warning("Background pre-test stages of commit %s did not complete.", sha)
+                failed_commits.add(sha)
+                continue
+            self._handle_pre_test_context(sha, ctx, failed_commits)
+        return set(results)
 
-            for batch in batches:
-                logger.info("Processing batch of %d tasks", len(batch))
-                unique_commit_hexshas = list({commit.hexsha for commit in batch})
+    def _is_cached(self, sha: str) -> bool:
+        """Check whether the pre-test stages of a commit can be skipped thanks to the workspace cache.
+
+        Args:
+            sha (str): The commit.
+
+        Returns:
+            bool: True if the commit's build status is known.
+        """
+        return self.workspace_cache is not None and self.workspace_cache.status(sha) is not None
 
-                self._run_pre_test_stages(unique_commit_hexshas, failed_commits, progress)
-                batch_to_process = [commit for commit in batch if commit.hexsha not in failed_commits]
-                self._run_batch_stages(batch_to_process, progress)
+    def _reuse_cached_workspaces(self, hexshas: list[str], failed_commits: set[str]) -> set[str]:
+        """Find the commits of a batch whose pre-test stages already ran in a cached workspace.
 
-                clean_cache_dir(self.repo_path)
-                progress.advance(pipeline_task)
+        Args:
+            hexshas (list[str]): The commits of the batch.
+            failed_commits (set[str]): A set to which commits whose build is known to fail are added.
+
+        Returns:
+            set[str]: The commits that need not be prepared again.
+        """
+        if self.workspace_cache is None:
+            return set()
+        cached: set[str] = set()
+        for sha in hexshas:
+            if (status := self.workspace_cache.status(sha)) is None:
+                continue
+            cached.add(sha)
+            if status != BUILT:
+                logger.warning("Build of commit %s is known to fail; skipping it.", sha)
+                failed_commits.add(sha)
+        if cached:
+            logger.info("Reusing %d cached workspaces.", len(cached))
+        return cached
+
+    def _handle_pre_test_context(self, sha: str, ctx: dict[str, Any], failed_commits: set[str]) -> None:
+        """Replay the logs of the pre-test stages of a commit and record their outcome.
+
+        Args:
+            sha (str): The commit.
+            ctx (dict[str, Any]): The context returned by the pre-test stages.
+            failed_commits (set[str]): A set to which the commit is added if its build failed.
+        """
+        log_context_buffer(ctx)
+        tracer.merge(ctx.get("trace_spans", []))
+        if ctx.get("abort_pipeline"):
+            logger.warning("Aborting pipeline due to commit %s", sha)
+            sys.exit(1)
+        if ctx.get("slot_timeout"):
+            # A scheduling problem, not a build failure: the commit is not recorded in the workspace cache.
+            logger.warning("Commit %s got no stage slot in time; it is left out of this batch.", sha)
+            failed_commits.add(sha)
+            self.deferred.add(sha)
+            return
+        if ctx.get("build_failed"):
+            logger.warning("Build failed for commit %s", sha)
+            failed_commits.add(sha)
+        if self.workspace_cache is not None and not ctx.get("transient_failure"):
+            self.workspace_cache.record(sha, built=not ctx.get("build_failed"))
 
     def _run_pre_test_stages(
         self,
@@ -420,62 +805,136 @@ class Pipeline:
             failed_commits: A set to which failed SHAs will be added.
             progress: Rich Progress instance for updating a sub-task bar.
         """
-        use_mp: bool = getattr(self.config.execution_plan, "use_multiprocessing", False)
+        stages = self.stages.get("pre_test_stages", [])
+        max_workers = self.config.worker_pool.workers or self._pre_test_workers(stages)
+        use_mp: bool = getattr(self.config.execution_plan, "use_multiprocessing", False) or max_workers is not None
         logger.info("Using multiprocessing: %s", use_mp)
         total = len(unique_commit_hexshas)
         subtask = progress.add_task("Pre batch stages", total=total)
 
         if use_mp:
-            # parallel execution
-            with concurrent.futures.ProcessPoolExecutor() as executor:
-                futures = {
-                    executor.submit(run_pre_test_stages_for_commit, sha, self.repo_path): sha for sha in unique_commit_hexshas
-                }
-                for future in concurrent.futures.as_completed(futures):
-                    sha = futures[future]
-                    try:
-                        ctx = future.result(timeout=self.config.timeout)
-                    except Exception:
-                        logger.exception("Commit %s generated an exception.", sha)
-                        progress.advance(subtask)
-                        continue
-
-                    log_context_buffer(ctx)
-                    if ctx.get("abort_pipeline"):
-                        logger.warning("Aborting pipeline due to commit %s", sha)
-                        sys.exit(1)
-                    if ctx.get("build_failed"):
-                        logger.warning("Build failed for commit %s", sha)
-                        failed_commits.add(sha)
-
-                    desc = f"Pre batch stages (failed: {len(failed_commits)})" if failed_commits else "Pre batch stages"
-                    progress.update(subtask, advance=1, description=desc)
+            # parallel execution in the pool of the campaign; its workers hold the stages (and their semaphores)
+            pool = self._worker_pool(stages, max_workers)
+            for sha, future in pool.imap_unordered(
+                functools.partial(run_pre_test_stages_for_commit, repo_path=self.repo_path),
+                unique_commit_hexshas,
+            ):
+                try:
+                    ctx = future.result()
+                except Exception:
+                    logger.exception("Commit %s generated an exception.", sha)
+                    failed_commits.add(sha)
+                    progress.advance(subtask)
+                    continue
+
+                self._handle_pre_test_context(sha, ctx, failed_commits)
+
+                desc = f"Pre batch stages (failed: {len(failed_commits)})" if failed_commits else "Pre batch stages"
+                progress.update(subtask, advance=1, description=desc)
             progress.remove_task(subtask)
 
         else:
             # sequential execution
             for sha in unique_commit_hexshas:
-                ctx = run_pre_test_stages_for_commit(sha, self.repo_path)
-                log_context_buffer(ctx)
-                if ctx.get("abort_pipeline"):
-                    logger.warning("Aborting pipeline due to commit %s", sha)
-                    sys.exit(1)
-                if ctx.get("build_failed"):
-                    logger.warning("Build failed for commit %s", sha)
-                    failed_commits.add(sha)
+                ctx = run_pre_test_stages_for_commit(sha, self.repo_path, stages)
+                self._handle_pre_test_context(sha, ctx, failed_commits)
 
                 desc = f"Pre batch stages (failed: {len(failed_commits)})" if failed_commits else "Pre batch stages"
                 progress.update(subtask, advance=1, description=desc)
             progress.remove_task(subtask)
 
-    def _run_batch_stages(self, batch_to_process: list[git.Commit], progress: Progress) -> None:
+    def _worker_pool(self, stages: list[PipelineStage], max_workers: int | None) -> WorkerPool[str]:
+        """Start the process pool of the pre-test stages, or return the one already started.
+
+        Args:
+            stages (list[PipelineStage]): The pre-test stages, handed to the workers when they start.
+            max_workers (int | None): Number of workers; the CPU count if None.
+
+        Returns:
+            WorkerPool[str]: The pool, running the pre-test stages of commit hashes.
+        """
+        if self.pool is None:
+            settings = self.config.worker_pool
+            self.pool = WorkerPool(
+                max_workers or os.cpu_count() or 1,
+                initializer=functools.partial(_init_pre_test_worker, stages, self.repo_path),
+                memory_per_task=int(settings.memory_per_build_gb * BYTES_PER_GB),
+                poll_interval=settings.poll_interval,
+            )
+        return self.pool
+
+    @staticmethod
+    def _pre_test_workers(stages: list[PipelineStage]) -> int | None:
+        """Number of pool workers needed to saturate the parallel pre-test stages.
+
+        Args:
+            stages (list[PipelineStage]): The pre-test stages.
+
+        Returns:
+            int | None: The largest concurrency limit of the parallel stages (the CPU count for an
+                unlimited one), or None if no stage is declared parallel.
+        """
+        limits = [
+            stage.limit or os.cpu_count() or 1
+            for stage in stages
+            if isinstance(stage, ConfiguredStage) and stage.definition.parallel
+        ]
+        return max(limits, default=None)
+
+    def _run_adaptive_rounds(
+        self,
+        batch: list[MeasurementTask],
+        failed_commits: set[str],
+        progress: Progress,
+    ) -> None:
+        """Measure the commits of a batch again until the sampler considers them settled.
+
+        The workspaces built for the batch are reused, so extra rounds only cost measurements.
+
+        Args:
+            batch (list[MeasurementTask]): The tasks of the first round of the batch.
+            failed_commits (set[str]): Commits that failed to build or measure; updated in place.
+            progress (Progress): Rich Progress instance for updating a sub-task bar.
+        """
+        assert self.sampler is not None
+        commits = list({task.hexsha: task.commit for task in batch}.values())
+        while tasks := self.sampler.next_round([commit for commit in commits if commit.hexsha not in failed_commits]):
+            failed_commits |= self._run_batch_stages(tasks, progress)
+
+    def _record_measurement(self, hexsha: str, values: list[str]) -> None:
+        """Keep the first measured value of a run, for the adaptive sampler and for callers such as bisect.
+
+        Args:
+            hexsha (str): The measured commit.
+            values (list[str]): The values written to the results file for this run.
+        """
+        try:
+            value = float(values[0])
+        except ValueError:
+            logger.warning("Measurement %s of commit %s is not a number.", values[0], hexsha)
+            return
+        self.samples.setdefault(hexsha, []).append(value)
+        if self.sampler is not None:
+            self.sampler.record(hexsha, value)
+
+    def _run_batch_stages(self, batch_to_process: list[MeasurementTask], progress: Progress) -> set[str]:
+        """Run the batch stages on every task of a batch.
+
+        Args:
+            batch_to_process (list[MeasurementTask]): The tasks to run.
+            progress (Progress): Rich Progress instance for updating a sub-task bar.
+
+        Returns:
+            set[str]: The commits for which a batch stage aborted.
+        """
         batch_stage_task = progress.add_task(
             "[green]🧪Batch stages",
             total=len(batch_to_process),
         )
         failed_tests_commits: set[str] = set()
-        logger.info("Starting pipeline over %d commits...", len(batch_to_process))
-        for commit in batch_to_process:
+        logger.info("Starting pipeline over %d tasks...", len(batch_to_process))
+        for task in batch_to_process:
+            commit = task.commit
             if commit.hexsha in failed_tests_commits:
                 logger.warning("Skipping failed commit %s", commit.hexsha)
                 continue
@@ -488,18 +947,23 @@ class Pipeline:
 
             commit_context: dict[str, Any] = {
                 "commit": commit,
+                "task": task,
+                "journal": self.journal,
                 "build_failed": False,
                 "abort_pipeline": False,
                 "repo_path": self.repo_path,
             }
-            logger.info("==== Processing commit %s ====", commit.hexsha)
+            logger.info("==== Processing commit %s (run %d) ====", commit.hexsha, task.run_index)
 
-            if not self._run_stage_group(self.stages.get("batch_stages", []), commit_context):
+            if not self._run_stage_group(self.stages.get("batch_stages", []), commit_context, self.background):
                 logger.warning("Commit %s failed to process.", commit.hexsha)
                 failed_tests_commits.add(commit.hexsha)
                 continue
 
+            if values := commit_context.get("measurement"):
+                self._record_measurement(commit.hexsha, values)
             logger.info("==== Done with commit %s ====\n", commit.hexsha)
 
         logger.info("Batch stages completed with %d failed commits.", len(failed_tests_commits))
         progress.remove_task(batch_stage_task)
+        return failed_tests_commits
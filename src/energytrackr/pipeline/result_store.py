@@ -0,0 +1,283 @@
+"""Pluggable storage of the measurement results.
+
+Every run produces a `MeasurementRecord` holding the measured values and the metadata of the run
+(run and repeat indices, start time, duration, exit code, backend, host) and the covariates of the
+run (CPU temperature before and after, mean CPU frequency, load average). Writers
+buffer records and write them in batches:
+
+- `CsvResultWriter` keeps the historical headerless ``commit,value...`` layout read by
+  ``energytrackr sort`` and ``energytrackr plot``;
+- `SqliteResultWriter` stores one row per run with all the metadata, in a single table whose
+  value columns are named after the measured events. `read_results` loads it as a DataFrame,
+  without the warm-up runs.
+"""
+
+import sqlite3
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from energytrackr.config.config_model import PipelineConfig, ResultFormatEnum
+
+RESULTS_TABLE = "measurements"
+METADATA_COLUMNS: dict[str, str] = {
+    "run_index": "INTEGER",
+    "repeat_index": "INTEGER",
+    "started_at": "TEXT",
+    "duration_s": "REAL",
+    "cpu_temperature": "REAL",
+    "end_temperature": "REAL",
+    "cpu_frequency_mhz": "REAL",
+    "loadavg": "REAL",
+    "exit_code": "INTEGER",
+    "backend": "TEXT",
+    "host": "TEXT",
+    "warmup": "INTEGER",
+    "schedule": "TEXT",
+    "schedule_seed": "INTEGER",
+}
+SQLITE_SUFFIXES = (".sqlite", ".db")
+
+
+@dataclass
+class MeasurementRecord:
+    """The result of one measured run.
+
+    Attributes:
+        commit (str): Hash of the measured commit.
+        values (dict[str, str | None]): Measured value of each event or domain, in column order.
+        run_index (int): Index of the run for this commit.
+        repeat_index (int): Index of the repetition within the run.
+        started_at (str): ISO timestamp of the start of the run.
+        duration_s (float | None): Wall-clock duration of the measured command, in seconds.
+        cpu_temperature (float | None): CPU temperature before the run, in milli-degrees.
+        end_temperature (float | None): CPU temperature after the run, in milli-degrees.
+        cpu_frequency_mhz (float | None): Mean of two readings of the CPU frequency, each averaged over
+            the CPUs, at the start and at the end of the run; not sampled during the run.
+        loadavg (float | None): One-minute load average before the run.
+        exit_code (int | None): Exit code of the measured command.
+        backend (str): Measurement backend ("perf" or "rapl").
+        host (str): Machine that measured the run.
+        warmup (bool): Whether the run is a warm-up run, to be left out of the analysis.
+        schedule (str): Scheduling strategy of the campaign.
+        schedule_seed (int | None): Seed of the schedule, to reproduce the order of the runs.
+    """
+
+    commit: str
+    values: dict[str, str | None] = field(default_factory=dict)
+    run_index: int = 0
+    repeat_index: int = 0
+    started_at: str = ""
+    duration_s: float | None = None
+    cpu_temperature: float | None = None
+    end_temperature: float | None = None
+    cpu_frequency_mhz: float | None = None
+    loadavg: float | None = None
+    exit_code: int | None = None
+    backend: str = ""
+    host: str = ""
+    warmup: bool = False
+    schedule: str = ""
+    schedule_seed: int | None = None
+
+
+class ResultWriter(ABC):
+    """Buffered writer of measurement records."""
+
+    suffix = ""
+
+    def __init__(self, path: str | Path, flush_every: int = 1) -> None:
+        """Initialize the writer.
+
+        Args:
+            path (str | Path): The result file.
+            flush_every (int): Number of records buffered before they are written.
+        """
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self._buffer: list[MeasurementRecord] = []
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered records not written yet."""
+        return len(self._buffer)
+
+    def write(self, record: MeasurementRecord) -> bool:
+        """Buffer a record, writing the buffer once it is full.
+
+        Args:
+            record (MeasurementRecord): The record to store.
+
+        Returns:
+            bool: True if the buffer (including this record) has been written.
+        """
+        self._buffer.append(record)
+        if len(self._buffer) < self.flush_every:
+            return False
+        self.flush()
+        return True
+
+    def flush(self) -> None:
+        """Write every buffered record."""
+        if not self._buffer:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_records(self._buffer)
+        self._buffer = []
+
+    @abstractmethod
+    def _write_records(self, records: list[MeasurementRecord]) -> None:
+        """Persist records to the result file.
+
+        Args:
+            records (list[MeasurementRecord]): The records to write.
+        """
+
+
+class CsvResultWriter(ResultWriter):
+    """Writes headerless ``commit,value...`` rows; the run metadata and the warm-up runs are not stored."""
+
+    suffix = ".csv"
+
+    def _write_records(self, records: list[MeasurementRecord]) -> None:
+        """Append the records as CSV rows.
+
+        Args:
+            records (list[MeasurementRecord]): The records to write.
+        """
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.writelines(",".join([r.commit, *(str(v) for v in r.values.values())]) + "\n" for r in records if not r.warmup)
+
+
+class SqliteResultWriter(ResultWriter):
+    """Writes one row per run, with its metadata, to a SQLite database."""
+
+    suffix = ".sqlite"
+
+    def _write_records(self, records: list[MeasurementRecord]) -> None:
+        """Insert the records in a single transaction, adding value columns for new events.
+
+        Args:
+            records (list[MeasurementRecord]): The records to write.
+        """
+        with sqlite3.connect(self.path) as conn:
+            metadata = ", ".join(f"{name} {kind}" for name, kind in METADATA_COLUMNS.items())
+            conn.execute(f'CREATE TABLE IF NOT EXISTS {RESULTS_TABLE} ("commit" TEXT NOT NULL, {metadata})')
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({RESULTS_TABLE})")}
+            # Stores written by older versions lack the newer metadata columns.
+            for name, kind in METADATA_COLUMNS.items():
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE {RESULTS_TABLE} ADD COLUMN {name} {kind}")
+            for name in dict.fromkeys(name for r in records for name in r.values):
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE {RESULTS_TABLE} ADD COLUMN {_quote(name)} REAL")
+            for record in records:
+                row = {
+                    "commit": record.commit,
+                    **{name: getattr(record, name) for name in METADATA_COLUMNS},
+                    **{name: _to_float(value) for name, value in record.values.items()},
+                }
+                columns = ", ".join(_quote(name) for name in row)
+                placeholders = ", ".join("?" for _ in row)
+                conn.execute(f"INSERT INTO {RESULTS_TABLE} ({columns}) VALUES ({placeholders})", list(row.values()))
+        conn.close()
+
+
+def create_result_writer(config: PipelineConfig, stem: str | Path) -> ResultWriter:
+    """Create the result writer selected by the configuration.
+
+    Args:
+        config (PipelineConfig): The pipeline configuration.
+        stem (str | Path): The result file path without its suffix.
+
+    Returns:
+        ResultWriter: The writer; the suffix of its file depends on the format.
+    """
+    writer_cls = SqliteResultWriter if config.results.format == ResultFormatEnum.SQLITE else CsvResultWriter
+    return writer_cls(f"{stem}{writer_cls.suffix}", flush_every=config.results.flush_every)
+
+
+def is_sqlite_results(path: str | Path) -> bool:
+    """Check whether a result file is a SQLite result store.
+
+    Args:
+        path (str | Path): The result file.
+
+    Returns:
+        bool: True if the file has a SQLite suffix.
+    """
+    return Path(path).suffix in SQLITE_SUFFIXES
+
+
+def read_results(path: str | Path, include_warmup: bool = False) -> pd.DataFrame:
+    """Load a SQLite result store.
+
+    Args:
+        path (str | Path): The SQLite result file.
+        include_warmup (bool): Keep the warm-up runs, which are left out of the analysis.
+
+    Returns:
+        pd.DataFrame: One row per run, with the columns `commit`, then the value columns in the
+            order they were first written, then the metadata columns.
+    """
+    with sqlite3.connect(path) as conn:
+        df = pd.read_sql_query(f"SELECT * FROM {RESULTS_TABLE} ORDER BY rowid", conn)
+    conn.close()
+    if not include_warmup and "warmup" in df.columns:
+        df = df[df["warmup"].fillna(0).eq(0)].reset_index(drop=True)
+    values = [c for c in df.columns if c != "commit" and c not in METADATA_COLUMNS]
+    return df[["commit", *values, *(c for c in METADATA_COLUMNS if c in df.columns)]]
+
+
+def measured_commits(path: str | Path) -> set[str]:
+    """List the commits that have at least one measured run in a result file.
+
+    Args:
+        path (str | Path): The result file, CSV or SQLite; it may not exist yet.
+
+    Returns:
+        set[str]: The commit hashes; warm-up runs do not count.
+    """
+    path = Path(path)
+    if not path.is_file():
+        return set()
+    if not is_sqlite_results(path):
+        with path.open(encoding="utf-8") as fh:
+            return {line.split(",", 1)[0] for line in fh if line.strip()}
+    with sqlite3.connect(path) as conn:
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({RESULTS_TABLE})")}
+        where = " WHERE NOT warmup" if "warmup" in columns else ""
+        query = f'SELECT DISTINCT "commit" FROM {RESULTS_TABLE}{where}'
+        # The table only exists once a run was written.
+        commits = {row[0] for row in conn.execute(query)} if columns else set()
+    conn.close()
+    return commits
+
+
+def _quote(name: str) -> str:
+    """Quote an SQL identifier.
+
+    Args:
+        name (str): The identifier, e.g. an event name such as "power/energy-pkg/".
+
+    Returns:
+        str: The quoted identifier.
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _to_float(value: str | None) -> float | None:
+    """Convert a measured value to a number, keeping missing values as NULL.
+
+    Args:
+        value (str | None): The measured value.
+
+    Returns:
+        float | None: The numeric value, or None if it is missing or not a number.
+    """
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
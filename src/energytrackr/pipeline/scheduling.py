@@ -0,0 +1,115 @@
+"""Counterbalanced orders of the runs of a campaign.
+
+With the 'sequential' strategy, all the runs of the oldest commits are measured first and those of
+the newest commits last, so any slow drift of the machine during the campaign shows up as a trend
+over the history. The other strategies measure the campaign in rounds: each round visits every
+commit (in batches of at most `batch_size` commits, so that the workspaces of a batch still fit
+the disk) and the order of the visits changes from round to round so that every commit is, on
+average, measured at the same time of the campaign:
+
+- 'round_robin' keeps the history order in every round;
+- 'abba' alternates the history order and its reverse (forward, backward, backward, forward),
+  which cancels a linear drift over every four rounds;
+- 'latin_square' takes the orders from the rows of a Williams design, in which every batch (and
+  every commit of a batch) takes every position once and follows every other one equally often;
+- 'random' shuffles the orders with a seeded generator.
+"""
+
+import random
+from collections.abc import Sequence
+
+from energytrackr.config.config_model import ScheduleDefinition, ScheduleStrategyEnum
+from energytrackr.utils.logger import logger
+
+# ABBA blocks: rounds 1 and 2 of every 4 are measured backwards.
+ABBA_BLOCK = 4
+ABBA_REVERSED = {1, 2}
+SEED_BITS = 32
+
+
+def williams_order(n: int, row: int) -> list[int]:
+    """Row of a Williams Latin square, balanced for first-order carry-over effects.
+
+    The first row is ``0, 1, n-1, 2, n-2, ...``, and the others add the row index modulo n. For an
+    odd n, rows n to 2n-1 are the previous ones reversed, as two squares are needed for balance.
+
+    Args:
+        n (int): Number of treatments.
+        row (int): Index of the row; taken modulo the number of rows of the design.
+
+    Returns:
+        list[int]: A permutation of ``range(n)``.
+    """
+    if n <= 1:
+        return list(range(n))
+    base = [0, *((i + 1) // 2 if i % 2 else n - i // 2 for i in range(1, n))]
+    row %= 2 * n if n % 2 else n
+    order = [(value + row) % n for value in base]
+    return order[::-1] if row >= n else order
+
+
+def round_order[T](items: Sequence[T], strategy: ScheduleStrategyEnum, round_index: int, rng: random.Random) -> list[T]:
+    """Order items (batches, or commits within a batch) for one round.
+
+    Args:
+        items (Sequence[T]): The items, in history order.
+        strategy (ScheduleStrategyEnum): The scheduling strategy.
+        round_index (int): Index of the round.
+        rng (random.Random): Generator of the random orders.
+
+    Returns:
+        list[T]: The items in the order they are measured in this round.
+    """
+    match strategy:
+        case ScheduleStrategyEnum.ABBA if round_index % ABBA_BLOCK in ABBA_REVERSED:
+            return list(reversed(items))
+        case ScheduleStrategyEnum.LATIN_SQUARE:
+            return [items[i] for i in williams_order(len(items), round_index)]
+        case ScheduleStrategyEnum.RANDOM:
+            return rng.sample(list(items), len(items))
+        case _:
+            return list(items)
+
+
+def schedule_rounds[T](
+    items: Sequence[T],
+    batch_size: int,
+    num_runs: int,
+    schedule: ScheduleDefinition,
+    rng: random.Random,
+) -> list[tuple[list[list[T]], range]]:
+    """Split items (commits) into batches and spread their runs over rounds.
+
+    Args:
+        items (Sequence[T]): The items, in history order.
+        batch_size (int): Number of items per batch.
+        num_runs (int): Number of runs per item.
+        schedule (ScheduleDefinition): The schedule settings.
+        rng (random.Random): Generator of the random orders.
+
+    Returns:
+        list[tuple[list[list[T]], range]]: For each round, the batches in the order they are visited
+            and the indices of the runs measured in the round. The sequential strategy has a single round.
+    """
+    batches = [list(items[i : i + batch_size]) for i in range(0, len(items), batch_size)]
+    if schedule.strategy == ScheduleStrategyEnum.SEQUENTIAL:
+        return [(batches, range(num_runs))]
+    num_rounds = min(schedule.rounds or num_runs, num_runs)
+    return [(round_order(batches, schedule.strategy, r, rng), range(r, num_runs, num_rounds)) for r in range(num_rounds)]
+
+
+def resolve_seed(schedule: ScheduleDefinition) -> int:
+    """Draw the seed of the schedule if it is not configured, and store it in the configuration.
+
+    The seed is recorded with every run, so that the order of a campaign can be reproduced.
+
+    Args:
+        schedule (ScheduleDefinition): The schedule settings.
+
+    Returns:
+        int: The seed.
+    """
+    if schedule.seed is None:
+        schedule.seed = random.SystemRandom().getrandbits(SEED_BITS)
+    logger.info("Scheduling strategy %s with seed %d.", schedule.strategy, schedule.seed)
+    return schedule.seed
@@ -1,6 +1,7 @@
 """Interface for pipeline stages."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterable
 from typing import Any
 
 
@@ -8,8 +9,18 @@ class PipelineStage(ABC):
     """Abstract base for pipeline stages.
 
     Each stage receives a shared 'context' dict and can read/write data.
+
+    Attributes:
+        measures_energy (bool): Whether the stage measures energy; background builds are suspended while it runs.
     """
 
+    measures_energy: bool = False
+
+    @property
+    def name(self) -> str:
+        """Name of the stage in logs and traces."""
+        return self.__class__.__name__
+
     @abstractmethod
     def run(self, context: dict[str, Any]) -> None:
         """Execute the logic for this stage, possibly modifying context.
@@ -19,3 +30,18 @@ class PipelineStage(ABC):
         Args:
             context (dict[str, Any]): Shared context for the pipeline.
         """
+
+    def flush(self) -> None:  # noqa: B027
+        """Persist any state buffered by the stage.
+
+        Called by the pipeline after each batch. Stages without buffered state need not override it.
+        """
+
+    def forget_commits(self, hexshas: Iterable[str]) -> None:  # noqa: B027
+        """Drop the state kept for commits whose workspace is released, to be built again.
+
+        Called by the pipeline after each batch. Stages without per-commit state need not override it.
+
+        Args:
+            hexshas (Iterable[str]): The commits.
+        """
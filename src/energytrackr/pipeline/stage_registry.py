@@ -0,0 +1,154 @@
+"""Stages declared in the configuration.
+
+The `stages` section of the configuration describes each stage group as a DAG: every stage names
+its class (a built-in stage or ``package.module:Class``), its constructor parameters, the stages
+it depends on and its scheduling constraints. Groups are ordered topologically when the
+configuration is loaded; this module instantiates them.
+
+Pre-test stages of different commits run in a process pool. A stage that is not `parallel` is
+entered by one commit at a time, and a parallel stage by at most `concurrency` commits; the limits
+are process-shared semaphores inherited by the workers, so e.g. checkouts can proceed while eight
+builds and a single dependency download run. A worker that dies inside a stage never releases
+its slot: a commit waiting longer than `slot_timeout_s` for one is left out of its batch.
+The dependencies only order the stages of a commit; they never run concurrently for one commit.
+Stages that are `exclusive` (and the energy measurement) suspend background builds while they run.
+"""
+
+import inspect
+import multiprocessing
+from collections.abc import Iterable
+from multiprocessing.synchronize import BoundedSemaphore
+from typing import Any
+
+from energytrackr.config.config_model import StageDefinition
+from energytrackr.pipeline.core_stages.build_stage import BuildStage
+from energytrackr.pipeline.core_stages.checkout_stage import CheckoutStage
+from energytrackr.pipeline.core_stages.copy_directory_stage import CopyDirectoryStage
+from energytrackr.pipeline.core_stages.filter_and_regression_stage import FilterAndRegressionStage
+from energytrackr.pipeline.core_stages.measure_stage import MeasureEnergyStage
+from energytrackr.pipeline.core_stages.post_test_stage import PostTestStage
+from energytrackr.pipeline.core_stages.set_directory_stage import SetDirectoryStage
+from energytrackr.pipeline.core_stages.stability_check_stage import StabilityCheckStage
+from energytrackr.pipeline.core_stages.temperature_check_stage import TemperatureCheckStage
+from energytrackr.pipeline.core_stages.verify_perf_stage import VerifyPerfStage
+from energytrackr.pipeline.custom_stages.java_setup_stage import JavaSetupStage
+from energytrackr.pipeline.stage_interface import PipelineStage
+from energytrackr.plot.core.loader import load_callable
+from energytrackr.utils.exceptions import ModuleDidNotResolveToClassError, MustImplementError
+from energytrackr.utils.logger import logger
+
+BUILTIN_STAGES: dict[str, type[PipelineStage]] = {
+    cls.__name__: cls
+    for cls in (
+        BuildStage,
+        CheckoutStage,
+        CopyDirectoryStage,
+        FilterAndRegressionStage,
+        JavaSetupStage,
+        MeasureEnergyStage,
+        PostTestStage,
+        SetDirectoryStage,
+        StabilityCheckStage,
+        TemperatureCheckStage,
+        VerifyPerfStage,
+    )
+}
+
+
+class ConfiguredStage(PipelineStage):
+    """A stage instantiated from the configuration, running under its concurrency limit."""
+
+    def __init__(self, definition: StageDefinition, stage: PipelineStage) -> None:
+        """Wrap a stage.
+
+        Args:
+            definition (StageDefinition): The declaration of the stage.
+            stage (PipelineStage): The stage instance.
+        """
+        self.definition = definition
+        self.stage = stage
+        self.measures_energy = definition.exclusive or stage.measures_energy
+        self.limit = 1 if not definition.parallel else definition.concurrency
+        # Created before the workers are started, so that they all share it; not tied to fork, so
+        # that it can also be handed to the background build processes, started by a fork server.
+        self._semaphore: BoundedSemaphore | None = (
+            multiprocessing.get_context("forkserver").BoundedSemaphore(self.limit) if self.limit else None
+        )
+
+    @property
+    def name(self) -> str:
+        """Name of the stage in the configuration."""
+        return self.definition.key
+
+    def run(self, context: dict[str, Any]) -> None:
+        """Run the stage once a slot is free.
+
+        If no slot is freed within `slot_timeout_s`, the stage is skipped and
+        ``context["slot_timeout"]`` is set: the commit is left out of its batch, without counting
+        as a failed build.
+
+        Args:
+            context (dict[str, Any]): Shared context for the pipeline.
+        """
+        if self._semaphore is None:
+            self.stage.run(context)
+            return
+        if not self._semaphore.acquire(timeout=self.definition.slot_timeout_s):
+            logger.error(
+                "No free slot in stage %s after %s s; a worker may have died in it. Skipping commit %s.",
+                self.name,
+                self.definition.slot_timeout_s,
+                context.get("commit"),
+                context=context,
+            )
+            context["slot_timeout"] = True
+            return
+        try:
+            self.stage.run(context)
+        finally:
+            self._semaphore.release()
+
+    def flush(self) -> None:
+        """Persist any state buffered by the stage."""
+        self.stage.flush()
+
+    def forget_commits(self, hexshas: Iterable[str]) -> None:
+        """Drop the state kept by the stage for the given commits.
+
+        Args:
+            hexshas (Iterable[str]): The commits.
+        """
+        self.stage.forget_commits(hexshas)
+
+
+def load_stage_class(module: str) -> type[PipelineStage]:
+    """Resolve the class of a stage.
+
+    Args:
+        module (str): Name of a built-in stage, or ``package.module:Class``.
+
+    Returns:
+        type[PipelineStage]: The stage class.
+
+    Raises:
+        ModuleDidNotResolveToClassError: If the path does not resolve to a class.
+        MustImplementError: If the class is not a `PipelineStage`.
+    """
+    cls = BUILTIN_STAGES.get(module) or load_callable(module)
+    if not inspect.isclass(cls):
+        raise ModuleDidNotResolveToClassError(module)
+    if not issubclass(cls, PipelineStage):
+        raise MustImplementError(cls.__name__, PipelineStage)
+    return cls
+
+
+def build_stages(definitions: list[StageDefinition]) -> list[PipelineStage]:
+    """Instantiate an (ordered) stage group of the configuration.
+
+    Args:
+        definitions (list[StageDefinition]): The stages, in topological order.
+
+    Returns:
+        list[PipelineStage]: The stages, ready to run.
+    """
+    return [ConfiguredStage(d, load_stage_class(d.module)(**d.params)) for d in definitions]
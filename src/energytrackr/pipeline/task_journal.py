@@ -0,0 +1,179 @@
+"""Persistent journal of measurement tasks, used to resume interrupted campaigns.
+
+Every measurement task is identified by the triple ``(commit, run index, repeat index)``.
+The journal is an append-only JSON-lines file: a task is recorded as soon as its result
+has been written, and the file is flushed and fsync'ed so that a crash, reboot or Ctrl-C
+never loses more than the run that was in flight. The journal also records the name of the
+result file of the campaign, so that a resumed campaign appends to the same file.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import git
+
+from energytrackr.utils.logger import logger
+
+TaskKey = tuple[str, int, int]
+
+
+@dataclass(frozen=True)
+class MeasurementTask:
+    """A single measurement of one commit.
+
+    Attributes:
+        commit (git.Commit): The commit to measure.
+        run_index (int): Index of the run for this commit (0-based).
+        repeat_index (int): Index of the repetition within the run (0-based).
+    """
+
+    commit: git.Commit
+    run_index: int = 0
+    repeat_index: int = 0
+
+    @property
+    def hexsha(self) -> str:
+        """Full hash of the commit to measure."""
+        return self.commit.hexsha
+
+    @property
+    def key(self) -> TaskKey:
+        """Hashable identifier of the task, as stored in the journal."""
+        return (self.commit.hexsha, self.run_index, self.repeat_index)
+
+
+class TaskJournal:
+    """Append-only on-disk record of completed measurement tasks."""
+
+    def __init__(self, path: str | Path, resume: bool = False) -> None:
+        """Open the journal at *path*.
+
+        Args:
+            path (str | Path): Location of the JSON-lines journal file.
+            resume (bool): If True, completed tasks already present in the file are loaded.
+                Otherwise the journal is truncated and a new campaign starts.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._completed: set[TaskKey] = set()
+        # Name of the result file of the campaign, once its first run was written.
+        self.dataset: str | None = None
+        if resume:
+            self._completed, self.dataset = self._load(self.path)
+            logger.info("Resuming from journal %s (%d completed tasks)", self.path, len(self._completed))
+        else:
+            self.path.write_text("", encoding="utf-8")
+
+    @property
+    def completed(self) -> set[TaskKey]:
+        """Keys of all tasks recorded as done."""
+        return set(self._completed)
+
+    def is_done(self, task: MeasurementTask) -> bool:
+        """Check whether a task has already been completed.
+
+        Args:
+            task (MeasurementTask): The task to look up.
+
+        Returns:
+            bool: True if the task is recorded in the journal.
+        """
+        return task.key in self._completed
+
+    def mark_done(self, task: MeasurementTask) -> None:
+        """Durably record a task as completed.
+
+        Args:
+            task (MeasurementTask): The task whose result has just been written.
+        """
+        if task.key in self._completed:
+            return
+        self._append({"commit": task.hexsha, "run": task.run_index, "repeat": task.repeat_index})
+        self._completed.add(task.key)
+
+    def set_dataset(self, name: str) -> None:
+        """Durably record the name of the result file of the campaign.
+
+        Args:
+            name (str): The name of the result file, without extension.
+        """
+        if name == self.dataset:
+            return
+        self._append({"dataset": name})
+        self.dataset = name
+
+    def _append(self, record: dict[str, Any]) -> None:
+        """Append a record to the journal and sync it to disk.
+
+        Args:
+            record (dict[str, Any]): The JSON record.
+        """
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    @staticmethod
+    def _load(path: Path) -> tuple[set[TaskKey], str | None]:
+        """Read completed task keys and the result file name from an existing journal.
+
+        A truncated last line (e.g. the process was killed while writing it) is ignored and cut
+        from the file, so that the next record starts on a line of its own.
+
+        Args:
+            path (Path): Location of the journal file.
+
+        Returns:
+            tuple[set[TaskKey], str | None]: The keys of the completed tasks, and the name of the
+                result file of the campaign, if recorded.
+        """
+        completed: set[TaskKey] = set()
+        dataset: str | None = None
+        if not path.is_file():
+            logger.warning("No journal found at %s; starting a new campaign.", path)
+            return completed, dataset
+        _drop_partial_line(path)
+        with path.open(encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                try:
+                    entry = _parse_entry(line)
+                except (KeyError, TypeError, ValueError):
+                    logger.warning("Skipping malformed journal entry: %s", line.strip())
+                    continue
+                if isinstance(entry, str):
+                    dataset = entry
+                else:
+                    completed.add(entry)
+        return completed, dataset
+
+
+def _parse_entry(line: str) -> TaskKey | str:
+    """Parse a line of the journal.
+
+    Args:
+        line (str): The JSON line.
+
+    Returns:
+        TaskKey | str: The key of a completed task, or the name of the result file of the campaign.
+    """
+    record: dict[str, Any] = json.loads(line)
+    if "dataset" in record:
+        return str(record["dataset"])
+    return (str(record["commit"]), int(record["run"]), int(record["repeat"]))
+
+
+def _drop_partial_line(path: Path) -> None:
+    """Truncate a file after its last newline.
+
+    Args:
+        path (Path): The file.
+    """
+    with path.open("rb+") as fh:
+        content = fh.read()
+        if content and not content.endswith(b"\n"):
+            fh.truncate(content.rfind(b"\n") + 1)
@@ -0,0 +1,231 @@
+"""Task queue shared by a coordinator and measurement workers through a directory.
+
+The directory can be local (several workers on one machine, or tests) or on a shared filesystem
+mounted by every machine. Every state change is a single atomic ``rename`` or ``utime``::
+
+    <queue>/pending/<task>.json    published, waiting for a worker
+    <queue>/leased/<task>.json     claimed by a worker; its mtime is the last renewal of the lease
+    <queue>/results/<worker>.jsonl results appended by each worker, one JSON line per task
+    <queue>/closed                 written by the coordinator once every task has a result
+
+A worker claims a task by renaming it from ``pending`` to ``leased``, which only one worker can
+do, and renews its lease while it runs the task. Leases that are not renewed in time (a crashed
+or disconnected worker) are moved back to ``pending`` by the coordinator. A task therefore runs
+at least once; the coordinator keeps the first result of each task. Lease expiry compares
+modification times with the local clock, so the clocks of the machines must be synchronized.
+"""
+
+import json
+import os
+import time
+from collections.abc import Collection, Iterable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from energytrackr.utils.logger import logger
+
+PENDING_DIR = "pending"
+LEASED_DIR = "leased"
+RESULTS_DIR = "results"
+CLOSED_FILE = "closed"
+
+
+@dataclass(frozen=True)
+class QueuedTask:
+    """A measurement task in the queue.
+
+    Attributes:
+        commit (str): Hash of the commit to measure.
+        run_index (int): Index of the run for this commit.
+        repeat_index (int): Index of the repetition within the run.
+    """
+
+    commit: str
+    run_index: int = 0
+    repeat_index: int = 0
+
+    @property
+    def id(self) -> str:
+        """Identifier of the task, used as its file name."""
+        return f"{self.commit}-{self.run_index}-{self.repeat_index}"
+
+
+class FileTaskQueue:
+    """Queue of measurement tasks stored in a directory."""
+
+    def __init__(self, root: str | Path) -> None:
+        """Open (and create) a queue directory.
+
+        Args:
+            root (str | Path): The queue directory.
+        """
+        self.root = Path(root)
+        for name in (PENDING_DIR, LEASED_DIR, RESULTS_DIR):
+            (self.root / name).mkdir(parents=True, exist_ok=True)
+        self._offsets: dict[Path, int] = {}
+
+    def publish(self, tasks: Iterable[QueuedTask]) -> int:
+        """Add tasks to the queue, skipping those already pending or leased.
+
+        Args:
+            tasks (Iterable[QueuedTask]): The tasks.
+
+        Returns:
+            int: The number of tasks added.
+        """
+        added = 0
+        for task in tasks:
+            name = f"{task.id}.json"
+            if (self.root / PENDING_DIR / name).exists() or (self.root / LEASED_DIR / name).exists():
+                continue
+            tmp_path = self.root / f".{name}.tmp-{os.getpid()}"
+            tmp_path.write_text(json.dumps(asdict(task)), encoding="utf-8")
+            os.replace(tmp_path, self.root / PENDING_DIR / name)
+            added += 1
+        return added
+
+    def claim(self, prefer: Collection[str] = ()) -> QueuedTask | None:
+        """Lease a pending task, in the order the tasks were published.
+
+        Args:
+            prefer (Collection[str]): Commits whose tasks are claimed first, e.g. those whose
+                workspace the worker has already built.
+
+        Returns:
+            QueuedTask | None: The leased task, or None if no task is pending.
+        """
+        candidates: list[tuple[bool, int, str]] = []
+        for entry in os.scandir(self.root / PENDING_DIR):
+            try:
+                candidates.append((entry.name.split("-", 1)[0] not in prefer, entry.stat().st_mtime_ns, entry.name))
+            except FileNotFoundError:
+                continue
+        for _, _, name in sorted(candidates):
+            try:
+                return self._claim(name)
+            except FileNotFoundError:
+                # Claimed by another worker in the meantime.
+                continue
+        return None
+
+    def _claim(self, name: str) -> QueuedTask:
+        """Move a pending task to the leased tasks.
+
+        Args:
+            name (str): The file name of the task.
+
+        Returns:
+            QueuedTask: The leased task.
+        """
+        pending = self.root / PENDING_DIR / name
+        leased = self.root / LEASED_DIR / name
+        # The lease starts now: the mtime is carried over by the rename.
+        os.utime(pending)
+        os.rename(pending, leased)
+        return QueuedTask(**json.loads(leased.read_text(encoding="utf-8")))
+
+    def renew(self, task: QueuedTask) -> bool:
+        """Renew the lease of a task.
+
+        Args:
+            task (QueuedTask): A task leased by this worker.
+
+        Returns:
+            bool: False if the lease was lost (the task expired and was re-queued).
+        """
+        try:
+            os.utime(self.root / LEASED_DIR / f"{task.id}.json")
+        except FileNotFoundError:
+            return False
+        return True
+
+    def complete(self, task: QueuedTask, worker: str, result: dict[str, Any]) -> None:
+        """Report the result of a task and release its lease.
+
+        Args:
+            task (QueuedTask): The leased task.
+            worker (str): Identifier of the worker, naming its result file.
+            result (dict[str, Any]): The result, serializable to JSON.
+        """
+        line = json.dumps({**result, "task": task.id, "worker": worker})
+        with (self.root / RESULTS_DIR / f"{worker}.jsonl").open("a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        (self.root / LEASED_DIR / f"{task.id}.json").unlink(missing_ok=True)
+
+    def requeue_expired(self, lease_s: float) -> list[str]:
+        """Move the tasks whose lease was not renewed in time back to the pending tasks.
+
+        Args:
+            lease_s (float): Duration of a lease, in seconds.
+
+        Returns:
+            list[str]: The identifiers of the re-queued tasks.
+        """
+        requeued: list[str] = []
+        deadline = time.time() - lease_s
+        for leased in (self.root / LEASED_DIR).iterdir():
+            try:
+                mtime = leased.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if mtime >= deadline:
+                continue
+            try:
+                os.rename(leased, self.root / PENDING_DIR / leased.name)
+            except FileNotFoundError:
+                continue
+            requeued.append(leased.stem)
+        return requeued
+
+    def discard(self, task_id: str) -> None:
+        """Remove a pending copy of a task that already has a result.
+
+        Args:
+            task_id (str): The identifier of the task.
+        """
+        (self.root / PENDING_DIR / f"{task_id}.json").unlink(missing_ok=True)
+
+    def read_results(self) -> list[dict[str, Any]]:
+        """Read the results appended since the previous call.
+
+        Returns:
+            list[dict[str, Any]]: The new results, each with its "task" and "worker" identifiers.
+        """
+        results: list[dict[str, Any]] = []
+        for path in sorted((self.root / RESULTS_DIR).glob("*.jsonl")):
+            with path.open("rb") as fh:
+                fh.seek(self._offsets.get(path, 0))
+                data = fh.read()
+            # A line being written is only read once it is complete.
+            complete = data[: data.rfind(b"\n") + 1]
+            self._offsets[path] = self._offsets.get(path, 0) + len(complete)
+            for line in complete.decode().splitlines():
+                try:
+                    results.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning("Skipping malformed result in %s: %s", path, line)
+        return results
+
+    def pending_count(self) -> int:
+        """Number of tasks waiting for a worker.
+
+        Returns:
+            int: The number of pending tasks.
+        """
+        return len(os.listdir(self.root / PENDING_DIR))
+
+    def close(self) -> None:
+        """Tell the workers that the campaign is over."""
+        (self.root / CLOSED_FILE).touch()
+
+    def reopen(self) -> None:
+        """Accept workers again, e.g. when a new campaign starts in the same directory."""
+        (self.root / CLOSED_FILE).unlink(missing_ok=True)
+
+    @property
+    def closed(self) -> bool:
+        """Whether the coordinator closed the queue."""
+        return (self.root / CLOSED_FILE).exists()
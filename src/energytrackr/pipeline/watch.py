@@ -0,0 +1,190 @@
+"""Continuous measurement of the commits pushed to the configured branch.
+
+The ``watch`` command runs as a daemon. Every ``watch.interval_s`` seconds it fetches the branch
+(from ``watch.remote``, e.g. a local mirror), gathers the configured commit range and compares it
+with the commits already in the result file, ``results.dataset`` (``energy_results`` by default).
+Only the commits without results are measured, along with the ``min_commits_before`` commits
+preceding each of them if those have no results either, and their runs are appended to the
+same file. The report is then generated again from the whole file.
+
+The first cycle measures the whole range; later cycles only measure what was pushed since.
+Commits whose build or measurement failed are not retried until the daemon is restarted. A cycle
+that raises is logged and the daemon carries on with the next one.
+"""
+
+import os
+import time
+from collections.abc import Collection
+from pathlib import Path
+
+import git
+
+from energytrackr.config.config_model import PipelineConfig
+from energytrackr.pipeline.pipeline import (
+    Pipeline,
+    compile_stages,
+    export_trace,
+    open_project,
+    plan_batches,
+    restore_head,
+    run_pre_stages,
+    run_setup_commands,
+)
+from energytrackr.pipeline.result_store import create_result_writer, measured_commits
+from energytrackr.pipeline.scheduling import resolve_seed
+from energytrackr.plot.pipeline import plot
+from energytrackr.utils.exceptions import CantFindFileError
+from energytrackr.utils.git_utils import gather_commits
+from energytrackr.utils.logger import logger
+from energytrackr.utils.tracing import tracer
+
+WATCH_DATASET = "energy_results"
+
+
+def update_branch(repo: git.Repo, remote: str, branch: str) -> str:
+    """Fetch a branch and fast-forward the local branch to it.
+
+    Args:
+        repo (git.Repo): The clone.
+        remote (str): The remote name, URL or path fetched from.
+        branch (str): The branch.
+
+    Returns:
+        str: The hash of the updated tip of the branch.
+    """
+    repo.git.fetch(remote, branch)
+    repo.git.checkout(branch)
+    repo.git.merge("--ff-only", "FETCH_HEAD")
+    return repo.head.commit.hexsha
+
+
+def select_commits(commits: list[git.Commit], measured: Collection[str], before: int) -> list[git.Commit]:
+    """Select the commits without results, with the commits preceding them that have none either.
+
+    Args:
+        commits (list[git.Commit]): The commits of the range, oldest first.
+        measured (Collection[str]): Hashes of the commits that already have results.
+        before (int): Number of commits preceding a new commit that serve as its regression baseline.
+
+    Returns:
+        list[git.Commit]: The commits to measure, oldest first.
+    """
+    selected: set[int] = set()
+    for index, commit in enumerate(commits):
+        if commit.hexsha not in measured:
+            selected.update(range(max(index - before, 0), index + 1))
+    return [commits[index] for index in sorted(selected) if commits[index].hexsha not in measured]
+
+
+class Watcher:
+    """Measures the commits of the branch that are not in the dataset yet."""
+
+    def __init__(
+        self,
+        config: PipelineConfig,
+        repo: git.Repo,
+        dataset: Path,
+        plot_config: str | None = None,
+    ) -> None:
+        """Initialize the watcher.
+
+        Args:
+            config (PipelineConfig): The pipeline configuration.
+            repo (git.Repo): The clone.
+            dataset (Path): The result file the runs are appended to.
+            plot_config (str | None): Path of the plot configuration of the report.
+        """
+        self.config = config
+        self.repo = repo
+        self.dataset = dataset
+        self.plot_config = plot_config
+        self.stages = compile_stages(config)
+        self.last_tip: str | None = None
+        # Commits that were measured without producing results, e.g. because their build failed.
+        self.failed: set[str] = set()
+
+    @property
+    def repo_path(self) -> str:
+        """Path to the clone."""
+        return str(self.repo.working_dir)
+
+    def cycle(self) -> int:
+        """Fetch the branch and measure its new commits.
+
+        Returns:
+            int: The number of commits measured.
+        """
+        branch = self.config.repo.branch or self.repo.active_branch.name
+        if (tip := update_branch(self.repo, self.config.watch.remote, branch)) == self.last_tip:
+            logger.info("No new commit on %s.", branch)
+            return 0
+        self.last_tip = tip
+
+        commits = gather_commits(self.repo)
+        measured = measured_commits(self.dataset) | self.failed
+        if all(commit.hexsha in measured for commit in commits):
+            logger.info("Every commit of %s up to %s is measured.", branch, tip)
+            return 0
+        if not run_pre_stages(commits, self.repo_path, self.stages["pre_stages"]):
+            return 0
+
+        if not (targets := select_commits(commits, measured, self.config.regression_detection.min_commits_before)):
+            return 0
+        logger.info("Measuring %d new commits of %s up to %s.", len(targets), branch, tip)
+        resolve_seed(self.config.execution_plan.schedule)
+        batches = plan_batches(targets, self.config.execution_plan)
+        # Cleared while measuring: the next cycle measures the same tip again if the measurements are interrupted.
+        self.last_tip = None
+        try:
+            Pipeline(self.stages, self.repo_path).run(batches)
+        finally:
+            restore_head(self.repo, branch)
+        self.last_tip = tip
+
+        if missing := {commit.hexsha for commit in targets} - measured_commits(self.dataset):
+            logger.warning("No results for %d commits; they are not retried: %s", len(missing), ", ".join(sorted(missing)))
+            self.failed |= missing
+        self.refresh_report()
+        return len(targets) - len(missing)
+
+    def refresh_report(self) -> None:
+        """Generate the report of the dataset again."""
+        if not self.dataset.is_file():
+            return
+        try:
+            plot(str(self.dataset), self.repo_path, self.plot_config, open_browser=False)
+        except CantFindFileError as e:
+            logger.warning("Report not refreshed: %s", e)
+
+
+def watch(config_path: str, plot_config: str | None = None, once: bool = False) -> None:
+    """Measure the commits pushed to the configured branch as they arrive.
+
+    Args:
+        config_path (str): The file path to the configuration file.
+        plot_config (str | None): Path of the plot configuration of the report (defaults to
+            `plot.yml` in the current directory or next to the dataset).
+        once (bool): Run a single cycle instead of running until interrupted, e.g. from cron.
+    """
+    config_folder = os.path.dirname(config_path)
+    config, _, repo = open_project(config_path)
+    # The measure stage appends the runs of every cycle to the dataset.
+    config.results.dataset = config.results.dataset or WATCH_DATASET
+    if config.setup_commands:
+        run_setup_commands(config.setup_commands)
+
+    stem = os.path.join(config_folder, "energy_measurements", config.results.dataset)
+    watcher = Watcher(config, repo, create_result_writer(config, stem).path, plot_config)
+    logger.info("Watching %s; results are appended to %s", config.repo.branch or repo.active_branch.name, watcher.dataset)
+    while True:
+        try:
+            watcher.cycle()
+        except Exception:
+            # A failing cycle (e.g. an unreachable remote) must not stop the daemon; the next one retries.
+            logger.exception("Watch cycle failed.")
+        export_trace(config_folder)
+        # Every cycle writes its own trace.
+        tracer.spans.clear()
+        if once:
+            return
+        time.sleep(config.watch.interval_s)
@@ -0,0 +1,167 @@
+"""Long-lived process pool with memory-aware admission of tasks.
+
+A build can take gigabytes of memory (a Maven or Gradle daemon, a C++ link), so starting one per
+core can make the machine swap. `WorkerPool` only submits a task while the memory available
+(``MemAvailable`` in ``/proc/meminfo``) covers the memory reserved by the running tasks plus
+one more; otherwise it waits for a task to finish. One task is always allowed to run, so that
+the campaign makes progress on a small machine.
+
+The pool is created once per campaign: its processes, and whatever their initializer caches
+(e.g. an open repository), are reused from batch to batch. If a worker process dies (e.g. killed
+by the OOM killer), the pool is started again with the same initializer, and the tasks that were
+running are run again one at a time: only the task that kills its worker again fails.
+"""
+
+import concurrent.futures
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any
+
+from energytrackr.utils.logger import logger
+
+MEMINFO_PATH = "/proc/meminfo"
+BYTES_PER_KIB = 1024
+
+
+def mem_available_bytes(meminfo: str | Path = MEMINFO_PATH) -> int | None:
+    """Read the memory available for new processes without swapping.
+
+    Args:
+        meminfo (str | Path): The meminfo file.
+
+    Returns:
+        int | None: The available memory in bytes, or None if it cannot be read.
+    """
+    try:
+        text = Path(meminfo).read_text(encoding="utf-8")
+    except OSError:
+        return None
+    for line in text.splitlines():
+        if line.startswith("MemAvailable:"):
+            try:
+                return int(line.split()[1]) * BYTES_PER_KIB
+            except (ValueError, IndexError):
+                return None
+    return None
+
+
+class WorkerPool[T]:
+    """Process pool running tasks while enough memory is available."""
+
+    def __init__(
+        self,
+        max_workers: int,
+        initializer: Callable[[], None] | None = None,
+        memory_per_task: int = 0,
+        poll_interval: float = 1.0,
+        meminfo: str | Path = MEMINFO_PATH,
+    ) -> None:
+        """Start the pool.
+
+        Args:
+            max_workers (int): Number of worker processes.
+            initializer (Callable[[], None] | None): Called once in every worker process; bind its
+                arguments with `functools.partial`.
+            memory_per_task (int): Bytes reserved for every running task; 0 disables the admission control.
+            poll_interval (float): Seconds between two checks of the available memory while tasks wait.
+            meminfo (str | Path): The meminfo file.
+        """
+        self.max_workers = max_workers
+        self.memory_per_task = memory_per_task
+        self.poll_interval = poll_interval
+        self.meminfo = meminfo
+        self.initializer = initializer
+        self.executor = self._start()
+
+    def imap_unordered(
+        self,
+        fn: Callable[[T], Any],
+        items: Iterable[T],
+    ) -> Iterator[tuple[T, concurrent.futures.Future[Any]]]:
+        """Run a function on every item, yielding the items with their future as they complete.
+
+        Args:
+            fn (Callable[[T], Any]): The function, picklable.
+            items (Iterable[T]): The items.
+
+        Yields:
+            tuple[T, concurrent.futures.Future[Any]]: An item and its completed future. The future of a
+                task that killed its worker even when run alone raises `BrokenProcessPool`.
+        """
+        waiting = deque(items)
+        # Tasks that were running when a worker died; they are run again one at a time.
+        suspects: deque[T] = deque()
+        running: dict[concurrent.futures.Future[Any], tuple[T, bool]] = {}
+        while waiting or suspects or running:
+            if suspects and not running:
+                item = suspects.popleft()
+                running[self._submit(fn, item)] = (item, True)
+            isolating = bool(suspects) or any(isolated for _, isolated in running.values())
+            while (
+                not isolating and waiting and len(running) < self.max_workers and (not running or self._admits(len(running)))
+            ):
+                item = waiting.popleft()
+                running[self._submit(fn, item)] = (item, False)
+            if not isolating and waiting and len(running) < self.max_workers:
+                logger.info("Waiting for memory to start another task (%d running).", len(running))
+            done, _ = concurrent.futures.wait(
+                running,
+                timeout=self.poll_interval if waiting else None,
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for future in done:
+                item, isolated = running.pop(future)
+                if not isolated and isinstance(future.exception(), BrokenProcessPool):
+                    suspects.append(item)
+                    continue
+                yield item, future
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        self.executor.shutdown()
+
+    def _start(self) -> concurrent.futures.ProcessPoolExecutor:
+        """Start the worker processes.
+
+        Returns:
+            concurrent.futures.ProcessPoolExecutor: The executor.
+        """
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=self.initializer,
+        )
+
+    def _submit(self, fn: Callable[[T], Any], item: T) -> concurrent.futures.Future[Any]:
+        """Submit a task, starting the pool again if a worker process died.
+
+        Args:
+            fn (Callable[[T], Any]): The function.
+            item (T): The item.
+
+        Returns:
+            concurrent.futures.Future[Any]: The future of the task.
+        """
+        try:
+            return self.executor.submit(fn, item)
+        except BrokenProcessPool:
+            logger.warning("A worker process died; starting the pool again.")
+            self.executor.shutdown(wait=False)
+            self.executor = self._start()
+            return self.executor.submit(fn, item)
+
+    def _admits(self, running: int) -> bool:
+        """Check whether one more task fits in the available memory.
+
+        Args:
+            running (int): Number of running tasks.
+
+        Returns:
+            bool: True if the available memory covers the reservation of the running tasks plus one.
+        """
+        if not self.memory_per_task:
+            return True
+        if (available := mem_available_bytes(self.meminfo)) is None:
+            return True
+        return available >= (running + 1) * self.memory_per_task
@@ -0,0 +1,71 @@
+"""Creation and removal of the per-commit workspaces.
+
+A workspace is the directory ``<repo>_<sha>`` in which a commit is checked out, built and measured.
+Depending on the configured strategy it is a full copy of the clone, a git worktree or a shared
+clone (both of which only cost the checked-out files), or a copy-on-write copy.
+"""
+
+import shutil
+import subprocess
+from pathlib import Path
+
+import git
+
+from energytrackr.config.config_model import WorkspaceStrategyEnum
+from energytrackr.utils.logger import logger
+
+
+def create_workspace(source: Path, target: Path, commit: str, strategy: WorkspaceStrategyEnum) -> None:
+    """Create the workspace of a commit from the main clone.
+
+    Errors from git or from copying are propagated to the caller.
+
+    Args:
+        source (Path): The main clone of the repository.
+        target (Path): The workspace directory to create.
+        commit (str): The commit to check out in the workspace.
+        strategy (WorkspaceStrategyEnum): How the workspace is created.
+    """
+    match strategy:
+        case WorkspaceStrategyEnum.WORKTREE:
+            git.Repo(source).git.worktree("add", "--detach", "--force", str(target), commit)
+        case WorkspaceStrategyEnum.SHARED_CLONE:
+            git.Repo.clone_from(str(source), str(target), multi_options=["--shared", "--no-checkout"])
+            git.Repo(target).git.checkout("--detach", commit)
+        case WorkspaceStrategyEnum.REFLINK:
+            _reflink_copy(source, target)
+        case _:
+            shutil.copytree(src=source, dst=target, symlinks=True)
+
+
+def _reflink_copy(source: Path, target: Path) -> None:
+    """Copy a directory with copy-on-write clones where the filesystem supports them.
+
+    Falls back to a regular copy if `cp --reflink` is not available (e.g. non-GNU coreutils).
+
+    Args:
+        source (Path): The directory to copy.
+        target (Path): The destination directory.
+    """
+    result = subprocess.run(
+        ["cp", "-a", "--reflink=auto", f"{source}/.", str(target)],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode:
+        logger.warning("Reflink copy failed (%s); falling back to a full copy.", result.stderr.strip())
+        shutil.rmtree(target, ignore_errors=True)
+        shutil.copytree(src=source, dst=target, symlinks=True)
+
+
+def prune_worktrees(repo_path: str) -> None:
+    """Drop the administrative entries of worktrees whose directory has been deleted.
+
+    Args:
+        repo_path (str): The main clone of the repository.
+    """
+    try:
+        git.Repo(repo_path).git.worktree("prune")
+    except (git.InvalidGitRepositoryError, git.NoSuchPathError, git.GitCommandError) as e:
+        logger.debug("Could not prune worktrees of %s: %s", repo_path, e)
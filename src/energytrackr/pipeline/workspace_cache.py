@@ -0,0 +1,223 @@
+"""LRU cache of the built per-commit workspaces, within a disk budget.
+
+Without it, every ``<repo>_<sha>`` workspace is deleted after its batch, and a commit measured
+again later (in a re-run, a bisection or an adaptive round of another batch) is created and built
+from scratch. The cache keeps built workspaces across batches and invocations instead, and records
+the build status of every commit in an index (``<project>/.cache/.workspace_index.json``):
+
+- a commit whose workspace is cached skips the pre-test stages altogether;
+- a commit whose build failed is not built again for ``failure_ttl_h`` hours, unless the failures
+  are forgotten (``measure --retry-failed``); transient failures (a timed-out or killed build
+  command, a crashed worker, no free stage slot) are not recorded;
+- after each batch, the least recently used workspaces are deleted until the cached workspaces fit
+  in the budget.
+
+The index is tied to the compile commands and the workspace strategy: when they change, every
+cached workspace and build status is discarded.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections.abc import Collection
+from pathlib import Path
+from typing import Any
+
+from energytrackr.config.config_model import PipelineConfig
+from energytrackr.utils.logger import logger
+
+WORKSPACE_INDEX_FILE = ".workspace_index.json"
+BUILT = "built"
+FAILED = "failed"
+BYTES_PER_GB = 1024**3
+
+
+class WorkspaceCache:
+    """Index of the cached workspaces of a project, evicted in least recently used order."""
+
+    def __init__(self, repo_path: str, max_bytes: int, fingerprint: str, failure_ttl_s: float | None = None) -> None:
+        """Load the index of a project.
+
+        Args:
+            repo_path (str): Path to the main clone; workspaces are its ``<repo_path>_<sha>`` siblings.
+            max_bytes (int): Disk budget of the cached workspaces.
+            fingerprint (str): Identifies the build settings the cached workspaces were built with.
+            failure_ttl_s (float | None): Seconds after which a failed build is attempted again; never if None.
+        """
+        self.repo_path = repo_path
+        self.max_bytes = max_bytes
+        self.fingerprint = fingerprint
+        self.failure_ttl_s = failure_ttl_s
+        self.path = Path(repo_path).parent / WORKSPACE_INDEX_FILE
+        self.entries: dict[str, dict[str, Any]] = self._load()
+
+    @classmethod
+    def from_config(cls, config: PipelineConfig, repo_path: str) -> "WorkspaceCache | None":
+        """Create the cache described by the configuration, if it is enabled.
+
+        Args:
+            config (PipelineConfig): The pipeline configuration.
+            repo_path (str): Path to the main clone.
+
+        Returns:
+            WorkspaceCache | None: The cache, or None if workspaces are not cached.
+        """
+        if not config.workspace_cache.enabled:
+            return None
+        digest = hashlib.sha256(str(config.workspace_strategy).encode())
+        for cmd in config.execution_plan.compile_commands or []:
+            digest.update(b"\0" + cmd.encode())
+        ttl_h = config.workspace_cache.failure_ttl_h
+        return cls(
+            repo_path,
+            int(config.workspace_cache.max_size_gb * BYTES_PER_GB),
+            digest.hexdigest(),
+            failure_ttl_s=ttl_h * 3600 if ttl_h is not None else None,
+        )
+
+    def workspace(self, hexsha: str) -> str:
+        """Path of the workspace of a commit.
+
+        Args:
+            hexsha (str): The commit.
+
+        Returns:
+            str: The absolute workspace path.
+        """
+        return os.path.abspath(f"{self.repo_path}_{hexsha}")
+
+    def status(self, hexsha: str) -> str | None:
+        """Look up the build status of a commit, marking its workspace as recently used.
+
+        Args:
+            hexsha (str): The commit.
+
+        Returns:
+            str | None: "built" if its built workspace is cached, "failed" if its build failed less
+                than `failure_ttl_s` ago, or None if the pre-test stages must run.
+        """
+        if (entry := self.entries.get(hexsha)) is None:
+            return None
+        if entry["status"] == BUILT and not os.path.isdir(self.workspace(hexsha)):
+            del self.entries[hexsha]
+            return None
+        # Entries written before failures expired have no "failed_at"; they expire at once.
+        if entry["status"] == FAILED and self._expired(entry.get("failed_at", 0.0)):
+            logger.info("The failed build of %s has expired; building it again.", hexsha)
+            del self.entries[hexsha]
+            return None
+        entry["last_used"] = time.time()
+        return entry["status"]
+
+    def record(self, hexsha: str, built: bool) -> None:
+        """Record the outcome of the pre-test stages of a commit.
+
+        Args:
+            hexsha (str): The commit.
+            built (bool): Whether its workspace was built successfully (and is kept).
+        """
+        now = time.time()
+        if built:
+            self.entries[hexsha] = {"status": BUILT, "size": _disk_usage(self.workspace(hexsha)), "last_used": now}
+        else:
+            self.entries[hexsha] = {"status": FAILED, "size": 0, "last_used": now, "failed_at": now}
+
+    def forget_failures(self) -> int:
+        """Drop the recorded build failures, so that the failed commits are built again.
+
+        Returns:
+            int: The number of failures forgotten.
+        """
+        failed = [hexsha for hexsha, entry in self.entries.items() if entry["status"] == FAILED]
+        for hexsha in failed:
+            del self.entries[hexsha]
+        return len(failed)
+
+    def workspaces(self) -> set[str]:
+        """Paths of the cached workspaces, which must not be cleaned up.
+
+        Returns:
+            set[str]: The absolute workspace paths.
+        """
+        return {self.workspace(hexsha) for hexsha, entry in self.entries.items() if entry["status"] == BUILT}
+
+    def evict(self, protected: Collection[str] = ()) -> None:
+        """Delete the least recently used workspaces until the cache fits in its budget, and save the index.
+
+        Args:
+            protected (Collection[str]): Commits whose workspaces must be kept, e.g. those of the next batch.
+        """
+        built = sorted(
+            ((hexsha, entry) for hexsha, entry in self.entries.items() if entry["status"] == BUILT),
+            key=lambda item: item[1]["last_used"],
+        )
+        total = sum(entry["size"] for _, entry in built)
+        for hexsha, entry in built:
+            if total <= self.max_bytes:
+                break
+            if hexsha in protected:
+                continue
+            logger.info("Evicting cached workspace of %s (%.1f MB)", hexsha, entry["size"] / 1024**2)
+            shutil.rmtree(self.workspace(hexsha), ignore_errors=True)
+            del self.entries[hexsha]
+            total -= entry["size"]
+        self.save()
+
+    def save(self) -> None:
+        """Persist the index atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".tmp-{os.getpid()}")
+        tmp_path.write_text(json.dumps({"fingerprint": self.fingerprint, "entries": self.entries}), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def _expired(self, failed_at: float) -> bool:
+        """Check whether a build failure is older than `failure_ttl_s`.
+
+        Args:
+            failed_at (float): Time of the failure.
+
+        Returns:
+            bool: True if the commit must be built again.
+        """
+        return self.failure_ttl_s is not None and time.time() - failed_at >= self.failure_ttl_s
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        """Read the persisted index.
+
+        Returns:
+            dict[str, dict[str, Any]]: The entries, keyed by commit, or an empty index if the file is
+                missing, unreadable or was written with other build settings.
+        """
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Ignoring unreadable workspace index %s: %s", self.path, e)
+            return {}
+        if data.get("fingerprint") != self.fingerprint:
+            logger.info("Build settings changed; discarding the cached workspaces.")
+            # The stale workspaces are removed with the other cache entries.
+            return {}
+        return data.get("entries", {})
+
+
+def _disk_usage(path: str) -> int:
+    """Compute the disk space used by a directory tree, without following symbolic links.
+
+    Args:
+        path (str): The directory.
+
+    Returns:
+        int: The allocated size in bytes.
+    """
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_blocks * 512
+            except OSError:
+                continue
+    return total
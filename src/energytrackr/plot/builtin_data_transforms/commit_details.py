@@ -9,6 +9,7 @@ from git import Repo
 
 from energytrackr.plot.core.context import Context
 from energytrackr.plot.core.interfaces import Transform
+from energytrackr.utils.commit_index import CommitFileIndex
 from energytrackr.utils.git_utils import get_commit_details_from_git
 from energytrackr.utils.logger import logger
 
@@ -38,9 +39,14 @@ class CommitDetails(Transform):
             except Exception:
                 logger.exception("CommitDetails: failed to open repo at %s", git_repo_path)
             else:
+                try:
+                    file_index = CommitFileIndex.for_commits(repo, valid)
+                except Exception:
+                    logger.exception("CommitDetails: failed to index modified files; diffing each commit")
+                    file_index = None
                 for commit in valid:
                     try:
-                        details[commit] = get_commit_details_from_git(commit, repo)
+                        details[commit] = get_commit_details_from_git(commit, repo, file_index)
                     except Exception:
                         logger.exception("CommitDetails: failed to get details for %s", commit)
 
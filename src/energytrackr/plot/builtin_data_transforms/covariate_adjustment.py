@@ -0,0 +1,95 @@
+"""Data transform regressing the run covariates out of the energy readings."""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from energytrackr.plot.config import get_settings
+from energytrackr.plot.core.context import Context
+from energytrackr.plot.core.interfaces import Configurable, Transform
+from energytrackr.utils.logger import logger
+
+
+@dataclass(frozen=True)
+class CovariateAdjustmentConfig:
+    """Configuration for the covariate adjustment.
+
+    Only the covariates read before the run are adjusted for by default. The run duration, the
+    temperature after the run (``end_temperature``) and the frequency averaged over the start and
+    the end of the run (``cpu_frequency_mhz``) are partly outcomes of the workload: a commit that
+    draws more power runs hotter, so regressing them out would also remove real energy changes.
+    """
+
+    column: str | None = None
+    covariates: list[str] = field(default_factory=lambda: ["cpu_temperature", "loadavg"])
+    commit_col: str = "commit"
+
+
+class CovariateAdjustment(Transform, Configurable[CovariateAdjustmentConfig]):
+    """Adjust the energy of every run to the average covariates of the campaign.
+
+    Fits ``energy ~ commit + covariates`` by least squares, with one intercept per commit (the
+    covariates are demeaned within each commit), and subtracts the covariate effects relative to
+    their campaign mean. The readings keep their unit and scale, but the part of their variance
+    explained by temperature, frequency or load is removed, so fewer runs per commit reach the same
+    confidence. Writes:
+      ctx.artefacts["df"][column]          -> the adjusted energy
+      ctx.artefacts["df"][f"{column}_raw"] -> the measured energy
+      ctx.stats["covariate_adjustment"]    -> coefficients and residual spread before/after
+
+    Covariates missing from the results (e.g. CSV results, which hold no metadata) or constant over
+    the campaign are ignored; missing readings of a run are taken at the campaign mean.
+    """
+
+    def __init__(self, **params: dict[str, Any]) -> None:
+        """Initialize the adjustment with configuration parameters."""
+        super().__init__(CovariateAdjustmentConfig, **params)
+        self.column = self.config.column or get_settings().energytrackr.data.energy_fields[0]
+
+    def apply(self, ctx: Context) -> None:
+        """Replace the energy column of the DataFrame with its covariate-adjusted values.
+
+        Args:
+            ctx (Context): The context containing the DataFrame.
+        """
+        df: pd.DataFrame = ctx.artefacts["df"]
+        covariates = [
+            name
+            for name in self.config.covariates
+            if name in df.columns and pd.to_numeric(df[name], errors="coerce").nunique() > 1
+        ]
+        if not covariates:
+            logger.info("No covariate recorded for %s; energy readings are not adjusted.", self.column)
+            return
+
+        energy = pd.to_numeric(df[self.column], errors="coerce")
+        x = df[covariates].apply(pd.to_numeric, errors="coerce")
+        x = x.fillna(x.mean())
+        fitted = energy.notna()
+        groups = df.loc[fitted, self.config.commit_col]
+        # Demeaning within each commit gives the coefficients of the model with one intercept per commit.
+        y_within = energy[fitted] - energy[fitted].groupby(groups).transform("mean")
+        x_within = x[fitted] - x[fitted].groupby(groups).transform("mean")
+        coefficients, *_ = np.linalg.lstsq(x_within.to_numpy(), y_within.to_numpy(), rcond=None)
+
+        residuals = y_within.to_numpy() - x_within.to_numpy() @ coefficients
+        before, after = float(y_within.std()), float(residuals.std(ddof=1))
+        df = df.copy()
+        df[f"{self.column}_raw"] = energy
+        df[self.column] = energy - (x - x.mean()).to_numpy() @ coefficients
+        ctx.artefacts["df"] = df
+        ctx.stats["covariate_adjustment"] = {
+            "column": self.column,
+            "coefficients": dict(zip(covariates, coefficients.tolist(), strict=True)),
+            "residual_std_before": before,
+            "residual_std_after": after,
+        }
+        logger.info(
+            "Adjusted %s for %s: within-commit std %.4g -> %.4g.",
+            self.column,
+            ", ".join(covariates),
+            before,
+            after,
+        )
@@ -5,12 +5,12 @@ from dataclasses import dataclass
 from typing import Any
 
 import numpy as np
-from scipy.stats import ttest_ind
 
 from energytrackr.plot.config import get_settings
 from energytrackr.plot.core.context import Context
 from energytrackr.plot.core.interfaces import Configurable, Transform
 from energytrackr.utils.logger import logger
+from energytrackr.utils.significance import cohens_d, welch_p_value
 
 
 @dataclass
@@ -139,10 +139,10 @@ class DetectChanges(Transform, Configurable[DetectChangesConfig]):
             return None
 
         level = None
-        if (p_value := self._compute_p_value(baseline, test)) >= self.thr["welch_p"]:
+        if (p_value := welch_p_value(baseline, test)) >= self.thr["welch_p"]:
             level = 0
 
-        cohen_d = self._compute_cohen_d(baseline, test)
+        cohen_d = cohens_d(baseline, test)
         effect_cat = self.classify_effect_size(cohen_d)
         effect_size = EffectSize(cohen_d=cohen_d, category=effect_cat)
 
@@ -173,37 +173,6 @@ class DetectChanges(Transform, Configurable[DetectChangesConfig]):
             level=level,
         )
 
-    @staticmethod
-    def _compute_p_value(baseline: np.ndarray, test: np.ndarray) -> float:
-        """Compute Welch's t-test p-value.
-
-        Args:
-            baseline (np.ndarray): The baseline sample data.
-            test (np.ndarray): The test sample data.
-
-        Returns:
-            float: The p-value from the t-test.
-        """
-        _, p = ttest_ind(baseline, test, equal_var=False)
-        return float(p)
-
-    @staticmethod
-    def _compute_cohen_d(baseline: np.ndarray, test: np.ndarray) -> float:
-        """Compute Cohen's d effect size.
-
-        Args:
-            baseline (np.ndarray): The baseline sample data.
-            test (np.ndarray): The test sample data.
-
-        Returns:
-            float: The Cohen's d effect size.
-        """
-        mean_b, mean_t = np.mean(baseline), np.mean(test)
-        var_b = np.var(baseline, ddof=1)
-        var_t = np.var(test, ddof=1)
-        pooled = np.sqrt((var_b + var_t) / 2.0) or 1.0
-        return float((mean_t - mean_b) / pooled)
-
     def _determine_level(self, cohen_d: float, pct: float, practical: str) -> int:
         """Determine change level based on thresholds.
 
@@ -6,6 +6,7 @@ from typing import Any
 
 import pandas as pd
 
+from energytrackr.pipeline.result_store import METADATA_COLUMNS, is_sqlite_results, read_results
 from energytrackr.plot.config import get_settings
 from energytrackr.plot.core.context import Context
 from energytrackr.plot.core.interfaces import Configurable, Transform
@@ -24,6 +25,8 @@ class LoadCSV(Transform, Configurable[LoadCSVConfig]):
 
     - If `csv_columns` is passed via params or constructor, uses that list.
     - Otherwise falls back to settings.energytrackr.data.csv_columns.
+    - SQLite result stores (`.sqlite`, `.db`) are read directly; their value columns are renamed
+      after `csv_columns`, and the run metadata columns are kept.
     """
 
     def __init__(self, **params: dict[str, Any]) -> None:
@@ -52,7 +55,12 @@ class LoadCSV(Transform, Configurable[LoadCSVConfig]):
             columns = list(cfg.csv_columns)
         logger.info("Loading CSV file '%s' with columns: %s", ctx.input_path, columns)
         # 2) load into DataFrame
-        df = pd.read_csv(ctx.input_path, header=None, names=columns)
+        if is_sqlite_results(ctx.input_path):
+            df = read_results(ctx.input_path)
+            values = [c for c in df.columns if c != "commit" and c not in METADATA_COLUMNS]
+            df = df.rename(columns=dict(zip(values, columns[1:], strict=False)))
+        else:
+            df = pd.read_csv(ctx.input_path, header=None, names=columns)
 
         # 3) stash for downstream transforms
         ctx.artefacts["df"] = df
@@ -0,0 +1,60 @@
+"""Data transform dropping the runs of each commit measured before steady state."""
+
+from dataclasses import dataclass
+from typing import Any
+
+import pandas as pd
+
+from energytrackr.plot.config import get_settings
+from energytrackr.plot.core.context import Context
+from energytrackr.plot.core.interfaces import Configurable, Transform
+from energytrackr.utils.logger import logger
+from energytrackr.utils.steady_state import DEFAULT_BATCH_SIZE, DEFAULT_MAX_FRACTION, mser_truncation
+
+
+@dataclass(frozen=True)
+class SteadyStateConfig:
+    """Configuration for the steady-state truncation."""
+
+    column: str | None = None
+    batch_size: int = DEFAULT_BATCH_SIZE
+    max_fraction: float = DEFAULT_MAX_FRACTION
+    commit_col: str = "commit"
+
+
+class SteadyState(Transform, Configurable[SteadyStateConfig]):
+    """Keep the runs of each commit that are in steady state.
+
+    For each commit, drops the leading runs that the MSER-m rule places in the warm-up transient.
+    The runs recorded as warm-up are already left out when the results are loaded. The runs of a
+    commit are taken in the order of the results file, which is the order they were measured in.
+    Writes:
+      ctx.stats["steady_state_truncated"]  -> number of leading runs dropped, per truncated commit
+    """
+
+    def __init__(self, **params: dict[str, Any]) -> None:
+        """Initialize the truncation with configuration parameters."""
+        super().__init__(SteadyStateConfig, **params)
+        self.column = self.config.column or get_settings().energytrackr.data.energy_fields[0]
+
+    def apply(self, ctx: Context) -> None:
+        """Remove the runs before steady state from the DataFrame stored in the context artefacts.
+
+        Args:
+            ctx (Context): The context containing the DataFrame.
+        """
+        df: pd.DataFrame = ctx.artefacts["df"]
+        commits = df[self.config.commit_col]
+        truncation = df.groupby(commits, sort=False)[self.column].agg(
+            lambda values: mser_truncation(values.tolist(), self.config.batch_size, self.config.max_fraction),
+        )
+        position = df.groupby(commits, sort=False).cumcount()
+        df = df[position >= commits.map(truncation)].copy()
+
+        ctx.artefacts["df"] = df
+        ctx.stats["steady_state_truncated"] = {commit: int(n) for commit, n in truncation.items() if n}
+        logger.info(
+            "Dropped %d leading runs of %d commits before steady state.",
+            int(truncation.sum()),
+            len(ctx.stats["steady_state_truncated"]),
+        )
@@ -224,6 +224,7 @@ def plot(
     input_path: str,
     git_repo_path: str | None = None,
     config_path: str | None = None,
+    open_browser: bool = True,
 ) -> None:
     """Main entry point: orchestrate loading, plotting, and report generation.
 
@@ -231,6 +232,7 @@ def plot(
         input_path (str): Path to the CSV file containing energy data.
         git_repo_path (str | None): Optional path to a Git repository.
         config_path (str | None): Optional path to the configuration file.
+        open_browser (bool): Open the report if the configuration asks for it.
     """
     # Resolve paths
     csv_path = _resolve_csv_path(input_path)
@@ -264,5 +266,5 @@ def plot(
     logger.info("✔ Report exported to %s", output_file)
 
     # Optionally open in browser
-    if settings.energytrackr.report.chart.get("open", False):
+    if open_browser and settings.energytrackr.report.chart.get("open", False):
         webbrowser.open(output_file.as_uri())
@@ -2,6 +2,8 @@
 
 import argparse
 
+from energytrackr.utils.merge import MERGE_POLICIES
+
 
 def parse_args() -> argparse.Namespace:
     """Parse command-line arguments.
@@ -15,16 +17,68 @@ def parse_args() -> argparse.Namespace:
     # measure subcommand
     measure_parser = subparsers.add_parser("measure", help="Run energy measurement")
     measure_parser.add_argument("--config", default="config.yml", help="Path to config file")
+    measure_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted campaign, skipping the tasks recorded in its journal",
+    )
+    measure_parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Build again the commits whose failed build is recorded in the workspace cache",
+    )
+
+    # bisect subcommand
+    bisect_parser = subparsers.add_parser("bisect", help="Find the first commit whose energy differs from a good commit")
+    bisect_parser.add_argument("--config", default="config.yml", help="Path to config file")
+    bisect_parser.add_argument("--good", required=True, help="Known-good commit")
+    bisect_parser.add_argument("--bad", required=True, help="Known-bad commit")
+    bisect_parser.add_argument("--plot-config", default=None, help="Plot config holding the statistical thresholds")
+
+    # watch subcommand
+    watch_parser = subparsers.add_parser("watch", help="Measure the commits pushed to the branch as they arrive")
+    watch_parser.add_argument("--config", default="config.yml", help="Path to config file")
+    watch_parser.add_argument("--plot-config", default=None, help="Plot config of the refreshed report")
+    watch_parser.add_argument("--once", action="store_true", help="Run a single cycle and exit")
 
     # sort subcommand
     sort_parser = subparsers.add_parser("sort", help="Sort a result file")
     sort_parser.add_argument("file", help="Path to the result file to sort")
     sort_parser.add_argument("repo_path", help="Path to the repository")
     sort_parser.add_argument("output_file", help="Path to the output file")
+    sort_parser.add_argument("--branch", default="HEAD", help="Measured branch, whose first-parent history gives the order")
+
+    # merge subcommand
+    merge_parser = subparsers.add_parser("merge", help="Merge result CSV files")
+    merge_parser.add_argument("inputs", nargs="+", help="Result files to merge, in order")
+    merge_parser.add_argument("-o", "--output", required=True, help="Path to the merged file")
+    merge_parser.add_argument(
+        "--policy",
+        choices=MERGE_POLICIES,
+        default="first-wins",
+        help="Keep a commit from the first file it appears in only (default), or keep every run",
+    )
+    merge_parser.add_argument("--header", action="store_true", help="The files start with a header row")
+    merge_parser.add_argument("--hash-column", default="commit", help="Commit-hash column of files with a header")
 
     # plot subcommand
     plot_parser = subparsers.add_parser("plot", help="Plot a result file")
     plot_parser.add_argument("file", help="Path to the result file to plot")
     plot_parser.add_argument("repo_path", help="Path to the repository")
 
+    # coordinate subcommand
+    coordinate_parser = subparsers.add_parser("coordinate", help="Publish measurement tasks and merge the results of workers")
+    coordinate_parser.add_argument("--config", default="config.yml", help="Path to config file")
+    coordinate_parser.add_argument("--queue", required=True, help="Queue directory shared with the workers")
+
+    # work subcommand
+    work_parser = subparsers.add_parser("work", help="Measure the tasks published by a coordinator")
+    work_parser.add_argument("--config", default="config.yml", help="Path to config file")
+    work_parser.add_argument("--queue", required=True, help="Queue directory shared with the coordinator")
+    work_parser.add_argument("--host", default=None, help="Name of this machine in the results (default: hostname)")
+
+    # trace subcommand
+    trace_parser = subparsers.add_parser("trace", help="Summarize the time spent per stage in a trace file")
+    trace_parser.add_argument("file", help="Path to the Chrome trace written by measure or bisect")
+
     return parser.parse_args()
@@ -0,0 +1,153 @@
+"""Asynchronous execution of shell commands with bounded output capture.
+
+Build tools can print hundreds of megabytes, so the output of a command is streamed into a
+`OutputTail` that only keeps its last bytes (enough to report an error or to parse the counters
+`perf` prints when the command exits). Each command runs in its own session, and thus its own
+process group: on timeout the whole group is terminated, so that no orphaned compiler or JVM keeps
+heating the CPU during later measurements.
+
+`energytrackr.utils.utils.run_command` is the blocking entry point used by the stages.
+"""
+
+import asyncio
+import os
+import signal
+import subprocess
+from asyncio.subprocess import Process
+from collections import deque
+from contextlib import suppress
+
+READ_CHUNK = 64 * 1024
+DEFAULT_MAX_OUTPUT = 1024 * 1024
+# Time given to the process group to exit after SIGTERM before it is killed.
+KILL_GRACE_S = 2.0
+
+
+class OutputTail:
+    """Ring buffer keeping the last bytes written to it."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_OUTPUT) -> None:
+        """Initialize an empty buffer.
+
+        Args:
+            max_bytes (int): Number of bytes kept.
+        """
+        self.max_bytes = max_bytes
+        self.dropped = 0
+        self._chunks: deque[bytes] = deque()
+        self._size = 0
+
+    def write(self, data: bytes) -> None:
+        """Append data, dropping the oldest bytes beyond the capacity.
+
+        Args:
+            data (bytes): The data.
+        """
+        self._chunks.append(data)
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            excess = self._size - self.max_bytes
+            head = self._chunks[0]
+            if len(head) <= excess:
+                self._chunks.popleft()
+                dropped = len(head)
+            else:
+                self._chunks[0] = head[excess:]
+                dropped = excess
+            self._size -= dropped
+            self.dropped += dropped
+
+    def text(self) -> str:
+        """Decode the kept bytes.
+
+        Returns:
+            str: The tail of the output, preceded by a marker line if older output was dropped.
+        """
+        text = b"".join(self._chunks).decode(errors="replace")
+        return f"[... {self.dropped} bytes of output dropped ...]\n{text}" if self.dropped else text
+
+
+async def _pump(stream: asyncio.StreamReader, tail: OutputTail) -> None:
+    """Copy a stream into a buffer until end of file.
+
+    Args:
+        stream (asyncio.StreamReader): The stream.
+        tail (OutputTail): The buffer.
+    """
+    while chunk := await stream.read(READ_CHUNK):
+        tail.write(chunk)
+
+
+def _signal_group(pgid: int, signum: int) -> None:
+    """Send a signal to a process group, if it still exists.
+
+    Args:
+        pgid (int): The process group.
+        signum (int): The signal.
+    """
+    with suppress(ProcessLookupError, PermissionError):
+        os.killpg(pgid, signum)
+
+
+async def _terminate_group(process: Process) -> None:
+    """Terminate the process group of a command, then kill what is left of it.
+
+    Args:
+        process (Process): The leader of the group.
+    """
+    _signal_group(process.pid, signal.SIGTERM)
+    with suppress(TimeoutError):
+        await asyncio.wait_for(process.wait(), KILL_GRACE_S)
+    # Children may ignore SIGTERM or outlive their parent.
+    _signal_group(process.pid, signal.SIGKILL)
+    await process.wait()
+
+
+async def run_command_async(
+    cmd: str,
+    cwd: str | None = None,
+    timeout: float | None = None,
+    max_output: int = DEFAULT_MAX_OUTPUT,
+) -> subprocess.CompletedProcess[str]:
+    """Run a shell command in its own process group, keeping the tail of its output.
+
+    If the call is cancelled (e.g. by Ctrl-C) while the command runs, its process group is
+    terminated as well before the cancellation propagates.
+
+    Args:
+        cmd (str): The command.
+        cwd (str | None): The working directory.
+        timeout (float | None): Seconds after which the process group is terminated.
+        max_output (int): Bytes kept from each of stdout and stderr.
+
+    Returns:
+        subprocess.CompletedProcess[str]: The return code and the tails of stdout and stderr.
+
+    Raises:
+        subprocess.TimeoutExpired: If the command did not finish in time (its process group is terminated).
+        asyncio.CancelledError: If the call is cancelled, once the process group is terminated.
+    """
+    process = await asyncio.create_subprocess_shell(
+        cmd,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
+    )
+    assert process.stdout is not None and process.stderr is not None
+    stdout, stderr = OutputTail(max_output), OutputTail(max_output)
+    # The pipes are read until every process of the group has closed them, like `communicate`.
+    done = asyncio.gather(_pump(process.stdout, stdout), _pump(process.stderr, stderr), process.wait())
+    try:
+        _, _, returncode = await asyncio.wait_for(done, timeout)
+    except TimeoutError:
+        await _terminate_group(process)
+        raise subprocess.TimeoutExpired(cmd, timeout or 0, output=stdout.text(), stderr=stderr.text()) from None
+    except asyncio.CancelledError:
+        # Cancelled, e.g. by Ctrl-C under `asyncio.run`: the group must not outlive the caller.
+        if process.returncode is None:
+            # Sent before awaiting, in case the cleanup is cancelled too.
+            _signal_group(process.pid, signal.SIGTERM)
+            await _terminate_group(process)
+        raise
+    return subprocess.CompletedProcess(args=cmd, returncode=returncode, stdout=stdout.text(), stderr=stderr.text())
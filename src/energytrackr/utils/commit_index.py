@@ -0,0 +1,158 @@
+"""Index of the files modified by each commit, built from a single `git log` stream.
+
+`commit.stats.files` makes GitPython run one `git diff --numstat` per commit, which dominates the
+pre-stages on long histories. `CommitFileIndex` instead lists the modified files of all requested
+commits with one ``git log --name-only --no-walk --stdin`` invocation and answers lookups in O(1).
+Merge commits are diffed against their first parent, like `commit.stats`.
+
+Commits never change, so the index is persisted in the repository's git directory
+(``.git/energytrackr/commit_files.json``) and only commits that are not in it yet are read from git.
+"""
+
+import json
+import os
+import subprocess
+from collections.abc import Iterable
+from pathlib import Path
+
+from git import Repo
+
+from energytrackr.utils.logger import logger
+
+INDEX_DIR = "energytrackr"
+INDEX_FILE = "commit_files.json"
+# Marks the start of a commit in the `git log` stream (`%x00` in the format); file names never contain a NUL byte.
+COMMIT_MARKER = "\x00"
+
+
+class CommitFileIndex:
+    """Maps commit hashes to the paths of the files they modify."""
+
+    def __init__(self, files: dict[str, list[str]] | None = None) -> None:
+        """Initialize the index.
+
+        Args:
+            files (dict[str, list[str]] | None): Already known modified files, keyed by commit hash.
+        """
+        self._files: dict[str, list[str]] = files or {}
+
+    def __contains__(self, hexsha: object) -> bool:
+        """Check whether a commit is indexed.
+
+        Args:
+            hexsha (object): The commit hash.
+
+        Returns:
+            bool: True if the modified files of the commit are known.
+        """
+        return hexsha in self._files
+
+    def __len__(self) -> int:
+        """Number of indexed commits.
+
+        Returns:
+            int: The number of commits.
+        """
+        return len(self._files)
+
+    def files(self, hexsha: str) -> list[str]:
+        """Return the files modified by a commit.
+
+        Args:
+            hexsha (str): The commit hash.
+
+        Returns:
+            list[str]: The modified paths, relative to the repository root.
+        """
+        return self._files[hexsha]
+
+    @classmethod
+    def for_commits(cls, repo: Repo, hexshas: Iterable[str], persist: bool = True) -> "CommitFileIndex":
+        """Build the index of a set of commits, reusing the persisted index of the repository.
+
+        Args:
+            repo (Repo): The repository containing the commits.
+            hexshas (Iterable[str]): The commits to index.
+            persist (bool): Load and update the index stored in the git directory.
+
+        Returns:
+            CommitFileIndex: An index containing at least the requested commits.
+        """
+        git_dir = Path(repo.git_dir)
+        path = git_dir / INDEX_DIR / INDEX_FILE
+        index = cls.load(path) if persist else cls()
+        if missing := [hexsha for hexsha in dict.fromkeys(hexshas) if hexsha not in index]:
+            logger.info("Indexing the modified files of %d commits", len(missing))
+            index.add_from_git(git_dir, missing)
+            if persist:
+                index.save(path)
+        return index
+
+    def add_from_git(self, git_dir: str | Path, hexshas: list[str]) -> None:
+        """Read the modified files of commits with a single `git log` invocation.
+
+        Args:
+            git_dir (str | Path): The git directory of the repository.
+            hexshas (list[str]): The commits to index.
+
+        Raises:
+            subprocess.CalledProcessError: If `git log` fails (e.g. an unknown commit).
+        """
+        cmd = [
+            "git",
+            "--git-dir",
+            str(git_dir),
+            "-c",
+            "core.quotePath=false",
+            "log",
+            "--no-walk=unsorted",
+            "--stdin",
+            "--name-only",
+            "--no-renames",
+            "--diff-merges=first-parent",
+            "--format=%x00%H",
+        ]
+        with subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True) as proc:
+            assert proc.stdin is not None and proc.stdout is not None and proc.stderr is not None
+            # git reads every revision before writing anything, so stdin can be written in one go.
+            proc.stdin.write("\n".join(hexshas) + "\n")
+            proc.stdin.close()
+            current: list[str] = []
+            for line in proc.stdout:
+                if line.startswith(COMMIT_MARKER):
+                    current = self._files[line[1:].strip()] = []
+                elif stripped := line.rstrip("\n"):
+                    current.append(stripped)
+            stderr = proc.stderr.read()
+        if proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "CommitFileIndex":
+        """Load a persisted index.
+
+        Args:
+            path (str | Path): The JSON index file.
+
+        Returns:
+            CommitFileIndex: The index, empty if the file does not exist or is corrupted.
+        """
+        try:
+            return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            return cls()
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Ignoring unreadable commit file index %s: %s", path, e)
+            return cls()
+
+    def save(self, path: str | Path) -> None:
+        """Persist the index atomically.
+
+        Args:
+            path (str | Path): The JSON index file.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".tmp-{os.getpid()}")
+        tmp_path.write_text(json.dumps(self._files), encoding="utf-8")
+        os.replace(tmp_path, path)
@@ -0,0 +1,84 @@
+"""Newton cooling model of the CPU, learned from temperature readings.
+
+While the CPU cools down, its temperature follows Newton's law of cooling::
+
+    dT/dt = -(T - T_ambient) / tau
+
+Each pair of consecutive readings gives an estimate of the cooling rate at their mean
+temperature; a linear regression of the rates against the temperatures yields `tau` (slope
+``-1/tau``) and the temperature the CPU converges to (``T_ambient``). The time to cool from
+``T`` to a target is then ``tau * ln((T - T_ambient) / (target - T_ambient))``.
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+
+MIN_POINTS = 2
+
+
+class CoolingModel:
+    """Learns the cooling curve of the machine and predicts cooldown durations."""
+
+    def __init__(self, max_points: int = 256) -> None:
+        """Initialize an empty model.
+
+        Args:
+            max_points (int): Number of most recent (temperature, rate) points kept for the fit.
+        """
+        self._points: deque[tuple[float, float]] = deque(maxlen=max_points)
+        self._last: tuple[float, float] | None = None
+        self._fit: tuple[float, float] | None = None
+
+    def observe(self, timestamp: float, temperature: float) -> None:
+        """Record a temperature reading taken while the CPU is idle.
+
+        Args:
+            timestamp (float): Monotonic time of the reading, in seconds.
+            temperature (float): The temperature.
+        """
+        if self._last is not None and (dt := timestamp - self._last[0]) > 0:
+            previous = self._last[1]
+            self._points.append(((previous + temperature) / 2, (temperature - previous) / dt))
+            self._fit = None
+        self._last = (timestamp, temperature)
+
+    def end_episode(self) -> None:
+        """Forget the last reading, so that the next one does not span a period of CPU activity."""
+        self._last = None
+
+    def fit(self) -> tuple[float, float] | None:
+        """Fit the cooling curve.
+
+        Returns:
+            tuple[float, float] | None: The time constant `tau` in seconds and the ambient
+                temperature, or None if the readings do not describe a cooling curve yet.
+        """
+        if self._fit is None and len(self._points) >= MIN_POINTS:
+            temperatures, rates = np.array(self._points).T
+            if np.ptp(temperatures) > 0:
+                slope, intercept = np.polyfit(temperatures, rates, 1)
+                if slope < 0:
+                    self._fit = (-1 / slope, -intercept / slope)
+        return self._fit
+
+    def predict_wait(self, temperature: float, target: float) -> float | None:
+        """Predict how long it takes to cool down to a target temperature.
+
+        Args:
+            temperature (float): The current temperature.
+            target (float): The temperature to reach.
+
+        Returns:
+            float | None: The predicted wait in seconds (0 if already cool enough), or None if the
+                model is not fitted or the target is not reachable (at or below the ambient temperature).
+        """
+        if temperature <= target:
+            return 0.0
+        if (fit := self.fit()) is None:
+            return None
+        tau, ambient = fit
+        if target <= ambient:
+            return None
+        return tau * math.log((temperature - ambient) / (target - ambient))
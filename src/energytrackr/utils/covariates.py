@@ -0,0 +1,73 @@
+"""Readings of the machine state recorded with every run, to explain part of its energy variance.
+
+The energy of a run depends on more than the measured commit: a hotter CPU leaks more power, a
+lower clock frequency stretches the run, and background load competes for the package. Recording
+these covariates lets the analysis regress them out (see
+`energytrackr.plot.builtin_data_transforms.covariate_adjustment`).
+"""
+
+import os
+from pathlib import Path
+
+DEFAULT_CPU_DIR = "/sys/devices/system/cpu"
+DEFAULT_CPUINFO = "/proc/cpuinfo"
+# `scaling_cur_freq` is in kHz.
+KHZ_PER_MHZ = 1000
+
+
+def read_cpu_temperature(path: str | Path) -> int:
+    """Read and parse the CPU temperature from a thermal file.
+
+    Args:
+        path (str | Path): Path to the thermal file, e.g. ``/sys/class/thermal/thermal_zone0/temp``.
+
+    Returns:
+        int: The CPU temperature in milli-degrees Celsius.
+    """
+    # strip() + int() kept together so failure raises ValueError
+    return int(Path(path).read_text(encoding="utf-8").strip())
+
+
+def read_cpu_frequency_mhz(cpu_dir: str | Path = DEFAULT_CPU_DIR, cpuinfo: str | Path = DEFAULT_CPUINFO) -> float | None:
+    """Read the current clock frequency averaged over the online CPUs.
+
+    The cpufreq ``scaling_cur_freq`` files are used when available, ``/proc/cpuinfo`` otherwise.
+
+    Args:
+        cpu_dir (str | Path): The sysfs CPU directory.
+        cpuinfo (str | Path): The cpuinfo file.
+
+    Returns:
+        float | None: The mean frequency in MHz, or None if it cannot be read.
+    """
+    frequencies: list[float] = []
+    for path in Path(cpu_dir).glob("cpu[0-9]*/cpufreq/scaling_cur_freq"):
+        try:
+            frequencies.append(int(path.read_text(encoding="utf-8")) / KHZ_PER_MHZ)
+        except (OSError, ValueError):
+            continue
+    if not frequencies:
+        try:
+            lines = Path(cpuinfo).read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return None
+        for line in lines:
+            key, _, value = line.partition(":")
+            if key.strip() == "cpu MHz":
+                try:
+                    frequencies.append(float(value))
+                except ValueError:
+                    continue
+    return sum(frequencies) / len(frequencies) if frequencies else None
+
+
+def read_loadavg() -> float | None:
+    """Read the one-minute load average.
+
+    Returns:
+        float | None: The load average, or None if the platform does not provide it.
+    """
+    try:
+        return os.getloadavg()[0]
+    except OSError:
+        return None
@@ -300,3 +300,92 @@ class JavaHomeNotFoundError(ValueError):
             java_home (str): The JAVA_HOME path that does not exist or is not a directory.
         """
         super().__init__(f"java_home path does not exist or is not a directory: {java_home}")
+
+
+class InvalidBisectRangeError(ValueError):
+    """Exception raised when the good commit of a bisection is not an ancestor of the bad commit."""
+
+    def __init__(self, good: str, bad: str) -> None:
+        """Initialize the exception with the bisection bounds.
+
+        Args:
+            good (str): The known-good commit.
+            bad (str): The known-bad commit.
+        """
+        super().__init__(f"No commits between {good} and {bad}; is {good} an ancestor of {bad}?")
+
+
+class UnmeasurableBisectCommitsError(RuntimeError):
+    """Exception raised when a bisection cannot go on because commits of its range cannot be measured."""
+
+    def __init__(self, hexshas: list[str]) -> None:
+        """Initialize the exception with the commits that could not be measured.
+
+        Args:
+            hexshas (list[str]): The commits without enough measurements, e.g. because their build failed.
+        """
+        super().__init__(f"Not enough measurements of {', '.join(hexshas)} to locate the first differing commit.")
+
+
+class DuplicateStageNameError(ValueError):
+    """Exception raised when two stages of a group share the same name."""
+
+    def __init__(self, name: str) -> None:
+        """Initialize the exception with the duplicated name.
+
+        Args:
+            name (str): The stage name declared twice.
+        """
+        super().__init__(f"Stage name declared twice in the same group: {name}")
+
+
+class UnknownStageDependencyError(ValueError):
+    """Exception raised when a stage depends on a stage that is not in its group."""
+
+    def __init__(self, stage: str, dependency: str) -> None:
+        """Initialize the exception with the stage and its unknown dependency.
+
+        Args:
+            stage (str): The stage declaring the dependency.
+            dependency (str): The missing stage.
+        """
+        super().__init__(f"Stage {stage} depends on unknown stage {dependency}")
+
+
+class StageCycleError(ValueError):
+    """Exception raised when the dependencies of a stage group form a cycle."""
+
+    def __init__(self, stages: list[str]) -> None:
+        """Initialize the exception with the stages involved in the cycle.
+
+        Args:
+            stages (list[str]): The stages that could not be ordered.
+        """
+        super().__init__(f"Stage dependencies form a cycle between: {', '.join(stages)}")
+
+
+class MismatchedHeaderError(ValueError):
+    """Exception raised when the result files to merge do not share the same header."""
+
+    def __init__(self, path: str, header: list[str], expected: list[str]) -> None:
+        """Initialize the exception with the mismatching file and headers.
+
+        Args:
+            path (str): The file whose header differs.
+            header (list[str]): Its header.
+            expected (list[str]): The header of the first file.
+        """
+        super().__init__(f"Header of {path} ({', '.join(header)}) differs from the first file ({', '.join(expected)})")
+
+
+class MissingHashColumnError(ValueError):
+    """Exception raised when the commit-hash column is not in the header of a result file."""
+
+    def __init__(self, column: str, header: list[str]) -> None:
+        """Initialize the exception with the missing column and the available ones.
+
+        Args:
+            column (str): The commit-hash column.
+            header (list[str]): The columns of the file.
+        """
+        super().__init__(f"Column {column} not found; available columns: {', '.join(header)}")
@@ -3,9 +3,11 @@
 import os
 from typing import Any
 
-from git import Commit, Repo
+from git import Commit, GitCommandError, Repo
 
+from energytrackr.config.config_model import ExecutionPlanDefinition
 from energytrackr.config.config_store import Config
+from energytrackr.utils.commit_index import CommitFileIndex
 from energytrackr.utils.logger import logger
 
 
@@ -28,6 +30,93 @@ def clone_or_open_repo(repo_path: str, repo_url: str, clone_options: list[str] |
     return Repo(repo_path)
 
 
+def commit_ref(repo: Repo, hexsha: str) -> Commit:
+    """Reference a commit by its full hash without reading it.
+
+    GitPython reads the commit object (message, author, parents...) on first access to one of its
+    attributes, so the reference costs nothing until a stage needs more than the hash.
+
+    Args:
+        repo (Repo): The repository containing the commit.
+        hexsha (str): The full hash of the commit.
+
+    Returns:
+        Commit: The commit.
+    """
+    return Commit(repo, bytes.fromhex(hexsha))
+
+
+def rev_list(repo: Repo, *args: str) -> list[Commit]:
+    """List commits with `git rev-list`, without reading the commit objects.
+
+    Args:
+        repo (Repo): The repository.
+        *args (str): Revisions and options passed to `git rev-list`.
+
+    Returns:
+        list[Commit]: The listed commits, in the order of `git rev-list` (newest first by default).
+    """
+    return [commit_ref(repo, hexsha) for hexsha in repo.git.rev_list(*args).split()]
+
+
+def _is_ancestor(repo: Repo, ancestor: str, rev: str) -> bool:
+    """Check whether a commit is reachable from a revision.
+
+    Args:
+        repo (Repo): The repository.
+        ancestor (str): The candidate ancestor.
+        rev (str): The revision.
+
+    Returns:
+        bool: True if `ancestor` exists and is reachable from `rev` (or is `rev` itself).
+    """
+    try:
+        repo.git.merge_base("--is-ancestor", ancestor, rev)
+    except GitCommandError:
+        # Exit status 1 if it is not an ancestor, 128 if a revision does not exist.
+        return False
+    return True
+
+
+def _rev_list_args(repo: Repo, plan: ExecutionPlanDefinition, branch: str) -> list[str]:
+    """Translate the commit range of the execution plan into `git rev-list` arguments.
+
+    Args:
+        repo (Repo): The repository.
+        plan (ExecutionPlanDefinition): The execution plan.
+        branch (str): The branch whose history is gathered.
+
+    Returns:
+        list[str]: The options, revisions and pathspecs to pass to `git rev-list`.
+    """
+    args: list[str] = []
+    if plan.first_parent:
+        args.append("--first-parent")
+    # rev-list lists newest-first, so --max-count keeps the most recent num_commits of the range.
+    if plan.num_commits:
+        args.append(f"--max-count={plan.num_commits}")
+
+    # If a newest_commit is specified, stop at that commit (inclusive)
+    tip = branch
+    if plan.newest_commit:
+        if _is_ancestor(repo, plan.newest_commit, tip):
+            tip = plan.newest_commit
+        else:
+            logger.warning("Newest commit %s not found in commit history.", plan.newest_commit)
+    args.append(tip)
+
+    # If an oldest_commit is specified, start from that commit onward: exclude its parents.
+    if plan.oldest_commit:
+        if _is_ancestor(repo, plan.oldest_commit, tip):
+            args.append(f"^{plan.oldest_commit}^@")
+        else:
+            logger.warning("Oldest commit %s not found in commit history.", plan.oldest_commit)
+
+    if plan.paths:
+        args.extend(["--", *plan.paths])
+    return args
+
+
 def gather_commits(repo: Repo) -> list[Commit]:
     """Gather the commits that should be processed according to the execution plan.
 
@@ -36,11 +125,14 @@ def gather_commits(repo: Repo) -> list[Commit]:
     branch, starting from the oldest commit. If oldest_commit is specified, we start from there.
     If newest_commit is specified, we stop at that commit.
 
+    The range selection is done by `git rev-list`, so only the hashes of the selected commits are
+    loaded; the commit objects are only read when a stage needs more than the hash.
+
     Args:
         repo (git.Repo): The git repository to gather commits from.
 
     Returns:
-        list[git.Commit]: The list of commits to process.
+        list[Commit]: The list of commits to process.
     """
     conf = Config.get_config()
     plan = conf.execution_plan
@@ -48,44 +140,28 @@ def gather_commits(repo: Repo) -> list[Commit]:
     if plan.granularity == "branches":
         # One commit per branch
         branches = list(repo.remotes.origin.refs)
-        return [branch.commit for branch in branches]
+        return [commit_ref(repo, branch.commit.hexsha) for branch in branches]
 
     if plan.granularity == "tags":
-        tags = list(repo.tags)
+        max_count = [f"--max-count={plan.num_commits}"] if plan.num_commits else []
         commits: list[Commit] = []
-        for tag in tags:
-            commits.extend(list(repo.iter_commits(tag, max_count=plan.num_commits)))
+        for tag in repo.tags:
+            commits.extend(rev_list(repo, *max_count, tag.path))
         return commits
 
     # commits granularity
-    # Get all commits from the branch in descending order (newest-first)
-    if not conf.repo.branch or conf.repo.branch not in repo.branches:
-        logger.warning("Branch %s not found in the repository. Using default branch.", conf.repo.branch)
-        conf.repo.branch = repo.active_branch.name
-    commits = list(repo.iter_commits(conf.repo.branch))
-    # Reverse to get ascending order (oldest-first) to make filtering more intuitive
-    commits = list(reversed(commits))
+    branch = conf.repo.branch
+    if branch is None:
+        branch = repo.active_branch.name
+        logger.info("No branch configured. Using the active branch %s.", branch)
+    elif branch not in repo.branches:
+        logger.warning("Branch %s not found in the repository. Using default branch.", branch)
+        branch = repo.active_branch.name
+    conf.repo.branch = branch
 
-    # If an oldest_commit is specified, start from that commit onward.
-    if plan.oldest_commit:
-        if (start_idx := next((i for i, c in enumerate(commits) if c.hexsha == plan.oldest_commit), None)) is not None:
-            commits = commits[start_idx:]
-        else:
-            logger.warning("Oldest commit %s not found in commit history.", plan.oldest_commit)
-
-    # If a newest_commit is specified, stop at that commit (inclusive)
-    if plan.newest_commit:
-        if (end_idx := next((i for i, c in enumerate(commits) if c.hexsha == plan.newest_commit), None)) is not None:
-            commits = commits[: end_idx + 1]
-        else:
-            logger.warning("Newest commit %s not found in commit history.", plan.newest_commit)
-
-    # If a number of commits is specified, take the most recent num_commits from the ascending list.
-    # Since the list is ascending (oldest-first), we slice from the tail to keep the latest commits.
-    if plan.num_commits:
-        commits = commits[-plan.num_commits :]
-
-    logger.info("Gathered %d commits from branch %s", len(commits), conf.repo.branch)
+    # Reverse to get ascending order (oldest-first) to make filtering more intuitive
+    commits = list(reversed(rev_list(repo, *_rev_list_args(repo, plan, branch))))
+    logger.info("Gathered %d commits from branch %s", len(commits), branch)
 
     return commits
 
@@ -128,12 +204,14 @@ def generate_commit_link(remote_url: str, commit_hash: str) -> str:
     return "N/A"
 
 
-def get_commit_details_from_git(commit_hash: str, repo: Repo) -> dict[str, Any]:
+def get_commit_details_from_git(commit_hash: str, repo: Repo, file_index: CommitFileIndex | None = None) -> dict[str, Any]:
     """Retrieve details about a specific git commit from a repository.
 
     Args:
         commit_hash (str): The hash of the commit to retrieve details for.
         repo (Repo): An instance of a GitPython Repo object representing the repository.
+        file_index (CommitFileIndex | None): Index of the modified files; if it contains the commit,
+            it is used instead of diffing the commit.
 
     Returns:
         dict[str, Any]: A dictionary containing the following keys:
@@ -153,7 +231,10 @@ def get_commit_details_from_git(commit_hash: str, repo: Repo) -> dict[str, Any]:
     commit_date = commit_obj.committed_datetime.strftime("%Y-%m-%d")
     commit_summary = commit_obj.summary
     commit_message = commit_obj.message
-    commit_files = list(commit_obj.stats.files.keys())
+    if file_index is not None and commit_obj.hexsha in file_index:
+        commit_files = file_index.files(commit_obj.hexsha)
+    else:
+        commit_files = list(commit_obj.stats.files.keys())
     commit_link = "N/A"
     if repo.remotes:
         remote_url = repo.remotes[0].url
@@ -0,0 +1,151 @@
+"""Streaming merge of result CSV files.
+
+The files are read row by row and written in chunks, so memory does not grow with the number or
+size of the files: the only state kept is the set of commits already taken from earlier files,
+which is bounded by the number of commits of the project rather than by the number of runs.
+
+Two policies decide what happens to a commit measured in several files:
+
+- ``first-wins`` keeps all the runs of the commit from the first file it appears in and drops it
+  from the later files (the behaviour of the former ``merger.py`` script);
+- ``keep-all`` keeps every run from every file.
+
+By default the files are headerless ``commit,value...`` rows, as written by `MeasureEnergyStage`.
+"""
+
+import csv
+from collections.abc import Iterator
+from dataclasses import dataclass
+from itertools import batched
+from typing import Literal, TextIO
+
+from energytrackr.utils.exceptions import MismatchedHeaderError, MissingHashColumnError
+
+MergePolicy = Literal["first-wins", "keep-all"]
+MERGE_POLICIES: tuple[MergePolicy, ...] = ("first-wins", "keep-all")
+CHUNK_ROWS = 10_000
+
+
+@dataclass
+class MergeSummary:
+    """Counts of a merge.
+
+    Attributes:
+        files (int): Number of merged files.
+        rows (int): Number of rows written.
+        dropped (int): Number of rows dropped because their commit came from an earlier file.
+        commits (int): Number of distinct commits written.
+    """
+
+    files: int = 0
+    rows: int = 0
+    dropped: int = 0
+    commits: int = 0
+
+
+def merge_result_files(
+    inputs: list[str],
+    output: str,
+    policy: MergePolicy = "first-wins",
+    hash_column: str | None = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> MergeSummary:
+    """Merge result CSV files into one, in the order of the inputs.
+
+    Args:
+        inputs (list[str]): The files to merge, in merge order.
+        output (str): The merged file.
+        policy (MergePolicy): What to do with commits measured in several files.
+        hash_column (str | None): Name of the commit-hash column of files starting with a header
+            row, which is written once to the output; None for headerless files, whose commit is
+            the first column.
+        chunk_rows (int): Number of rows read and written at a time.
+
+    Returns:
+        MergeSummary: The counts of the merge.
+    """
+    with open(output, "w", newline="", encoding="utf-8") as out:
+        merger = _Merger(out, policy, hash_column)
+        for path in inputs:
+            merger.add(path, chunk_rows)
+    merger.summary.commits = len(merger.seen)
+    return merger.summary
+
+
+class _Merger:
+    """Appends result files to the merged file, keeping what is carried from file to file."""
+
+    def __init__(self, out: TextIO, policy: MergePolicy, hash_column: str | None) -> None:
+        """Start a merge.
+
+        Args:
+            out (TextIO): The merged file.
+            policy (MergePolicy): What to do with commits measured in several files.
+            hash_column (str | None): Commit-hash column of files with a header, None for headerless files.
+        """
+        self.writer = csv.writer(out)
+        self.policy = policy
+        self.hash_column = hash_column
+        self.summary = MergeSummary()
+        # Commits taken from the files already merged.
+        self.seen: set[str] = set()
+        self.header: list[str] | None = None
+
+    def add(self, path: str, chunk_rows: int) -> None:
+        """Append the rows of a file, dropping the commits of earlier files under first-wins.
+
+        Args:
+            path (str): The file.
+            chunk_rows (int): Number of rows read and written at a time.
+        """
+        with open(path, newline="", encoding="utf-8") as fh:
+            reader = csv.reader(fh)
+            index = 0 if self.hash_column is None else self._hash_index(path, next(reader, []), self.hash_column)
+            # Commits taken from the current file.
+            current: set[str] = set()
+            for chunk in batched(_rows(reader), chunk_rows, strict=False):
+                kept = [row for row in chunk if self.policy == "keep-all" or row[index] not in self.seen]
+                current.update(row[index] for row in kept)
+                self.writer.writerows(kept)
+                self.summary.rows += len(kept)
+                self.summary.dropped += len(chunk) - len(kept)
+            self.seen |= current
+        self.summary.files += 1
+
+    def _hash_index(self, path: str, columns: list[str], hash_column: str) -> int:
+        """Check the header of a file, writing the first one to the merged file.
+
+        Args:
+            path (str): The file.
+            columns (list[str]): Its header row.
+            hash_column (str): The commit-hash column.
+
+        Returns:
+            int: The position of the commit-hash column.
+
+        Raises:
+            MismatchedHeaderError: If the header differs from the first file's.
+            MissingHashColumnError: If the hash column is not in the header.
+        """
+        if self.header is None:
+            self.header = columns
+            self.writer.writerow(columns)
+        elif columns != self.header:
+            raise MismatchedHeaderError(path, columns, self.header)
+        if hash_column not in columns:
+            raise MissingHashColumnError(hash_column, columns)
+        return columns.index(hash_column)
+
+
+def _rows(reader: Iterator[list[str]]) -> Iterator[list[str]]:
+    """Skip the empty lines of a CSV file.
+
+    Args:
+        reader (Iterator[list[str]]): The CSV reader.
+
+    Yields:
+        list[str]: The non-empty rows.
+    """
+    for row in reader:
+        if row:
+            yield row
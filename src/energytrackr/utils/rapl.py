@@ -0,0 +1,283 @@
+"""Direct access to the Intel RAPL energy counters exposed by the Linux powercap framework.
+
+Each RAPL zone is a directory ``<root>/intel-rapl:<N>[:<M>]`` containing:
+  - ``name``: the domain name (``package-0``, ``core``, ``uncore``, ``dram``, ``psys``),
+  - ``energy_uj``: a monotonically increasing energy counter in micro-joules,
+  - ``max_energy_range_uj``: the value at which the counter wraps around to zero.
+
+`RaplSampler` reads the counter of one domain at a fixed rate, with ``pread`` on a file descriptor
+kept open, into a preallocated NumPy ring buffer: sampling neither spawns processes nor allocates.
+Its stability test compares the mean power of short windows with that of a warm-up period.
+"""
+
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_POWERCAP_DIR = "/sys/class/powercap"
+MICROJOULES_PER_JOULE = 1_000_000
+# A counter is a decimal number of micro-joules followed by a newline.
+READ_SIZE = 32
+# Makes a modified z-score comparable to a z-score for normal data (Iglewicz and Hoaglin).
+MODIFIED_Z_FACTOR = 0.6745
+# Micro-joules per nanosecond in watts.
+WATTS_PER_UJ_PER_NS = 1_000
+
+
+@dataclass(frozen=True)
+class RaplDomain:
+    """A RAPL energy domain.
+
+    Attributes:
+        name (str): Unique label of the domain (e.g. "package-0", "core", "dram").
+        zone (str): Name of the powercap zone directory (e.g. "intel-rapl:0:1").
+        energy_path (Path): Path of the `energy_uj` counter.
+        max_energy_uj (int): Range of the counter, used to correct wrap-arounds.
+    """
+
+    name: str
+    zone: str
+    energy_path: Path
+    max_energy_uj: int
+
+
+def discover_domains(root: str | Path = DEFAULT_POWERCAP_DIR) -> list[RaplDomain]:
+    """List the readable RAPL domains under a powercap directory.
+
+    Sub-zones (e.g. core, uncore, dram) are listed after their package. If a domain name appears
+    more than once (multi-socket machines), the zone identifier is appended to keep labels unique.
+
+    Args:
+        root (str | Path): The powercap sysfs directory.
+
+    Returns:
+        list[RaplDomain]: The domains, ordered by zone.
+    """
+    domains: list[RaplDomain] = []
+    seen: set[str] = set()
+    zones = sorted(Path(root).glob("intel-rapl:*"), key=lambda p: [int(part) for part in p.name.split(":")[1:]])
+    for zone in zones:
+        try:
+            name, max_energy = _read_zone(zone)
+        except (OSError, ValueError):
+            # Unreadable zones (e.g. energy_uj is root-only since CVE-2020-8694) are skipped.
+            continue
+        label = name if name not in seen else f"{name}:{zone.name.removeprefix('intel-rapl:')}"
+        seen.add(name)
+        domains.append(RaplDomain(name=label, zone=zone.name, energy_path=zone / "energy_uj", max_energy_uj=max_energy))
+    return domains
+
+
+def _read_zone(zone: Path) -> tuple[str, int]:
+    """Read the name and the counter range of a powercap zone, checking that its counter is readable.
+
+    Args:
+        zone (Path): The zone directory.
+
+    Returns:
+        tuple[str, int]: The domain name and the range of its counter, in micro-joules.
+    """
+    name = (zone / "name").read_text(encoding="utf-8").strip()
+    max_energy = int((zone / "max_energy_range_uj").read_text(encoding="utf-8").strip())
+    int((zone / "energy_uj").read_text(encoding="utf-8").strip())
+    return name, max_energy
+
+
+def energy_delta_uj(before: int, after: int, max_energy_uj: int) -> int:
+    """Compute the energy consumed between two counter readings, correcting a single wrap-around.
+
+    Args:
+        before (int): Counter value at the start, in micro-joules.
+        after (int): Counter value at the end, in micro-joules.
+        max_energy_uj (int): Range of the counter.
+
+    Returns:
+        int: The consumed energy in micro-joules.
+    """
+    if after >= before:
+        return after - before
+    return max_energy_uj - before + after
+
+
+class RaplReader:
+    """Reads all RAPL domains of the machine at once."""
+
+    def __init__(self, root: str | Path = DEFAULT_POWERCAP_DIR) -> None:
+        """Discover the RAPL domains.
+
+        Args:
+            root (str | Path): The powercap sysfs directory.
+        """
+        self.domains = discover_domains(root)
+
+    @property
+    def domain_names(self) -> list[str]:
+        """Labels of the domains, in the order used for readings."""
+        return [domain.name for domain in self.domains]
+
+    def snapshot(self) -> list[int]:
+        """Read the current counter of every domain.
+
+        Returns:
+            list[int]: The counter values in micro-joules, in the order of `domains`.
+        """
+        return [int(domain.energy_path.read_text(encoding="utf-8")) for domain in self.domains]
+
+    def energy_joules(self, before: list[int], after: list[int]) -> dict[str, float]:
+        """Convert two snapshots into the energy consumed by each domain.
+
+        Args:
+            before (list[int]): Snapshot taken before the workload.
+            after (list[int]): Snapshot taken after the workload.
+
+        Returns:
+            dict[str, float]: Energy in joules per domain label.
+        """
+        return {
+            domain.name: energy_delta_uj(start, end, domain.max_energy_uj) / MICROJOULES_PER_JOULE
+            for domain, start, end in zip(self.domains, before, after, strict=True)
+        }
+
+
+@dataclass(frozen=True)
+class StabilityResult:
+    """Outcome of a stability test.
+
+    Attributes:
+        stable (bool): Whether no test window was an outlier.
+        median_w (float): Median power of the warm-up windows, in watts.
+        max_z (float): Largest absolute modified z-score of the test windows.
+        windows (int): Number of test windows.
+    """
+
+    stable: bool
+    median_w: float
+    max_z: float
+    windows: int
+
+
+def window_power(times_ns: np.ndarray, energy_uj: np.ndarray, window: int, max_energy_uj: int) -> np.ndarray:
+    """Compute the mean power of consecutive windows of counter samples.
+
+    Args:
+        times_ns (np.ndarray): Monotonic timestamps of the samples, in nanoseconds.
+        energy_uj (np.ndarray): Counter values of the samples, in micro-joules.
+        window (int): Sampling intervals per window; an incomplete last window is dropped.
+        max_energy_uj (int): Range of the counter, used to correct wrap-arounds.
+
+    Returns:
+        np.ndarray: The mean power of each window, in watts.
+    """
+    energy = np.diff(energy_uj).astype(np.float64)
+    energy[energy < 0] += max_energy_uj
+    elapsed = np.diff(times_ns).astype(np.float64)
+    count = len(energy) // window * window
+    return (
+        energy[:count].reshape(-1, window).sum(axis=1) / elapsed[:count].reshape(-1, window).sum(axis=1) * WATTS_PER_UJ_PER_NS
+    )
+
+
+def check_stability(power_w: np.ndarray, warmup: int, threshold: float) -> StabilityResult:
+    """Check that the power of the test windows is in line with that of the warm-up windows.
+
+    Args:
+        power_w (np.ndarray): Mean power of consecutive windows, warm-up windows first.
+        warmup (int): Number of warm-up windows, giving the reference median and MAD.
+        threshold (float): Largest absolute modified z-score of a stable test window.
+
+    Returns:
+        StabilityResult: The outcome of the test.
+    """
+    reference, test = power_w[:warmup], power_w[warmup:]
+    median = float(np.median(reference))
+    # A perfectly flat reference would make every deviation infinite.
+    mad = float(np.median(np.abs(reference - median))) or sys.float_info.epsilon
+    max_z = float(np.max(np.abs(MODIFIED_Z_FACTOR * (test - median) / mad), initial=0.0))
+    return StabilityResult(stable=max_z <= threshold, median_w=median, max_z=max_z, windows=len(test))
+
+
+class RaplSampler:
+    """Samples the counter of a RAPL domain at a fixed rate into a ring buffer."""
+
+    def __init__(self, domain: RaplDomain, rate_hz: float = 100.0, capacity: int = 1024) -> None:
+        """Open the counter and allocate the buffer.
+
+        Args:
+            domain (RaplDomain): The domain, usually the package.
+            rate_hz (float): Sampling rate.
+            capacity (int): Number of samples kept; older samples are overwritten.
+        """
+        self.domain = domain
+        self.period_ns = round(1e9 / rate_hz)
+        self.capacity = capacity
+        self.times_ns = np.zeros(capacity, dtype=np.int64)
+        self.energy_uj = np.zeros(capacity, dtype=np.int64)
+        self.count = 0
+        self._fd = os.open(domain.energy_path, os.O_RDONLY)
+
+    def read_uj(self) -> int:
+        """Read the counter.
+
+        Returns:
+            int: The counter value in micro-joules.
+        """
+        return int(os.pread(self._fd, READ_SIZE, 0))
+
+    def record(self, samples: int) -> None:
+        """Take samples at the sampling rate; deadlines are absolute, so delays do not accumulate.
+
+        Args:
+            samples (int): Number of samples.
+        """
+        deadline = time.monotonic_ns()
+        for _ in range(samples):
+            if (delay := deadline - time.monotonic_ns()) > 0:
+                time.sleep(delay / 1e9)
+            index = self.count % self.capacity
+            self.times_ns[index] = time.monotonic_ns()
+            self.energy_uj[index] = self.read_uj()
+            self.count += 1
+            deadline += self.period_ns
+
+    def samples(self, last: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return the most recent samples in chronological order.
+
+        Args:
+            last (int | None): Number of samples; every kept sample if None.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The timestamps (ns) and the counter values (uJ).
+        """
+        kept = min(self.count, self.capacity)
+        size = kept if last is None else min(last, kept)
+        order = np.arange(self.count - size, self.count) % self.capacity
+        return self.times_ns[order], self.energy_uj[order]
+
+    def stability_test(self, warmup_s: float, duration_s: float, window_s: float, threshold: float) -> StabilityResult:
+        """Sample the counter and check that the power draw is stable.
+
+        Args:
+            warmup_s (float): Duration of the warm-up period, giving the reference power.
+            duration_s (float): Duration of the test period that follows it.
+            window_s (float): Duration of a window whose mean power is compared.
+            threshold (float): Largest absolute modified z-score of a stable window.
+
+        Returns:
+            StabilityResult: The outcome of the test.
+        """
+        window = max(round(window_s * 1e9 / self.period_ns), 1)
+        warmup = max(round(warmup_s / window_s), 1)
+        samples = min((warmup + max(round(duration_s / window_s), 1)) * window + 1, self.capacity)
+        self.record(samples)
+        power = window_power(*self.samples(samples), window, self.domain.max_energy_uj)
+        return check_stability(power, warmup, threshold)
+
+    def close(self) -> None:
+        """Close the counter."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
@@ -0,0 +1,39 @@
+"""Statistical comparison of two samples of measurements.
+
+Shared by the `DetectChanges` transform of the report and by the energy bisection, so that both
+call a change with the same tests: Welch's t-test for significance, Cohen's d for the effect size.
+"""
+
+import numpy as np
+from scipy.stats import ttest_ind
+
+
+def welch_p_value(baseline: np.ndarray, test: np.ndarray) -> float:
+    """Compute Welch's t-test p-value.
+
+    Args:
+        baseline (np.ndarray): The baseline sample data.
+        test (np.ndarray): The test sample data.
+
+    Returns:
+        float: The p-value from the t-test.
+    """
+    _, p = ttest_ind(baseline, test, equal_var=False)
+    return float(p)
+
+
+def cohens_d(baseline: np.ndarray, test: np.ndarray) -> float:
+    """Compute Cohen's d effect size.
+
+    Args:
+        baseline (np.ndarray): The baseline sample data.
+        test (np.ndarray): The test sample data.
+
+    Returns:
+        float: The Cohen's d effect size.
+    """
+    mean_b, mean_t = np.mean(baseline), np.mean(test)
+    var_b = np.var(baseline, ddof=1)
+    var_t = np.var(test, ddof=1)
+    pooled = np.sqrt((var_b + var_t) / 2.0) or 1.0
+    return float((mean_t - mean_b) / pooled)
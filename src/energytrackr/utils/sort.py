@@ -1,18 +1,31 @@
 """Sorts a CSV file containing commit hashes and energy values based on the commit history of a Git repository."""
 
 import csv
+import heapq
 import logging
+import os
 import subprocess
 import sys
+import tempfile
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import ExitStack
+from itertools import batched
+from operator import itemgetter
+from typing import TextIO
 
 EXPECTED_ROW_LENGTH = 2  # Number of columns expected in the CSV file
+RUN_ROWS = 500_000  # Rows sorted in memory before being spilled to disk
 
 
-def get_commit_history(repo_path: str) -> list[str]:
-    """Retrieve the commit history from a Git repository in chronological order.
+def get_commit_history(repo_path: str, ref: str = "HEAD") -> list[str]:
+    """Retrieve the first-parent history of a branch in chronological order.
+
+    Only the first parent of merge commits is followed, which is the sequence of commits the
+    measured branch went through; commits of merged feature branches are left out.
 
     Args:
         repo_path (str): The file system path to the Git repository.
+        ref (str): The measured branch (or any commit-ish).
 
     Returns:
         list[str]: A list of commit hashes in chronological order (oldest to newest).
@@ -20,7 +33,7 @@ def get_commit_history(repo_path: str) -> list[str]:
     """
     try:
         result = subprocess.run(
-            ["git", "rev-list", "--reverse", "--all"],
+            ["git", "rev-list", "--reverse", "--first-parent", ref],
             cwd=repo_path,
             capture_output=True,
             text=True,
@@ -65,27 +78,100 @@ def write_csv(file_path: str, sorted_data: list[tuple[str, str]]) -> None:
             writer.writerow([commit, energy])
 
 
-def reorder_commits(csv_file: str, repo_path: str, output_file: str) -> None:
+def reorder_commits(
+    csv_file: str,
+    repo_path: str,
+    output_file: str,
+    ref: str = "HEAD",
+    run_rows: int = RUN_ROWS,
+) -> None:
     """Reorders the rows of a CSV file containing commit hashes.
 
-    Reorders the rows of a CSV file containing commit hashes to match the chronological order of
-    commits in a Git repository, preserving duplicate entries, and writes the result to a new CSV file.
+    Reorders the rows of a CSV file containing commit hashes to match the first-parent history of
+    the measured branch, preserving duplicate entries and their relative order, and writes the result
+    to a new CSV file. The file is sorted externally: sorted runs of at most `run_rows` rows are
+    spilled to temporary files and merged, so memory does not grow with the size of the file.
 
     Args:
         csv_file (str): Path to the input CSV file where the first column contains commit hashes.
         repo_path (str): Path to the local Git repository to retrieve commit history.
         output_file (str): Path to the output CSV file where the reordered data will be written.
+        ref (str): The measured branch, whose first-parent history gives the order.
+        run_rows (int): Number of rows sorted in memory at a time.
 
     Notes:
-        - Rows with commit hashes not found in the repository history are placed at the end of the output file.
-        - Assumes the existence of helper functions: get_commit_history, read_csv, and write_csv.
+        - Rows with commit hashes not found in the history are placed at the end of the output file.
+        - Rows with fewer than two columns are skipped.
+    """
+    commit_order = {commit: i for i, commit in enumerate(get_commit_history(repo_path, ref))}
+    unknown = len(commit_order)
+
+    with tempfile.TemporaryDirectory(prefix="energytrackr_sort_") as tmp_dir:
+        runs: list[str] = []
+        with open(csv_file, newline="", encoding="utf-8") as csvfile:
+            rows = (row for row in csv.reader(csvfile) if len(row) >= EXPECTED_ROW_LENGTH)
+            # The input position breaks ties, so that the sort is stable across runs.
+            keyed = ((commit_order.get(row[0], unknown), seq, row) for seq, row in enumerate(rows))
+            for chunk in batched(keyed, run_rows, strict=False):
+                run = sorted(chunk, key=itemgetter(0, 1))
+                if not runs and len(chunk) < run_rows:
+                    # The whole file fits in one run: no need to spill it.
+                    _write_rows(output_file, (row for _, _, row in run))
+                    logging.info("Reordered CSV written to %s", output_file)
+                    return
+                runs.append(_spill_run(tmp_dir, len(runs), run))
+
+        _merge_runs(output_file, runs)
+    logging.info("Reordered CSV written to %s (%d sorted runs merged)", output_file, len(runs))
+
+
+def _merge_runs(file_path: str, runs: list[str]) -> None:
+    """Merge sorted runs into a CSV file.
+
+    Args:
+        file_path (str): The path to the CSV file.
+        runs (list[str]): The paths of the runs written by `_spill_run`.
+    """
+    with ExitStack() as stack:
+        readers = [_read_run(stack.enter_context(open(path, newline="", encoding="utf-8"))) for path in runs]
+        _write_rows(file_path, (row for _, _, row in heapq.merge(*readers, key=itemgetter(0, 1))))
+
+
+def _spill_run(tmp_dir: str, index: int, run: list[tuple[int, int, list[str]]]) -> str:
+    """Write a sorted run to a temporary file, prefixing each row with its sort key.
+
+    Args:
+        tmp_dir (str): The directory of the runs.
+        index (int): The index of the run.
+        run (list[tuple[int, int, list[str]]]): The sorted (position in history, input position, row) triples.
+
+    Returns:
+        str: The path of the run.
     """
-    commit_history = get_commit_history(repo_path)
-    csv_data = read_csv(csv_file)
+    path = os.path.join(tmp_dir, f"run_{index}.csv")
+    _write_rows(path, ([rank, seq, *row] for rank, seq, row in run))
+    return path
 
-    # Sort the list while preserving duplicates
-    commit_order = {commit: i for i, commit in enumerate(commit_history)}
-    sorted_data = sorted(csv_data, key=lambda x: commit_order.get(x[0], float("inf")))
 
-    write_csv(output_file, sorted_data)
-    logging.info("Reordered CSV written to %s", output_file)
+def _read_run(csvfile: TextIO) -> Iterator[tuple[int, int, list[str]]]:
+    """Read back a run written by `_spill_run`.
+
+    Args:
+        csvfile (TextIO): The open run.
+
+    Yields:
+        tuple[int, int, list[str]]: The (position in history, input position, row) triples, in order.
+    """
+    for rank, seq, *row in csv.reader(csvfile):
+        yield int(rank), int(seq), row
+
+
+def _write_rows(file_path: str, rows: Iterable[Sequence[object]]) -> None:
+    """Write rows to a CSV file.
+
+    Args:
+        file_path (str): The path to the CSV file.
+        rows (Iterable[Sequence[object]]): The rows.
+    """
+    with open(file_path, "w", newline="", encoding="utf-8") as csvfile:
+        csv.writer(csvfile).writerows(rows)
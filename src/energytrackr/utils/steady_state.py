@@ -0,0 +1,39 @@
+"""Detection of the warm-up transient at the start of a sequence of runs.
+
+The first runs of a commit after a build or a cooldown are often different from the following
+ones (JIT compilation, cold page cache, turbo budget). The MSER rule (Marginal Standard Error
+Rule, White 1997) picks the number of leading observations to drop that minimizes the standard
+error of the mean of the remaining ones; MSER-m applies it to the means of batches of m runs,
+which smooths the noise of single runs.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+DEFAULT_BATCH_SIZE = 5
+DEFAULT_MAX_FRACTION = 0.5
+
+
+def mser_truncation(
+    values: Sequence[float],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_fraction: float = DEFAULT_MAX_FRACTION,
+) -> int:
+    """Number of leading values to drop so that the rest is in steady state (MSER-m rule).
+
+    Args:
+        values (Sequence[float]): The values, in the order they were measured.
+        batch_size (int): Number of consecutive values averaged into a batch (m).
+        max_fraction (float): Largest fraction of the batches that may be dropped.
+
+    Returns:
+        int: The number of values to drop; 0 if there are too few values to decide.
+    """
+    n_batches = len(values) // batch_size
+    if not (max_dropped := int(n_batches * max_fraction)):
+        return 0
+    means = np.asarray(values[: n_batches * batch_size], dtype=float).reshape(n_batches, batch_size).mean(axis=1)
+    # MSER(d) = sum((x_i - mean)^2 for i > d) / (n - d)^2, i.e. the variance of the tail over its length.
+    statistics = [means[d:].var() / (n_batches - d) for d in range(max_dropped + 1)]
+    return int(np.argmin(statistics)) * batch_size
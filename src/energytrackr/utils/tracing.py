@@ -0,0 +1,277 @@
+"""Timing spans of the pipeline stages.
+
+Every `PipelineStage.run` is wrapped in a span recording the stage, its group, the commit, the
+process that ran it, its start and end times and its outcome. Like buffered log calls, spans
+recorded in worker processes are stored in the commit context (under ``"trace_spans"``) and
+merged into the main `tracer` when the context is returned.
+
+Spans can be exported as Chrome trace-event JSON (open it in ``chrome://tracing`` or Perfetto)
+and summarized per stage (count, total, median and 95th percentile durations).
+"""
+
+import functools
+import json
+import os
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+US_PER_S = 1_000_000
+P95 = 95
+
+
+@dataclass(frozen=True)
+class Span:
+    """A timed execution of a stage.
+
+    Attributes:
+        stage (str): Name of the stage class.
+        group (str): Stage group ("pre_stages", "pre_test_stages" or "batch_stages").
+        commit (str | None): Commit processed by the stage, if any.
+        pid (int): Process that ran the stage.
+        start (float): Start time, in seconds since the epoch.
+        end (float): End time, in seconds since the epoch.
+        outcome (str): "ok", "build_failed", "aborted" or "error" (the stage raised).
+    """
+
+    stage: str
+    group: str
+    commit: str | None
+    pid: int
+    start: float
+    end: float
+    outcome: str
+
+    @property
+    def duration(self) -> float:
+        """Duration of the span, in seconds."""
+        return self.end - self.start
+
+
+@dataclass(frozen=True)
+class StageSummary:
+    """Time spent in a stage over a campaign.
+
+    Attributes:
+        group (str): Stage group.
+        stage (str): Name of the stage class.
+        count (int): Number of runs of the stage.
+        total (float): Total time, in seconds.
+        p50 (float): Median duration of a run, in seconds.
+        p95 (float): 95th percentile of the duration of a run, in seconds.
+    """
+
+    group: str
+    stage: str
+    count: int
+    total: float
+    p50: float
+    p95: float
+
+
+class Tracer:
+    """Collects the spans of the stages run by this process."""
+
+    def __init__(self) -> None:
+        """Initialize an empty tracer."""
+        self.spans: list[Span] = []
+
+    def span(self, stage: str, group: str, context: dict[str, Any]) -> "StageTimer":
+        """Time the run of a stage on a context.
+
+        Args:
+            stage (str): Name of the stage.
+            group (str): Stage group.
+            context (dict[str, Any]): The context passed to the stage; the outcome is read from its
+                flags, and the span is buffered in it in worker processes.
+
+        Returns:
+            StageTimer: A context manager recording the span when the stage returns or raises.
+        """
+        return StageTimer(self, functools.partial(Span, stage=stage, group=group), context)
+
+    def record(self, span: Span, context: dict[str, Any]) -> None:
+        """Keep a finished span, buffering it in the context in worker processes.
+
+        Args:
+            span (Span): The span.
+            context (dict[str, Any]): The context passed to the stage.
+        """
+        if context.get("worker_process"):
+            context.setdefault("trace_spans", []).append(asdict(span))
+        else:
+            self.spans.append(span)
+
+    def merge(self, spans: Iterable[dict[str, Any]]) -> None:
+        """Add the spans buffered in a worker context.
+
+        Args:
+            spans (Iterable[dict[str, Any]]): The buffered spans, as dictionaries.
+        """
+        self.spans.extend(Span(**span) for span in spans)
+
+
+class StageTimer:
+    """Times the run of a stage, see `Tracer.span`."""
+
+    def __init__(self, owner: Tracer, span: Callable[..., Span], context: dict[str, Any]) -> None:
+        """Prepare the span of a stage.
+
+        Args:
+            owner (Tracer): The tracer keeping the span.
+            span (Callable[..., Span]): Builds the span from its commit, pid, times and outcome.
+            context (dict[str, Any]): The context passed to the stage.
+        """
+        self.owner = owner
+        self.span = span
+        self.context = context
+        self.flags = (context.get("build_failed"), context.get("abort_pipeline"))
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        """Start the clock."""
+        self.start = time.time()
+
+    def __exit__(self, exc_type: type[BaseException] | None, *_: object) -> None:
+        """Record the span; an exception raised by the stage is recorded as an error and propagates.
+
+        Args:
+            exc_type (type[BaseException] | None): The type of the exception raised by the stage, if any.
+        """
+        if exc_type is not None:
+            outcome = "error"
+        elif self.context.get("abort_pipeline") and not self.flags[1]:
+            outcome = "aborted"
+        elif self.context.get("build_failed") and not self.flags[0]:
+            outcome = "build_failed"
+        else:
+            outcome = "ok"
+        commit = self.context.get("commit")
+        span = self.span(
+            commit=str(getattr(commit, "hexsha", commit)) if commit is not None else None,
+            pid=os.getpid(),
+            start=self.start,
+            end=time.time(),
+            outcome=outcome,
+        )
+        self.owner.record(span, self.context)
+
+
+def to_chrome_trace(spans: Iterable[Span]) -> dict[str, Any]:
+    """Convert spans to the Chrome trace-event format.
+
+    Args:
+        spans (Iterable[Span]): The spans.
+
+    Returns:
+        dict[str, Any]: A trace with one complete ("X") event per span.
+    """
+    return {
+        "displayTimeUnit": "ms",
+        "traceEvents": [
+            {
+                "name": span.stage,
+                "cat": span.group,
+                "ph": "X",
+                "ts": span.start * US_PER_S,
+                "dur": span.duration * US_PER_S,
+                "pid": span.pid,
+                "tid": span.pid,
+                "args": {"commit": span.commit, "outcome": span.outcome},
+            }
+            for span in spans
+        ],
+    }
+
+
+def write_chrome_trace(spans: Iterable[Span], path: str | Path) -> None:
+    """Write spans as a Chrome trace-event JSON file.
+
+    Args:
+        spans (Iterable[Span]): The spans.
+        path (str | Path): The output file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(to_chrome_trace(spans)), encoding="utf-8")
+
+
+def read_chrome_trace(path: str | Path) -> list[Span]:
+    """Read the spans of a Chrome trace written by `write_chrome_trace`.
+
+    Args:
+        path (str | Path): The trace file.
+
+    Returns:
+        list[Span]: The spans.
+    """
+    events = json.loads(Path(path).read_text(encoding="utf-8"))["traceEvents"]
+    return [
+        Span(
+            stage=event["name"],
+            group=event["cat"],
+            commit=event["args"]["commit"],
+            pid=event["pid"],
+            start=event["ts"] / US_PER_S,
+            end=(event["ts"] + event["dur"]) / US_PER_S,
+            outcome=event["args"]["outcome"],
+        )
+        for event in events
+        if event.get("ph") == "X"
+    ]
+
+
+def summarize(spans: Iterable[Span]) -> list[StageSummary]:
+    """Summarize the time spent in each stage.
+
+    Args:
+        spans (Iterable[Span]): The spans.
+
+    Returns:
+        list[StageSummary]: One summary per (group, stage), by decreasing total time.
+    """
+    durations: defaultdict[tuple[str, str], list[float]] = defaultdict(list)
+    for span in spans:
+        durations[span.group, span.stage].append(span.duration)
+    summaries = [
+        StageSummary(
+            group=group,
+            stage=stage,
+            count=len(values),
+            total=float(np.sum(values)),
+            p50=float(np.percentile(values, 50)),
+            p95=float(np.percentile(values, P95)),
+        )
+        for (group, stage), values in durations.items()
+    ]
+    return sorted(summaries, key=lambda summary: summary.total, reverse=True)
+
+
+def format_summary(summaries: list[StageSummary]) -> str:
+    """Format stage summaries as a text table.
+
+    Args:
+        summaries (list[StageSummary]): The summaries.
+
+    Returns:
+        str: The table, one line per stage.
+    """
+    header = ("group", "stage", "count", "total (s)", "p50 (s)", "p95 (s)")
+    rows = [header] + [(s.group, s.stage, str(s.count), f"{s.total:.2f}", f"{s.p50:.3f}", f"{s.p95:.3f}") for s in summaries]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    # Names are left-aligned, numbers right-aligned.
+    return "\n".join(
+        "  ".join([
+            *(c.ljust(w) for c, w in zip(row[:2], widths[:2], strict=True)),
+            *(c.rjust(w) for c, w in zip(row[2:], widths[2:], strict=True)),
+        ])
+        for row in rows
+    )
+
+
+tracer = Tracer()
@@ -1,5 +1,6 @@
 """Utility functions."""
 
+import asyncio
 import math
 import subprocess
 from pathlib import Path
@@ -8,6 +9,7 @@ from typing import Any
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from energytrackr.config.config_store import Config
+from energytrackr.utils.command_runner import run_command_async
 from energytrackr.utils.logger import logger
 
 
@@ -16,7 +18,10 @@ def run_command(
     cwd: str | None = None,
     context: dict[str, Any] | None = None,
 ) -> subprocess.CompletedProcess[str]:
-    """Executes a shell command, streaming and capturing its output in real time.
+    """Executes a shell command, capturing the tail of its output.
+
+    The command runs in its own process group, which is terminated as a whole if it exceeds
+    `config.timeout`; only the last `config.max_command_output` bytes of stdout and stderr are kept.
 
     Args:
         arg (str): The command to run.
@@ -26,31 +31,24 @@ def run_command(
     Returns:
         subprocess.CompletedProcess[str]: The completed process object containing the command's output and return code.
 
+    Raises:
+        subprocess.TimeoutExpired: If the command timed out (after its process group was terminated).
     """
     logger.info("Running command: %s", arg, context=context)
-    with subprocess.Popen(
-        arg,
-        cwd=cwd,
-        shell=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,  # Ensures stdout and stderr are returned as strings
-    ) as process:
-        config = Config.get_config()
-        stdout, stderr = process.communicate(timeout=config.timeout)
-        retcode = process.returncode
-
-    if retcode:
-        logger.error("Command failed with return code %d", retcode, context=context)
-        logger.error("stdout: %s", stdout, context=context)
-        logger.error("stderr: %s", stderr, context=context)
-
-    return subprocess.CompletedProcess(
-        args=arg,
-        returncode=retcode,
-        stdout=stdout,
-        stderr=stderr,
-    )
+    config = Config.get_config()
+    try:
+        result = asyncio.run(run_command_async(arg, cwd=cwd, timeout=config.timeout, max_output=config.max_command_output))
+    except subprocess.TimeoutExpired as e:
+        logger.error("Command timed out after %ss; its process group was terminated.", config.timeout, context=context)
+        logger.error("stderr: %s", e.stderr, context=context)
+        raise
+
+    if result.returncode:
+        logger.error("Command failed with return code %d", result.returncode, context=context)
+        logger.error("stdout: %s", result.stdout, context=context)
+        logger.error("stderr: %s", result.stderr, context=context)
+
+    return result
 
 
 def nice_number(x: float) -> float:
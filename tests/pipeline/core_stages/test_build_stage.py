@@ -1,5 +1,6 @@
 """Unit tests for the BuildStage class in the pipeline.core_stages module."""
 
+import subprocess
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -17,6 +18,7 @@ def mock_config() -> MagicMock:
     config = MagicMock()
     config.execution_plan.compile_commands = ["make build", "make test"]
     config.execution_plan.ignore_failures = False
+    config.build_cache.enabled = False
     return config
 
 
@@ -33,6 +35,7 @@ def test_build_stage_success() -> None:
     ):
         mock_config.return_value.execution_plan.compile_commands = ["make"]
         mock_config.return_value.execution_plan.ignore_failures = False
+        mock_config.return_value.build_cache.enabled = False
         stage = BuildStage()
         stage.run(context)
 
@@ -65,3 +68,70 @@ def test_build_stage_fail_ignore(monkeypatch: MagicMock, mock_config: MagicMock)
 
     assert context["build_failed"] is True
     assert context.get("abort_pipeline") is not True
+
+
+def test_build_stage_restores_from_cache(monkeypatch: MagicMock, mock_config: MagicMock) -> None:
+    """Test that the build commands are skipped on a build cache hit."""
+    cache = MagicMock()
+    cache.restore.return_value = True
+    run_mock = MagicMock()
+    monkeypatch.setattr("energytrackr.config.config_store.Config.get_config", lambda: mock_config)
+    monkeypatch.setattr("energytrackr.pipeline.core_stages.build_stage.BuildCache.from_config", lambda *_: cache)
+    monkeypatch.setattr("energytrackr.pipeline.core_stages.build_stage.git.Repo", MagicMock())
+    monkeypatch.setattr("energytrackr.pipeline.core_stages.build_stage.run_command", run_mock)
+
+    context = {"commit": "abc123", "repo_path": "/tmp/repo", "build_failed": False, "abort_pipeline": False}
+    BuildStage().run(context)
+
+    run_mock.assert_not_called()
+    cache.store.assert_not_called()
+    assert context["build_cache_hit"] is True
+
+
+def test_build_stage_stores_in_cache(monkeypatch: MagicMock, mock_config: MagicMock) -> None:
+    """Test that a successful build is stored in the build cache."""
+    cache = MagicMock()
+    cache.restore.return_value = False
+    cache.key_for.return_value = "key"
+    monkeypatch.setattr("energytrackr.config.config_store.Config.get_config", lambda: mock_config)
+    monkeypatch.setattr("energytrackr.pipeline.core_stages.build_stage.BuildCache.from_config", lambda *_: cache)
+    monkeypatch.setattr("energytrackr.pipeline.core_stages.build_stage.git.Repo", MagicMock())
+    monkeypatch.setattr(
+        "energytrackr.pipeline.core_stages.build_stage.run_command",
+        MagicMock(return_value=MagicMock(returncode=0)),
+    )
+
+    context = {"commit": "abc123", "repo_path": "/tmp/repo", "build_failed": False, "abort_pipeline": False}
+    BuildStage().run(context)
+
+    cache.store.assert_called_once()
+    assert cache.store.call_args.args[0] == "key"
+    assert not context["build_failed"]
+
+
+@pytest.mark.parametrize(
+    ("outcome", "transient"),
+    [(2, False), (137, True), (-9, True), (subprocess.TimeoutExpired("make", 60), True)],
+)
+def test_build_stage_flags_transient_failures(
+    monkeypatch: pytest.MonkeyPatch,
+    mock_config: MagicMock,
+    outcome: int | subprocess.TimeoutExpired,
+    transient: bool,
+) -> None:
+    """A build command that timed out or was killed by a signal is a transient failure."""
+
+    def run(*_args: object, **_kwargs: object) -> MagicMock:
+        if isinstance(outcome, subprocess.TimeoutExpired):
+            raise outcome
+        return MagicMock(returncode=outcome)
+
+    mock_config.execution_plan.ignore_failures = True
+    monkeypatch.setattr("energytrackr.config.config_store.Config.get_config", lambda: mock_config)
+    monkeypatch.setattr("energytrackr.pipeline.core_stages.build_stage.run_command", run)
+    context: dict[str, bool] = {}
+
+    BuildStage().run(context)
+
+    assert context["build_failed"] is True
+    assert context["transient_failure"] is transient
@@ -1,15 +1,57 @@
 """Unit tests for the CopyDirectoryStage class."""
 
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Any
 
+import git
 import pytest
 
+from energytrackr.config.config_model import WorkspaceStrategyEnum
+from energytrackr.config.config_store import Config
 from energytrackr.pipeline.core_stages.copy_directory_stage import CopyDirectoryStage
 from energytrackr.utils.exceptions import SourceDirectoryNotFoundError
 
 
-def test_copy_directory_success(tmp_path: Path) -> None:
+@pytest.fixture
+def strategy(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    """Stub Config.get_config() to return a configurable workspace strategy.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): The pytest monkeypatch fixture.
+
+    Returns:
+        SimpleNamespace: The stub configuration, whose workspace_strategy can be changed by tests.
+    """
+    cfg = SimpleNamespace(workspace_strategy=WorkspaceStrategyEnum.COPY)
+    monkeypatch.setattr(Config, "get_config", classmethod(lambda _: cfg))
+    return cfg
+
+
+@pytest.fixture
+def git_source(tmp_path: Path) -> tuple[Path, list[str]]:
+    """Fixture to create a repository with two commits.
+
+    Args:
+        tmp_path (Path): The temporary path to create the repository.
+
+    Returns:
+        tuple[Path, list[str]]: The repository path and the commit hashes, oldest first.
+    """
+    source_dir = tmp_path / "source"
+    repo = git.Repo.init(source_dir)
+    with repo.config_writer() as cw:
+        cw.set_value("user", "name", "Test")
+        cw.set_value("user", "email", "test@example.com")
+    shas: list[str] = []
+    for content in ("v1", "v2"):
+        (source_dir / "file.txt").write_text(content, encoding="utf-8")
+        repo.index.add(["file.txt"])
+        shas.append(repo.index.commit(content).hexsha)
+    return source_dir, shas
+
+
+def test_copy_directory_success(tmp_path: Path, strategy: SimpleNamespace) -> None:  # noqa: ARG001
     """Test CopyDirectoryStage with a valid source directory."""
     source_dir = tmp_path / "source"
     source_dir.mkdir()
@@ -25,7 +67,7 @@ def test_copy_directory_success(tmp_path: Path) -> None:
     assert (target_dir / "file.txt").read_text() == "test"
 
 
-def test_copy_directory_target_exists(tmp_path: Path) -> None:
+def test_copy_directory_target_exists(tmp_path: Path, strategy: SimpleNamespace) -> None:  # noqa: ARG001
     """Test CopyDirectoryStage with existing target directory."""
     source_dir = tmp_path / "source"
     target_dir = tmp_path / "source_abc123"
@@ -44,10 +86,36 @@ def test_copy_directory_target_exists(tmp_path: Path) -> None:
     assert not (target_dir / "file.txt").exists()  # was never copied again
 
 
-def test_copy_directory_source_not_found(tmp_path: Path) -> None:
+def test_copy_directory_source_not_found(tmp_path: Path, strategy: SimpleNamespace) -> None:  # noqa: ARG001
     """Test CopyDirectoryStage with a non-existent source directory."""
     context: dict[str, Any] = {"repo_path": str(tmp_path / "nonexistent"), "commit": "abc123"}
 
     stage = CopyDirectoryStage()
     with pytest.raises(SourceDirectoryNotFoundError):
         stage.run(context)
+
+
+@pytest.mark.parametrize(
+    "workspace_strategy",
+    [WorkspaceStrategyEnum.WORKTREE, WorkspaceStrategyEnum.SHARED_CLONE, WorkspaceStrategyEnum.REFLINK],
+)
+def test_git_workspace_strategies(
+    git_source: tuple[Path, list[str]],
+    strategy: SimpleNamespace,
+    workspace_strategy: WorkspaceStrategyEnum,
+) -> None:
+    """Test that every strategy produces a workspace at the requested commit."""
+    source_dir, shas = git_source
+    strategy.workspace_strategy = workspace_strategy
+    context: dict[str, Any] = {"repo_path": str(source_dir), "commit": shas[0]}
+
+    CopyDirectoryStage().run(context)
+
+    target_dir = Path(f"{source_dir}_{shas[0]}")
+    assert not context.get("abort_pipeline")
+    assert (target_dir / "file.txt").read_text(encoding="utf-8") in {"v1", "v2"}
+    if workspace_strategy != WorkspaceStrategyEnum.REFLINK:
+        # worktree and shared clone check the commit out themselves
+        assert git.Repo(target_dir).head.commit.hexsha == shas[0]
+    if workspace_strategy == WorkspaceStrategyEnum.WORKTREE:
+        assert (target_dir / ".git").is_file()
@@ -7,6 +7,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from energytrackr.pipeline.core_stages.measure_stage import MeasureEnergyStage
+from energytrackr.pipeline.task_journal import MeasurementTask, TaskJournal
 
 
 class DummyCommit:
@@ -47,9 +48,15 @@ def mock_config() -> SimpleNamespace:
         class ExecutionPlan:
             test_command = "run-tests.sh"
             ignore_failures = False
+            measurement_backend = "perf"
+            warmup_runs = 0
+            schedule = SimpleNamespace(strategy="sequential", seed=None)
+            perf_events = ["power/energy-pkg/"]  # noqa: RUF012
 
         execution_plan = ExecutionPlan()
         repo = SimpleNamespace(url="some/repo", branch="main")
+        results = SimpleNamespace(format="csv", flush_every=1, dataset=None)
+        cpu_thermal_file = "/nonexistent/temp"
 
     with patch("energytrackr.pipeline.core_stages.measure_stage.Config.get_config", return_value=DummyConfig()):
         yield DummyConfig()
@@ -58,7 +65,7 @@ def mock_config() -> SimpleNamespace:
 @patch("energytrackr.pipeline.core_stages.measure_stage.run_command")
 def test_measure_energy_success(mock_run: MagicMock, dummy_context: dict[str, str], mock_config: SimpleNamespace) -> None:  # noqa: ARG001
     """Test the MeasureEnergyStage with a successful run."""
-    mock_run.return_value = SimpleNamespace(returncode=0, stdout="42 power/energy-pkg/", stderr="")
+    mock_run.return_value = SimpleNamespace(returncode=0, stdout="", stderr="42.00,Joules,power/energy-pkg/,1000,100.00,,")
     dummy_context["repo_path"] = str(Path(dummy_context["repo_path"]))
     Path(dummy_context["repo_path"]).mkdir(parents=True, exist_ok=True)
 
@@ -69,7 +76,7 @@ def test_measure_energy_success(mock_run: MagicMock, dummy_context: dict[str, st
     output_files = list(output_dir.glob("energy_results_*.csv"))
 
     assert output_files
-    assert output_files[0].read_text().strip() == "abc123,42"
+    assert output_files[0].read_text().strip() == "abc123,42.00"
 
 
 @patch("energytrackr.pipeline.core_stages.measure_stage.run_command")
@@ -113,6 +120,9 @@ def test_measure_energy_no_test_command(mock_run: MagicMock, dummy_context: dict
         class ExecutionPlan:
             test_command = ""
             ignore_failures = False
+            measurement_backend = "perf"
+            warmup_runs = 0
+            schedule = SimpleNamespace(strategy="sequential", seed=None)
 
         execution_plan = ExecutionPlan()
 
@@ -132,6 +142,9 @@ def test_measure_energy_build_failed_skips(mock_run: MagicMock, dummy_context: d
         class ExecutionPlan:
             test_command = "run"
             ignore_failures = False
+            measurement_backend = "perf"
+            warmup_runs = 0
+            schedule = SimpleNamespace(strategy="sequential", seed=None)
 
         execution_plan = ExecutionPlan()
 
@@ -181,7 +194,7 @@ def test_measure_energy_perf_fails_but_data_saved(
 ) -> None:
     """Test that energy data is still extracted and saved even if perf fails but ignore_failures is True."""
     mock_config.execution_plan.ignore_failures = True
-    mock_run.return_value = SimpleNamespace(returncode=1, stdout="42 power/energy-pkg/", stderr="")
+    mock_run.return_value = SimpleNamespace(returncode=1, stdout="", stderr="42.00,Joules,power/energy-pkg/,1000,100.00,,")
 
     dummy_context["repo_path"] = str(Path(dummy_context["repo_path"]))
     Path(dummy_context["repo_path"]).mkdir(parents=True, exist_ok=True)
@@ -193,5 +206,210 @@ def test_measure_energy_perf_fails_but_data_saved(
     output_files = list(output_dir.glob("energy_results_*.csv"))
 
     assert output_files
-    assert output_files[0].read_text().strip() == "abc123,42"
+    assert output_files[0].read_text().strip() == "abc123,42.00"
     assert dummy_context["abort_pipeline"] is False
+
+
+@patch("energytrackr.pipeline.core_stages.measure_stage.run_command")
+def test_measure_energy_rapl_backend(
+    mock_run: MagicMock,
+    dummy_context: dict[str, str],
+    tmp_path: Path,
+) -> None:
+    """Test that the RAPL backend writes one value per domain, in joules, without calling perf."""
+    powercap = tmp_path / "powercap"
+    for zone, name in (("intel-rapl:0", "package-0"), ("intel-rapl:0:0", "core")):
+        (powercap / zone).mkdir(parents=True)
+        (powercap / zone / "name").write_text(name)
+        (powercap / zone / "max_energy_range_uj").write_text("1000000000")
+        (powercap / zone / "energy_uj").write_text("1000000")
+
+    def workload(cmd: str, context: dict[str, str]) -> SimpleNamespace:  # noqa: ARG001
+        (powercap / "intel-rapl:0" / "energy_uj").write_text("3500000")
+        (powercap / "intel-rapl:0:0" / "energy_uj").write_text("1250000")
+        return SimpleNamespace(returncode=0, stdout="", stderr="")
+
+    mock_run.side_effect = workload
+    dummy_context["repo_path"] = str(tmp_path / ".cache" / ".cache_project")
+
+    class DummyConfig:
+        class ExecutionPlan:
+            test_command = "run-tests.sh"
+            ignore_failures = False
+            measurement_backend = "rapl"
+            warmup_runs = 0
+            schedule = SimpleNamespace(strategy="sequential", seed=None)
+
+        execution_plan = ExecutionPlan()
+        powercap_dir = str(powercap)
+        results = SimpleNamespace(format="csv", flush_every=1, dataset=None)
+        cpu_thermal_file = "/nonexistent/temp"
+
+    with patch("energytrackr.pipeline.core_stages.measure_stage.Config.get_config", return_value=DummyConfig()):
+        stage = MeasureEnergyStage()
+        stage.run(dummy_context)
+
+    mock_run.assert_called_once_with("run-tests.sh", context=dummy_context)
+    output_dir = Path(dummy_context["repo_path"]).parent.parent / "energy_measurements"
+    output_files = list(output_dir.glob("energy_results_*.csv"))
+    assert output_files
+    assert output_files[0].read_text().strip() == "abc123,2.500000,0.250000"
+
+
+def test_parse_perf_output_multiple_events() -> None:
+    """Test that every requested event is parsed from a single `perf stat -x,` output."""
+    output = "\n".join([
+        "test output, with commas",
+        "12.50,Joules,power/energy-pkg/,1001234,100.00,,",
+        "3.25,Joules,power/energy-cores/,1001234,100.00,,",
+        "<not supported>,Joules,power/energy-gpu/,0,100.00,,",
+    ])
+
+    readings = MeasureEnergyStage.parse_perf_output(
+        output,
+        ["power/energy-pkg/", "power/energy-cores/", "power/energy-gpu/", "power/energy-ram/"],
+    )
+
+    assert readings == {
+        "power/energy-pkg/": "12.50",
+        "power/energy-cores/": "3.25",
+        "power/energy-gpu/": None,
+        "power/energy-ram/": None,
+    }
+
+
+@patch("energytrackr.pipeline.core_stages.measure_stage.run_command")
+def test_measure_energy_multiple_events_single_run(
+    mock_run: MagicMock,
+    dummy_context: dict[str, str],
+    mock_config: SimpleNamespace,
+    tmp_path: Path,
+) -> None:
+    """Test that all configured events are collected with one perf invocation and written in order."""
+    mock_config.execution_plan.perf_events = ["power/energy-pkg/", "power/energy-cores/"]
+    mock_run.return_value = SimpleNamespace(
+        returncode=0,
+        stdout="",
+        stderr="1.50,Joules,power/energy-cores/,1000,100.00,,\n9.00,Joules,power/energy-pkg/,1000,100.00,,",
+    )
+    dummy_context["repo_path"] = str(tmp_path / ".cache" / ".cache_project")
+
+    stage = MeasureEnergyStage()
+    stage.run(dummy_context)
+
+    mock_run.assert_called_once_with(
+        "perf stat -x, -e power/energy-pkg/,power/energy-cores/ run-tests.sh",
+        context=dummy_context,
+    )
+    output_files = list((tmp_path / "energy_measurements").glob("energy_results_*.csv"))
+    assert output_files
+    assert output_files[0].read_text().strip() == "abc123,9.00,1.50"
+
+
+@patch("energytrackr.pipeline.core_stages.measure_stage.run_command")
+def test_measure_energy_buffered_journal_marked_on_flush(
+    mock_run: MagicMock,
+    dummy_context: dict[str, str],
+    mock_config: SimpleNamespace,
+    tmp_path: Path,
+) -> None:
+    """Test that buffered runs are written and journaled only when the buffer is flushed."""
+    mock_config.results.flush_every = 10
+    mock_run.return_value = SimpleNamespace(returncode=0, stdout="", stderr="42.00,Joules,power/energy-pkg/,1000,100.00,,")
+    journal = MagicMock(dataset=None)
+    dummy_context["repo_path"] = str(tmp_path / ".cache" / ".cache_project")
+    dummy_context["journal"] = journal
+    dummy_context["task"] = MeasurementTask(DummyCommit(), run_index=3)
+
+    stage = MeasureEnergyStage()
+    stage.run(dummy_context)
+
+    assert not list((tmp_path / "energy_measurements").glob("energy_results_*.csv"))
+    journal.mark_done.assert_not_called()
+
+    stage.flush()
+
+    output_files = list((tmp_path / "energy_measurements").glob("energy_results_*.csv"))
+    assert output_files[0].read_text().strip() == "abc123,42.00"
+    journal.mark_done.assert_called_once_with(dummy_context["task"])
+
+
+@patch("energytrackr.pipeline.core_stages.measure_stage.run_command")
+def test_resumed_campaign_appends_to_same_file(
+    mock_run: MagicMock,
+    dummy_context: dict[str, object],
+    mock_config: SimpleNamespace,  # noqa: ARG001
+    tmp_path: Path,
+) -> None:
+    """Test that a campaign resumed by a later invocation writes to the result file of the campaign."""
+    mock_run.return_value = SimpleNamespace(returncode=0, stdout="", stderr="42.00,Joules,power/energy-pkg/,1000,100.00,,")
+    journal_path = tmp_path / "energy_measurements" / "task_journal.jsonl"
+    dummy_context["repo_path"] = str(tmp_path / ".cache" / ".cache_project")
+    dummy_context["journal"] = TaskJournal(journal_path)
+    dummy_context["task"] = MeasurementTask(DummyCommit(), run_index=0)
+    stage = MeasureEnergyStage()
+    stage.timestamp = "first"
+    stage.run(dummy_context)
+    stage.flush()
+    # Interrupted here: a new invocation resumes the campaign with a new stage.
+    dummy_context["journal"] = TaskJournal(journal_path, resume=True)
+    dummy_context["task"] = MeasurementTask(DummyCommit(), run_index=1)
+    resumed = MeasureEnergyStage()
+    resumed.timestamp = "second"
+    resumed.run(dummy_context)
+    resumed.flush()
+
+    output_files = list((tmp_path / "energy_measurements").glob("energy_results_*.csv"))
+    assert [path.name for path in output_files] == ["energy_results_first.csv"]
+    assert output_files[0].read_text().splitlines() == ["abc123,42.00", "abc123,42.00"]
+    assert TaskJournal(journal_path, resume=True).completed == {("abc123", 0, 0), ("abc123", 1, 0)}
+
+
+@patch("energytrackr.pipeline.core_stages.measure_stage.read_cpu_frequency_mhz", side_effect=[2000.0, 3000.0])
+@patch("energytrackr.pipeline.core_stages.measure_stage.MeasureEnergyStage._read_temperature", side_effect=[45000.0, 52000.0])
+@patch("energytrackr.pipeline.core_stages.measure_stage.run_command")
+def test_measure_energy_records_covariates(
+    mock_run: MagicMock,
+    mock_temperature: MagicMock,  # noqa: ARG001
+    mock_frequency: MagicMock,  # noqa: ARG001
+    dummy_context: dict[str, str],
+    mock_config: SimpleNamespace,  # noqa: ARG001
+) -> None:
+    """Test that the temperatures before and after, the mean frequency and the load are recorded."""
+    mock_run.return_value = SimpleNamespace(returncode=0, stdout="", stderr="42.00,Joules,power/energy-pkg/,1000,100.00,,")
+
+    MeasureEnergyStage().run(dummy_context)
+
+    record = dummy_context["record"]
+    assert (record.cpu_temperature, record.end_temperature) == (45000.0, 52000.0)
+    assert record.cpu_frequency_mhz == pytest.approx(2500.0)
+    assert record.loadavg is not None
+    assert record.duration_s is not None
+
+
+@patch("energytrackr.pipeline.core_stages.measure_stage.run_command")
+def test_measure_energy_warmup_runs(
+    mock_run: MagicMock,
+    dummy_context: dict[str, str],
+    mock_config: SimpleNamespace,
+    tmp_path: Path,
+) -> None:
+    """Test that the first run of a commit after its build is preceded by warm-up runs, left out of the CSV."""
+    mock_run.return_value = SimpleNamespace(returncode=0, stdout="", stderr="42.00,Joules,power/energy-pkg/,1000,100.00,,")
+    mock_config.execution_plan.warmup_runs = 2
+    dummy_context["repo_path"] = str(tmp_path / ".cache" / ".cache_project")
+
+    stage = MeasureEnergyStage()
+    stage.run(dummy_context)
+    stage.run(dummy_context)
+    assert mock_run.call_count == 4  # noqa: PLR2004
+    stage.flush()
+    stage.run(dummy_context)
+    assert mock_run.call_count == 5  # noqa: PLR2004
+    stage.forget_commits(["abc123"])
+    stage.run(dummy_context)
+    stage.flush()
+
+    assert mock_run.call_count == 8  # noqa: PLR2004
+    output_file = next((tmp_path / "energy_measurements").glob("energy_results_*.csv"))
+    assert output_file.read_text().splitlines() == ["abc123,42.00"] * 4
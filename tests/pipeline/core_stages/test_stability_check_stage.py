@@ -0,0 +1,104 @@
+"""Tests for the StabilityCheckStage class."""
+
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from energytrackr.config.config_model import StabilityCheckDefinition
+from energytrackr.pipeline.core_stages import stability_check_stage
+from energytrackr.pipeline.core_stages.stability_check_stage import StabilityCheckStage
+from energytrackr.utils.rapl import RaplDomain, RaplSampler, StabilityResult
+
+SETTINGS = StabilityCheckDefinition(enabled=True, max_attempts=3, retry_wait_s=5.0)
+POWERCAP_DIR = "/custom/powercap"
+
+
+@pytest.fixture
+def domain(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> RaplDomain:
+    """A fake package counter, returned by the discovery of the stage.
+
+    Args:
+        tmp_path (Path): The temporary path fixture.
+        monkeypatch (pytest.MonkeyPatch): The pytest monkeypatch fixture.
+
+    Returns:
+        RaplDomain: The fake domain.
+    """
+    (tmp_path / "energy_uj").write_text("1000\n", encoding="utf-8")
+    fake = RaplDomain(name="package-0", zone="intel-rapl:0", energy_path=tmp_path / "energy_uj", max_energy_uj=10**9)
+    monkeypatch.setattr(stability_check_stage, "discover_domains", lambda root: [fake] if root == POWERCAP_DIR else [])
+    return fake
+
+
+def stub_results(monkeypatch: pytest.MonkeyPatch, *stable: bool) -> list[float]:
+    """Make the stability tests return the given outcomes, in order, and record the sleeps.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): The pytest monkeypatch fixture.
+        *stable (bool): Outcome of each test.
+
+    Returns:
+        list[float]: The recorded sleep durations.
+    """
+    results = iter(StabilityResult(stable=value, median_w=10.0, max_z=1.0 if value else 9.0, windows=40) for value in stable)
+    monkeypatch.setattr(RaplSampler, "stability_test", lambda *_args: next(results))
+    sleeps: list[float] = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    return sleeps
+
+
+@pytest.mark.usefixtures("domain")
+def test_retries_until_stable(monkeypatch: pytest.MonkeyPatch) -> None:
+    """An unstable test is retried after a wait, with the same sampler."""
+    sleeps = stub_results(monkeypatch, False, True)
+    stage = StabilityCheckStage(SETTINGS, POWERCAP_DIR)
+    context: dict[str, bool] = {"abort_pipeline": False}
+
+    stage.run(context)
+
+    assert not context["abort_pipeline"]
+    assert sleeps == [SETTINGS.retry_wait_s]
+    sampler = stage.sampler
+    stub_results(monkeypatch, True)
+    assert stage.wait_until_stable()
+    assert stage.sampler is sampler
+    stage.close()
+
+
+@pytest.mark.usefixtures("domain")
+def test_aborts_when_never_stable(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The pipeline is aborted once every attempt failed."""
+    sleeps = stub_results(monkeypatch, False, False, False)
+    stage = StabilityCheckStage(SETTINGS, POWERCAP_DIR)
+    context: dict[str, bool] = {"abort_pipeline": False}
+
+    stage.run(context)
+
+    assert context["abort_pipeline"]
+    assert len(sleeps) == SETTINGS.max_attempts - 1
+    stage.close()
+
+
+def test_without_counter_proceeds(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without a readable RAPL counter, nothing is checked."""
+    monkeypatch.setattr(stability_check_stage, "discover_domains", lambda _root: [])
+
+    assert StabilityCheckStage(SETTINGS, POWERCAP_DIR).wait_until_stable()
+
+
+@pytest.mark.usefixtures("domain")
+def test_uses_configured_powercap_dir(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without an explicit directory, the counter is looked up where the RAPL measurements read it."""
+    stub_results(monkeypatch, True)
+    monkeypatch.setattr(
+        stability_check_stage.Config,
+        "get_config",
+        lambda: SimpleNamespace(powercap_dir=POWERCAP_DIR),
+    )
+    stage = StabilityCheckStage(SETTINGS)
+
+    assert stage.wait_until_stable()
+    assert stage.sampler is not None
+    stage.close()
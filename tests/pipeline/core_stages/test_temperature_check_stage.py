@@ -1,6 +1,7 @@
 """Tests for the TemperatureCheckStage class."""
 
 import logging
+import math
 import time
 from pathlib import Path
 from types import SimpleNamespace
@@ -8,7 +9,9 @@ from typing import Any
 
 import pytest
 
+from energytrackr.config.config_model import CooldownDefinition
 from energytrackr.config.config_store import Config
+from energytrackr.pipeline.core_stages import temperature_check_stage
 from energytrackr.pipeline.core_stages.temperature_check_stage import TemperatureCheckStage
 from energytrackr.utils.logger import logger
 
@@ -41,43 +44,12 @@ def dummy_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> tuple[Any,
     """
     fake_file = tmp_path / "dummy_temp"
     fake_file.write_text("0")
-    limits = SimpleNamespace(temperature_safe_limit=6000)
+    limits = SimpleNamespace(temperature_safe_limit=6000, cooldown=CooldownDefinition())
     cfg = SimpleNamespace(cpu_thermal_file=str(fake_file), limits=limits)
     monkeypatch.setattr(Config, "get_config", classmethod(lambda _: cfg))
     return fake_file, cfg
 
 
-def test_read_cpu_temp_success(tmp_path: Path) -> None:
-    """Test that the function reads the CPU temperature correctly.
-
-    Args:
-        tmp_path (Path): The temporary path fixture.
-    """
-    temperature = 42000
-    f = tmp_path / "t"
-    f.write_text(f" {temperature}\n")
-    assert TemperatureCheckStage._read_cpu_temp(str(f)) == temperature
-
-
-def test_read_cpu_temp_file_not_found() -> None:
-    """Test that the function raises an OSError if the file does not exist."""
-    missing = "/nonexistent/path"
-    with pytest.raises(OSError):
-        TemperatureCheckStage._read_cpu_temp(missing)
-
-
-def test_read_cpu_temp_invalid_content(tmp_path: Path) -> None:
-    """Test that the function raises a ValueError if the content is not an integer.
-
-    Args:
-        tmp_path (Path): The temporary path fixture.
-    """
-    f = tmp_path / "t"
-    f.write_text("not-an-int")
-    with pytest.raises(ValueError):
-        TemperatureCheckStage._read_cpu_temp(str(f))
-
-
 def test_run_immediate_under_limit(
     dummy_config: tuple[Any, SimpleNamespace],
     caplog: pytest.LogCaptureFixture,
@@ -122,7 +94,7 @@ def test_run_two_reads_above_then_below(
     """
     _, _ = dummy_config
     seq = [7000, 5000]
-    monkeypatch.setattr(TemperatureCheckStage, "_read_cpu_temp", staticmethod(lambda _: seq.pop(0)))
+    monkeypatch.setattr(temperature_check_stage, "read_cpu_temperature", lambda _: seq.pop(0))
 
     caplog.set_level(logging.WARNING, logger=logger.name)
 
@@ -150,11 +122,7 @@ def test_run_read_error_breaks(
         exc (OSError | ValueError): The exception to raise during the test.
         no_sleep (list[int]): The list to record sleep calls.
     """
-    monkeypatch.setattr(
-        TemperatureCheckStage,
-        "_read_cpu_temp",
-        staticmethod(lambda _: (_ for _ in ()).throw(exc)),
-    )
+    monkeypatch.setattr(temperature_check_stage, "read_cpu_temperature", lambda _: (_ for _ in ()).throw(exc))
 
     caplog.set_level(logging.WARNING, logger=logger.name)
 
@@ -165,3 +133,67 @@ def test_run_read_error_breaks(
         rec.levelno == logging.WARNING and "Could not read or parse temperature" in rec.getMessage() for rec in caplog.records
     )
     assert no_sleep == []
+
+
+def test_run_sleeps_for_predicted_cooldown(
+    monkeypatch: pytest.MonkeyPatch,
+    dummy_config: tuple[Any, SimpleNamespace],
+) -> None:
+    """Test that once the cooling curve is learned, the stage sleeps for the predicted time instead of polling.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): The pytest monkeypatch fixture.
+        dummy_config (tuple[Any, SimpleNamespace]): The dummy configuration.
+    """
+    _, cfg = dummy_config
+    cfg.limits.temperature_safe_limit = 50000
+    tau, ambient, start_temp = 10.0, 30000.0, 70000.0
+    clock = [0.0]
+    sleeps: list[float] = []
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(time, "sleep", fake_sleep)
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(
+        temperature_check_stage,
+        "read_cpu_temperature",
+        lambda _: int(ambient + (start_temp - ambient) * math.exp(-clock[0] / tau)),
+    )
+
+    context: dict[str, Any] = {}
+    TemperatureCheckStage().run(context)
+
+    expected = tau * math.log(2)
+    max_sleeps = 4
+    assert sleeps[:2] == [2, 2]
+    assert len(sleeps) <= max_sleeps
+    assert expected <= context["cooldown_s"] < expected + 1
+
+
+def test_run_warm_steady_warms_up_cold_cpu(
+    monkeypatch: pytest.MonkeyPatch,
+    dummy_config: tuple[Any, SimpleNamespace],
+    no_sleep: list[Any],
+) -> None:
+    """Test that in warm-steady mode a CPU below the band is warmed up before proceeding.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): The pytest monkeypatch fixture.
+        dummy_config (tuple[Any, SimpleNamespace]): The dummy configuration.
+        no_sleep (list[Any]): The list to record sleep calls.
+    """
+    _, cfg = dummy_config
+    cfg.limits.cooldown = CooldownDefinition(mode="warm_steady", band=1000)
+    seq = [4000, 4500, 5500]
+    warm_ups: list[float] = []
+    monkeypatch.setattr(temperature_check_stage, "read_cpu_temperature", lambda _: seq.pop(0))
+    monkeypatch.setattr(TemperatureCheckStage, "_warm_up", staticmethod(lambda s: warm_ups.append(s) or s))
+
+    TemperatureCheckStage().run(context={})
+
+    assert warm_ups == [1.0, 1.0]
+    assert not seq
+    assert no_sleep == []
@@ -0,0 +1,143 @@
+"""Unit tests for the adaptive sampler."""
+
+from dataclasses import dataclass
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from energytrackr.config.config_model import (
+    AdaptiveSamplingDefinition,
+    ExecutionPlanDefinition,
+    ScheduleDefinition,
+    SteadyStateDefinition,
+)
+from energytrackr.pipeline.adaptive_sampling import AdaptiveSampler, median_confidence_interval
+from energytrackr.pipeline.pipeline import Pipeline
+from energytrackr.pipeline.stage_interface import PipelineStage
+
+MAX_RUNS = 30
+
+
+@dataclass(frozen=True)
+class DummyCommit:
+    """Minimal stand-in for a git commit."""
+
+    hexsha: str
+
+
+@pytest.fixture
+def plan() -> ExecutionPlanDefinition:
+    """Execution plan with adaptive sampling enabled.
+
+    Returns:
+        ExecutionPlanDefinition: The execution plan.
+    """
+    return ExecutionPlanDefinition(
+        test_command="true",
+        num_runs=MAX_RUNS,
+        adaptive_sampling=AdaptiveSamplingDefinition(enabled=True, initial_runs=5, runs_per_round=5, relative_ci_width=0.05),
+    )
+
+
+def test_median_confidence_interval() -> None:
+    """The interval is None for tiny samples and brackets the median otherwise."""
+    assert median_confidence_interval([1.0, 2.0, 3.0], 0.95) is None
+    values = [float(v) for v in range(1, 31)]
+    low, high = median_confidence_interval(values, 0.95)
+    assert low < 15.5 < high  # noqa: PLR2004
+    assert high - low < values[-1] - values[0]
+
+
+def test_initial_round_then_stop_when_settled(plan: ExecutionPlanDefinition) -> None:
+    """A commit with a tight estimate is not measured again; a noisy one gets another round."""
+    stable, noisy = DummyCommit("stable"), DummyCommit("noisy")
+    sampler = AdaptiveSampler([stable, noisy], plan)
+
+    tasks = sampler.initial_round([stable, noisy])
+    assert {task.key for task in tasks} == {(c, run, 0) for c in ("stable", "noisy") for run in range(5)}
+
+    for i in range(10):
+        sampler.record("stable", 100.0 + i * 0.1)
+    for value in (50.0, 150.0, 80.0, 120.0, 100.0, 60.0, 140.0, 90.0, 110.0, 70.0):
+        sampler.record("noisy", value)
+    next_tasks = sampler.next_round([stable, noisy])
+    assert {task.hexsha for task in next_tasks} == {"noisy"}
+    assert sorted(task.run_index for task in next_tasks) == [5, 6, 7, 8, 9]
+
+
+def test_warmup_transient_is_left_out(plan: ExecutionPlanDefinition) -> None:
+    """With steady-state detection, hot leading runs do not keep a commit unsettled."""
+    commit = DummyCommit("jit")
+    values = [200.0, 180.0, 160.0, 140.0, 120.0] + [100.0 + i * 0.1 for i in range(10)]
+    without = AdaptiveSampler([commit], plan)
+    detected = AdaptiveSampler([commit], plan.model_copy(update={"steady_state": SteadyStateDefinition(enabled=True)}))
+    for sampler in (without, detected):
+        sampler.initial_round([commit])
+        for value in values:
+            sampler.record("jit", value)
+
+    assert detected.steady_values(values) == values[5:]
+    assert without.needs_more_runs("jit")
+    assert not detected.needs_more_runs("jit")
+
+
+def test_neighbour_difference_keeps_sampling(plan: ExecutionPlanDefinition) -> None:
+    """Settled commits keep being measured when their neighbour is statistically different."""
+    commits = [DummyCommit("a"), DummyCommit("b"), DummyCommit("c")]
+    sampler = AdaptiveSampler(commits, plan)
+    sampler.initial_round(commits)
+    for i in range(10):
+        sampler.record("a", 100.0 + i * 0.01)
+        sampler.record("b", 200.0 + i * 0.01)
+        sampler.record("c", 200.0 + i * 0.01)
+
+    assert sampler.needs_more_runs("a")
+    assert sampler.needs_more_runs("b")
+    assert not sampler.needs_more_runs("c")
+
+
+def test_max_runs_bounds_sampling(plan: ExecutionPlanDefinition) -> None:
+    """No commit is scheduled beyond `num_runs`, even if its estimate never settles."""
+    commit = DummyCommit("noisy")
+    sampler = AdaptiveSampler([commit], plan, completed={("noisy", 0, 0), ("noisy", 1, 0)})
+
+    tasks = sampler.initial_round([commit])
+    assert [task.run_index for task in tasks] == [2, 3, 4]
+    while tasks := sampler.next_round([commit]):
+        for task in tasks:
+            sampler.record(task.hexsha, float(task.run_index % 2) * 100.0 + 1.0)
+
+    assert sampler.total_runs() == MAX_RUNS
+
+
+def test_pipeline_runs_rounds_until_settled(monkeypatch: pytest.MonkeyPatch, plan: ExecutionPlanDefinition) -> None:
+    """The pipeline measures the batch again until the sampler has nothing left to schedule."""
+
+    class ConstantMeasure(PipelineStage):
+        def run(self, context: dict[str, Any]) -> None:  # noqa: PLR6301
+            context["measurement"] = ["42.0"]
+
+    monkeypatch.setattr("energytrackr.config.config_store.Config.get_config", MagicMock)
+    commit = DummyCommit("abc")
+    sampler = AdaptiveSampler([commit], plan)
+    pipeline = Pipeline({"batch_stages": [ConstantMeasure()]}, repo_path="fake/path", sampler=sampler)
+
+    batch = sampler.initial_round([commit])
+    failed = pipeline._run_batch_stages(batch, MagicMock())
+    pipeline._run_adaptive_rounds(batch, failed, MagicMock())
+
+    assert len(sampler.samples["abc"]) == 10  # noqa: PLR2004
+    assert sampler.total_runs() == 10  # noqa: PLR2004
+
+
+def test_randomized_rounds_follow_the_schedule_seed(plan: ExecutionPlanDefinition) -> None:
+    """The order of randomized runs is reproduced by the recorded schedule seed."""
+    commits = [DummyCommit(letter * 40) for letter in "abcdef"]
+
+    def order(seed: int) -> list[tuple[str, int, int]]:
+        seeded = plan.model_copy(update={"randomize_tasks": True, "schedule": ScheduleDefinition(seed=seed)})
+        return [task.key for task in AdaptiveSampler(commits, seeded).initial_round(commits)]
+
+    assert order(7) == order(7)
+    assert order(7) != order(8)
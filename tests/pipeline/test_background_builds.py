@@ -0,0 +1,180 @@
+"""Unit tests for the background builds."""
+
+import asyncio
+import os
+import subprocess
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from energytrackr.pipeline.background_builds import BackgroundBuilder, PreTestRunner
+from energytrackr.pipeline.pipeline import Pipeline
+from energytrackr.pipeline.stage_interface import PipelineStage
+from energytrackr.utils.command_runner import run_command_async
+
+TICKS = 40
+
+
+def tick_runner(hexsha: str, repo_path: str) -> dict[str, Any]:
+    """Pre-test runner whose child command appends a line to a file every 10 ms.
+
+    Args:
+        hexsha (str): The commit.
+        repo_path (str): Directory of the output file.
+
+    Returns:
+        dict[str, Any]: A minimal context.
+    """
+    out = Path(repo_path) / f"{hexsha}.txt"
+    subprocess.run(f"for i in $(seq {TICKS}); do echo $i >> {out}; sleep 0.01; done", shell=True, check=True)
+    return {"commit": hexsha, "build_failed": False}
+
+
+def session_tick_runner(hexsha: str, repo_path: str) -> dict[str, Any]:
+    """Pre-test runner whose command runs in its own process group, like those of `run_command`.
+
+    Args:
+        hexsha (str): The commit.
+        repo_path (str): Directory of the output file.
+
+    Returns:
+        dict[str, Any]: A minimal context.
+    """
+    out = Path(repo_path) / f"{hexsha}.txt"
+    asyncio.run(run_command_async(f"for i in $(seq {TICKS}); do echo $i >> {out}; sleep 0.01; done"))
+    return {"commit": hexsha, "build_failed": False}
+
+
+def failing_runner(hexsha: str, repo_path: str) -> dict[str, Any]:
+    """Pre-test runner that raises.
+
+    Args:
+        hexsha (str): The commit.
+        repo_path (str): Unused.
+
+    Raises:
+        RuntimeError: Always.
+    """
+    raise RuntimeError(hexsha + repo_path)
+
+
+def set_environ(name: str, value: str) -> None:
+    """Initializer of the build processes setting an environment variable.
+
+    Args:
+        name (str): The variable.
+        value (str): Its value.
+    """
+    os.environ[name] = value
+
+
+def environ_runner(hexsha: str, repo_path: str) -> dict[str, Any]:
+    """Pre-test runner reporting the variable set by the initializer of the build process.
+
+    Args:
+        hexsha (str): The commit.
+        repo_path (str): Unused.
+
+    Returns:
+        dict[str, Any]: The commit and the value of the variable.
+    """
+    return {"commit": hexsha, "repo": repo_path, "initialized": os.environ.get("BUILD_INITIALIZED")}
+
+
+def line_count(path: Path) -> int:
+    """Number of lines written so far.
+
+    Args:
+        path (Path): The output file.
+
+    Returns:
+        int: The number of lines, 0 if the file does not exist yet.
+    """
+    return len(path.read_text(encoding="utf-8").splitlines()) if path.exists() else 0
+
+
+@pytest.mark.parametrize("runner", [tick_runner, session_tick_runner])
+def test_background_build_is_suspended_while_measuring(tmp_path: Path, runner: PreTestRunner) -> None:
+    """Test that commands spawned by a background build make no progress inside `suspended()`."""
+    builder = BackgroundBuilder(runner, str(tmp_path))
+    builder.submit(["abc"])
+    out = tmp_path / "abc.txt"
+    deadline = time.monotonic() + 10
+    while not line_count(out) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    with builder.suspended():
+        time.sleep(0.05)
+        frozen = line_count(out)
+        time.sleep(0.2)
+        assert line_count(out) == frozen
+    results = builder.results()
+
+    assert 0 < frozen < TICKS
+    assert line_count(out) == TICKS
+    assert results == {"abc": {"commit": "abc", "build_failed": False}}
+
+
+def test_background_build_failure_and_workspaces(tmp_path: Path) -> None:
+    """Test that a failing build yields no context and that submitted workspaces are reported."""
+    builder = BackgroundBuilder(failing_runner, str(tmp_path / "repo"))
+    builder.submit(["abc", "def"])
+
+    assert builder.workspaces() == {str(tmp_path / "repo_abc"), str(tmp_path / "repo_def")}
+    assert builder.results() == {"abc": None, "def": None}
+    assert not builder.workspaces()
+
+
+def test_background_build_runs_initializer(tmp_path: Path) -> None:
+    """Test that the build processes, which do not inherit the state of the builder, run the initializer first."""
+    builder = BackgroundBuilder(environ_runner, str(tmp_path), initializer=set_environ, initargs=("BUILD_INITIALIZED", "1"))
+    builder.submit(["abc"])
+
+    assert builder.results() == {"abc": {"commit": "abc", "repo": str(tmp_path), "initialized": "1"}}
+    assert "BUILD_INITIALIZED" not in os.environ
+
+
+class RecordingStage(PipelineStage):
+    """Stage recording whether the background builds were suspended while it ran."""
+
+    def __init__(self, events: list[str], measures_energy: bool) -> None:
+        """Initialize the stage.
+
+        Args:
+            events (list[str]): Shared event log.
+            measures_energy (bool): Whether the stage measures energy.
+        """
+        self.events = events
+        self.measures_energy = measures_energy
+
+    def run(self, context: dict[str, Any]) -> None:  # noqa: ARG002
+        """Record the run.
+
+        Args:
+            context (dict[str, Any]): Unused.
+        """
+        self.events.append(f"run measures_energy={self.measures_energy}")
+
+
+def test_stage_group_suspends_background_only_for_measurements() -> None:
+    """Test that background builds are suspended around measuring stages only."""
+    events: list[str] = []
+
+    class FakeBackground:
+        @staticmethod
+        @contextmanager
+        def suspended() -> Generator[None]:
+            events.append("suspend")
+            try:
+                yield
+            finally:
+                events.append("resume")
+
+    stages = [RecordingStage(events, measures_energy=False), RecordingStage(events, measures_energy=True)]
+
+    assert Pipeline._run_stage_group(stages, {}, FakeBackground())
+    assert events == ["run measures_energy=False", "suspend", "run measures_energy=True", "resume"]
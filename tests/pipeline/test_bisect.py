@@ -0,0 +1,111 @@
+"""Unit tests for the energy bisection."""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import git
+import pytest
+
+from energytrackr.pipeline.bisect import EnergyBisector, MeasurementCache, commit_range
+from energytrackr.plot.config import Thresholds
+from energytrackr.utils.exceptions import InvalidBisectRangeError, UnmeasurableBisectCommitsError
+
+NUM_COMMITS = 64
+REGRESSION_INDEX = 41
+
+
+@dataclass(frozen=True)
+class DummyCommit:
+    """Minimal stand-in for a git commit."""
+
+    hexsha: str
+
+
+def fake_measurements(commit: DummyCommit) -> list[float]:
+    """Energy values of a commit: commits from REGRESSION_INDEX on consume 10% more.
+
+    Args:
+        commit (DummyCommit): The commit to measure.
+
+    Returns:
+        list[float]: Ten slightly noisy measurements.
+    """
+    base = 110.0 if int(commit.hexsha) >= REGRESSION_INDEX else 100.0
+    return [base + (i % 3) * 0.5 for i in range(10)]
+
+
+def test_bisector_finds_first_regression_in_log_measurements() -> None:
+    """Test that the first differing commit is found while measuring O(log n) commits."""
+    commits = [DummyCommit(str(i)) for i in range(NUM_COMMITS)]
+    measured: list[str] = []
+
+    def measure(commit: DummyCommit) -> list[float]:
+        measured.append(commit.hexsha)
+        return fake_measurements(commit)
+
+    found = EnergyBisector(commits, measure, Thresholds()).run()
+
+    assert found == commits[REGRESSION_INDEX]
+    assert len(measured) == len(set(measured))
+    assert len(measured) <= 2 + (NUM_COMMITS - 1).bit_length()
+
+
+def test_bisector_returns_none_without_difference() -> None:
+    """Test that nothing is reported when the bad commit does not differ from the good one."""
+    commits = [DummyCommit(str(i)) for i in range(REGRESSION_INDEX)]
+
+    assert EnergyBisector(commits, fake_measurements, Thresholds()).run() is None
+
+
+def test_bisector_skips_unmeasurable_commits() -> None:
+    """Test that a probed commit without measurements is replaced by a neighbour, as with git bisect skip."""
+    commits = [DummyCommit(str(i)) for i in range(NUM_COMMITS)]
+    broken = {str(NUM_COMMITS // 2 - 1), str(NUM_COMMITS // 2)}
+
+    def measure(commit: DummyCommit) -> list[float]:
+        return [] if commit.hexsha in broken else fake_measurements(commit)
+
+    assert EnergyBisector(commits, measure, Thresholds()).run() == commits[REGRESSION_INDEX]
+
+
+def test_bisector_reports_ambiguous_range() -> None:
+    """Test that the bisection fails when the commits around the change cannot be measured."""
+    commits = [DummyCommit(str(i)) for i in range(NUM_COMMITS)]
+
+    def measure(commit: DummyCommit) -> list[float]:
+        return [] if commit.hexsha == str(REGRESSION_INDEX) else fake_measurements(commit)
+
+    with pytest.raises(UnmeasurableBisectCommitsError, match=f"of {REGRESSION_INDEX} "):
+        EnergyBisector(commits, measure, Thresholds()).run()
+
+
+def test_bisector_uses_negligible_effect_size() -> None:
+    """Test that a significant difference below the "negligible" Cohen's d is not reported, as in DetectChanges."""
+    thresholds = Thresholds(cohen_d={"negligible": 100.0, "small": 0.1, "medium": 0.2, "large": 0.3})
+    bisector = EnergyBisector([], fake_measurements, thresholds)
+    good, bad = fake_measurements(DummyCommit("0")), fake_measurements(DummyCommit(str(REGRESSION_INDEX)))
+
+    assert not bisector.differs(good, bad)
+    assert EnergyBisector([], fake_measurements, Thresholds()).differs(good, bad)
+
+
+def test_measurement_cache_roundtrip(tmp_path: Path) -> None:
+    """Test that cached values are persisted and reloaded."""
+    path = tmp_path / "energy_measurements" / "bisect_cache.json"
+    MeasurementCache(path).put("abc", [1.0, 2.0])
+
+    assert MeasurementCache(path).get("abc") == [1.0, 2.0]
+    assert not MeasurementCache(path).get("def")
+
+
+def test_commit_range(tmp_path: Path) -> None:
+    """Test that the range starts with the good commit and ends with the bad one, oldest first."""
+    repo = git.Repo.init(tmp_path / "repo")
+    with repo.config_writer() as cw:
+        cw.set_value("user", "name", "Test")
+        cw.set_value("user", "email", "test@example.com")
+    shas = [repo.index.commit(f"commit {i}").hexsha for i in range(4)]
+
+    assert [c.hexsha for c in commit_range(repo, shas[1], shas[3])] == shas[1:]
+    with pytest.raises(InvalidBisectRangeError):
+        commit_range(repo, shas[3], shas[1])
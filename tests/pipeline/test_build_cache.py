@@ -0,0 +1,79 @@
+"""Unit tests for the BuildCache class."""
+
+from pathlib import Path
+
+import git
+import pytest
+
+from energytrackr.pipeline.build_cache import BuildCache
+
+
+@pytest.fixture
+def repo_with_commits(tmp_path: Path) -> tuple[git.Repo, list[str]]:
+    """Fixture to create a repository with three commits.
+
+    The second commit only touches a non-tracked file, the third one changes a tracked file.
+
+    Args:
+        tmp_path (Path): The temporary path to create the repository.
+
+    Returns:
+        tuple[git.Repo, list[str]]: The repository and the commit hashes, oldest first.
+    """
+    repo_dir = tmp_path / "repo"
+    repo = git.Repo.init(repo_dir)
+    with repo.config_writer() as cw:
+        cw.set_value("user", "name", "Test")
+        cw.set_value("user", "email", "test@example.com")
+    shas: list[str] = []
+    for name, content in [("Main.java", "class A {}"), ("README.md", "docs"), ("Main.java", "class B {}")]:
+        (repo_dir / name).write_text(content, encoding="utf-8")
+        repo.index.add([name])
+        shas.append(repo.index.commit(f"update {name}").hexsha)
+    return repo, shas
+
+
+def test_key_depends_on_full_tree(tmp_path: Path, repo_with_commits: tuple[git.Repo, list[str]]) -> None:
+    """Test that every tree change produces a new key when hashing the full tree."""
+    repo, shas = repo_with_commits
+    cache = BuildCache(tmp_path / "cache", ["target"], ["mvn compile"])
+
+    assert len({cache.key_for(repo, sha) for sha in shas}) == len(shas)
+
+
+def test_key_restricted_to_tracked_files(tmp_path: Path, repo_with_commits: tuple[git.Repo, list[str]]) -> None:
+    """Test that changes to untracked files do not change the key when tracked_extensions is set."""
+    repo, shas = repo_with_commits
+    cache = BuildCache(tmp_path / "cache", ["target"], ["mvn compile"], tracked_extensions={"java"})
+
+    assert cache.key_for(repo, shas[0]) == cache.key_for(repo, shas[1])
+    assert cache.key_for(repo, shas[1]) != cache.key_for(repo, shas[2])
+
+
+def test_key_depends_on_compile_commands(tmp_path: Path, repo_with_commits: tuple[git.Repo, list[str]]) -> None:
+    """Test that changing the build commands invalidates the cache."""
+    repo, shas = repo_with_commits
+    first = BuildCache(tmp_path / "cache", ["target"], ["mvn compile"])
+    second = BuildCache(tmp_path / "cache", ["target"], ["mvn package"])
+
+    assert first.key_for(repo, shas[0]) != second.key_for(repo, shas[0])
+
+
+def test_store_and_restore(tmp_path: Path) -> None:
+    """Test that stored outputs are restored into a fresh workspace."""
+    built = tmp_path / "built"
+    (built / "target" / "classes").mkdir(parents=True)
+    (built / "target" / "classes" / "A.class").write_bytes(b"\xca\xfe")
+    (built / "app.jar").write_bytes(b"jar")
+    cache = BuildCache(tmp_path / "cache", ["target", "app.jar", "missing"], [])
+
+    assert not cache.restore("k1", tmp_path / "fresh")
+    cache.store("k1", built, "abc123")
+    assert cache.contains("k1")
+
+    fresh = tmp_path / "fresh"
+    fresh.mkdir()
+    assert cache.restore("k1", fresh)
+    assert (fresh / "target" / "classes" / "A.class").read_bytes() == b"\xca\xfe"
+    assert (fresh / "app.jar").read_bytes() == b"jar"
+    assert not list((tmp_path / "cache").glob("*.tmp-*"))
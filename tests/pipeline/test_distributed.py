@@ -0,0 +1,140 @@
+"""Unit tests for the coordinator and workers of distributed measurements."""
+
+import os
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from energytrackr.config.config_model import DistributedDefinition
+from energytrackr.pipeline import distributed
+from energytrackr.pipeline.distributed import WorkerExecutor, collect_results, serve
+from energytrackr.pipeline.result_store import SqliteResultWriter, read_results
+from energytrackr.pipeline.stage_interface import PipelineStage
+from energytrackr.pipeline.task_queue import FileTaskQueue, QueuedTask
+
+LEASE_S = 1.0
+POLL_S = 0.02
+
+
+def fake_execute(task: QueuedTask) -> dict[str, Any]:
+    """Pretend to measure a task.
+
+    Args:
+        task (QueuedTask): The task.
+
+    Returns:
+        dict[str, Any]: A successful result whose value is the run index.
+    """
+    time.sleep(0.01)
+    if task.commit == "broken":
+        return {"status": "build_failed"}
+    record = {"commit": task.commit, "values": {"energy": str(task.run_index)}, "run_index": task.run_index}
+    return {"status": "ok", "record": record}
+
+
+def start_worker(queue_dir: Path, host: str) -> threading.Thread:
+    """Run a worker in a thread.
+
+    Args:
+        queue_dir (Path): The queue directory.
+        host (str): Host name of the worker.
+
+    Returns:
+        threading.Thread: The started worker thread.
+    """
+    thread = threading.Thread(
+        target=serve,
+        args=(FileTaskQueue(queue_dir), fake_execute, host, DistributedDefinition(lease_s=LEASE_S, poll_interval=POLL_S)),
+    )
+    thread.start()
+    return thread
+
+
+def test_workers_measure_every_task_once(tmp_path: Path) -> None:
+    """Every task gets one result, written with the host that measured it; failed tasks are skipped."""
+    queue = FileTaskQueue(tmp_path / "queue")
+    tasks = [QueuedTask(sha, run) for sha in ("aaa", "bbb", "broken") for run in range(3)]
+    queue.publish(tasks)
+    workers = [start_worker(tmp_path / "queue", host) for host in ("bench-1", "bench-2")]
+
+    writer = SqliteResultWriter(tmp_path / "results.sqlite")
+    hosts = collect_results(queue, {task.id for task in tasks}, writer, LEASE_S, POLL_S)
+    queue.close()
+    for worker in workers:
+        worker.join(timeout=10)
+
+    df = read_results(tmp_path / "results.sqlite")
+    assert sum(hosts.values()) == len(df) == 6  # noqa: PLR2004
+    assert set(df["host"]) <= {"bench-1", "bench-2"}
+    measured = sorted(zip(df["commit"], df["run_index"], strict=True))
+    assert measured == [(sha, run) for sha in ("aaa", "bbb") for run in range(3)]
+    assert not any(worker.is_alive() for worker in workers)
+
+
+def test_task_of_lost_worker_is_measured_by_another(tmp_path: Path) -> None:
+    """A task leased by a worker that died is re-queued and measured by a live worker."""
+    queue = FileTaskQueue(tmp_path / "queue")
+    queue.publish([QueuedTask("aaa")])
+    lost = queue.claim()
+    assert lost is not None
+    stale = time.time() - 10 * LEASE_S
+    os.utime(tmp_path / "queue" / "leased" / f"{lost.id}.json", (stale, stale))
+    worker = start_worker(tmp_path / "queue", "bench-2")
+
+    writer = SqliteResultWriter(tmp_path / "results.sqlite")
+    hosts = collect_results(queue, {lost.id}, writer, LEASE_S, POLL_S)
+    queue.close()
+    worker.join(timeout=10)
+
+    assert hosts == {"bench-2": 1}
+
+
+def test_first_result_wins(tmp_path: Path) -> None:
+    """A task measured twice (after its lease expired) is only recorded once."""
+    queue = FileTaskQueue(tmp_path / "queue")
+    task = QueuedTask("aaa")
+    for host in ("bench-1", "bench-2"):
+        queue.complete(task, f"{host}-1", {**fake_execute(task), "host": host})
+
+    writer = SqliteResultWriter(tmp_path / "results.sqlite")
+    hosts = collect_results(queue, {task.id}, writer, LEASE_S, POLL_S)
+
+    assert sum(hosts.values()) == 1
+    assert len(read_results(tmp_path / "results.sqlite")) == 1
+
+
+class ForgetfulStage(PipelineStage):
+    """Batch stage recording the commits whose state it is asked to drop."""
+
+    def __init__(self) -> None:
+        """Initialize the record."""
+        self.forgotten: list[str] = []
+
+    def run(self, context: dict[str, Any]) -> None:
+        """Do nothing."""
+
+    def forget_commits(self, hexshas: Iterable[str]) -> None:
+        """Record the commits.
+
+        Args:
+            hexshas (Iterable[str]): The commits.
+        """
+        self.forgotten.extend(hexshas)
+
+
+def test_executor_forgets_commits_built_again(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """The per-commit state of the batch stages (e.g. warm-ups) is dropped on each build, not after each task."""
+    monkeypatch.setattr(distributed, "run_pre_test_stages_for_commit", lambda *_args: {})
+    monkeypatch.setattr(distributed, "clean_cache_dir", lambda *_args, **_kwargs: None)
+    stage = ForgetfulStage()
+    executor = WorkerExecutor(None, str(tmp_path / "repo"), {"batch_stages": [stage]}, keep=1)  # type: ignore[arg-type]
+
+    first, second = "a" * 40, "b" * 40
+    for commit, run in [(first, 0), (first, 1), (second, 0), (first, 2)]:
+        executor(QueuedTask(commit, run))
+
+    assert stage.forgotten == [first, second, first]
@@ -4,15 +4,27 @@ import concurrent.futures
 import logging
 from dataclasses import dataclass
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
+import git
 import pytest
 from git import Commit
 
+from energytrackr.config.config_model import ExecutionPlanDefinition
 from energytrackr.config.config_store import Config
 from energytrackr.config.loader import load_pipeline_config
-from energytrackr.pipeline.pipeline import Pipeline, log_context_buffer, run_pre_test_stages_for_commit
+from energytrackr.pipeline import pipeline as pipeline_module
+from energytrackr.pipeline.pipeline import (
+    Pipeline,
+    create_batches,
+    log_context_buffer,
+    plan_batches,
+    run_pre_test_stages_for_commit,
+)
 from energytrackr.pipeline.stage_interface import PipelineStage
+from energytrackr.pipeline.task_journal import MeasurementTask
+from energytrackr.pipeline.workspace_cache import WorkspaceCache
 
 
 @pytest.fixture
@@ -97,6 +109,22 @@ def test_run_pre_test_stages_for_commit_failure(monkeypatch: pytest.MonkeyPatch)
     dummy_stage.run.assert_not_called()
 
 
+def test_pool_worker_opens_repository_once(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """A pool worker opens the repository in its initializer and reuses it for every commit."""
+    repo = git.Repo.init(tmp_path)
+    (tmp_path / "file.txt").write_text("content", encoding="utf-8")
+    repo.index.add(["file.txt"])
+    hexsha = repo.index.commit("initial").hexsha
+    monkeypatch.setattr(pipeline_module, "_WORKER", pipeline_module._WorkerState())
+    pipeline_module._init_pre_test_worker([], str(tmp_path))
+
+    monkeypatch.setattr("git.Repo", lambda _path: (_ for _ in ()).throw(AssertionError("Repository opened again")))
+    result = run_pre_test_stages_for_commit(hexsha, str(tmp_path))
+
+    assert result["commit"] == hexsha
+    assert not result["abort_pipeline"]
+
+
 def test_log_context_buffer_logs_messages(caplog: pytest.LogCaptureFixture) -> None:
     """Test that log_context_buffer logs messages correctly."""
     context = {
@@ -143,11 +171,14 @@ def test_pipeline_run_all_stages(monkeypatch: pytest.MonkeyPatch) -> None:
     # Patch Config.get_config to return a dummy config
     dummy_config = MagicMock()
     dummy_config.execution_plan.num_commits = 1
+    dummy_config.execution_plan.stability_check.enabled = False
+    dummy_config.worker_pool = SimpleNamespace(workers=None, memory_per_build_gb=0.0, poll_interval=1.0)
+    dummy_config.workspace_cache.enabled = False
     monkeypatch.setattr("energytrackr.config.config_store.Config.get_config", lambda: dummy_config)
 
     # Patch ProcessPoolExecutor to return a real Future
     class DummyExecutor:
-        def __enter__(self) -> "DummyExecutor":
+        def __init__(self, *_args: tuple, **_kwargs: dict) -> None:
             self.future = concurrent.futures.Future()
             self.future.set_result(
                 {
@@ -158,9 +189,8 @@ def test_pipeline_run_all_stages(monkeypatch: pytest.MonkeyPatch) -> None:
                     "log_buffer": [(20, "Stage ran")],
                 },
             )
-            return self
 
-        def __exit__(self, exc_type: type | None, exc_val: BaseException | None, exc_tb: object | None) -> None:
+        def shutdown(self) -> None:
             pass
 
         def submit(self, _fn: callable, *_args: tuple, **_kwargs: dict) -> concurrent.futures.Future:
@@ -169,4 +199,55 @@ def test_pipeline_run_all_stages(monkeypatch: pytest.MonkeyPatch) -> None:
     pipeline = Pipeline(stages, repo_path="fake/path")
 
     with patch("concurrent.futures.ProcessPoolExecutor", DummyExecutor):
-        pipeline.run([[dummy_commit]])
+        pipeline.run([[MeasurementTask(dummy_commit)]])
+
+
+def test_create_batches_expands_runs_and_repeats() -> None:
+    """Test that every commit is expanded into one task per (run, repeat) pair."""
+
+    @dataclass
+    class DummyCommit:
+        hexsha: str
+
+    commits = [DummyCommit("a"), DummyCommit("b"), DummyCommit("c")]
+    batches = create_batches(commits, batch_size=2, num_runs=2, num_repeats=2, randomize_tasks=False)
+
+    assert [len(batch) for batch in batches] == [8, 4]
+    assert {task.key for task in batches[1]} == {("c", run, rep) for run in range(2) for rep in range(2)}
+
+
+def test_plan_batches_skips_completed_tasks() -> None:
+    """Test that tasks recorded as completed are not scheduled again, and empty batches are dropped."""
+
+    @dataclass
+    class DummyCommit:
+        hexsha: str
+
+    commits = [DummyCommit("a"), DummyCommit("b")]
+    completed = {("a", 0, 0), ("a", 1, 0), ("b", 0, 0)}
+    plan = ExecutionPlanDefinition(test_command="true", batch_size=1, num_runs=2, randomize_tasks=True)
+    batches = plan_batches(commits, plan, completed=completed)
+
+    assert len(batches) == 1
+    assert [task.key for task in batches[0]] == [("b", 1, 0)]
+
+
+def test_transient_failures_are_not_cached(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """A commit without a stage slot or whose build was killed is not recorded as a failed build."""
+    dummy_config = MagicMock()
+    dummy_config.execution_plan.stability_check.enabled = False
+    dummy_config.workspace_cache.enabled = False
+    monkeypatch.setattr("energytrackr.config.config_store.Config.get_config", lambda: dummy_config)
+    pipeline = Pipeline({}, repo_path=str(tmp_path / ".cache_project"))
+    pipeline.workspace_cache = WorkspaceCache(pipeline.repo_path, 1024, "settings")
+    failed: set[str] = set()
+
+    pipeline._handle_pre_test_context("a" * 40, {"commit": "a" * 40, "slot_timeout": True}, failed)
+    pipeline._handle_pre_test_context("b" * 40, {"commit": "b" * 40, "build_failed": True}, failed)
+    pipeline._handle_pre_test_context("c" * 40, {"commit": "c" * 40, "build_failed": True, "transient_failure": True}, failed)
+
+    assert failed == {"a" * 40, "b" * 40, "c" * 40}
+    assert pipeline.deferred == {"a" * 40}
+    assert pipeline.workspace_cache.status("a" * 40) is None
+    assert pipeline.workspace_cache.status("b" * 40) == "failed"
+    assert pipeline.workspace_cache.status("c" * 40) is None
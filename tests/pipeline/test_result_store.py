@@ -0,0 +1,134 @@
+"""Unit tests for the result writers."""
+
+import sqlite3
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from energytrackr.pipeline.result_store import (
+    CsvResultWriter,
+    MeasurementRecord,
+    SqliteResultWriter,
+    create_result_writer,
+    measured_commits,
+    read_results,
+)
+
+FLUSH_EVERY = 3
+
+
+def make_record(commit: str, run_index: int, **values: str | None) -> MeasurementRecord:
+    """Build a record with metadata.
+
+    Args:
+        commit (str): The commit hash.
+        run_index (int): The run index.
+        **values (str | None): The measured values.
+
+    Returns:
+        MeasurementRecord: The record.
+    """
+    return MeasurementRecord(
+        commit=commit,
+        values=values,
+        run_index=run_index,
+        started_at="2025-01-01T00:00:00",
+        duration_s=1.5,
+        cpu_temperature=45000.0,
+        exit_code=0,
+        backend="perf",
+    )
+
+
+def test_csv_writer_keeps_legacy_layout(tmp_path: Path) -> None:
+    """Test that CSV rows are `commit,value...` without header or metadata."""
+    writer = CsvResultWriter(tmp_path / "results.csv")
+    writer.write(make_record("abc", 0, pkg="1.5", core="0.5"))
+    writer.write(make_record("def", 0, pkg="2.5", core=None))
+
+    assert (tmp_path / "results.csv").read_text().splitlines() == ["abc,1.5,0.5", "def,2.5,None"]
+
+
+def test_writer_buffers_until_flush(tmp_path: Path) -> None:
+    """Test that records are only written once `flush_every` records are buffered or on flush()."""
+    writer = SqliteResultWriter(tmp_path / "results.sqlite", flush_every=FLUSH_EVERY)
+
+    assert not writer.write(make_record("abc", 0, pkg="1.0"))
+    assert not writer.write(make_record("abc", 1, pkg="2.0"))
+    assert not writer.path.exists()
+    assert writer.write(make_record("abc", 2, pkg="3.0"))
+    writer.write(make_record("def", 0, pkg="4.0"))
+    assert writer.pending == 1
+    writer.flush()
+
+    assert len(read_results(writer.path)) == FLUSH_EVERY + 1
+
+
+def test_sqlite_round_trip_with_metadata(tmp_path: Path) -> None:
+    """Test that values and metadata are stored, and that new events add columns."""
+    writer = SqliteResultWriter(tmp_path / "results.sqlite")
+    writer.write(make_record("abc", 0, **{"power/energy-pkg/": "1.5"}))
+    writer.write(make_record("abc", 1, **{"power/energy-pkg/": "2.5", "power/energy-cores/": "<not counted>"}))
+
+    df = read_results(writer.path)
+
+    assert list(df.columns[:3]) == ["commit", "power/energy-pkg/", "power/energy-cores/"]
+    assert df["power/energy-pkg/"].tolist() == [1.5, 2.5]
+    assert df["power/energy-cores/"].isna().all()
+    assert df["run_index"].tolist() == [0, 1]
+    assert df["duration_s"].tolist() == [1.5, 1.5]
+    assert set(df["backend"]) == {"perf"}
+
+
+def test_sqlite_adds_missing_metadata_columns(tmp_path: Path) -> None:
+    """Test that a store written before the host column existed gains it on the next write."""
+    path = tmp_path / "results.sqlite"
+    with sqlite3.connect(path) as conn:
+        conn.execute('CREATE TABLE measurements ("commit" TEXT NOT NULL, run_index INTEGER, pkg REAL)')
+        conn.execute("INSERT INTO measurements VALUES ('abc', 0, 1.0)")
+    conn.close()
+    assert "host" not in read_results(path).columns
+
+    writer = SqliteResultWriter(path)
+    writer.write(MeasurementRecord(commit="def", values={"pkg": "2.0"}, host="bench-1"))
+    writer.flush()
+
+    hosts = read_results(path)["host"]
+    assert hosts.isna().tolist() == [True, False]
+    assert hosts.iloc[1] == "bench-1"
+
+
+@pytest.mark.parametrize(("fmt", "suffix"), [("csv", ".csv"), ("sqlite", ".sqlite")])
+def test_create_result_writer(tmp_path: Path, fmt: str, suffix: str) -> None:
+    """Test that the configured format selects the writer and the file suffix."""
+    config = SimpleNamespace(results=SimpleNamespace(format=fmt, flush_every=FLUSH_EVERY))
+
+    writer = create_result_writer(config, tmp_path / "energy_results_1")
+
+    assert writer.path == tmp_path / f"energy_results_1{suffix}"
+    assert writer.flush_every == FLUSH_EVERY
+
+
+def test_warmup_runs_only_in_sqlite(tmp_path: Path) -> None:
+    """Test that warm-up runs are tagged in SQLite stores, not loaded by default, and left out of CSV files."""
+    warmup = MeasurementRecord(commit="abc", values={"pkg": "9.0"}, warmup=True)
+    for writer in (CsvResultWriter(tmp_path / "results.csv"), SqliteResultWriter(tmp_path / "results.sqlite")):
+        writer.write(warmup)
+        writer.write(make_record("abc", 0, pkg="1.0"))
+        writer.flush()
+
+    assert (tmp_path / "results.csv").read_text().splitlines() == ["abc,1.0"]
+    assert read_results(tmp_path / "results.sqlite", include_warmup=True)["warmup"].tolist() == [1, 0]
+    assert read_results(tmp_path / "results.sqlite")["pkg"].tolist() == [1.0]
+
+
+def test_measured_commits(tmp_path: Path) -> None:
+    """Test that the measured commits are read from both formats, without those with only warm-up runs."""
+    assert measured_commits(tmp_path / "missing.csv") == set()
+    for writer in (CsvResultWriter(tmp_path / "results.csv"), SqliteResultWriter(tmp_path / "results.sqlite")):
+        writer.write(MeasurementRecord(commit="abc", values={"pkg": "9.0"}, warmup=True))
+        writer.write(make_record("def", 0, pkg="1.0"))
+        writer.write(make_record("def", 1, pkg="1.1"))
+        writer.flush()
+        assert measured_commits(writer.path) == {"def"}
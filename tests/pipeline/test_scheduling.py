@@ -0,0 +1,102 @@
+"""Unit tests for the counterbalanced scheduling strategies."""
+
+from collections import Counter
+from dataclasses import dataclass
+from itertools import pairwise
+from statistics import mean
+
+import pytest
+
+from energytrackr.config.config_model import ExecutionPlanDefinition, ScheduleDefinition, ScheduleStrategyEnum
+from energytrackr.pipeline.pipeline import plan_batches
+from energytrackr.pipeline.scheduling import resolve_seed, williams_order
+
+NUM_RUNS = 4
+BATCH_SIZE = 2
+
+
+@dataclass(frozen=True)
+class DummyCommit:
+    """Minimal stand-in for a git commit."""
+
+    hexsha: str
+
+
+COMMITS = [DummyCommit(sha) for sha in "abcdef"]
+
+
+def plan(schedule: ScheduleDefinition, randomize_tasks: bool = False) -> ExecutionPlanDefinition:
+    """Execution plan of NUM_RUNS runs in batches of BATCH_SIZE commits.
+
+    Args:
+        schedule (ScheduleDefinition): The schedule settings.
+        randomize_tasks (bool): Whether to shuffle the tasks of each batch.
+
+    Returns:
+        ExecutionPlanDefinition: The execution plan.
+    """
+    return ExecutionPlanDefinition(
+        test_command="true",
+        batch_size=BATCH_SIZE,
+        num_runs=NUM_RUNS,
+        randomize_tasks=randomize_tasks,
+        schedule=schedule,
+    )
+
+
+@pytest.mark.parametrize("n", [4, 5])
+def test_williams_square_is_balanced(n: int) -> None:
+    """Every treatment takes every position equally often and follows every other one equally often."""
+    rows = [williams_order(n, row) for row in range(n if n % 2 == 0 else 2 * n)]
+    positions = Counter((position, value) for row in rows for position, value in enumerate(row))
+    successions = Counter(pair for row in rows for pair in pairwise(row))
+
+    assert len(set(positions.values())) == 1
+    assert len(successions) == n * (n - 1)
+    assert len(set(successions.values())) == 1
+
+
+@pytest.mark.parametrize("strategy", list(ScheduleStrategyEnum))
+def test_every_task_scheduled_once_within_batch_size(strategy: ScheduleStrategyEnum) -> None:
+    """Whatever the strategy, every run is scheduled once and a batch never holds more than batch_size commits."""
+    schedule = ScheduleDefinition(strategy=strategy, seed=1)
+    batches = plan_batches(COMMITS, plan(schedule))
+
+    keys = [task.key for batch in batches for task in batch]
+    assert sorted(keys) == sorted((c.hexsha, run, 0) for c in COMMITS for run in range(NUM_RUNS))
+    assert all(len({task.hexsha for task in batch}) <= BATCH_SIZE for batch in batches)
+
+
+def mean_positions(strategy: ScheduleStrategyEnum) -> dict[str, float]:
+    """Mean position of the runs of each commit in the campaign.
+
+    Args:
+        strategy (ScheduleStrategyEnum): The scheduling strategy.
+
+    Returns:
+        dict[str, float]: The mean position of each commit.
+    """
+    schedule = ScheduleDefinition(strategy=strategy, seed=1)
+    tasks = [task for batch in plan_batches(COMMITS, plan(schedule)) for task in batch]
+    return {c.hexsha: mean(i for i, task in enumerate(tasks) if task.hexsha == c.hexsha) for c in COMMITS}
+
+
+def test_abba_cancels_linear_drift() -> None:
+    """With ABBA rounds every commit is measured, on average, at the middle of the campaign."""
+    sequential = mean_positions(ScheduleStrategyEnum.SEQUENTIAL)
+    abba = mean_positions(ScheduleStrategyEnum.ABBA)
+
+    assert sequential["a"] < sequential["f"]
+    assert len(set(abba.values())) == 1
+
+
+def test_random_schedule_is_reproducible() -> None:
+    """The same seed gives the same order; the seed is drawn and kept when not configured."""
+    first = plan_batches(COMMITS, plan(ScheduleDefinition(strategy="random", seed=7), randomize_tasks=True))
+    second = plan_batches(COMMITS, plan(ScheduleDefinition(strategy="random", seed=7), randomize_tasks=True))
+    assert [[t.key for t in batch] for batch in first] == [[t.key for t in batch] for batch in second]
+
+    schedule = ScheduleDefinition(strategy="random")
+    seed = resolve_seed(schedule)
+    assert schedule.seed == seed
+    assert resolve_seed(schedule) == seed
@@ -0,0 +1,141 @@
+"""Unit tests for the stages declared in the configuration."""
+
+import threading
+import time
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+
+from energytrackr.config.config_model import StageDefinition, StagesDefinition
+from energytrackr.pipeline.core_stages.build_stage import BuildStage
+from energytrackr.pipeline.core_stages.measure_stage import MeasureEnergyStage
+from energytrackr.pipeline.custom_stages.java_setup_stage import JavaSetupStage
+from energytrackr.pipeline.pipeline import Pipeline
+from energytrackr.pipeline.stage_interface import PipelineStage
+from energytrackr.pipeline.stage_registry import ConfiguredStage, build_stages, load_stage_class
+from energytrackr.utils.exceptions import ModuleDidNotResolveToClassError, MustImplementError
+
+POOL_SIZE = 3
+
+
+class OverlapStage(PipelineStage):
+    """Stage recording how many callers run it at the same time."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def run(self, context: dict[str, Any]) -> None:  # noqa: ARG002
+        """Hold the stage for a moment.
+
+        Args:
+            context (dict[str, Any]): Unused.
+        """
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.05)
+        with self.lock:
+            self.running -= 1
+
+
+def test_groups_are_sorted_by_dependencies() -> None:
+    """Stages come after their dependencies, otherwise the first declared stage runs first."""
+    stages = StagesDefinition.model_validate({
+        "pre_test_stages": [
+            {"module": "BuildStage", "depends_on": ["CheckoutStage", "prepare"]},
+            {"module": "CheckoutStage"},
+            {"module": "my.module:Prepare", "name": "prepare", "depends_on": ["CheckoutStage"]},
+            {"module": "SetDirectoryStage"},
+        ],
+    })
+    assert stages.pre_test_stages is not None
+    assert [s.key for s in stages.pre_test_stages] == ["CheckoutStage", "prepare", "BuildStage", "SetDirectoryStage"]
+    assert stages.batch_stages is None
+
+
+@pytest.mark.parametrize(
+    ("group", "message"),
+    [
+        ([{"module": "BuildStage"}, {"module": "BuildStage"}], "declared twice"),
+        ([{"module": "BuildStage", "depends_on": ["Missing"]}], "unknown stage"),
+        (
+            [
+                {"module": "BuildStage", "depends_on": ["CheckoutStage"]},
+                {"module": "CheckoutStage", "depends_on": ["BuildStage"]},
+            ],
+            "cycle",
+        ),
+    ],
+)
+def test_invalid_groups_are_rejected(group: list[dict[str, Any]], message: str) -> None:
+    """Duplicate names, unknown dependencies and cycles fail validation."""
+    with pytest.raises(ValidationError, match=message):
+        StagesDefinition.model_validate({"batch_stages": group})
+
+
+def test_load_stage_class() -> None:
+    """Built-in names and module paths resolve to stage classes."""
+    assert load_stage_class("BuildStage") is BuildStage
+    assert load_stage_class("energytrackr.pipeline.custom_stages.java_setup_stage:JavaSetupStage") is JavaSetupStage
+    with pytest.raises(ModuleDidNotResolveToClassError):
+        load_stage_class("math:pi")
+    with pytest.raises(MustImplementError):
+        load_stage_class("collections:OrderedDict")
+
+
+def test_build_stages_names_and_exclusivity() -> None:
+    """Built stages carry their configured name and exclusivity."""
+    stages = build_stages([
+        StageDefinition(module="JavaSetupStage", name="java", exclusive=True),
+        StageDefinition(module="MeasureEnergyStage"),
+    ])
+    assert [stage.name for stage in stages] == ["java", "MeasureEnergyStage"]
+    assert [stage.measures_energy for stage in stages] == [True, True]
+    assert isinstance(stages[1], ConfiguredStage)
+    assert isinstance(stages[1].stage, MeasureEnergyStage)
+
+
+@pytest.mark.parametrize(("parallel", "concurrency", "expected"), [(False, None, 1), (True, 2, 2), (True, None, 4)])
+def test_concurrency_limit(parallel: bool, concurrency: int | None, expected: int) -> None:
+    """A stage is entered by at most `concurrency` callers, and by one if it is not parallel."""
+    inner = OverlapStage()
+    stage = ConfiguredStage(StageDefinition(module="OverlapStage", parallel=parallel, concurrency=concurrency), inner)
+    threads = [threading.Thread(target=stage.run, args=({},)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert inner.peak == expected
+
+
+def test_slot_timeout_skips_commit() -> None:
+    """A commit that never gets a slot, e.g. held by a dead worker, is skipped without failing its build."""
+    inner = OverlapStage()
+    stage = ConfiguredStage(StageDefinition(module="OverlapStage", slot_timeout_s=0.1), inner)
+    assert stage._semaphore is not None
+    stage._semaphore.acquire()
+    context: dict[str, Any] = {"commit": "abc", "build_failed": False}
+
+    stage.run(context)
+
+    assert context["slot_timeout"]
+    assert not context["build_failed"]
+    assert inner.peak == 0
+    stage._semaphore.release()
+    stage.run(context)
+    assert inner.peak == 1
+
+
+def test_pre_test_workers() -> None:
+    """The pool is sized for the largest limit of the parallel stages."""
+    stages = build_stages([
+        StageDefinition(module="CheckoutStage"),
+        StageDefinition(module="BuildStage", parallel=True, concurrency=POOL_SIZE),
+    ])
+    assert Pipeline._pre_test_workers(stages) == POOL_SIZE
+    assert Pipeline._pre_test_workers([BuildStage()]) is None
+    assert Pipeline._pre_test_workers(stages[:1]) is None
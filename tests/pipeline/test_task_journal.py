@@ -0,0 +1,62 @@
+"""Unit tests for the TaskJournal class."""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+from energytrackr.pipeline.task_journal import MeasurementTask, TaskJournal
+
+
+@dataclass(frozen=True)
+class DummyCommit:
+    """Dummy commit class for testing purposes."""
+
+    hexsha: str
+
+
+def test_mark_done_is_persisted(tmp_path: Path) -> None:
+    """Test that completed tasks survive re-opening the journal in resume mode."""
+    path = tmp_path / "journal.jsonl"
+    journal = TaskJournal(path)
+    journal.mark_done(MeasurementTask(DummyCommit("abc"), 0, 0))
+    journal.mark_done(MeasurementTask(DummyCommit("abc"), 1, 0))
+    journal.mark_done(MeasurementTask(DummyCommit("abc"), 1, 0))
+
+    resumed = TaskJournal(path, resume=True)
+
+    assert resumed.completed == {("abc", 0, 0), ("abc", 1, 0)}
+    assert resumed.is_done(MeasurementTask(DummyCommit("abc"), 1, 0))
+    assert not resumed.is_done(MeasurementTask(DummyCommit("abc"), 2, 0))
+    expected_entries = 2
+    assert len(path.read_text().splitlines()) == expected_entries
+
+
+def test_new_campaign_truncates_journal(tmp_path: Path) -> None:
+    """Test that opening a journal without resume starts from scratch."""
+    path = tmp_path / "journal.jsonl"
+    TaskJournal(path).mark_done(MeasurementTask(DummyCommit("abc")))
+
+    assert TaskJournal(path).completed == set()
+    assert TaskJournal(path, resume=True).completed == set()
+
+
+def test_resume_ignores_truncated_line(tmp_path: Path) -> None:
+    """Test that a partially written last entry (e.g. after a crash) is skipped."""
+    path = tmp_path / "journal.jsonl"
+    path.write_text('{"commit": "abc", "run": 0, "repeat": 0}\n{"commit": "abc", "ru')
+
+    assert TaskJournal(path, resume=True).completed == {("abc", 0, 0)}
+
+
+def test_resume_appends_after_truncated_line(tmp_path: Path) -> None:
+    """Test that the first task recorded after resuming past a truncated line survives the next resume."""
+    path = tmp_path / "journal.jsonl"
+    path.write_text('{"commit": "abc", "run": 0, "repeat": 0}\n{"commit": "abc", "ru')
+
+    TaskJournal(path, resume=True).mark_done(MeasurementTask(DummyCommit("abc"), 1, 0))
+
+    assert TaskJournal(path, resume=True).completed == {("abc", 0, 0), ("abc", 1, 0)}
+
+
+def test_resume_without_journal(tmp_path: Path) -> None:
+    """Test that resuming without an existing journal starts an empty campaign."""
+    assert TaskJournal(tmp_path / "missing" / "journal.jsonl", resume=True).completed == set()
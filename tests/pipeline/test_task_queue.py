@@ -0,0 +1,77 @@
+"""Unit tests for the file-based task queue."""
+
+import os
+import time
+from pathlib import Path
+
+from energytrackr.pipeline.task_queue import FileTaskQueue, QueuedTask
+
+TASKS = [QueuedTask("aaa", 0, 0), QueuedTask("bbb", 0, 0), QueuedTask("aaa", 1, 0)]
+
+
+def publish_in_order(queue: FileTaskQueue, tasks: list[QueuedTask]) -> None:
+    """Publish tasks one by one, with increasing publication times.
+
+    Args:
+        queue (FileTaskQueue): The queue.
+        tasks (list[QueuedTask]): The tasks.
+    """
+    for task in tasks:
+        queue.publish([task])
+        time.sleep(0.01)
+
+
+def test_publish_and_claim_in_order(tmp_path: Path) -> None:
+    """Tasks are claimed once each, in publication order, preferring the given commits."""
+    queue = FileTaskQueue(tmp_path)
+    publish_in_order(queue, TASKS)
+    assert queue.publish(TASKS) == 0
+
+    other = FileTaskQueue(tmp_path)
+    assert queue.claim() == TASKS[0]
+    assert other.claim(prefer={"aaa"}) == TASKS[2]
+    assert queue.claim() == TASKS[1]
+    assert other.claim() is None
+    assert queue.pending_count() == 0
+
+
+def test_expired_lease_is_requeued(tmp_path: Path) -> None:
+    """A lease that is not renewed goes back to the pending tasks, and its worker learns it lost it."""
+    queue = FileTaskQueue(tmp_path)
+    queue.publish(TASKS[:2])
+    first, second = queue.claim(), queue.claim()
+    assert first is not None and second is not None
+    stale = time.time() - 100
+    os.utime(tmp_path / "leased" / f"{first.id}.json", (stale, stale))
+    assert queue.renew(second)
+
+    assert queue.requeue_expired(lease_s=50) == [first.id]
+    assert not queue.renew(first)
+    assert queue.claim() == first
+
+
+def test_results_are_read_incrementally(tmp_path: Path) -> None:
+    """Results are read once, and a line being written is only read when complete."""
+    queue = FileTaskQueue(tmp_path)
+    queue.publish(TASKS[:1])
+    task = queue.claim()
+    assert task is not None
+    queue.complete(task, "worker-1", {"status": "ok"})
+
+    assert queue.read_results() == [{"status": "ok", "task": task.id, "worker": "worker-1"}]
+    assert not (tmp_path / "leased" / f"{task.id}.json").exists()
+    with (tmp_path / "results" / "worker-1.jsonl").open("a", encoding="utf-8") as fh:
+        fh.write('{"status": "fail')
+    assert queue.read_results() == []
+    with (tmp_path / "results" / "worker-1.jsonl").open("a", encoding="utf-8") as fh:
+        fh.write('ed", "task": "x"}\n')
+    assert queue.read_results() == [{"status": "failed", "task": "x"}]
+
+
+def test_close_and_reopen(tmp_path: Path) -> None:
+    """Closing the queue is visible to every instance until it is reopened."""
+    queue = FileTaskQueue(tmp_path)
+    queue.close()
+    assert FileTaskQueue(tmp_path).closed
+    queue.reopen()
+    assert not queue.closed
@@ -0,0 +1,177 @@
+"""Unit tests for the watch command, measuring the commits pushed to a branch."""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import git
+import pytest
+
+from energytrackr.pipeline import watch as watch_module
+from energytrackr.pipeline.task_journal import MeasurementTask
+from energytrackr.pipeline.watch import Watcher, select_commits, update_branch
+from energytrackr.utils.git_utils import commit_ref, rev_list
+
+
+def add_commit(repo: git.Repo, name: str) -> str:
+    """Commit a new file.
+
+    Args:
+        repo (git.Repo): The repository.
+        name (str): Name and content of the file.
+
+    Returns:
+        str: The hash of the commit.
+    """
+    Path(repo.working_dir, name).write_text(name, encoding="utf-8")
+    repo.index.add([name])
+    return repo.index.commit(name).hexsha
+
+
+@pytest.fixture
+def mirror(tmp_path: Path) -> git.Repo:
+    """Repository standing for the mirror the branch is fetched from, with two commits.
+
+    Args:
+        tmp_path (Path): Temporary directory.
+
+    Returns:
+        git.Repo: The mirror, on branch "main".
+    """
+    repo = git.Repo.init(tmp_path / "mirror", initial_branch="main")
+    add_commit(repo, "a")
+    add_commit(repo, "b")
+    return repo
+
+
+def watch_config() -> SimpleNamespace:
+    """Configuration of a watcher of the "main" branch of the "origin" remote.
+
+    Returns:
+        SimpleNamespace: The configuration attributes read by the watcher.
+    """
+    return SimpleNamespace(
+        repo=SimpleNamespace(branch="main"),
+        watch=SimpleNamespace(remote="origin", interval_s=0),
+        regression_detection=SimpleNamespace(min_commits_before=1),
+        execution_plan=SimpleNamespace(
+            batch_size=10,
+            num_runs=2,
+            num_repeats=1,
+            randomize_tasks=False,
+            schedule=SimpleNamespace(strategy="sequential", seed=0),
+        ),
+    )
+
+
+def test_select_commits_adds_unmeasured_baselines() -> None:
+    """New commits are selected with the preceding commits that have no results."""
+    shas = [letter * 40 for letter in "abcdef"]
+    commits = [commit_ref(None, sha) for sha in shas]  # type: ignore[arg-type]
+
+    selected = select_commits(commits, measured={shas[0], shas[2], shas[3]}, before=2)
+
+    assert [commit.hexsha for commit in selected] == [shas[1], shas[4], shas[5]]
+    assert [commit.hexsha for commit in select_commits(commits, measured=set(shas), before=2)] == []
+
+
+def test_update_branch_fast_forwards(mirror: git.Repo, tmp_path: Path) -> None:
+    """The local branch follows the commits pushed to the mirror."""
+    clone = git.Repo.clone_from(mirror.working_dir, tmp_path / "clone")
+    new = add_commit(mirror, "c")
+
+    assert update_branch(clone, "origin", "main") == new
+    assert clone.active_branch.name == "main"
+
+
+def test_watcher_measures_only_new_commits(monkeypatch: pytest.MonkeyPatch, mirror: git.Repo, tmp_path: Path) -> None:
+    """Each cycle appends the runs of the unmeasured commits to the dataset and refreshes the report."""
+    clone = git.Repo.clone_from(mirror.working_dir, tmp_path / "clone")
+    dataset = tmp_path / "energy_results.csv"
+    broken = add_commit(mirror, "broken")
+    measured: list[list[str]] = []
+    reports: list[str] = []
+
+    class FakePipeline:
+        def __init__(self, *_args: object) -> None:
+            pass
+
+        def run(self, batches: list[list[MeasurementTask]]) -> None:  # noqa: PLR6301
+            shas = list(dict.fromkeys(task.hexsha for batch in batches for task in batch))
+            measured.append(shas)
+            with dataset.open("a", encoding="utf-8") as fh:
+                fh.writelines(f"{sha},1.0\n" for sha in shas if sha != broken)
+
+    monkeypatch.setattr(watch_module, "compile_stages", lambda _config: {"pre_stages": []})
+    monkeypatch.setattr(watch_module, "gather_commits", lambda repo: list(reversed(rev_list(repo, "main"))))
+    monkeypatch.setattr(watch_module, "Pipeline", FakePipeline)
+    monkeypatch.setattr(watch_module, "restore_head", lambda *_args: None)
+    monkeypatch.setattr(watch_module, "plot", lambda path, *_args, **_kwargs: reports.append(path))
+    watcher = Watcher(watch_config(), clone, dataset)  # type: ignore[arg-type]
+
+    assert watcher.cycle() == 2  # noqa: PLR2004
+    assert watcher.cycle() == 0
+    new = add_commit(mirror, "c")
+    assert watcher.cycle() == 1
+
+    history = list(reversed(rev_list(mirror, "main")))
+    assert measured == [[commit.hexsha for commit in history[:3]], [new]]
+    assert watcher.failed == {broken}
+    assert reports == [str(dataset), str(dataset)]
+
+
+def test_failed_cycle_restores_head_and_retries(monkeypatch: pytest.MonkeyPatch, mirror: git.Repo, tmp_path: Path) -> None:
+    """HEAD is restored when the pipeline raises, and the next cycle measures the same tip again."""
+    clone = git.Repo.clone_from(mirror.working_dir, tmp_path / "clone")
+    runs: list[int] = []
+    restored: list[str] = []
+
+    class FailingPipeline:
+        def __init__(self, *_args: object) -> None:
+            pass
+
+        def run(self, _batches: list[list[MeasurementTask]]) -> None:  # noqa: PLR6301
+            runs.append(len(runs))
+            raise RuntimeError("build host gone")  # noqa: TRY003
+
+    monkeypatch.setattr(watch_module, "compile_stages", lambda _config: {"pre_stages": []})
+    monkeypatch.setattr(watch_module, "gather_commits", lambda repo: list(reversed(rev_list(repo, "main"))))
+    monkeypatch.setattr(watch_module, "Pipeline", FailingPipeline)
+    monkeypatch.setattr(watch_module, "restore_head", lambda _repo, branch: restored.append(branch))
+    watcher = Watcher(watch_config(), clone, tmp_path / "energy_results.csv")  # type: ignore[arg-type]
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="build host gone"):
+            watcher.cycle()
+
+    assert runs == [0, 1]
+    assert restored == ["main", "main"]
+
+
+def test_watch_survives_failed_cycle(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """A cycle that raises is logged and the daemon carries on with the next one."""
+    cycles: list[int] = []
+
+    class FlakyWatcher:
+        dataset = tmp_path / "energy_results.csv"
+
+        def __init__(self, *_args: object) -> None:
+            pass
+
+        def cycle(self) -> int:  # noqa: PLR6301
+            cycles.append(len(cycles))
+            if len(cycles) == 1:
+                raise git.GitCommandError("fetch", 128)
+            raise KeyboardInterrupt
+
+    config = watch_config()
+    config.results = SimpleNamespace(dataset=None)
+    config.setup_commands = []
+    monkeypatch.setattr(watch_module, "open_project", lambda _path: (config, str(tmp_path), None))
+    monkeypatch.setattr(watch_module, "create_result_writer", lambda *_args: SimpleNamespace(path=FlakyWatcher.dataset))
+    monkeypatch.setattr(watch_module, "Watcher", FlakyWatcher)
+    monkeypatch.setattr(watch_module, "export_trace", lambda _folder: None)
+
+    with pytest.raises(KeyboardInterrupt):
+        watch_module.watch(str(tmp_path / "config.json"))
+
+    assert cycles == [0, 1]
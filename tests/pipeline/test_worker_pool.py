@@ -0,0 +1,102 @@
+"""Unit tests for the persistent worker pool and its memory-aware admission."""
+
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import pytest
+
+from energytrackr.pipeline.worker_pool import WorkerPool, mem_available_bytes
+
+GIB = 1024**3
+
+
+def write_meminfo(path: Path, available_gib: int) -> Path:
+    """Write a meminfo file reporting the given available memory.
+
+    Args:
+        path (Path): The file.
+        available_gib (int): The available memory, in GiB.
+
+    Returns:
+        Path: The file.
+    """
+    path.write_text(
+        f"MemTotal:       {64 * GIB // 1024} kB\nMemFree:        1024 kB\nMemAvailable:   {available_gib * GIB // 1024} kB\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+def exit_on_negative(value: int) -> int:
+    """Kill the worker process on a negative value, like a build killed by the OOM killer.
+
+    Args:
+        value (int): The value.
+
+    Returns:
+        int: The value.
+    """
+    if value < 0:
+        os._exit(1)
+    time.sleep(0.1)
+    return value
+
+
+def test_mem_available_bytes(tmp_path: Path) -> None:
+    """MemAvailable is read in bytes; an unreadable file gives None."""
+    assert mem_available_bytes(write_meminfo(tmp_path / "meminfo", 3)) == 3 * GIB
+    assert mem_available_bytes(tmp_path / "missing") is None
+    (tmp_path / "empty").write_text("MemTotal: 1 kB\n", encoding="utf-8")
+    assert mem_available_bytes(tmp_path / "empty") is None
+
+
+def test_admission_reserves_memory_per_task(tmp_path: Path) -> None:
+    """A task is admitted while the available memory covers it and the running ones."""
+    pool: WorkerPool[int] = WorkerPool(4, memory_per_task=2 * GIB, meminfo=write_meminfo(tmp_path / "meminfo", 5))
+    try:
+        assert pool._admits(0)
+        assert pool._admits(1)
+        assert not pool._admits(2)
+        pool.meminfo = tmp_path / "missing"
+        assert pool._admits(3)
+    finally:
+        pool.shutdown()
+
+
+def test_memory_limits_concurrency_across_calls(tmp_path: Path) -> None:
+    """Tasks wait for memory even with idle workers, and the pool is reused from call to call."""
+    pool: WorkerPool[float] = WorkerPool(
+        3,
+        memory_per_task=2 * GIB,
+        poll_interval=0.05,
+        meminfo=write_meminfo(tmp_path / "meminfo", 3),
+    )
+    try:
+        executor = pool.executor
+        start = time.monotonic()
+        done = [item for item, future in pool.imap_unordered(time.sleep, [0.2, 0.2, 0.2]) if future.result() is None]
+        # One task at a time: 3 GiB only fit one 2 GiB build.
+        assert time.monotonic() - start >= 0.6  # noqa: PLR2004
+        assert done == [0.2, 0.2, 0.2]
+        assert sorted(item for item, future in pool.imap_unordered(abs, [-2, 1]) if future.result() == abs(item)) == [-2, 1]
+        assert pool.executor is executor
+    finally:
+        pool.shutdown()
+
+
+def test_dead_worker_restarts_pool() -> None:
+    """A dead worker restarts the pool; only the task that kills it when run alone fails."""
+    pool: WorkerPool[int] = WorkerPool(2)
+    try:
+        executor = pool.executor
+        futures = dict(pool.imap_unordered(exit_on_negative, [1, -1, 2, 3]))
+
+        with pytest.raises(BrokenProcessPool):
+            futures[-1].result()
+        assert {item: futures[item].result() for item in (1, 2, 3)} == {1: 1, 2: 2, 3: 3}
+        assert pool.executor is not executor
+        assert [future.result() for _, future in pool.imap_unordered(exit_on_negative, [4])] == [4]
+    finally:
+        pool.shutdown()
@@ -0,0 +1,125 @@
+"""Unit tests for the WorkspaceCache class."""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from energytrackr.pipeline.pipeline import clean_cache_dir
+from energytrackr.pipeline.workspace_cache import WorkspaceCache
+
+BLOCK = 64 * 1024
+
+
+def make_workspace(repo_path: Path, sha: str) -> None:
+    """Create a workspace holding one 64 KiB file.
+
+    Args:
+        repo_path (Path): The main clone.
+        sha (str): The commit of the workspace.
+    """
+    workspace = Path(f"{repo_path}_{sha}")
+    workspace.mkdir()
+    (workspace / "build.bin").write_bytes(b"x" * BLOCK)
+
+
+def test_status_is_persisted(tmp_path: Path) -> None:
+    """Build statuses survive across instances; a deleted workspace is no longer reported as built."""
+    repo_path = tmp_path / ".cache_project"
+    make_workspace(repo_path, "a")
+    cache = WorkspaceCache(str(repo_path), 10 * BLOCK, "settings")
+    cache.record("a", built=True)
+    cache.record("b", built=False)
+    cache.save()
+
+    reloaded = WorkspaceCache(str(repo_path), 10 * BLOCK, "settings")
+    assert reloaded.status("a") == "built"
+    assert reloaded.status("b") == "failed"
+    assert reloaded.status("c") is None
+    assert reloaded.workspaces() == {str(Path(f"{repo_path}_a").absolute())}
+
+    Path(f"{repo_path}_a", "build.bin").unlink()
+    Path(f"{repo_path}_a").rmdir()
+    assert reloaded.status("a") is None
+
+
+def test_changed_settings_discard_the_index(tmp_path: Path) -> None:
+    """An index written with other build settings is ignored."""
+    repo_path = tmp_path / ".cache_project"
+    cache = WorkspaceCache(str(repo_path), BLOCK, "mvn compile")
+    cache.record("b", built=False)
+    cache.save()
+
+    assert WorkspaceCache(str(repo_path), BLOCK, "mvn package").status("b") is None
+
+
+def test_failed_builds_expire(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A failed build is only skipped for `failure_ttl_s` seconds."""
+    repo_path = tmp_path / ".cache_project"
+    cache = WorkspaceCache(str(repo_path), BLOCK, "settings", failure_ttl_s=60.0)
+    cache.record("b", built=False)
+    assert cache.status("b") == "failed"
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61.0)
+    assert cache.status("b") is None
+
+
+def test_forget_failures(tmp_path: Path) -> None:
+    """Forgotten failures are built again; built workspaces stay cached."""
+    repo_path = tmp_path / ".cache_project"
+    make_workspace(repo_path, "a")
+    cache = WorkspaceCache(str(repo_path), 10 * BLOCK, "settings")
+    cache.record("a", built=True)
+    cache.record("b", built=False)
+
+    assert cache.forget_failures() == 1
+    assert cache.status("a") == "built"
+    assert cache.status("b") is None
+
+
+def test_evict_least_recently_used(tmp_path: Path) -> None:
+    """Eviction deletes the least recently used workspaces until the budget is met."""
+    repo_path = tmp_path / ".cache_project"
+    cache = WorkspaceCache(str(repo_path), 2 * BLOCK, "settings")
+    for sha in ("a", "b", "c"):
+        make_workspace(repo_path, sha)
+        cache.record(sha, built=True)
+        time.sleep(0.01)
+    cache.status("a")
+
+    cache.evict()
+
+    assert not Path(f"{repo_path}_b").exists()
+    assert {Path(path).name for path in cache.workspaces()} == {".cache_project_a", ".cache_project_c"}
+
+
+def test_evict_keeps_protected_workspaces(tmp_path: Path) -> None:
+    """Protected workspaces, e.g. those of the next batch, are kept even if least recently used."""
+    repo_path = tmp_path / ".cache_project"
+    cache = WorkspaceCache(str(repo_path), 2 * BLOCK, "settings")
+    for sha in ("a", "b", "c"):
+        make_workspace(repo_path, sha)
+        cache.record(sha, built=True)
+        time.sleep(0.01)
+
+    cache.evict(protected={"a"})
+
+    assert {Path(path).name for path in cache.workspaces()} == {".cache_project_a", ".cache_project_c"}
+
+
+def test_clean_cache_dir_keeps_cached_workspaces(tmp_path: Path) -> None:
+    """Cleaning the cache directory keeps the index and the workspaces it is told to keep."""
+    repo_path = tmp_path / ".cache_project"
+    repo_path.mkdir()
+    cache = WorkspaceCache(str(repo_path), 10 * BLOCK, "settings")
+    for sha in ("a", "b"):
+        make_workspace(repo_path, sha)
+    cache.record("a", built=True)
+    cache.record("b", built=False)
+    cache.save()
+
+    clean_cache_dir(str(repo_path), keep=cache.workspaces())
+
+    remaining = sorted(entry.name for entry in tmp_path.iterdir())
+    assert remaining == [".cache_project", ".cache_project_a", ".workspace_index.json"]
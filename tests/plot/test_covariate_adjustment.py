@@ -0,0 +1,70 @@
+"""Tests for the CovariateAdjustment transform."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from energytrackr.plot.builtin_data_transforms.covariate_adjustment import CovariateAdjustment
+from energytrackr.plot.core.context import Context
+
+TEMPERATURE_EFFECT = 0.002  # joules per milli-degree
+
+
+def make_context(df: pd.DataFrame) -> Context:
+    """Wrap a DataFrame in a plotting context.
+
+    Args:
+        df (pd.DataFrame): The results.
+
+    Returns:
+        Context: The context.
+    """
+    ctx = Context(input_path="results.sqlite", energy_fields=["energy-pkg"])
+    ctx.artefacts["df"] = df
+    return ctx
+
+
+def test_adjustment_removes_temperature_effect() -> None:
+    """The energy explained by the temperature is removed, and the commit difference is kept."""
+    rng = np.random.default_rng(0)
+    temperature = rng.uniform(40_000, 70_000, 200)
+    commit = np.repeat(["a", "b"], 100)
+    energy = np.where(commit == "a", 10.0, 12.0) + TEMPERATURE_EFFECT * temperature + rng.normal(0, 0.05, 200)
+    df = pd.DataFrame({"commit": commit, "energy-pkg": energy, "cpu_temperature": temperature, "loadavg": 0.5})
+    ctx = make_context(df)
+
+    CovariateAdjustment(column="energy-pkg").apply(ctx)
+
+    adjusted = ctx.artefacts["df"]
+    stats = ctx.stats["covariate_adjustment"]
+    assert stats["coefficients"] == {"cpu_temperature": pytest.approx(TEMPERATURE_EFFECT, rel=0.05)}
+    assert stats["residual_std_after"] < stats["residual_std_before"] / 10
+    assert adjusted.groupby("commit")["energy-pkg"].std().max() < 0.1  # noqa: PLR2004
+    means = adjusted.groupby("commit")["energy-pkg"].mean()
+    assert means["b"] - means["a"] == pytest.approx(2.0, abs=0.05)
+    assert adjusted["energy-pkg_raw"].tolist() == energy.tolist()
+
+
+def test_post_run_covariates_are_not_adjusted_by_default() -> None:
+    """A temperature read after the run follows the energy of the commit; it is not regressed out by default."""
+    commit = np.repeat(["a", "b"], 50)
+    energy = np.where(commit == "a", 10.0, 12.0) + np.tile([0.0, 0.1], 50)
+    df = pd.DataFrame({"commit": commit, "energy-pkg": energy, "end_temperature": 40_000 + 5_000 * energy})
+    ctx = make_context(df)
+
+    CovariateAdjustment(column="energy-pkg").apply(ctx)
+
+    assert ctx.artefacts["df"] is df
+    CovariateAdjustment(column="energy-pkg", covariates=["end_temperature"]).apply(ctx)
+    assert ctx.stats["covariate_adjustment"]["coefficients"].keys() == {"end_temperature"}
+
+
+def test_no_covariates_leaves_data_unchanged() -> None:
+    """CSV results hold no covariate; the readings are kept as they are."""
+    df = pd.DataFrame({"commit": ["a", "b"], "energy-pkg": [1.0, 2.0]})
+    ctx = make_context(df)
+
+    CovariateAdjustment(column="energy-pkg").apply(ctx)
+
+    assert ctx.artefacts["df"] is df
+    assert "covariate_adjustment" not in ctx.stats
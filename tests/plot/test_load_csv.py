@@ -0,0 +1,38 @@
+"""Tests for the LoadCSV transform."""
+
+from pathlib import Path
+
+from energytrackr.pipeline.result_store import MeasurementRecord, SqliteResultWriter
+from energytrackr.plot.builtin_data_transforms.load_csv import LoadCSV
+from energytrackr.plot.core.context import Context
+
+COLUMNS = ["commit", "energy-pkg", "energy-core", "energy-gpu"]
+
+
+def test_sqlite_store_with_fewer_events_than_columns(tmp_path: Path) -> None:
+    """Only the value columns are renamed, even when fewer events than columns were measured."""
+    writer = SqliteResultWriter(tmp_path / "results.sqlite")
+    writer.write(MeasurementRecord(commit="abc", values={"pkg": "1.5"}, run_index=2, repeat_index=1))
+    writer.flush()
+    ctx = Context(input_path=str(writer.path), energy_fields=COLUMNS[1:])
+
+    LoadCSV(csv_columns=COLUMNS).apply(ctx)
+
+    df = ctx.artefacts["df"]
+    assert list(df.columns[:2]) == ["commit", "energy-pkg"]
+    assert df["energy-pkg"].tolist() == [1.5]
+    assert df["run_index"].tolist() == [2]
+    assert df["repeat_index"].tolist() == [1]
+
+
+def test_sqlite_store_without_warmup_runs(tmp_path: Path) -> None:
+    """The runs recorded as warm-up are not loaded."""
+    writer = SqliteResultWriter(tmp_path / "results.sqlite")
+    writer.write(MeasurementRecord(commit="abc", values={"pkg": "9.0"}, warmup=True))
+    writer.write(MeasurementRecord(commit="abc", values={"pkg": "1.0"}))
+    writer.flush()
+    ctx = Context(input_path=str(writer.path), energy_fields=COLUMNS[1:])
+
+    LoadCSV(csv_columns=COLUMNS).apply(ctx)
+
+    assert ctx.artefacts["df"]["energy-pkg"].tolist() == [1.0]
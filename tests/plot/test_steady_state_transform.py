@@ -0,0 +1,25 @@
+"""Tests for the SteadyState transform."""
+
+import pandas as pd
+
+from energytrackr.plot.builtin_data_transforms.steady_state import SteadyState
+from energytrackr.plot.core.context import Context
+
+
+def test_drops_transient_runs() -> None:
+    """The leading runs of a commit with a transient are dropped."""
+    hot = [20.0, 20.0, 15.0, 15.0] + [10.0, 10.1, 9.9, 10.0] * 3
+    flat = [10.0, 10.1, 9.9, 10.0] * 4
+    df = pd.DataFrame({
+        "commit": ["a"] * len(hot) + ["b"] * len(flat),
+        "energy-pkg": [*hot, *flat],
+    })
+    ctx = Context(input_path="results.sqlite", energy_fields=["energy-pkg"])
+    ctx.artefacts["df"] = df
+
+    SteadyState(column="energy-pkg", batch_size=4).apply(ctx)
+
+    kept = ctx.artefacts["df"]
+    assert ctx.stats["steady_state_truncated"] == {"a": 4}
+    assert kept.loc[kept["commit"] == "a", "energy-pkg"].max() < 11  # noqa: PLR2004
+    assert (kept["commit"] == "b").sum() == len(flat)
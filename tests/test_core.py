@@ -243,6 +243,57 @@ def test_gather_commits_oldest_and_newest(tmp_path: Path) -> None:
     assert len(selected_shas) == expected_commit_count
 
 
+def test_gather_commits_first_parent_and_paths(tmp_path: Path) -> None:
+    """Test that first-parent and path filters are applied and that the listed commits can be read."""
+    Config.reset()
+
+    repo_dir = tmp_path / "repo"
+    repo: Repo = Repo.init(repo_dir, initial_branch="main")
+    with repo.config_writer() as cw:
+        cw.set_value("user", "name", "Test")
+        cw.set_value("user", "email", "test@example.com")
+
+    def commit(name: str, message: str) -> str:
+        (repo_dir / name).parent.mkdir(parents=True, exist_ok=True)
+        (repo_dir / name).write_text(message, encoding="utf-8")
+        repo.index.add([name])
+        return repo.index.commit(message).hexsha
+
+    root = commit("src/a.py", "root")
+    repo.git.checkout("-b", "side")
+    side = commit("src/b.py", "side")
+    repo.git.checkout("main")
+    docs = commit("README.md", "docs")
+    repo.git.merge("--no-ff", "-m", "merge", "side")
+    merge = repo.head.commit.hexsha
+
+    config = {
+        "repo": {"url": str(repo_dir), "branch": "main", "clone_options": []},
+        "execution_plan": {
+            "mode": "tests",
+            "granularity": "commits",
+            "test_command": "pytest",
+            "first_parent": True,
+        },
+        "limits": {"temperature_safe_limit": 90000, "energy_regression_percent": 15},
+        "tracked_file_extensions": ["py"],
+        "cpu_thermal_file": "/sys/class/thermal/thermal_zone0/temp",
+        "setup_commands": [],
+    }
+    config_file = tmp_path / "config.yml"
+    config_file.write_text(yaml.safe_dump(config), encoding="utf-8")
+    load_pipeline_config(str(config_file))
+
+    commits = gather_commits(repo)
+    assert [c.hexsha for c in commits] == [root, docs, merge]
+    assert isinstance(commits[0], Commit)
+    assert commits[0].message == "root"
+
+    Config.get_config().execution_plan.first_parent = False
+    Config.get_config().execution_plan.paths = ["src"]
+    assert {c.hexsha for c in gather_commits(repo)} == {root, side}
+
+
 def test_compile_stages() -> None:
     """Test the compile_stages function."""
     stages: dict[str, str] = compile_stages()
@@ -258,6 +309,7 @@ def test_parse_args_measure(monkeypatch: pytest.MonkeyPatch) -> None:
     args = parse_args()
     assert args.command == "measure"
     assert args.config == "test.yml"
+    assert not args.retry_failed
 
 
 def test_parse_args_sort(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -0,0 +1,68 @@
+"""Unit tests for the asynchronous command runner."""
+
+import asyncio
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from energytrackr.utils.command_runner import OutputTail, run_command_async
+
+MAX_OUTPUT = 1024
+
+
+def is_gone(pid_file: Path) -> bool:
+    """Check whether the process whose pid was written to a file has exited.
+
+    Args:
+        pid_file (Path): The file holding the pid.
+
+    Returns:
+        bool: True if the process is gone, or a zombie waiting for init to reap it.
+    """
+    stat = Path("/proc", pid_file.read_text(encoding="utf-8").strip(), "stat")
+    return not stat.exists() or stat.read_text(encoding="utf-8").rpartition(")")[2].split()[0] == "Z"
+
+
+def test_output_tail_keeps_last_bytes() -> None:
+    """The buffer keeps the most recent bytes and reports how many were dropped."""
+    tail = OutputTail(max_bytes=4)
+    for chunk in (b"ab", b"cde", b"fg"):
+        tail.write(chunk)
+    assert tail.text() == "[... 3 bytes of output dropped ...]\ndefg"
+    assert not OutputTail(max_bytes=4).text()
+
+
+def test_run_command_async_bounds_output() -> None:
+    """Only the tail of a verbose command is kept, and the return code is reported."""
+    result = asyncio.run(
+        run_command_async("seq 100000; echo done >&2; exit 3", timeout=30, max_output=MAX_OUTPUT),
+    )
+    assert result.returncode == 3  # noqa: PLR2004
+    assert result.stdout.endswith("99999\n100000\n")
+    assert len(result.stdout.splitlines()[-1]) < MAX_OUTPUT
+    assert result.stderr == "done\n"
+
+
+def test_timeout_kills_process_group(tmp_path: Path) -> None:
+    """On timeout, the children of the command are killed along with it."""
+    pid_file = tmp_path / "pid"
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(run_command_async(f"sleep 30 & echo $! > {pid_file}; wait", timeout=0.5))
+    assert is_gone(pid_file)
+
+
+def test_cancellation_kills_process_group(tmp_path: Path) -> None:
+    """When the caller is cancelled (as on Ctrl-C), the children of the command are killed as well."""
+    pid_file = tmp_path / "pid"
+
+    async def cancel_while_running() -> None:
+        task = asyncio.create_task(run_command_async(f"sleep 30 & echo $! > {pid_file}; wait"))
+        while not pid_file.exists() or not pid_file.read_text(encoding="utf-8").strip():
+            await asyncio.sleep(0.05)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(cancel_while_running())
+    assert is_gone(pid_file)
@@ -0,0 +1,70 @@
+"""Tests for the commit file index."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import git
+import pytest
+
+from energytrackr.utils.commit_index import INDEX_DIR, INDEX_FILE, CommitFileIndex
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> git.Repo:
+    """Repository with a root commit, a regular commit, a side branch and a merge.
+
+    Returns:
+        git.Repo: The repository.
+    """
+    repo_dir = tmp_path / "repo"
+    repo = git.Repo.init(repo_dir, initial_branch="main")
+    with repo.config_writer() as cw:
+        cw.set_value("user", "name", "Test")
+        cw.set_value("user", "email", "test@example.com")
+
+    def commit(files: dict[str, str], message: str) -> None:
+        for name, content in files.items():
+            (repo_dir / name).parent.mkdir(parents=True, exist_ok=True)
+            (repo_dir / name).write_text(content, encoding="utf-8")
+        repo.index.add(list(files))
+        repo.index.commit(message)
+
+    commit({"README.md": "init", "src/Main.java": "class A {}"}, "root")
+    commit({"src/Main.java": "class B {}"}, "change main")
+    repo.git.checkout("-b", "side")
+    commit({"docs/guide.md": "guide"}, "docs")
+    repo.git.checkout("main")
+    commit({"src/Util.java": "class U {}"}, "util")
+    repo.git.merge("--no-ff", "-m", "merge side", "side")
+    return repo
+
+
+def test_index_matches_commit_stats(repo: git.Repo) -> None:
+    """Test that the indexed files are those reported by GitPython for every commit, merges included."""
+    commits = list(repo.iter_commits("main"))
+
+    index = CommitFileIndex.for_commits(repo, [c.hexsha for c in commits], persist=False)
+
+    assert len(index) == len(commits)
+    for commit in commits:
+        assert sorted(index.files(commit.hexsha)) == sorted(commit.stats.files), commit.summary
+
+
+def test_index_is_persisted_and_reused(repo: git.Repo) -> None:
+    """Test that a second lookup of the same commits does not call git again."""
+    hexshas = [c.hexsha for c in repo.iter_commits("main")]
+    CommitFileIndex.for_commits(repo, hexshas)
+
+    assert (Path(repo.git_dir) / INDEX_DIR / INDEX_FILE).is_file()
+    with patch.object(CommitFileIndex, "add_from_git") as add_from_git:
+        index = CommitFileIndex.for_commits(repo, hexshas)
+    add_from_git.assert_not_called()
+    assert sorted(index.files(repo.head.commit.hexsha)) == ["docs/guide.md"]
+
+
+def test_load_corrupted_index(tmp_path: Path) -> None:
+    """Test that an unreadable index is ignored."""
+    path = tmp_path / INDEX_FILE
+    path.write_text("{not json", encoding="utf-8")
+
+    assert not len(CommitFileIndex.load(path))
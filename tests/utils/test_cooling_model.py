@@ -0,0 +1,62 @@
+"""Tests for the Newton cooling model."""
+
+import math
+
+import pytest
+
+from energytrackr.utils.cooling_model import CoolingModel
+
+TAU = 20.0
+AMBIENT = 40000.0
+
+
+def newton_curve(t: float, start: float = 80000.0) -> float:
+    """Temperature of a body cooling according to Newton's law.
+
+    Args:
+        t (float): Elapsed time in seconds.
+        start (float): Temperature at t=0.
+
+    Returns:
+        float: The temperature at time t.
+    """
+    return AMBIENT + (start - AMBIENT) * math.exp(-t / TAU)
+
+
+def test_fit_recovers_cooling_curve() -> None:
+    """Test that tau and the ambient temperature are learned from readings."""
+    model = CoolingModel()
+    for t in range(30):
+        model.observe(float(t), newton_curve(t))
+
+    fit = model.fit()
+
+    assert fit is not None
+    tau, ambient = fit
+    assert tau == pytest.approx(TAU, rel=0.05)
+    assert ambient == pytest.approx(AMBIENT, rel=0.01)
+    assert model.predict_wait(70000.0, 50000.0) == pytest.approx(TAU * math.log(3), rel=0.05)
+
+
+def test_predict_wait_without_model_or_reachable_target() -> None:
+    """Test that no prediction is made before the curve is known or below the ambient temperature."""
+    model = CoolingModel()
+    model.observe(0.0, 60000.0)
+
+    assert model.predict_wait(60000.0, 50000.0) is None
+    assert model.predict_wait(45000.0, 50000.0) == 0
+
+    for t in range(1, 10):
+        model.observe(float(t), newton_curve(t))
+    assert model.predict_wait(60000.0, AMBIENT - 1000) is None
+
+
+def test_end_episode_does_not_mix_curves() -> None:
+    """Test that readings separated by an episode boundary are not paired."""
+    model = CoolingModel()
+    model.observe(0.0, 50000.0)
+    model.end_episode()
+    model.observe(1.0, 70000.0)
+    model.observe(2.0, 69000.0)
+
+    assert model.fit() is None
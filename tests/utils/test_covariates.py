@@ -0,0 +1,55 @@
+"""Tests for the readers of the run covariates."""
+
+from pathlib import Path
+
+import pytest
+
+from energytrackr.utils.covariates import read_cpu_frequency_mhz, read_cpu_temperature, read_loadavg
+
+
+def test_frequency_from_cpufreq(tmp_path: Path) -> None:
+    """The scaling_cur_freq of the CPUs are averaged and converted to MHz."""
+    for cpu, khz in (("cpu0", 2_000_000), ("cpu1", 3_000_000)):
+        (tmp_path / cpu / "cpufreq").mkdir(parents=True)
+        (tmp_path / cpu / "cpufreq" / "scaling_cur_freq").write_text(f"{khz}\n")
+    (tmp_path / "cpufreq").mkdir()
+
+    assert read_cpu_frequency_mhz(tmp_path, tmp_path / "missing") == pytest.approx(2500.0)
+
+
+def test_frequency_from_cpuinfo(tmp_path: Path) -> None:
+    """Without cpufreq, the frequencies of /proc/cpuinfo are averaged; None if neither exists."""
+    cpuinfo = tmp_path / "cpuinfo"
+    cpuinfo.write_text("processor\t: 0\ncpu MHz\t\t: 1000.5\n\nprocessor\t: 1\ncpu MHz\t\t: 2000.5\n")
+
+    assert read_cpu_frequency_mhz(tmp_path, cpuinfo) == pytest.approx(1500.5)
+    assert read_cpu_frequency_mhz(tmp_path, tmp_path / "missing") is None
+
+
+def test_loadavg() -> None:
+    """The one-minute load average is a non-negative number on Linux."""
+    load = read_loadavg()
+    assert load is not None
+    assert load >= 0
+
+
+def test_read_cpu_temperature_success(tmp_path: Path) -> None:
+    """The thermal file is parsed as an integer, surrounding whitespace ignored."""
+    temperature = 42000
+    f = tmp_path / "t"
+    f.write_text(f" {temperature}\n")
+    assert read_cpu_temperature(f) == temperature
+
+
+def test_read_cpu_temperature_file_not_found() -> None:
+    """A missing thermal file raises an OSError."""
+    with pytest.raises(OSError):
+        read_cpu_temperature("/nonexistent/path")
+
+
+def test_read_cpu_temperature_invalid_content(tmp_path: Path) -> None:
+    """Non-integer content raises a ValueError."""
+    f = tmp_path / "t"
+    f.write_text("not-an-int")
+    with pytest.raises(ValueError):
+        read_cpu_temperature(f)
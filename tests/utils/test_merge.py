@@ -0,0 +1,67 @@
+"""Unit tests for utils.merge module."""
+
+from pathlib import Path
+
+import pytest
+
+from energytrackr.utils.exceptions import MismatchedHeaderError, MissingHashColumnError
+from energytrackr.utils.merge import merge_result_files
+
+
+def write_files(tmp_path: Path, *contents: str) -> list[str]:
+    """Write result files.
+
+    Args:
+        tmp_path (Path): The directory.
+        *contents (str): The content of each file.
+
+    Returns:
+        list[str]: The paths of the files, in order.
+    """
+    paths = []
+    for i, content in enumerate(contents):
+        path = tmp_path / f"results_{i}.csv"
+        path.write_text(content, encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def test_first_wins_keeps_runs_of_first_file(tmp_path: Path) -> None:
+    """A commit keeps all its runs from the first file it appears in and is dropped from later files."""
+    inputs = write_files(tmp_path, "a,1.0\na,1.1\nb,2.0\n", "b,9.0\nc,3.0\n\nc,3.1\n", "a,9.0,9.9\nd,4.0,0.5\n")
+    output = tmp_path / "merged.csv"
+
+    summary = merge_result_files(inputs, str(output), chunk_rows=1)
+
+    assert output.read_text().splitlines() == ["a,1.0", "a,1.1", "b,2.0", "c,3.0", "c,3.1", "d,4.0,0.5"]
+    assert (summary.files, summary.rows, summary.dropped, summary.commits) == (3, 6, 2, 4)
+
+
+def test_keep_all_keeps_every_run(tmp_path: Path) -> None:
+    """The keep-all policy concatenates the files."""
+    inputs = write_files(tmp_path, "a,1.0\n", "a,2.0\nb,3.0\n")
+    output = tmp_path / "merged.csv"
+
+    summary = merge_result_files(inputs, str(output), policy="keep-all")
+
+    assert output.read_text().splitlines() == ["a,1.0", "a,2.0", "b,3.0"]
+    assert summary.dropped == 0
+
+
+def test_header_is_written_once(tmp_path: Path) -> None:
+    """Files with a header are deduplicated on the named column and the header is written once."""
+    inputs = write_files(tmp_path, "energy,commit_hash\n1.0,a\n", "energy,commit_hash\n2.0,a\n3.0,b\n")
+    output = tmp_path / "merged.csv"
+
+    merge_result_files(inputs, str(output), hash_column="commit_hash")
+
+    assert output.read_text().splitlines() == ["energy,commit_hash", "1.0,a", "3.0,b"]
+
+
+def test_header_errors(tmp_path: Path) -> None:
+    """Files with different headers, or without the hash column, are rejected."""
+    inputs = write_files(tmp_path, "commit,energy\na,1.0\n", "commit,power\nb,2.0\n")
+    with pytest.raises(MismatchedHeaderError):
+        merge_result_files(inputs, str(tmp_path / "merged.csv"), hash_column="commit")
+    with pytest.raises(MissingHashColumnError):
+        merge_result_files(inputs[:1], str(tmp_path / "merged.csv"), hash_column="sha")
@@ -0,0 +1,143 @@
+"""Tests for the RAPL powercap reader and sampler."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from energytrackr.utils.rapl import (
+    RaplReader,
+    RaplSampler,
+    check_stability,
+    discover_domains,
+    energy_delta_uj,
+    window_power,
+)
+
+MAX_RANGE = 1_000_000_000
+CONSUMED = 20
+
+
+def make_zone(root: Path, zone: str, name: str, energy: int | None = 0) -> Path:
+    """Create a fake powercap zone directory.
+
+    Args:
+        root (Path): The fake powercap directory.
+        zone (str): Zone directory name, e.g. "intel-rapl:0".
+        name (str): Domain name.
+        energy (int | None): Initial counter value, or None to omit the counter.
+
+    Returns:
+        Path: The zone directory.
+    """
+    path = root / zone
+    path.mkdir(parents=True)
+    (path / "name").write_text(f"{name}\n")
+    (path / "max_energy_range_uj").write_text(f"{MAX_RANGE}\n")
+    if energy is not None:
+        (path / "energy_uj").write_text(f"{energy}\n")
+    return path
+
+
+@pytest.fixture
+def powercap(tmp_path: Path) -> Path:
+    """Fake powercap tree with a package, its core sub-zone and a psys zone.
+
+    Returns:
+        Path: The fake powercap directory.
+    """
+    make_zone(tmp_path, "intel-rapl:1", "psys", 500)
+    make_zone(tmp_path, "intel-rapl:0:0", "core", 100)
+    make_zone(tmp_path, "intel-rapl:0", "package-0", 1_000)
+    return tmp_path
+
+
+def test_discover_domains_ordered_by_zone(powercap: Path) -> None:
+    """Domains are listed package first, then sub-zones, then the next zone."""
+    domains = discover_domains(powercap)
+    assert [d.name for d in domains] == ["package-0", "core", "psys"]
+    assert domains[0].max_energy_uj == MAX_RANGE
+
+
+def test_discover_domains_skips_unreadable_and_dedups(tmp_path: Path) -> None:
+    """Zones without a readable counter are skipped and duplicate names get the zone id."""
+    make_zone(tmp_path, "intel-rapl:0", "package-0")
+    make_zone(tmp_path, "intel-rapl:1", "package-0")
+    make_zone(tmp_path, "intel-rapl:2", "dram", energy=None)
+    assert [d.name for d in discover_domains(tmp_path)] == ["package-0", "package-0:1"]
+
+
+def test_discover_domains_missing_root(tmp_path: Path) -> None:
+    """A machine without powercap exposes no domain."""
+    assert not discover_domains(tmp_path / "absent")
+
+
+def test_energy_delta_wraparound() -> None:
+    """The delta is corrected when the counter wrapped around."""
+    assert energy_delta_uj(10, 30, MAX_RANGE) == CONSUMED
+    assert energy_delta_uj(MAX_RANGE - 5, 15, MAX_RANGE) == CONSUMED
+
+
+def test_reader_energy_joules(powercap: Path) -> None:
+    """Two snapshots are converted to joules per domain."""
+    reader = RaplReader(powercap)
+    before = reader.snapshot()
+    (powercap / "intel-rapl:0" / "energy_uj").write_text("3001000\n")
+    (powercap / "intel-rapl:0:0" / "energy_uj").write_text("50\n")
+    after = reader.snapshot()
+
+    energies = reader.energy_joules(before, after)
+
+    assert energies["package-0"] == pytest.approx(3.0)
+    assert energies["core"] == pytest.approx((MAX_RANGE - 100 + 50) / 1_000_000)
+    assert energies["psys"] == 0
+
+
+def test_window_power_corrects_wraparound() -> None:
+    """Windows average the power of their intervals, across a wrap-around of the counter."""
+    times_ns = np.arange(0, 5) * 10_000_000
+    energy_uj = np.array([MAX_RANGE - 100_000, MAX_RANGE - 50_000, 0, 100_000, 200_000])
+
+    power = window_power(times_ns, energy_uj, window=2, max_energy_uj=MAX_RANGE)
+
+    # 100 mJ over 20 ms, then 200 mJ over 20 ms.
+    assert power.tolist() == pytest.approx([5.0, 10.0])
+
+
+def test_check_stability_flags_outlier_windows() -> None:
+    """A test window far from the warm-up windows makes the system unstable."""
+    warmup = [10.0, 10.2, 9.8, 10.1, 9.9]
+    assert check_stability(np.array([*warmup, 10.0, 10.15]), warmup=5, threshold=3.5).stable
+    unstable = check_stability(np.array([*warmup, 10.0, 14.0]), warmup=5, threshold=3.5)
+    assert not unstable.stable
+    assert unstable.median_w == pytest.approx(10.0)
+    assert unstable.windows == 2  # noqa: PLR2004
+
+
+def test_sampler_ring_buffer(powercap: Path) -> None:
+    """The sampler reads the open counter into its buffer, keeping the most recent samples in order."""
+    sampler = RaplSampler(discover_domains(powercap)[0], rate_hz=1_000.0, capacity=4)
+    try:
+        sampler.record(3)
+        (powercap / "intel-rapl:0" / "energy_uj").write_text("2000\n")
+        sampler.record(3)
+        times_ns, energy_uj = sampler.samples()
+    finally:
+        sampler.close()
+
+    assert energy_uj.tolist() == [1_000, 2_000, 2_000, 2_000]
+    assert np.all(np.diff(times_ns) > 0)
+    assert sampler.count == 6  # noqa: PLR2004
+
+
+def test_sampler_stability_test_is_short(powercap: Path) -> None:
+    """A stability test lasts about its warm-up and test periods; a constant counter is stable."""
+    sampler = RaplSampler(discover_domains(powercap)[0], rate_hz=200.0, capacity=128)
+    try:
+        result = sampler.stability_test(warmup_s=0.1, duration_s=0.2, window_s=0.05, threshold=3.5)
+    finally:
+        sampler.close()
+
+    assert result.stable
+    assert result.windows == 4  # noqa: PLR2004
+    assert sampler.count == 61  # noqa: PLR2004
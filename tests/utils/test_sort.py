@@ -137,3 +137,40 @@ def test_reorder_commits(tmp_path: Path, dummy_repo_with_commits: tuple[Path, li
         [commits[2], "5.0"],
     ]
     assert sorted_rows == expected
+
+
+def test_reorder_commits_follows_first_parent(tmp_path: Path, dummy_repo_with_commits: tuple[Path, list[str]]) -> None:
+    """Commits of a merged branch are placed after the first-parent history."""
+    repo_dir, commits = dummy_repo_with_commits
+    git = ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com"]
+    subprocess.run(["git", "checkout", "-q", "-b", "feature", commits[1]], cwd=repo_dir, check=True)
+    (repo_dir / "feature.txt").write_text("feature")
+    subprocess.run(["git", "add", "."], cwd=repo_dir, check=True)
+    subprocess.run([*git, "commit", "-q", "-m", "feature"], cwd=repo_dir, check=True)
+    feature = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=repo_dir).decode().strip()
+    subprocess.run(["git", "checkout", "-q", "-"], cwd=repo_dir, check=True)
+    subprocess.run([*git, "merge", "-q", "--no-ff", "-m", "merge", "feature"], cwd=repo_dir, check=True)
+    merge = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=repo_dir).decode().strip()
+
+    input_csv = tmp_path / "input.csv"
+    input_csv.write_text(f"{merge},1\n{feature},2\n{commits[2]},3\n{commits[0]},4\n")
+    output_csv = tmp_path / "sorted.csv"
+    reorder_commits(str(input_csv), str(repo_dir), str(output_csv))
+
+    assert [row[0] for row in csv.reader(output_csv.open())] == [commits[0], commits[2], merge, feature]
+
+
+def test_reorder_commits_spills_runs(tmp_path: Path, dummy_repo_with_commits: tuple[Path, list[str]]) -> None:
+    """Files larger than a run are sorted through temporary runs, stably and keeping every column."""
+    repo_dir, commits = dummy_repo_with_commits
+    rows = [[commits[2 - i % 3], str(i), "0.5"] for i in range(10)]
+    input_csv = tmp_path / "input.csv"
+    with open(input_csv, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(rows)
+
+    output_csv = tmp_path / "sorted.csv"
+    reorder_commits(str(input_csv), str(repo_dir), str(output_csv), run_rows=3)
+
+    with open(output_csv, newline="", encoding="utf-8") as f:
+        sorted_rows = list(csv.reader(f))
+    assert sorted_rows == sorted(rows, key=lambda row: (commits.index(row[0]), int(row[1])))
@@ -0,0 +1,24 @@
+"""Tests for the MSER steady-state truncation."""
+
+import numpy as np
+
+from energytrackr.utils.steady_state import mser_truncation
+
+
+def test_truncates_warmup_transient() -> None:
+    """A decaying start is dropped, in whole batches, and a stationary sequence is kept."""
+    rng = np.random.default_rng(1)
+    steady = rng.normal(10.0, 0.1, 40)
+    warmup = 10.0 + 3.0 * np.exp(-np.arange(10) / 2)
+
+    dropped = mser_truncation([*warmup, *steady], batch_size=5)
+
+    assert dropped in {5, 10}
+    assert mser_truncation(steady.tolist(), batch_size=5) == 0
+
+
+def test_bounds() -> None:
+    """Too few values are never truncated, and at most max_fraction of the batches are dropped."""
+    assert mser_truncation([5.0, 1.0, 1.0], batch_size=5) == 0
+    # A sequence still drifting at the end: the rule cannot go beyond half of the batches.
+    assert mser_truncation([float(i) for i in range(40)], batch_size=5, max_fraction=0.5) <= 20  # noqa: PLR2004
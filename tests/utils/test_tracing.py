@@ -0,0 +1,69 @@
+"""Tests for the stage timing spans."""
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from energytrackr.utils.tracing import Span, Tracer, format_summary, read_chrome_trace, summarize, write_chrome_trace
+
+NUM_SPANS = 20
+
+
+def test_span_outcomes() -> None:
+    """Test that the outcome reflects the flags set by the stage and exceptions.
+
+    Raises:
+        RuntimeError: Inside a span, to record an error outcome.
+    """
+    tracer = Tracer()
+    context: dict[str, Any] = {"commit": "abc", "build_failed": False, "abort_pipeline": False}
+
+    with tracer.span("BuildStage", "pre_test_stages", context):
+        context["build_failed"] = True
+    with tracer.span("PostTestStage", "pre_test_stages", context):
+        pass
+    with pytest.raises(RuntimeError), tracer.span("MeasureEnergyStage", "batch_stages", context):
+        raise RuntimeError
+    with tracer.span("CheckoutStage", "pre_test_stages", context):
+        context["abort_pipeline"] = True
+
+    assert [span.outcome for span in tracer.spans] == ["build_failed", "ok", "error", "aborted"]
+    assert {span.commit for span in tracer.spans} == {"abc"}
+    assert {span.pid for span in tracer.spans} == {os.getpid()}
+    assert all(span.end >= span.start for span in tracer.spans)
+
+
+def test_worker_spans_are_buffered_then_merged() -> None:
+    """Test that spans of worker processes are stored in the context until merged."""
+    worker, main = Tracer(), Tracer()
+    context: dict[str, Any] = {"commit": "abc", "worker_process": True}
+
+    with worker.span("CopyDirectoryStage", "pre_test_stages", context):
+        pass
+    main.merge(context["trace_spans"])
+
+    assert not worker.spans
+    assert [span.stage for span in main.spans] == ["CopyDirectoryStage"]
+
+
+def test_chrome_trace_round_trip_and_summary(tmp_path: Path) -> None:
+    """Test the Chrome trace export and the per-stage percentiles."""
+    spans = [Span("MeasureEnergyStage", "batch_stages", "abc", 1, 100.0, 100.0 + i + 1, "ok") for i in range(NUM_SPANS)]
+    spans.append(Span("TemperatureCheckStage", "batch_stages", "abc", 1, 0.0, 0.5, "ok"))
+    path = tmp_path / "trace.json"
+
+    write_chrome_trace(spans, path)
+    events = json.loads(path.read_text(encoding="utf-8"))["traceEvents"]
+    summary = summarize(read_chrome_trace(path))
+
+    assert events[0]["ph"] == "X"
+    assert events[0]["dur"] == pytest.approx(1_000_000)
+    assert [s.stage for s in summary] == ["MeasureEnergyStage", "TemperatureCheckStage"]
+    assert summary[0].count == NUM_SPANS
+    assert summary[0].total == pytest.approx(sum(range(1, NUM_SPANS + 1)))
+    assert summary[0].p50 == pytest.approx(10.5)
+    assert summary[0].p95 == pytest.approx(19.05)
+    assert "MeasureEnergyStage" in format_summary(summary).splitlines()[1]